@@ -0,0 +1,350 @@
+"""
+Headless benchmarks of the app's compute paths on synthetic data.
+
+Each scenario drives one page through Streamlit's AppTest (no browser, no
+server) on a seeded rgm.synthetic dataset, with rerun profiling on, and
+records the wall time of every rerun, the profiler's stage timings and the
+process's peak resident memory. A button that starts a background job (see
+rgm.jobs) is timed until the job has finished and its result is back in the
+session. The simulator scenario then runs the post-modelling page's
+scenario maths (rgm.demand) on the models that job fitted: every model's
+demand curve, and its volume and elasticity over a sweep of own prices, as
+the simulator recomputes them when a price is edited. Every (scenario, rows) pair runs in its own process, with its own
+empty cache directory (RGM_CACHE_DIR), so memory peaks are not inflated by
+earlier scenarios, the artifact store never turns a run into a cache hit,
+and one failing page does not stop the others.
+
+    python benchmarks/run_benchmarks.py --rows 10000,100000 --out results.json
+    python benchmarks/run_benchmarks.py --rows 100000 --compare results.json
+
+With --compare, the run exits non-zero if any scenario got slower (total
+wall time) or bigger (peak RSS) than in the baseline file by more than
+--tolerance, or failed where the baseline passed.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from rgm.profiling import current_rss, environment  # noqa: E402
+
+
+APP = os.path.join(ROOT, "STYLEGUIDE.py")
+
+# name -> page to open, session frames to seed with the data, columns to drop
+# from it first, the button to click after the first run (its rerun is
+# measured too), the background job that click starts (waited for) and the
+# session table of model results to run the simulator on once it is done
+SCENARIOS = {
+    "base_price": {
+        "page": "section1_baseprice",
+        "frames": ["D0"],
+        "drop": ["BasePrice"],
+        "click": "Save All Base Prices",
+        "job": "Save All Base Prices",
+    },
+    "promo_depth": {
+        "page": "section1_promodepth",
+        "frames": ["D0", "dataframe1"],
+    },
+    "full_pipeline": {
+        "page": "section2_module1",
+        "frames": ["D0"],
+    },
+    "model_pipeline": {
+        "page": "section2_module1",
+        "frames": ["D0"],
+        "click": "Run Models",
+        "job": "Run Models",
+    },
+    "simulator": {
+        "page": "section2_module1",
+        "frames": ["D0"],
+        "click": "Run Models",
+        "job": "Run Models",
+        "simulate": "combined_results",
+    },
+    "market_construct": {
+        "page": "section1_market_construct",
+        "frames": ["D0"],
+    },
+}
+
+DEFAULT_ROWS = [10_000, 100_000]
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_TIMEOUT_S = 1800
+
+# Seconds between the reruns that poll for a background job's result
+JOB_POLL_S = 0.25
+
+# Own prices per model in the simulator's sweep, from half to one and a half times the mean PPU
+SIMULATOR_STEPS = 21
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round((peak if sys.platform == "darwin" else peak * 1024) / 2**20, 1)
+
+
+# -----------------------------
+#   Worker (one scenario, one process)
+# -----------------------------
+def wait_for_job(at, label, timeout):
+    """
+    Rerun at until this session's job label has finished; returns ({"label",
+    "state", "wall_s"}, error). wall_s runs from the end of the click's rerun
+    to the rerun that picks the result up.
+    """
+    from rgm.jobs import DONE
+
+    t0 = time.perf_counter()
+    while True:
+        # Checked before the first poll too: an artifact hit finishes during the click's rerun
+        outcome = at.session_state["finished_jobs"].get(label) if "finished_jobs" in at.session_state else None
+        if outcome is not None:
+            job = {"label": label, "state": outcome["state"], "wall_s": round(time.perf_counter() - t0, 6)}
+            if outcome.get("artifact") is not None:
+                return job, f"job {label!r} was served from the artifact store"
+            return job, None if outcome["state"] == DONE else f"job {label!r} {outcome['state']}: {outcome['error']}"
+        if time.perf_counter() - t0 > timeout:
+            return None, f"job {label!r} did not finish within {timeout}s"
+        time.sleep(JOB_POLL_S)
+        at.run()
+        if at.exception:
+            return None, at.exception[0].value
+
+
+def simulate(results, steps=SIMULATOR_STEPS):
+    """
+    The simulator's maths on results (a run_model_pipeline table): the
+    demand curves, then volume and elasticity at steps own prices per model.
+    Returns {"wall_s", "models", "curve_points", "prices"}.
+    """
+    import numpy as np
+
+    from rgm.demand import (
+        compute_current_volume, compute_elasticity_full, demand_curves, model_inputs, rpi_columns,
+    )
+
+    t0 = time.perf_counter()
+    curves = demand_curves(results)
+    beta_cols = [c for c in results.columns if c.startswith("Beta_")]
+    models = prices = 0
+    for _, row in results.iterrows():
+        try:
+            betas, intercept, defaults = model_inputs(row, beta_cols)
+        except ValueError:
+            continue
+        if betas.get("PPU", 0) == 0:
+            continue
+        models += 1
+        overrides = {p: v for p, v in defaults.items() if p != "PPU" and not p.endswith("_RPI")}
+        for price in defaults["PPU"] * np.linspace(0.5, 1.5, steps):
+            # Competitor prices stay fixed, so every ratio moves with the own price
+            rpi = {rp: defaults[rp] * price / defaults["PPU"] for rp in rpi_columns(betas)}
+            volume = compute_current_volume(betas, intercept, price, overrides, rpi)
+            compute_elasticity_full(betas, price, volume, rpi)
+            prices += 1
+    return {"wall_s": round(time.perf_counter() - t0, 6), "models": models,
+            "curve_points": len(curves), "prices": prices}
+
+
+def run_scenario(name, n_rows, seed, timeout):
+    """Run scenario name on n_rows synthetic rows in this process; the result dict."""
+    from streamlit.testing.v1 import AppTest
+
+    from rgm.calendar import attach_calendar, calendar_for
+    from rgm.synthetic import generate
+
+    spec = SCENARIOS[name]
+    started = time.perf_counter()
+    df = generate(n_rows, seed=seed).drop(columns=spec.get("drop", []))
+    attach_calendar(df, calendar_for(df))
+    generate_s = time.perf_counter() - started
+    data_rss = current_rss()
+
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    for key in spec["frames"]:
+        at.session_state[key] = df
+    at.session_state["page"] = spec["page"]
+    at.session_state["profile_reruns"] = True
+
+    reruns = []
+    error = None
+
+    def rerun(action):
+        nonlocal error
+        t0 = time.perf_counter()
+        action()
+        wall = time.perf_counter() - t0
+        if at.exception:
+            error = at.exception[0].value
+        reruns.append({"wall_s": round(wall, 6)})
+
+    rerun(at.run)
+    if error is None and spec.get("click"):
+        buttons = [b for b in at.button if b.label == spec["click"]]
+        if buttons:
+            rerun(lambda: buttons[0].click().run())
+        else:
+            error = f"button not found: {spec['click']}"
+
+    # The profiler's record of each rerun, in the same order
+    profiles = list(at.session_state["profile_runs"]) if "profile_runs" in at.session_state else []
+    for run, profile in zip(reruns, profiles[-len(reruns):]):
+        run["stopped"] = profile["stopped"]
+        run["stages"] = [
+            {k: s[k] for k in ("name", "depth", "duration_s", "peak_delta_mb")}
+            for s in profile["stages"]
+        ]
+
+    job = None
+    if error is None and spec.get("job"):
+        job, error = wait_for_job(at, spec["job"], timeout)
+
+    simulator = None
+    if error is None and spec.get("simulate"):
+        results = at.session_state[spec["simulate"]] if spec["simulate"] in at.session_state else None
+        if results is None:
+            error = f"no model results in {spec['simulate']!r}"
+        else:
+            simulator = simulate(results)
+
+    return {
+        "scenario": name,
+        "rows": len(df),
+        "ok": error is None,
+        "error": error,
+        "generate_s": round(generate_s, 6),
+        "wall_s": round(
+            sum(r["wall_s"] for r in reruns)
+            + (job["wall_s"] if job else 0.0)
+            + (simulator["wall_s"] if simulator else 0.0), 6
+        ),
+        "data_rss_mb": None if data_rss is None else round(data_rss / 2**20, 1),
+        "peak_rss_mb": _peak_rss_mb(),
+        "reruns": reruns,
+        "job": job,
+        "simulator": simulator,
+        "environment": environment(),
+    }
+
+
+# -----------------------------
+#   Driver
+# -----------------------------
+def run_in_subprocess(name, n_rows, seed, timeout):
+    """run_scenario in a fresh interpreter; a failed result if the process dies or times out."""
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "result.json")
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", name,
+               "--rows", str(n_rows), "--seed", str(seed), "--timeout", str(timeout), "--out", out]
+        # A fresh cache directory: no upload cache or stored artifacts from earlier runs
+        env = dict(os.environ, RGM_CACHE_DIR=os.path.join(tmp, "cache"))
+        try:
+            proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True, timeout=timeout + 60)
+        except subprocess.TimeoutExpired:
+            return {"scenario": name, "rows": n_rows, "ok": False, "error": f"timed out after {timeout}s"}
+        if proc.returncode != 0 or not os.path.exists(out):
+            tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or [f"exit code {proc.returncode}"]
+            return {"scenario": name, "rows": n_rows, "ok": False, "error": tail[0]}
+        with open(out) as f:
+            return json.load(f)
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of results against baseline (same scenario and requested rows), as messages."""
+    previous = {(r["scenario"], r["requested_rows"]): r for r in baseline["results"]}
+    problems = []
+    for r in results:
+        key = (r["scenario"], r["requested_rows"])
+        old = previous.get(key)
+        if old is None or not old["ok"]:
+            continue
+        label = f"{r['scenario']} @ {r['requested_rows']:,} rows"
+        if not r["ok"]:
+            problems.append(f"{label}: failed ({r['error']})")
+            continue
+        for metric, unit in (("wall_s", "s"), ("peak_rss_mb", " MB")):
+            if old.get(metric) and r[metric] > old[metric] * (1 + tolerance):
+                problems.append(f"{label}: {metric} {old[metric]:.2f}{unit} -> {r[metric]:.2f}{unit}")
+        # The simulator's own time, which the model fits before it would otherwise hide
+        old_sim, new_sim = old.get("simulator"), r.get("simulator")
+        if old_sim and new_sim and old_sim["wall_s"] and new_sim["wall_s"] > old_sim["wall_s"] * (1 + tolerance):
+            problems.append(f"{label}: simulator wall_s {old_sim['wall_s']:.2f}s -> {new_sim['wall_s']:.2f}s")
+    return problems
+
+
+def print_table(results):
+    print(f"{'scenario':<18}{'rows':>12}{'wall s':>10}{'peak MB':>10}  status")
+    for r in results:
+        status = "ok" if r["ok"] else f"FAILED: {r['error']}"
+        wall = f"{r['wall_s']:.2f}" if "wall_s" in r else "-"
+        peak = f"{r['peak_rss_mb']:.0f}" if r.get("peak_rss_mb") is not None else "-"
+        print(f"{r['scenario']:<18}{r['requested_rows']:>12,}{wall:>10}{peak:>10}  {status}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the app's compute paths on synthetic data.")
+    parser.add_argument("--rows", default=",".join(str(n) for n in DEFAULT_ROWS),
+                        help="comma-separated dataset sizes (default %(default)s)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="comma-separated scenarios (default: all of %(default)s)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="write the results as JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative slow-down / memory growth (default %(default)s)")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT_S, help="seconds per scenario")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        result = run_scenario(args.worker, int(args.rows), args.seed, args.timeout)
+        with open(args.out, "w") as f:
+            json.dump(result, f, default=str)
+        return 0
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    sizes = [int(n) for n in args.rows.split(",") if n.strip()]
+
+    results = []
+    for n_rows in sizes:
+        for name in scenarios:
+            print(f"… {name} @ {n_rows:,} rows", file=sys.stderr, flush=True)
+            result = run_in_subprocess(name, n_rows, args.seed, args.timeout)
+            result["requested_rows"] = n_rows
+            results.append(result)
+    print_table(results)
+
+    # The workers' environment: they, not this process, import the libraries whose versions matter
+    env = next((r.pop("environment") for r in results if "environment" in r), None) or environment()
+    for r in results:
+        r.pop("environment", None)
+    report = {"environment": env, "seed": args.seed, "results": results}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+
+    failed = any(not r["ok"] for r in results)
+    if args.compare:
+        with open(args.compare) as f:
+            problems = compare(results, json.load(f), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        failed = failed or bool(problems)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
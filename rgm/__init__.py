@@ -0,0 +1,7 @@
+"""
+Data-layer helpers for the RGM app.
+
+Everything in this package is plain pandas / numpy / pyarrow code so it can be
+imported outside of Streamlit (worker processes, scripts, notebooks). The
+Streamlit UI lives in STYLEGUIDE.py and calls into these modules.
+"""
@@ -0,0 +1,229 @@
+"""
+On-disk store of pipeline outputs (base prices, promo bins, model results,
+saved models), kept across sessions and server restarts.
+
+An artifact is one stage's output for one input dataset and one set of
+parameters: a directory under ARTIFACT_DIR/<stage>/<key> holding its
+DataFrames as Parquet files and a meta.json with everything else (the
+stage, the dataset fingerprint, the parameters, the session-state keys it
+goes to and the structure of the result). The key is a digest of stage,
+dataset fingerprint and parameters, so a stage looks its result up before
+computing it, and the results browser can put any stored run back into a
+session without recomputing anything.
+
+Results are tuples, lists and str- or tuple-keyed dicts of DataFrames,
+rows (Series) and JSON values, nested freely; anything else is not stored.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from rgm.fingerprint import content_hash
+from rgm.ingest import CACHE_DIR
+
+
+# Bump when the on-disk layout changes; older artifacts are then ignored
+ARTIFACT_FORMAT = "v1"
+ARTIFACT_DIR = os.path.join(CACHE_DIR, "artifacts", ARTIFACT_FORMAT)
+
+_META = "meta.json"
+
+
+class _NotStorable(TypeError):
+    pass
+
+
+def dataset_fingerprint(data):
+    """
+    Digest of a frame (every row, not content_hash's sample: a stored result
+    must never be matched to a different input), or of a dict of frames.
+    """
+    if isinstance(data, dict):
+        h = hashlib.blake2b(digest_size=16)
+        for name in sorted(data, key=str):
+            h.update(f"{name}={dataset_fingerprint(data[name])};".encode("utf-8"))
+        return h.hexdigest()
+    return content_hash(data, sample_rows=len(data))
+
+
+def _jsonable(obj):
+    """obj as plain JSON values (tuples as lists, non-str dict keys as [key, value] pairs)."""
+    if isinstance(obj, dict):
+        if all(isinstance(k, str) for k in obj):
+            return {k: _jsonable(v) for k, v in obj.items()}
+        return [[_jsonable(k), _jsonable(v)] for k, v in obj.items()]
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    return str(obj)
+
+
+def artifact_key(stage, dataset, params):
+    payload = json.dumps({"stage": stage, "dataset": dataset, "params": _jsonable(params)}, sort_keys=True)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# -----------------------------
+#   Result encoding
+# -----------------------------
+def _encode(obj, tables):
+    """JSON description of obj; its DataFrames are appended to tables."""
+    if isinstance(obj, pd.DataFrame):
+        tables.append(obj)
+        return {"table": len(tables) - 1}
+    if isinstance(obj, pd.Series):
+        tables.append(obj.to_frame().T.infer_objects())
+        return {"row": len(tables) - 1}
+    if isinstance(obj, tuple):
+        return {"tuple": [_encode(v, tables) for v in obj]}
+    if isinstance(obj, list):
+        return {"list": [_encode(v, tables) for v in obj]}
+    if isinstance(obj, dict):
+        return {"dict": [[_encode(k, tables), _encode(v, tables)] for k, v in obj.items()]}
+    if isinstance(obj, np.generic):
+        return {"value": obj.item()}
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return {"value": obj}
+    raise _NotStorable(f"Cannot store a {type(obj).__name__}.")
+
+
+def _decode(spec, tables):
+    kind, value = next(iter(spec.items()))
+    if kind == "table":
+        return tables(value)
+    if kind == "row":
+        return tables(value).iloc[0]
+    if kind == "tuple":
+        return tuple(_decode(v, tables) for v in value)
+    if kind == "list":
+        return [_decode(v, tables) for v in value]
+    if kind == "dict":
+        return {_decode(k, tables): _decode(v, tables) for k, v in value}
+    return value
+
+
+def _table_path(path, i):
+    return os.path.join(path, f"t{i}.parquet")
+
+
+def _read_meta(path):
+    with open(os.path.join(path, _META)) as f:
+        return json.load(f)
+
+
+class ArtifactStore:
+    """Artifacts under root (ARTIFACT_DIR by default), safe to share between sessions and processes."""
+
+    def __init__(self, root=ARTIFACT_DIR):
+        self.root = root
+
+    def path(self, stage, dataset, params):
+        return os.path.join(self.root, stage, artifact_key(stage, dataset, params))
+
+    def save(self, stage, dataset, params, result, targets=None, label=None):
+        """
+        Store result; returns its path, or None if it can't be stored (an
+        object that isn't a frame, row or JSON value, or a frame Parquet
+        can't represent). Replaces an artifact with the same key.
+        """
+        tables = []
+        try:
+            structure = _encode(result, tables)
+        except _NotStorable:
+            return None
+        path = self.path(stage, dataset, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written to a temp directory and renamed, so a reader never sees half an artifact
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        try:
+            for i, table in enumerate(tables):
+                table.to_parquet(_table_path(tmp_path, i))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError):
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return None
+        meta = {
+            "stage": stage,
+            "label": label or stage,
+            "dataset": dataset,
+            "params": _jsonable(params),
+            "targets": _jsonable(targets),
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "tables": [len(t) for t in tables],
+            "structure": structure,
+        }
+        with open(os.path.join(tmp_path, _META), "w") as f:
+            json.dump(meta, f)
+        if os.path.isdir(path):
+            old_path = f"{path}.{os.getpid()}.old"
+            os.replace(path, old_path)
+            shutil.rmtree(old_path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        return path
+
+    def load(self, stage, dataset, params):
+        """(result, meta) of the stored artifact, or None if there is none."""
+        path = self.path(stage, dataset, params)
+        if not os.path.exists(os.path.join(path, _META)):
+            return None
+        return self.load_run(path)
+
+    def load_run(self, path):
+        """(result, meta) of the artifact at path (a runs() "Path")."""
+        meta = _read_meta(path)
+        result = _decode(meta["structure"], lambda i: pd.read_parquet(_table_path(path, i)))
+        return result, meta
+
+    def runs(self):
+        """Every stored artifact, newest first: one row each with its stage, label, dataset, size and path."""
+        rows = []
+        if os.path.isdir(self.root):
+            for stage in os.listdir(self.root):
+                stage_dir = os.path.join(self.root, stage)
+                for key in os.listdir(stage_dir):
+                    path = os.path.join(stage_dir, key)
+                    if key.endswith((".tmp", ".old")) or not os.path.exists(os.path.join(path, _META)):
+                        continue
+                    meta = _read_meta(path)
+                    size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                    rows.append({
+                        "Created": meta["created_at"],
+                        "Stage": meta["stage"],
+                        "Label": meta["label"],
+                        "Dataset": meta["dataset"][:12],
+                        "Tables": len(meta["tables"]),
+                        "Rows": sum(meta["tables"]),
+                        "MB": round(size / 1024 ** 2, 2),
+                        "Path": path,
+                    })
+        columns = ["Created", "Stage", "Label", "Dataset", "Tables", "Rows", "MB", "Path"]
+        runs = pd.DataFrame(rows, columns=columns)
+        return runs.sort_values("Created", ascending=False, ignore_index=True)
+
+    def delete(self, path):
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def compute_and_save(root, stage, dataset, params, targets, label, fn, args, kwargs, warn=None):
+    """fn(*args, **kwargs), stored in the artifact store at root before it is returned (for jobs)."""
+    result = fn(*args, **kwargs)
+    try:
+        stored = ArtifactStore(root).save(stage, dataset, params, result, targets=targets, label=label)
+    except OSError as e:
+        stored = None
+        if warn is not None:
+            warn(f"Result not stored: {e}")
+    else:
+        if stored is None and warn is not None:
+            warn("Result not stored: it contains values the artifact store cannot write.")
+    return result
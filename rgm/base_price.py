@@ -0,0 +1,531 @@
+"""
+Base price estimation (the Base Price page's compute, without Streamlit).
+
+A PPG's weekly price series is scanned week by week. The base price starts
+at a percentile of the first rolling_period weeks and only moves at a
+transition: a price clearly above (below) the current base that the
+following promo_weeks weeks confirm, at least rolling_period weeks after the
+previous transition. Promo weeks therefore dip below the base price without
+pulling it down.
+
+base_price_table runs the estimator for every (Channel, Brand, aggregator,
+PPG) group of a frame, optionally over a process pool, and fill_base_prices
+writes such a table back onto the row-level data with one keyed join, the
+way the page's "Save All Base Prices" does. sweep_base_price scores a
+grid of estimator settings on a set of series, for tuning them.
+ppg_weekly and ppg_base_price cache the page's per-PPG previews.
+"""
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from rgm.fingerprint import frame_version
+from rgm.framecache import FrameCache
+from rgm.hierarchy import AGGREGATOR_COLUMNS, hierarchy_index
+from rgm.jobs import available_workers
+from rgm.schema import CALENDAR_KEY_COLUMNS
+
+
+# Estimator settings (the page's "Advanced Settings" defaults)
+BASE_PRICE_DEFAULTS = {
+    "rolling_period": 12,        # weeks; also the minimum gap between transitions
+    "upward_threshold": 5.0,     # % above the base price that starts an upward check
+    "downward_threshold": 5.0,   # % below the base price that starts a downward check
+    "promo_weeks": 12,           # weeks ahead used to validate a transition
+    "percentile": 75.0,          # percentile of the validated weeks taken as the new base
+}
+
+# Values of each setting a sweep tries by default (162 settings)
+SWEEP_CHOICES = {
+    "rolling_period": [8, 12, 16],
+    "upward_threshold": [3.0, 5.0, 8.0],
+    "downward_threshold": [3.0, 5.0, 8.0],
+    "promo_weeks": [8, 12],
+    "percentile": [60.0, 75.0, 90.0],
+}
+
+# Diagnostics of a sweep setting (setting_diagnostics), and those its Score ranks on (lower is better)
+SWEEP_DIAGNOSTICS = ["Series", "Transitions", "TransitionsPerYear", "PromoShare", "AboveBaseShare", "BaseVolatility"]
+SWEEP_SCORED = ["AboveBaseShare", "TransitionsPerYear", "BaseVolatility"]
+
+# A downward transition needs this many of the next promo_weeks prices within ±DOWNWARD_TOLERANCE of it
+DOWNWARD_REQUIRED_WEEKS = 9
+DOWNWARD_TOLERANCE = 0.02
+
+# Progress callbacks (and pool tasks) per base_price_table call, at most
+PROGRESS_STEPS = 100
+
+
+class PriceWindows:
+    """
+    Order statistics of every full window prices[i:i + window] of a price
+    series, computed for all positions at once: the windows' percentiles,
+    counts of prices within per-window bounds, and (from the sorted
+    windows) counts of prices at or above any threshold in O(log window).
+    NaN prices are never counted.
+    """
+
+    def __init__(self, prices, window):
+        prices = np.asarray(prices, dtype=float)
+        if len(prices) >= window:
+            self.views = sliding_window_view(prices, window)
+        else:
+            self.views = np.empty((0, window))
+        self._sorted = np.sort(self.views, axis=1)            # NaNs last
+        self._valid = window - np.isnan(self.views).sum(axis=1)
+
+    def __len__(self):
+        return len(self.views)
+
+    def percentile(self, q):
+        return np.percentile(self.views, q, axis=1)
+
+    def count_between(self, low, high):
+        """For each window i, how many of its prices are within [low[i], high[i]]."""
+        return ((self.views >= low[:, None]) & (self.views <= high[:, None])).sum(axis=1)
+
+    def count_at_least(self, i, threshold):
+        """How many prices of window i are >= threshold."""
+        return self._valid[i] - np.searchsorted(self._sorted[i], threshold, side="left")
+
+
+def _scan(prices, start, current_base_price, last_transition_week, rolling_period, upward_threshold,
+          downward_threshold, promo_weeks, percentile):
+    """
+    Base prices of weeks start.. of prices and the transitions among them,
+    from the state (base price, last transition week) before week start.
+    """
+    tail = prices[start:]
+    base_prices = np.empty(len(tail))
+    transition_points = []
+
+    windows = PriceWindows(tail, promo_weeks)
+    candidates = tail[:len(windows)]
+    future_percentile = windows.percentile(percentile)
+    near_candidate = windows.count_between(candidates * 0.97, candidates * 1.03)
+    holding_candidate = windows.count_between(candidates * (1 - DOWNWARD_TOLERANCE), candidates * (1 + DOWNWARD_TOLERANCE))
+
+    for j in range(len(tail)):
+        i = start + j
+        current_price = tail[j]
+        if j >= len(windows):
+            # Fewer than promo_weeks weeks left to validate a transition
+            base_prices[j] = current_base_price
+            continue
+        upward = False
+        if current_price >= current_base_price * (1 + upward_threshold / 100) and (i - last_transition_week >= rolling_period):
+            above_thresh = windows.count_at_least(j, current_base_price * (1 + upward_threshold / 100))
+            if above_thresh >= promo_weeks // 2 and near_candidate[j] >= promo_weeks // 2:
+                current_base_price = max(future_percentile[j], current_price)
+                transition_points.append(i)
+                last_transition_week = i
+                upward = True
+        if (not upward and current_price <= current_base_price * (1 - downward_threshold / 100)
+                and (i - last_transition_week >= rolling_period)):
+            if holding_candidate[j] >= DOWNWARD_REQUIRED_WEEKS:
+                current_base_price = min(future_percentile[j], current_price)
+                transition_points.append(i)
+                last_transition_week = i
+        base_prices[j] = current_base_price
+
+    return base_prices, transition_points
+
+
+def estimate_base_price(prices, rolling_period=12, upward_threshold=5.0, downward_threshold=5.0,
+                        promo_weeks=12, percentile=75.0):
+    """
+    Base price for each week of prices (a chronological weekly price array):
+    (base_prices, transition_points), the latter as week positions.
+
+    An upward move needs half of the next promo_weeks prices above the
+    threshold and within ±3% of the week's price; a downward move needs 9 of
+    them within ±2%. The new base is the window's percentile, capped at
+    the week's price. Everything that doesn't depend on the current base
+    price is taken from PriceWindows up front.
+    """
+    prices = np.asarray(prices, dtype=float)
+    return _scan(
+        prices, 0, np.percentile(prices[:rolling_period], percentile), -rolling_period,
+        rolling_period, upward_threshold, downward_threshold, promo_weeks, percentile,
+    )
+
+
+def extend_base_price(prices, previous, rolling_period=12, upward_threshold=5.0, downward_threshold=5.0,
+                      promo_weeks=12, percentile=75.0):
+    """
+    estimate_base_price(prices), given previous: its (base_prices,
+    transition_points) on a prefix of prices with the same settings (e.g.
+    before this week's data arrived). The scan is causal apart from its
+    promo_weeks look-ahead, so it resumes at the first week whose window
+    the prefix didn't fill, from the base price and last transition there:
+    the cost is O(new weeks + promo_weeks).
+    """
+    prices = np.asarray(prices, dtype=float)
+    previous_base, previous_transitions = previous
+    resume = len(previous_base) - promo_weeks + 1
+    if len(previous_base) < rolling_period or resume <= 0:
+        # The first base price (or every week) still depends on the new weeks
+        return estimate_base_price(prices, rolling_period, upward_threshold, downward_threshold, promo_weeks, percentile)
+    transition_points = list(previous_transitions)
+    last_transition_week = transition_points[-1] if transition_points else -rolling_period
+    base_prices, new_transitions = _scan(
+        prices, resume, previous_base[resume - 1], last_transition_week,
+        rolling_period, upward_threshold, downward_threshold, promo_weeks, percentile,
+    )
+    return np.concatenate([previous_base[:resume], base_prices]), transition_points + new_transitions
+
+
+def group_keys(aggregator):
+    return ["Channel", "Brand", aggregator, "PPG"]
+
+
+def estimate_base_prices(series, params):
+    """
+    Base prices of each (prices, previous) of series: extend_base_price
+    when previous is given, else estimate_base_price (one pool task of
+    base_price_table).
+    """
+    return [
+        estimate_base_price(prices, **params) if previous is None else extend_base_price(prices, previous, **params)
+        for prices, previous in series
+    ]
+
+
+def _previous_rows(weekly, previous, keys):
+    """weekly's group-weeks matched to previous (an earlier table): its Price, BasePrice, IsTransition and group size."""
+    on = keys + CALENDAR_KEY_COLUMNS
+    # In weekly's dtypes, so the keys match on their codes (values weekly doesn't have become NaN)
+    right = previous[on + ["Price", "BasePrice", "IsTransition"]].astype({c: weekly[c].dtype for c in on})
+    right["_weeks"] = right.groupby(keys, observed=True, dropna=False)["Price"].transform("size")
+    right = right.rename(columns={"Price": "_Price", "BasePrice": "_BasePrice", "IsTransition": "_IsTransition"})
+    return weekly[on].merge(right, on=on, how="left", indicator=True)
+
+
+def base_price_table(df, aggregator="Variant", progress=None, executor=None, previous=None, **params):
+    """
+    Weekly Price, BasePrice and IsTransition for every (Channel, Brand,
+    aggregator, PPG) group of df with at least rolling_period weeks,
+    chronological within each group. params override BASE_PRICE_DEFAULTS;
+    progress(fraction) is called as the groups are done. The groups are
+    estimated in batches, through executor.map when an executor is given.
+
+    previous is an earlier table of this aggregator with the same settings
+    (e.g. last week's run). A group whose weeks there are a prefix of its
+    weeks now, at the same prices, resumes from its previous base prices
+    and transitions (extend_base_price) instead of being scanned again.
+    """
+    params = dict(BASE_PRICE_DEFAULTS, **params)
+    keys = group_keys(aggregator)
+    weekly = (
+        df.groupby(keys + CALENDAR_KEY_COLUMNS, observed=True)[["SalesValue", "Volume"]]
+        .sum()
+        .reset_index()
+    )
+    weekly["Price"] = weekly["SalesValue"] / weekly["Volume"]
+
+    prices = weekly["Price"].to_numpy(dtype=float)
+    base_prices = np.full(len(weekly), np.nan)
+    is_transition = np.zeros(len(weekly), dtype=bool)
+    groups = [
+        positions for positions in weekly.groupby(keys, observed=True, sort=False).indices.values()
+        if len(positions) >= params["rolling_period"]
+    ]
+
+    states = [None] * len(groups)
+    if previous is not None and len(previous):
+        matched = _previous_rows(weekly, previous, keys)
+        in_previous = (matched["_merge"] == "both").to_numpy()
+        previous_weeks = matched["_weeks"].to_numpy(dtype=float, na_value=np.nan)
+        previous_price = matched["_Price"].to_numpy(dtype=float, na_value=np.nan)
+        previous_base = matched["_BasePrice"].to_numpy(dtype=float, na_value=np.nan)
+        previous_transition = matched["_IsTransition"].to_numpy(dtype=bool, na_value=False)
+        for g, positions in enumerate(groups):
+            n_previous = int(in_previous[positions].sum())
+            prefix = positions[:n_previous]
+            if (n_previous and in_previous[prefix].all() and previous_weeks[positions[0]] == n_previous
+                    and np.array_equal(prices[prefix], previous_price[prefix], equal_nan=True)):
+                states[g] = (previous_base[prefix], np.flatnonzero(previous_transition[prefix]).tolist())
+
+    batch_size = max(1, -(-len(groups) // PROGRESS_STEPS))
+    batches = [range(i, min(i + batch_size, len(groups))) for i in range(0, len(groups), batch_size)]
+    results = (executor.map if executor is not None else map)(
+        partial(estimate_base_prices, params=params),
+        [[(prices[groups[g]], states[g]) for g in batch] for batch in batches],
+    )
+    for n, (batch, estimates) in enumerate(zip(batches, results), start=1):
+        for g, (base, transitions) in zip(batch, estimates):
+            base_prices[groups[g]] = base
+            is_transition[groups[g][transitions]] = True
+        if progress is not None:
+            progress(n / len(batches))
+
+    weekly["BasePrice"] = base_prices
+    weekly["IsTransition"] = is_transition
+    return weekly[weekly["BasePrice"].notna()].reset_index(drop=True)
+
+
+def fill_base_prices(df, weekly, aggregator="Variant"):
+    """
+    df with Price set to the weekly price and missing BasePrice filled from
+    weekly (a base_price_table of df) on every row of a group-week in it.
+    """
+    keys = group_keys(aggregator) + CALENDAR_KEY_COLUMNS
+    # Match on the key codes so the dimension columns keep their dtype
+    right = weekly[keys + ["Price", "BasePrice"]].rename(columns={"Price": "_Price", "BasePrice": "_BasePrice"})
+    left = df[keys].astype({col: right[col].dtype for col in keys})
+    matched = left.merge(right, on=keys, how="left", indicator=True)
+    hit = (matched["_merge"] == "both").to_numpy()
+
+    out = df.copy()
+    if "BasePrice" not in out.columns:
+        out["BasePrice"] = np.nan
+    if "Price" not in out.columns:
+        out["Price"] = np.nan
+    price = out["Price"].to_numpy(dtype=float, copy=True)
+    price[hit] = matched["_Price"].to_numpy(dtype=float)[hit]
+    base_price = out["BasePrice"].to_numpy(dtype=float, copy=True)
+    fill = hit & np.isnan(base_price)
+    base_price[fill] = matched["_BasePrice"].to_numpy(dtype=float)[fill]
+    out["Price"] = price
+    out["BasePrice"] = base_price
+    return out
+
+
+def write_base_prices(df, weekly, group):
+    """
+    df's BasePrice column with weekly's BasePrice (one row per Year, Month,
+    Week) written over every row of group ({column: value}) in that week,
+    as saving a single PPG on the page does.
+    """
+    in_group = np.ones(len(df), dtype=bool)
+    for col, value in group.items():
+        in_group &= (df[col] == value).to_numpy(dtype=bool, na_value=False)
+    rows = np.flatnonzero(in_group)
+    right = weekly[CALENDAR_KEY_COLUMNS + ["BasePrice"]].rename(columns={"BasePrice": "_BasePrice"})
+    matched = df[CALENDAR_KEY_COLUMNS].iloc[rows].merge(right, on=CALENDAR_KEY_COLUMNS, how="left", indicator=True)
+    hit = (matched["_merge"] == "both").to_numpy()
+
+    base_price = df["BasePrice"].to_numpy(dtype=float, copy=True)
+    base_price[rows[hit]] = matched["_BasePrice"].to_numpy(dtype=float)[hit]
+    return base_price
+
+
+def base_prices(df, aggregators=AGGREGATOR_COLUMNS, progress=None, executor=None, previous=None, **params):
+    """
+    (df with BasePrice filled, weekly base-price table) over the aggregators
+    in order, as "Save All Base Prices" does: the first aggregator that
+    covers a row sets its BasePrice. The table has an Aggregator column
+    naming the dimension each row was computed under. progress(fraction)
+    is called as the work gets done; executor spreads the groups of each
+    aggregator over a pool, and previous (an earlier table of this function,
+    same settings) lets unchanged series resume (see base_price_table).
+    """
+    aggregators = [a for a in aggregators if a in df.columns]
+    tables = []
+    for i, aggregator in enumerate(aggregators):
+        step = None
+        if progress is not None:
+            step = lambda f, i=i: progress((i + f) / len(aggregators))
+        previous_weekly = None
+        if previous is not None and "Aggregator" in previous.columns:
+            previous_weekly = previous[previous["Aggregator"] == aggregator].rename(columns={"AggregatorValue": aggregator})
+        weekly = base_price_table(df, aggregator, progress=step, executor=executor, previous=previous_weekly, **params)
+        df = fill_base_prices(df, weekly, aggregator)
+        tables.append(weekly.rename(columns={aggregator: "AggregatorValue"}).assign(Aggregator=aggregator))
+    table = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+    return df, table
+
+
+@contextmanager
+def worker_pool(workers=None):
+    """
+    A spawn process pool of workers processes (default: rgm.jobs'
+    available_workers, one per CPU outside a background job), or None for a
+    single worker (run in-process). Queued tasks are dropped if the block
+    raises (e.g. the job was cancelled).
+    """
+    workers = workers or available_workers()
+    if workers == 1:
+        yield None
+        return
+    pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        yield pool
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def parallel_base_prices(df, aggregators=AGGREGATOR_COLUMNS, progress=None, workers=None, **params):
+    """base_prices with the groups spread over a worker_pool."""
+    with worker_pool(workers) as pool:
+        return base_prices(df, aggregators, progress=progress, executor=pool, **params)
+
+
+# -----------------------------
+#   Per-PPG page previews
+# -----------------------------
+def weekly_prices(ppg_data):
+    """
+    ppg_data summed by (Year, Month, Week) in chronological order, with its
+    mean BasePrice, Price and a "YYYY-Www" WeekYear label (the page's chart),
+    and whether every row of ppg_data already has a BasePrice.
+    """
+    weekly = ppg_data.groupby(["Year", "Month", "Week"]).agg({
+        "SalesValue": "sum",
+        "Volume": "sum",
+        "BasePrice": "mean"
+    }).reset_index()
+    weekly["Price"] = weekly["SalesValue"] / weekly["Volume"]
+    weekly = weekly.sort_values(by=["Year", "Week"]).reset_index(drop=True)
+    weekly["WeekYear"] = weekly["Year"].astype(str) + "-W" + weekly["Week"].astype(str)
+    return weekly, bool(ppg_data["BasePrice"].notnull().all())
+
+
+def _ppg_estimate(df, version, aggregator, path, params):
+    weekly, _ = ppg_weekly(df, aggregator, path, version)
+    params = dict(params)
+    if len(weekly) < params["rolling_period"]:
+        return None, None
+    base_price, transition_points = estimate_base_price(weekly["Price"].values, **params)
+    weekly = weekly.assign(
+        BasePrice=base_price,
+        IsTransition=np.isin(np.arange(len(base_price)), transition_points),
+    )
+    return weekly, transition_points
+
+
+# Only the frame's current version is kept, and at most this many PPGs / (PPG, settings) per
+# frame: every PPG on a page plus a few earlier settings each
+PREVIEW_CACHE_KEYS = 256
+
+_weekly = FrameCache(
+    lambda df, version, aggregator, path: weekly_prices(hierarchy_index(df).take(df, *path, aggregator=aggregator)),
+    versioned=True, max_keys=PREVIEW_CACHE_KEYS,
+)
+_estimates = FrameCache(_ppg_estimate, versioned=True, max_keys=PREVIEW_CACHE_KEYS)
+
+
+def ppg_weekly(df, aggregator, path, version=None):
+    """
+    weekly_prices of the PPG at path ((Channel, Brand, aggregator value,
+    PPG) in df's hierarchy index), built once per frame version, so reruns
+    only aggregate PPGs whose data changed; tables of older versions are
+    dropped. Treat the table as read-only.
+    """
+    if version is None:
+        version = frame_version(df)
+    return _weekly.get(df, version, aggregator, tuple(path))
+
+
+def ppg_base_price(df, aggregator, path, version=None, **params):
+    """
+    (weekly, transition points) of the PPG at path under params (see
+    estimate_base_price): its ppg_weekly table with BasePrice and
+    IsTransition, or (None, None) if it has fewer than rolling_period weeks.
+    Cached per frame version, path and params (the current version only,
+    least recently used settings dropped first), so reruns only estimate
+    PPGs whose data or settings changed. Treat the table as read-only.
+    """
+    if version is None:
+        version = frame_version(df)
+    params = tuple(sorted(dict(BASE_PRICE_DEFAULTS, **params).items()))
+    return _estimates.get(df, version, aggregator, tuple(path), params)
+
+
+# -----------------------------
+#   Settings sweep
+# -----------------------------
+def price_series(df, keys):
+    """Chronological weekly price array of every keys group of df (as the page charts it), by group."""
+    weekly = (
+        df.groupby(keys + CALENDAR_KEY_COLUMNS, observed=True)[["SalesValue", "Volume"]]
+        .sum()
+        .reset_index()
+    )
+    prices = (weekly["SalesValue"] / weekly["Volume"]).to_numpy(dtype=float)
+    return {
+        group: prices[positions]
+        for group, positions in weekly.groupby(keys, observed=True, sort=True).indices.items()
+    }
+
+
+def sweep_grid(choices=SWEEP_CHOICES):
+    """Every combination of the choices ({setting: values}) as a list of settings dicts."""
+    names = list(choices)
+    return [dict(zip(names, values)) for values in itertools.product(*(choices[n] for n in names))]
+
+
+def setting_diagnostics(series, params):
+    """
+    How the base prices of one setting behave on series (price arrays):
+    transitions per series and per year, the share of weeks below the base
+    (promo weeks, as the promo pages count them) and above it (regular
+    price the base misses), and BaseVolatility, the mean relative
+    week-to-week change of the base. Series shorter than rolling_period
+    are skipped, as in base_price_table.
+    """
+    n_series = weeks = transitions = promo = above = 0
+    volatility, steps = 0.0, 0
+    for prices in series:
+        if len(prices) < params["rolling_period"]:
+            continue
+        base, transition_points = estimate_base_price(prices, **params)
+        n_series += 1
+        weeks += len(prices)
+        transitions += len(transition_points)
+        promo += int(np.sum(prices < base))
+        above += int(np.sum(prices > base))
+        volatility += float(np.nansum(np.abs(np.diff(base)) / base[1:]))
+        steps += len(base) - 1
+    return dict(
+        params,
+        Series=n_series,
+        Transitions=transitions / n_series if n_series else np.nan,
+        TransitionsPerYear=transitions / weeks * 52 if weeks else np.nan,
+        PromoShare=promo / weeks if weeks else np.nan,
+        AboveBaseShare=above / weeks if weeks else np.nan,
+        BaseVolatility=volatility / steps if steps else np.nan,
+    )
+
+
+def _diagnose_settings(series, grid):
+    return [setting_diagnostics(series, params) for params in grid]
+
+
+def sweep_base_price(series, grid, progress=None, executor=None):
+    """
+    setting_diagnostics of every setting in grid (settings dicts, see
+    sweep_grid) on series, ranked: Score is the mean percentile rank of
+    AboveBaseShare, TransitionsPerYear and BaseVolatility (lower is a base
+    price that follows the regular price with fewer, steadier moves), and
+    Rank 1 the best. Settings are evaluated in batches, through
+    executor.map when an executor is given.
+    """
+    series = [np.asarray(prices, dtype=float) for prices in series]
+    grid = [dict(BASE_PRICE_DEFAULTS, **params) for params in grid]
+    batch_size = max(1, -(-len(grid) // PROGRESS_STEPS))
+    batches = [grid[i:i + batch_size] for i in range(0, len(grid), batch_size)]
+    rows = []
+    results = (executor.map if executor is not None else map)(partial(_diagnose_settings, series), batches)
+    for n, batch_rows in enumerate(results, start=1):
+        rows.extend(batch_rows)
+        if progress is not None:
+            progress(n / len(batches))
+
+    table = pd.DataFrame(rows, columns=list(BASE_PRICE_DEFAULTS) + SWEEP_DIAGNOSTICS)
+    ranks = table[SWEEP_SCORED].rank(pct=True)
+    table["Score"] = ranks.mean(axis=1, skipna=False)
+    table["Rank"] = table["Score"].rank(method="min").astype("Int64")
+    return table.sort_values(["Score"], na_position="last", kind="stable").reset_index(drop=True)
+
+
+def parallel_sweep(series, grid, progress=None, workers=None):
+    """sweep_base_price with the settings spread over a worker_pool."""
+    with worker_pool(workers) as pool:
+        return sweep_base_price(series, grid, progress=progress, executor=pool)
@@ -0,0 +1,240 @@
+"""
+Batch run of the whole RGM pipeline, without the app:
+
+    python -m rgm.batch data.parquet --config config.json --out results/ [--workers 4] [--previous last_week/]
+
+base prices -> promo depth bins -> elasticity models -> demand curves on
+one input file (.csv, .xlsx or .parquet), with the pages' default settings
+unless the JSON config overrides them (any subset of DEFAULT_CONFIG, section
+by section). Every step's tables go to the output directory as Parquet,
+plus run.json with the config used, the row count of each table and the
+step timings.
+
+The base-price series, the per-Channel promo bins and the per-group model
+fits are independent of each other, so those steps are spread over a
+process pool; the modelling frame is built in one pass over the whole
+input, as the modelling page builds it.
+
+With --previous (an earlier run's output directory, same base-price
+settings), base-price series whose history is unchanged resume from that
+run's state instead of being scanned again, so a weekly refresh only
+costs the new weeks.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+
+import pandas as pd
+
+from rgm.base_price import BASE_PRICE_DEFAULTS, base_prices
+from rgm.calendar import attach_calendar, calendar_for, parse_date_column
+from rgm.demand import CURVE_POINTS, demand_curves
+from rgm.elasticity import run_full_pipeline, run_model_pipeline
+from rgm.hierarchy import AGGREGATOR_COLUMNS
+from rgm.ingest import parse_upload, quarantine_rows
+from rgm.promo_depth import MAX_CLUSTERS, promo_depth_tables
+from rgm.schema import optimize_dtypes, validate_columns
+
+
+DEFAULT_CONFIG = {
+    "base_price": dict(BASE_PRICE_DEFAULTS, aggregators=list(AGGREGATOR_COLUMNS)),
+    "promo_depth": {"aggregator": "Variant", "max_clusters": MAX_CLUSTERS},
+    "modelling": {
+        "keys": ["Brand", "Variant", "PPG"],   # the three Type 1 keys
+        "volume": "Volume",
+        "use_kalman": True,
+        "use_ratio": False,
+        "k_folds": 5,
+        "predictors": None,                    # None: the page's default predictors
+        "standardize": None,                   # None: the page's default standardised columns
+    },
+    "demand": {"n_points": CURVE_POINTS},
+}
+
+# The modelling page's defaults
+DEFAULT_PREDICTORS = ["PPU", "D1", "is_outlier", "NetCatVol", "Cat_Down_Up"]
+DEFAULT_STANDARDIZE = ["D1", "PPU", "NetCatVol", "Cat_Weighted_Price", "Cat_Down_Up"]
+TARGET_COLUMN = "FilteredVolume"
+
+
+def load_config(path=None):
+    """DEFAULT_CONFIG updated with the JSON file at path; ValueError on unknown sections or settings."""
+    config = {section: dict(settings) for section, settings in DEFAULT_CONFIG.items()}
+    if path is None:
+        return config
+    with open(path) as f:
+        overrides = json.load(f)
+    for section, settings in overrides.items():
+        if section not in config:
+            raise ValueError(f"Unknown config section '{section}' (expected one of {list(config)}).")
+        unknown = [k for k in settings if k not in config[section]]
+        if unknown:
+            raise ValueError(f"Unknown setting(s) in '{section}': {unknown}.")
+        config[section].update(settings)
+    return config
+
+
+def load_input(path):
+    """The input file schema-checked, typed, with failing rows dropped and the calendar columns attached."""
+    name = os.path.basename(path)
+    if name.endswith(".parquet"):
+        df = pd.read_parquet(path)
+        validate_columns(df.columns)
+        df, _ = optimize_dtypes(df)
+        parse_date_column(df)
+    else:
+        with open(path, "rb") as f:
+            df, _ = parse_upload(f, name)
+    df, quarantine, _ = quarantine_rows(df, name)
+    if len(quarantine):
+        _log(f"{len(quarantine):,} row(s) of {name} failed the data-quality rules and were skipped.")
+    attach_calendar(df, calendar_for(df))
+    return df
+
+
+def _log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def by_channel(df):
+    return [part for _, part in df.groupby("Channel", observed=True, dropna=False, sort=False)]
+
+
+# -----------------------------
+#   Steps
+# -----------------------------
+def _modelling_frame(df, keys, volume, use_kalman, use_ratio):
+    date_col = next((c for c in df.columns if c.strip().lower() == "date"), "date")
+    channel_col = next((c for c in df.columns if c.strip().lower() == "channel"), "Channel")
+    return run_full_pipeline(
+        df, [date_col, channel_col] + keys, keys,
+        use_kalman=use_kalman, use_ratio_flag=use_ratio, selected_volume=volume, warn=_log,
+    )
+
+
+def model_columns(final_df, keys, predictors=None, standardize=None):
+    """(predictor columns, columns to standardise), defaulting the way the modelling page does."""
+    if predictors is None:
+        predictors = [c for c in sorted(final_df.columns) if c.endswith("_RPI") or c in DEFAULT_PREDICTORS]
+    X_columns = [c for c in predictors if c not in ["Channel"] + keys]
+    if standardize is None:
+        numeric = [c for c in X_columns if c in final_df.columns and pd.api.types.is_numeric_dtype(final_df[c])]
+        standardize = [c for c in numeric if c in DEFAULT_STANDARDIZE]
+    return X_columns, list(standardize)
+
+
+def load_previous(out_dir, config):
+    """The base_prices table of the run in out_dir, or None if it is missing or used other base-price settings."""
+    try:
+        with open(os.path.join(out_dir, "run.json")) as f:
+            manifest = json.load(f)
+        if manifest["config"]["base_price"] != config["base_price"]:
+            _log(f"{out_dir} used other base-price settings; computing every series.")
+            return None
+        return pd.read_parquet(os.path.join(out_dir, "base_prices.parquet"))
+    except (OSError, KeyError, ValueError) as e:
+        _log(f"No previous base prices in {out_dir} ({e}); computing every series.")
+        return None
+
+
+def run(df, config, executor=None, previous=None):
+    """
+    Every step on df (a frame as load_input returns it): a dict of output
+    tables by name, and the seconds each step took. previous is an earlier
+    run's base_prices table (see load_previous).
+    """
+    mapper = executor.map if executor is not None else map
+    outputs, timings = {}, {}
+
+    started = time.perf_counter()
+    bp = dict(config["base_price"])
+    aggregators = bp.pop("aggregators")
+    priced, outputs["base_prices"] = base_prices(df, aggregators, executor=executor, previous=previous, **bp)
+    outputs["data_with_base_price"] = priced
+    timings["base_price"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    promo = config["promo_depth"]
+    parts = list(mapper(
+        partial(promo_depth_tables, aggregator=promo["aggregator"], max_k=promo["max_clusters"]),
+        by_channel(priced),
+    ))
+    outputs["promo_weeks"] = pd.concat([p[0] for p in parts], ignore_index=True)
+    outputs["promo_bins"] = pd.concat([p[1] for p in parts], ignore_index=True)
+    timings["promo_depth"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    mc = config["modelling"]
+    keys = list(mc["keys"])
+    final_df = _modelling_frame(df, keys, mc["volume"], mc["use_kalman"], mc["use_ratio"])
+    outputs["model_data"] = final_df
+    timings["modelling_frame"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    X_columns, std_cols = model_columns(final_df, keys, mc["predictors"], mc["standardize"])
+    results, predictions = run_model_pipeline(
+        final_df, ["Channel"] + keys, X_columns, TARGET_COLUMN, mc["k_folds"], std_cols,
+        warn=_log, executor=executor,
+    )
+    if results is not None:
+        outputs["model_results"] = results
+        outputs["predictions"] = predictions
+    timings["models"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if results is not None:
+        outputs["demand_curves"] = demand_curves(results, config["demand"]["n_points"])
+    timings["demand"] = time.perf_counter() - started
+    return outputs, timings
+
+
+def write_outputs(outputs, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    for name, table in outputs.items():
+        table.to_parquet(os.path.join(out_dir, f"{name}.parquet"), index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the RGM pipeline on a data file and write Parquet outputs.")
+    parser.add_argument("input", help="scan data (.csv, .xlsx or .parquet)")
+    parser.add_argument("--config", help="JSON overrides of the default settings")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: one per CPU; 1 runs everything in-process)")
+    parser.add_argument("--previous", help="output directory of an earlier run, to resume its base-price series")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    started = time.perf_counter()
+    df = load_input(args.input)
+    previous = load_previous(args.previous, config) if args.previous else None
+    load_s = time.perf_counter() - started
+
+    pool = ProcessPoolExecutor(args.workers) if args.workers > 1 else nullcontext()
+    with pool as executor:
+        outputs, timings = run(df, config, executor, previous)
+    write_outputs(outputs, args.out)
+
+    manifest = {
+        "input": os.path.abspath(args.input),
+        "previous": os.path.abspath(args.previous) if args.previous else None,
+        "rows": len(df),
+        "workers": args.workers,
+        "config": config,
+        "outputs": {name: len(table) for name, table in outputs.items()},
+        "timings_s": dict({"load": load_s}, **timings),
+    }
+    with open(os.path.join(args.out, "run.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    for name, n in manifest["outputs"].items():
+        print(f"{name}: {n:,} rows")
+    print(f"Wrote {len(outputs)} tables to {args.out} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
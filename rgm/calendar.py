@@ -0,0 +1,149 @@
+"""
+Canonical calendar dimension for an RGM frame.
+
+Date is parsed once at ingest. The calendar table then holds one row per
+distinct date with every derived key the pages group or plot by: calendar
+Year/Month, ISO year/week, the Monday of the ISO week, the first day of the
+month, and YearWeek / YearMonth as integer keys (yyyyww / yyyymm). Pages look
+their rows up in it instead of re-running pd.to_datetime, ``.isocalendar()``
+or ``.to_period(...)`` over every row on every rerun.
+
+A data set has a few hundred to a few thousand distinct dates, so the table
+is tiny; a lookup is one hash probe per row (``Index.get_indexer``) plus a
+take per requested column.
+"""
+import pandas as pd
+
+from rgm.framecache import FrameCache
+
+
+# Columns of the calendar table (indexed by the parsed Date)
+CALENDAR_COLUMNS = [
+    "Year", "Month", "Day", "ISOYear", "ISOWeek", "WeekStart", "MonthStart", "YearWeek", "YearMonth",
+]
+
+
+# -----------------------------
+#   Parsing
+# -----------------------------
+def parse_dates(values):
+    """
+    values as a datetime64 Series (unparseable entries become NaT). Each
+    distinct value is parsed once, so repeated dates cost a hash lookup;
+    a column that is already datetime64 is returned as is.
+    """
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    codes, uniques = pd.factorize(s, sort=False)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), errors="coerce")
+    return pd.Series(
+        pd.api.extensions.take(parsed.array, codes, allow_fill=True), index=s.index, name=s.name
+    )
+
+
+def parse_date_column(df, col="Date", force=False):
+    """
+    Convert df[col] (in place) from text to datetime64 if every non-null
+    value parses; with force, unparseable values become NaT instead. Numeric
+    and already-parsed columns are left alone. Returns True if converted.
+    """
+    if col not in df.columns:
+        return False
+    s = df[col]
+    if not (pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s)):
+        return False
+    parsed = parse_dates(s)
+    if not force and (parsed.isna() & s.notna()).any():
+        return False
+    df[col] = parsed
+    return True
+
+
+# -----------------------------
+#   Calendar table
+# -----------------------------
+def build_calendar(dates):
+    """One row per distinct non-null date in dates, sorted, indexed by Date."""
+    days = pd.DatetimeIndex(parse_dates(dates).dropna().unique()).sort_values()
+    iso = days.isocalendar()
+    year = days.year.to_numpy(dtype="int32")
+    month = days.month.to_numpy(dtype="int32")
+    iso_year = iso["year"].to_numpy(dtype="int32")
+    iso_week = iso["week"].to_numpy(dtype="int32")
+    midnight = days.normalize()
+    calendar = pd.DataFrame(
+        {
+            "Year": year,
+            "Month": month,
+            "Day": days.date,
+            "ISOYear": iso_year,
+            "ISOWeek": iso_week,
+            "WeekStart": midnight - pd.to_timedelta(days.weekday, unit="D"),
+            "MonthStart": midnight - pd.to_timedelta(days.day - 1, unit="D"),
+            "YearWeek": iso_year * 100 + iso_week,
+            "YearMonth": year * 100 + month,
+        },
+        index=pd.Index(days, name="Date"),
+    )
+    return calendar
+
+
+_calendars = FrameCache(lambda df, date_col: build_calendar(df[date_col]))
+
+
+def calendar_for(df, date_col="Date"):
+    """
+    The calendar table of df[date_col], built on first use and reused on
+    later reruns for as long as the same frame object is alive.
+    """
+    return _calendars.get(df, date_col)
+
+
+def attach_calendar(df, calendar, date_col="Date"):
+    """Register a calendar built at ingest as df's calendar (skips the first build)."""
+    _calendars.put(df, calendar, date_col)
+
+
+# -----------------------------
+#   Lookups
+# -----------------------------
+def lookup(df, columns, date_col="Date", calendar=None):
+    """
+    Calendar columns for every row of df, as a DataFrame aligned to df.index.
+    Pass the calendar of a parent frame (e.g. D0's) when df is a per-rerun
+    subset of it, so no table is built for the subset. Rows whose date is
+    missing or not in the calendar get NaN / NaT.
+    """
+    if calendar is None:
+        calendar = calendar_for(df, date_col)
+    positions = calendar.index.get_indexer(parse_dates(df[date_col]))
+    return pd.DataFrame(
+        {col: pd.api.extensions.take(calendar[col].array, positions, allow_fill=True) for col in columns},
+        index=df.index,
+    )
+
+
+def week_start(iso_years, iso_weeks, calendar=None):
+    """
+    Monday of each (ISO year, ISO week) pair as datetime64, NaT where the
+    pair is not a real ISO week. Pairs present in calendar are looked up;
+    only the distinct pairs it lacks are computed.
+    """
+    years = pd.to_numeric(pd.Series(iso_years), errors="coerce").to_numpy(dtype="float64")
+    weeks = pd.to_numeric(pd.Series(iso_weeks), errors="coerce").to_numpy(dtype="float64")
+    codes, keys = pd.factorize(years * 100 + weeks, sort=False)
+
+    known = {}
+    if calendar is not None and len(calendar):
+        firsts = calendar.drop_duplicates("YearWeek")
+        known = dict(zip(firsts["YearWeek"].tolist(), firsts["WeekStart"].tolist()))
+    missing = [k for k in keys if k == k and int(k) not in known]
+    if missing:
+        computed = pd.to_datetime([f"{int(k):06d}1" for k in missing], format="%G%V%u", errors="coerce")
+        known.update(zip((int(k) for k in missing), computed))
+
+    starts = pd.DatetimeIndex([known.get(int(k), pd.NaT) if k == k else pd.NaT for k in keys])
+    result = pd.api.extensions.take(starts.array, codes, allow_fill=True)
+    index = iso_years.index if isinstance(iso_years, pd.Series) else None
+    return pd.Series(result, index=index)
@@ -0,0 +1,159 @@
+"""
+Demand curves from fitted elasticity models (the post-modelling page's
+scenario maths, without Streamlit).
+
+A model row of run_model_pipeline is linear in its predictors:
+Q = B0 + Beta_PPU * P + sum(Beta_x * x) + sum(Beta_r * RPI_r), where the
+competitor ratios RPI_r = P / P_r move with the own price P. The curve is
+traced by solving for P over a grid of volumes, with the other predictors
+and the competitor prices held fixed.
+"""
+import numpy as np
+import pandas as pd
+
+
+INTERCEPT_COLUMN = "B0 (Original)"
+
+# Points on each demand curve
+CURVE_POINTS = 15
+
+
+def model_inputs(row, beta_cols=None):
+    """
+    (betas, intercept, default values) of a model result row: betas by
+    predictor, the raw intercept, and each predictor's mean as fitted.
+    Raises ValueError if the row lacks the intercept, betas or a predictor mean.
+    """
+    if INTERCEPT_COLUMN not in row or pd.isna(row[INTERCEPT_COLUMN]):
+        raise ValueError(f"Missing intercept col '{INTERCEPT_COLUMN}'.")
+    if beta_cols is None:
+        beta_cols = [c for c in row.index if c.startswith("Beta_")]
+    if not beta_cols:
+        raise ValueError("No Beta_ columns found.")
+    betas = {bc.replace("Beta_", ""): float(row[bc]) for bc in beta_cols}
+    missing = [p for p in betas if p not in row or pd.isna(row[p])]
+    if missing:
+        raise ValueError(f"Missing or NaN columns for {missing}.")
+    return betas, float(row[INTERCEPT_COLUMN]), {p: float(row[p]) for p in betas}
+
+
+def rpi_columns(betas):
+    """Competitor ratio predictors with a non-zero beta."""
+    return [p for p in betas if p.endswith("_RPI") and betas[p] != 0]
+
+
+def compute_current_volume(betas, raw_int, my_price, user_over, rpi_vals):
+    """Predicted volume at own price my_price, other predictors user_over and ratios rpi_vals."""
+    sum_others = 0.0
+    for c_ in betas:
+        if (not c_.endswith("_RPI")) and (c_ != "PPU"):
+            sum_others += betas[c_] * user_over.get(c_, 0.0)
+    sum_rpi = 0.0
+    for rp_, ratio in rpi_vals.items():
+        sum_rpi += betas[rp_] * ratio
+    return raw_int + sum_others + sum_rpi + betas["PPU"] * my_price
+
+
+def compute_elasticity_full(betas, price_val, volume_val, rpi_vals):
+    """
+    betas     : dict of all β's, including 'PPU' and any '<brand>_RPI'
+    price_val : the own‐price P at which we evaluate
+    volume_val: the predicted Q at that price
+    rpi_vals  : dict mapping each '<brand>_RPI' to its P_own/P_comp ratio
+    """
+    if volume_val <= 0 or price_val <= 0:
+        return np.nan
+
+    # Start with the own‐price slope
+    derivative = betas.get("PPU", 0.0)
+
+    # Add competitor‐ratio contribution: ∂(P/Pc)/∂P = 1/Pc
+    for rp_col, ratio in rpi_vals.items():
+        beta_r = betas.get(rp_col, 0.0)
+        if ratio and beta_r:
+            P_comp = price_val / ratio
+            if P_comp > 0:
+                derivative += beta_r / P_comp
+
+    # Scale to get elasticity
+    return derivative * (price_val / volume_val)
+
+
+def build_curve_df(betas, raw_int, my_price, user_over, rpi_vals, n_points=CURVE_POINTS):
+    """Price, Volume, Revenue and Elasticity at n_points volumes from 0 to the curve's volume intercept."""
+    b_own_ = betas["PPU"]
+    sum_others = 0.0
+    for c_ in betas:
+        if (not c_.endswith("_RPI")) and (c_ != "PPU"):
+            sum_others += betas[c_] * user_over.get(c_, 0.0)
+    sum_rpi = 0.0
+    for rp_, ratio in rpi_vals.items():
+        sum_rpi += betas[rp_] * ratio
+    zero_x = raw_int + sum_others + sum_rpi
+    if b_own_ > 0:
+        if zero_x < 0: zero_x = 10
+        max_vol = 2 * zero_x
+    else:
+        if zero_x <= 0: zero_x = 10
+        max_vol = zero_x
+    if max_vol <= 0:
+        max_vol = 10
+
+    volumes = np.linspace(0, max_vol, n_points)
+    price_list = []
+    rev_list = []
+    elas_list = []
+
+    for Q_ in volumes:
+        p_ = (Q_ - zero_x) / b_own_ if b_own_ != 0 else 0
+        p_ = max(p_, 0)
+        rev_ = p_ * Q_
+        e_ = compute_elasticity_full(betas, p_, Q_, rpi_vals)
+        price_list.append(p_)
+        rev_list.append(rev_)
+        elas_list.append(e_)
+
+    df_out = pd.DataFrame({
+        "Price": price_list,
+        "Volume": volumes,
+        "Revenue": rev_list,
+        "Elasticity": elas_list
+    })
+    df_out.sort_values("Price", inplace=True)
+    df_out.reset_index(drop=True, inplace=True)
+    return df_out
+
+
+def demand_curves(results, n_points=CURVE_POINTS):
+    """
+    The baseline demand curve of every model row in results (a
+    run_model_pipeline table): predictors and competitor ratios at their
+    fitted means, own price at the mean PPU. One row per curve point, with
+    the row's group keys and Model, plus the current point's Volume,
+    Revenue and Elasticity. Rows without a usable PPU beta are skipped.
+    """
+    keys = list(results.columns[:results.columns.get_loc("Model") + 1])
+    beta_cols = [c for c in results.columns if c.startswith("Beta_")]
+    curves = []
+    for _, row in results.iterrows():
+        try:
+            betas, intercept, defaults = model_inputs(row, beta_cols)
+        except ValueError:
+            continue
+        if betas.get("PPU", 0) == 0:
+            continue
+        price = defaults["PPU"]
+        overrides = {p: v for p, v in defaults.items() if p != "PPU" and not p.endswith("_RPI")}
+        rpi = {rp: defaults[rp] for rp in rpi_columns(betas)}
+        curve = build_curve_df(betas, intercept, price, overrides, rpi, n_points)
+        volume = compute_current_volume(betas, intercept, price, overrides, rpi)
+        curve = curve.assign(
+            CurrentPrice=price,
+            CurrentVolume=volume,
+            CurrentRevenue=price * volume,
+            CurrentElasticity=compute_elasticity_full(betas, price, volume, rpi),
+        )
+        for key in reversed(keys):
+            curve.insert(0, key, row[key])
+        curves.append(curve)
+    return pd.concat(curves, ignore_index=True) if curves else pd.DataFrame(columns=keys)
@@ -0,0 +1,811 @@
+"""
+Elasticity modelling (the modelling page's compute, without Streamlit).
+
+run_full_pipeline turns row-level scan data into the modelling frame (one
+row per date, channel and product group, with own price, competitor price
+ratios, category features, outlier flags and a filtered volume target);
+run_model_pipeline fits the candidate regressions per group with k-fold
+cross-validation and derives each model's self-price elasticity.
+
+Both are pure functions of their inputs: messages the page shows as
+warnings go to the optional warn callback, and model fits can be spread
+over a process pool by passing an executor.
+"""
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from pykalman import KalmanFilter
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.linear_model import BayesianRidge, ElasticNet, Lasso, LinearRegression, Ridge
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+from sklearn.preprocessing import StandardScaler
+from statsmodels.tsa.seasonal import STL
+
+from rgm.calendar import calendar_for, lookup, parse_dates
+from rgm.profiling import stage
+from rgm.schema import SchemaError, project
+
+
+# -----------------------------
+#   Models
+# -----------------------------
+class CustomConstrainedRidge(BaseEstimator, RegressorMixin):
+    def __init__(self, l2_penalty=0.1, learning_rate=0.001, iterations=100000,
+                 adam=False, beta1=0.9, beta2=0.999, epsilon=1e-8):
+        self.learning_rate = learning_rate
+        self.iterations = iterations
+        self.l2_penalty = l2_penalty
+        self.adam = adam
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.epsilon = epsilon
+
+    def fit(self, X, Y, feature_names):
+        self.m, self.n = X.shape
+        self.W = np.zeros(self.n)
+        self.b = 0
+        self.X = X
+        self.Y = Y
+        self.feature_names = feature_names
+        self.rpi_ppu_indices = [
+            i for i, name in enumerate(feature_names)
+            if name.endswith("_RPI") or name == "PPU"
+        ]
+        self.d1_index = next((i for i, name in enumerate(feature_names) if name == "D1"), None)
+
+        if self.adam:
+            self.m_W = np.zeros(self.n)
+            self.v_W = np.zeros(self.n)
+            self.m_b = 0
+            self.v_b = 0
+            self.t = 0
+
+        for _ in range(self.iterations):
+            self.update_weights()
+
+        self.intercept_ = self.b
+        self.coef_ = self.W
+        return self
+
+    def update_weights(self):
+        Y_pred = self.predict(self.X)
+        grad_w = (
+            -(2 * (self.X.T).dot(self.Y - Y_pred))
+            + 2 * self.l2_penalty * self.W
+        ) / self.m
+        grad_b = -(2 / self.m) * np.sum(self.Y - Y_pred)
+
+        if self.adam:
+            self.t += 1
+            self.m_W = self.beta1 * self.m_W + (1 - self.beta1) * grad_w
+            self.m_b = self.beta1 * self.m_b + (1 - self.beta1) * grad_b
+            self.v_W = self.beta2 * self.v_W + (1 - self.beta2) * (grad_w ** 2)
+            self.v_b = self.beta2 * self.v_b + (1 - self.beta2) * (grad_b ** 2)
+
+            m_W_hat = self.m_W / (1 - self.beta1 ** self.t)
+            m_b_hat = self.m_b / (1 - self.beta1 ** self.t)
+            v_W_hat = self.v_W / (1 - self.beta2 ** self.t)
+            v_b_hat = self.v_b / (1 - self.beta2 ** self.t)
+
+            self.W -= self.learning_rate * m_W_hat / (np.sqrt(v_W_hat) + self.epsilon)
+            self.b -= self.learning_rate * m_b_hat / (np.sqrt(v_b_hat) + self.epsilon)
+        else:
+            self.W -= self.learning_rate * grad_w
+            self.b -= self.learning_rate * grad_b
+
+        # Constraints
+        for i in range(self.n):
+            if i in self.rpi_ppu_indices and self.W[i] > 0:
+                self.W[i] = 0
+            if i == self.d1_index and self.W[i] < 0:
+                self.W[i] = 0
+
+    def predict(self, X):
+        return X.dot(self.W) + self.b
+
+
+class ConstrainedLinearRegression(BaseEstimator, RegressorMixin):
+    def __init__(self, learning_rate=0.001, iterations=10000,
+                 adam=False, beta1=0.9, beta2=0.999, epsilon=1e-8):
+        self.learning_rate = learning_rate
+        self.iterations = iterations
+        self.adam = adam
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.epsilon = epsilon
+
+    def fit(self, X, Y, feature_names):
+        self.m, self.n = X.shape
+        self.W = np.zeros(self.n)
+        self.b = 0
+        self.X = X
+        self.Y = Y
+        self.feature_names = feature_names
+        self.rpi_ppu_indices = [
+            i for i, name in enumerate(feature_names)
+            if name.endswith('_RPI') or name == 'PPU'
+        ]
+        self.d1_index = next((i for i, name in enumerate(feature_names) if name == 'D1'), None)
+
+        if self.adam:
+            self.m_W = np.zeros(self.n)
+            self.v_W = np.zeros(self.n)
+            self.m_b = 0
+            self.v_b = 0
+            self.t = 0
+
+        for _ in range(self.iterations):
+            self.update_weights()
+
+        self.intercept_ = self.b
+        self.coef_ = self.W
+        return self
+
+    def update_weights(self):
+        Y_pred = self.predict(self.X)
+        dW = -(2 * self.X.T.dot(self.Y - Y_pred)) / self.m
+        db = -2 * np.sum(self.Y - Y_pred) / self.m
+
+        if self.adam:
+            self.t += 1
+            self.m_W = self.beta1 * self.m_W + (1 - self.beta1) * dW
+            self.m_b = self.beta1 * self.m_b + (1 - self.beta1) * db
+            self.v_W = self.beta2 * self.v_W + (1 - self.beta2) * (dW ** 2)
+            self.v_b = self.beta2 * self.v_b + (1 - self.beta2) * (db ** 2)
+
+            m_W_hat = self.m_W / (1 - self.beta1 ** self.t)
+            m_b_hat = self.m_b / (1 - self.beta1 ** self.t)
+            v_W_hat = self.v_W / (1 - self.beta2 ** self.t)
+            v_b_hat = self.v_b / (1 - self.beta2 ** self.t)
+
+            self.W -= self.learning_rate * m_W_hat / (np.sqrt(v_W_hat) + self.epsilon)
+            self.b -= self.learning_rate * m_b_hat / (np.sqrt(v_b_hat) + self.epsilon)
+        else:
+            self.W -= self.learning_rate * dW
+            self.b -= self.learning_rate * db
+
+        self.W[self.rpi_ppu_indices] = np.minimum(self.W[self.rpi_ppu_indices], 0)
+        if self.d1_index is not None:
+            self.W[self.d1_index] = max(self.W[self.d1_index], 0)
+
+    def predict(self, X):
+        return X.dot(self.W) + self.b
+
+
+def default_models():
+    """Fresh instances of the candidate models, by display name."""
+    return {
+        "Linear Regression": LinearRegression(),
+        "Ridge Regression": Ridge(alpha=1.0),
+        "Lasso Regression": Lasso(alpha=0.1),
+        "ElasticNet Regression": ElasticNet(alpha=0.1, l1_ratio=0.5),
+        "Bayesian Ridge Regression": BayesianRidge(),
+        "Custom Constrained Ridge": CustomConstrainedRidge(l2_penalty=0.1, learning_rate=0.001, iterations=10000),
+        "Constrained Linear Regression": ConstrainedLinearRegression(learning_rate=0.001, iterations=10000)
+    }
+
+
+MODEL_NAMES = list(default_models())
+
+
+# -----------------------------
+#   Helpers
+# -----------------------------
+def _warn(warn, message):
+    if warn is not None:
+        warn(message)
+
+
+def safe_mape(y_true, y_pred):
+    y_true = np.array(y_true, dtype=float)
+    y_pred = np.array(y_pred, dtype=float)
+    nonzero_mask = (y_true != 0)
+    y_true_nonzero = y_true[nonzero_mask]
+    y_pred_nonzero = y_pred[nonzero_mask]
+    if len(y_true_nonzero) == 0:
+        return float("nan")
+    return np.mean(np.abs((y_true_nonzero - y_pred_nonzero) / y_true_nonzero)) * 100
+
+
+# -----------------------------
+#   Modelling frame
+# -----------------------------
+def run_full_pipeline(
+    raw_df,
+    group_keys,
+    pivot_keys,
+    use_kalman=True,
+    use_ratio_flag=False,
+    selected_volume="Volume",
+    warn=None,
+):
+    """
+    The modelling frame: raw_df aggregated to group_keys (date, channel and
+    the product keys) with PPU, competitor price ratios (<product>_RPI) for
+    each pivot_keys product, category volume, price and seasonality columns,
+    STL outlier flags and FilteredVolume (Kalman-filtered Volume, or Volume
+    itself; divided by CatVol with use_ratio_flag). Every computation is
+    within a channel. warn(message) is called for recoverable problems.
+    """
+
+    def convert_and_arrange(df):
+        date_col = next((col for col in df.columns if col.strip().lower() == 'date'), None)
+        if not date_col:
+            raise SchemaError("DataFrame must have a 'date' column.")
+        df[date_col] = parse_dates(df[date_col])
+        df = df.dropna(subset=[date_col])
+        return df.sort_values(by=[date_col])
+
+    def adjust_volume_column(df, chosen_col):
+        df = df.copy()
+        chosen = chosen_col.strip().lower()
+        if chosen == 'volume':
+            if 'VolumeUnits' in df.columns:
+                df.drop(columns=['VolumeUnits'], inplace=True)
+        elif chosen == 'volumeunits':
+            if 'Volume' in df.columns:
+                df.drop(columns=['Volume'], inplace=True)
+            if 'VolumeUnits' in df.columns:
+                df.rename(columns={'VolumeUnits': 'Volume'}, inplace=True)
+            else:
+                _warn(warn, "Warning: 'VolumeUnits' column not found.")
+        else:
+            _warn(warn, f"Unrecognized volume column '{chosen_col}'.")
+        return df
+
+    def compute_category_weighted_price(df, d_date, d_channel):
+        df = df.copy()
+        df[d_date] = parse_dates(df[d_date])
+        grouping = [d_channel, d_date]
+        weighted_price = df.groupby(grouping, observed=True).apply(
+            lambda g: (g['PPU'] * g['Volume']).sum() / g['Volume'].sum()
+            if g['Volume'].sum() != 0 else 0
+        ).reset_index(name='Cat_Weighted_Price')
+        return weighted_price
+
+    def compute_cat_down_up(df, d_date, d_channel, l0_key=None, l2_key=None):
+        df = df.copy()
+        df[d_date] = parse_dates(df[d_date])
+        group_keys_for_mean = [d_channel]
+        if l0_key is not None:
+            group_keys_for_mean.append(l0_key)
+        if l2_key is not None:
+            group_keys_for_mean.append(l2_key)
+
+        group_mean = (
+            df.groupby(group_keys_for_mean, observed=True)['PPU']
+            .mean().reset_index().rename(columns={'PPU': 'mean_ppu'})
+        )
+
+        group_keys_daily = [d_channel, d_date]
+        if l0_key is not None:
+            group_keys_daily.append(l0_key)
+        if l2_key is not None:
+            group_keys_daily.append(l2_key)
+
+        daily_group = df.groupby(group_keys_daily, observed=True)['Volume'].sum().reset_index()
+        daily_group = daily_group.merge(group_mean, on=group_keys_for_mean, how='left')
+        total_volume = (
+            daily_group.groupby([d_channel, d_date], observed=True)['Volume']
+            .sum().reset_index().rename(columns={'Volume': 'total_volume'})
+        )
+        daily_group = daily_group.merge(total_volume, on=[d_channel, d_date], how='left')
+        daily_group['weighted_contrib'] = daily_group['mean_ppu'] * (daily_group['Volume'] / daily_group['total_volume'])
+
+        cat_down_up = (
+            daily_group.groupby([d_channel, d_date], observed=True)['weighted_contrib']
+            .sum().reset_index().rename(columns={'weighted_contrib': 'Cat_Down_Up'})
+        )
+        return cat_down_up
+
+    with stage("aggregation"):
+        # Only the group keys and measures are aggregated; the extract's other columns are never copied
+        measure_cols = ["Volume", "VolumeUnits", "Price", "SalesValue"]
+        df_proc = convert_and_arrange(project(raw_df, group_keys + measure_cols))
+        df_proc = adjust_volume_column(df_proc, selected_volume)
+
+        d_date = next((c for c in df_proc.columns if c.strip().lower()=='date'), 'date')
+        d_channel = next((c for c in df_proc.columns if c.strip().lower()=='channel'), 'Channel')
+        calendar = calendar_for(raw_df, d_date)
+
+        # Summaries for Price & SalesValue
+        if "Price" in df_proc.columns and "SalesValue" in df_proc.columns:
+            agg_df = (
+                df_proc.groupby(group_keys, observed=True)
+                .agg({"Volume": "sum", "Price": "mean", "SalesValue": "sum"})
+                .reset_index()
+            )
+            agg_df.rename(columns={"Price": "PPU"}, inplace=True)
+        elif "Price" in df_proc.columns:
+            agg_df = (
+                df_proc.groupby(group_keys, observed=True)
+                .agg({"Volume": "sum", "Price": "mean"})
+                .reset_index()
+            )
+            agg_df.rename(columns={"Price": "PPU"}, inplace=True)
+        elif "SalesValue" in df_proc.columns:
+            agg_df = (
+                df_proc.groupby(group_keys, observed=True)
+                .agg({"Volume": "sum", "SalesValue": "sum"})
+                .reset_index()
+            )
+            agg_df["PPU"] = np.where(
+                agg_df["Volume"] != 0,
+                agg_df["SalesValue"] / agg_df["Volume"],
+                0
+            )
+
+        # Add date parts (looked up in the calendar table built at ingest)
+        date_parts = lookup(agg_df, ["Year", "Month", "ISOWeek", "Day"], date_col=d_date, calendar=calendar)
+        agg_df['Year']  = date_parts['Year']
+        agg_df['Month'] = date_parts['Month']
+        agg_df['Week']  = date_parts['ISOWeek']
+        agg_df['Date']  = date_parts['Day']
+
+        # Pivot competitor PPU
+        if pivot_keys:
+            pivot_df = agg_df.pivot_table(index=[d_date, d_channel], columns=pivot_keys, values='PPU', observed=True)
+            agg_df = pd.concat([agg_df.set_index([d_date, d_channel]), pivot_df], axis=1).reset_index()
+            if isinstance(pivot_df.columns, pd.MultiIndex):
+                for col_tuple in pivot_df.columns:
+                    comp_col = "_".join(map(str, col_tuple)) + "_PPU"
+                    agg_df[comp_col] = agg_df[col_tuple]
+                    cond = True
+                    for i, key in enumerate(pivot_keys):
+                        cond &= (agg_df[key] == col_tuple[i])
+                    agg_df.loc[cond, comp_col] = np.nan
+            else:
+                for val in pivot_df.columns:
+                    comp_col = f"{val}_PPU"
+                    agg_df[comp_col] = agg_df[val]
+                    cond = (agg_df[pivot_keys[0]] == val)
+                    agg_df.loc[cond, comp_col] = np.nan
+
+            try:
+                agg_df.drop(columns=pivot_df.columns, inplace=True)
+            except Exception as e:
+                _warn(warn, "Could not drop pivot columns: " + str(e))
+
+        # Convert pivoted -> RPI
+        agg_df.columns = [
+            c.replace('_PPU','_RPI') if isinstance(c,str) and c.endswith('_PPU') else c
+            for c in agg_df.columns
+        ]
+        own_ppu = agg_df["PPU"]
+        for col in agg_df.columns:
+            if isinstance(col, str) and col.endswith('_RPI') and col != "PPU_RPI":
+                agg_df[col] = np.where(agg_df[col] != 0, own_ppu / agg_df[col], 0)
+
+        catvol_df = agg_df.groupby([d_channel, d_date], observed=True)['Volume'].sum().reset_index(name='CatVol')
+        agg_df = pd.merge(agg_df, catvol_df, on=[d_channel,d_date], how='left')
+        agg_df['NetCatVol'] = agg_df['CatVol'] - agg_df['Volume']
+
+        # Summarize brand-level vs channel-level
+        keys_for_brand = [d_channel] + pivot_keys
+        brand_totals = raw_df.groupby(keys_for_brand, observed=True)['SalesValue'].sum().reset_index(name='BrandSales')
+        channel_totals = raw_df.groupby(d_channel, observed=True)['SalesValue'].sum().reset_index(name='ChannelSales')
+        brand_totals = brand_totals.merge(channel_totals, on=[d_channel], how='left')
+        brand_totals['MarketShare_overall'] = brand_totals['BrandSales']/brand_totals['ChannelSales']*100
+        brand_totals['MarketShare_overall'] = brand_totals['MarketShare_overall'].fillna(0)
+
+        # Monthly seasonality
+        monthly_seasonality = (
+            agg_df.groupby([d_channel,'Month'], observed=True)['Volume']
+            .mean().reset_index().rename(columns={'Volume':'CatSeasonality'})
+        )
+        agg_df = pd.merge(agg_df, monthly_seasonality, on=[d_channel,'Month'], how='left')
+
+        # Category Weighted Price & Cat_Down_Up
+        cwp_df = compute_category_weighted_price(agg_df, d_date, d_channel)
+        cdu_df = compute_cat_down_up(
+            agg_df, d_date, d_channel,
+            pivot_keys[0] if pivot_keys else None,
+            pivot_keys[1] if pivot_keys and len(pivot_keys)>1 else None
+        )
+        agg_df[d_date] = parse_dates(agg_df[d_date])
+        cat_price_trend_df = pd.merge(cwp_df, cdu_df, on=[d_channel,d_date], how='inner')
+        cat_price_trend_df['mean_cat_down_up'] = cat_price_trend_df.groupby(d_channel, observed=True)['Cat_Down_Up'].transform('mean')
+        cat_price_trend_df['Cat_Price_trend_over_time'] = (
+            cat_price_trend_df['Cat_Weighted_Price'] *
+            (cat_price_trend_df['mean_cat_down_up']/cat_price_trend_df['Cat_Down_Up'])
+        )
+        agg_df = pd.merge(
+            agg_df,
+            cat_price_trend_df[[d_channel,d_date,'Cat_Weighted_Price','Cat_Down_Up','Cat_Price_trend_over_time']],
+            on=[d_channel,d_date], how='left'
+        )
+
+    # Outlier detection (STL)
+    if pivot_keys and len(pivot_keys)>1:
+        outlier_keys = [d_channel] + pivot_keys
+    else:
+        outlier_keys = [d_channel] + ([pivot_keys[0]] if pivot_keys else [])
+
+    final_df = agg_df.copy()
+    final_df.set_index(d_date, inplace=True)
+    final_df['residual'] = np.nan
+    final_df['z_score_residual'] = np.nan
+    final_df['is_outlier'] = 0
+
+    with stage("outliers (STL)"):
+        for name, group in final_df.groupby(outlier_keys, observed=True):
+            if len(group)<2:
+                continue
+            try:
+                orig_index = group.index.copy()
+                group_reset = group.reset_index()
+                stl = STL(group_reset['Volume'], seasonal=13, period=13)
+                result = stl.fit()
+                group_reset['residual'] = result.resid
+                group_reset['z_score_residual'] = (
+                    (group_reset['residual']-group_reset['residual'].mean()) /
+                    group_reset['residual'].std()
+                )
+                group_reset['is_outlier'] = np.where(
+                    np.abs(group_reset['z_score_residual'])>3, 1, 0
+                )
+                for idx, orig in enumerate(orig_index):
+                    final_df.at[orig, 'residual'] = group_reset.at[idx, 'residual']
+                    final_df.at[orig, 'z_score_residual'] = group_reset.at[idx, 'z_score_residual']
+                    final_df.at[orig, 'is_outlier'] = group_reset.at[idx, 'is_outlier']
+            except Exception as e:
+                _warn(warn, f"STL failed for group {name}: {e}")
+
+    final_df.reset_index(inplace=True)
+    final_df.sort_values(by=d_date, inplace=True)
+
+    # Kalman filter or direct
+    if use_kalman:
+        def apply_kalman_filter(df, y_col='Volume'):
+            vals = df[y_col].values
+            initial = vals[0]
+            kf = KalmanFilter(initial_state_mean=initial, n_dim_obs=1)
+            state_means, _ = kf.filter(vals)
+            return state_means.flatten()
+
+        final_df['FilteredVolume'] = np.nan
+        kalman_keys = [d_channel]
+        if pivot_keys:
+            kalman_keys.extend(pivot_keys)
+
+        with stage("Kalman filter"):
+            for grp_name, grp_df in final_df.groupby(kalman_keys, observed=True):
+                grp_df_sorted = grp_df.sort_values(d_date).reset_index().rename(columns={'index':'orig_index'})
+                filt_vals = apply_kalman_filter(grp_df_sorted, y_col='Volume')
+                final_df.loc[grp_df_sorted['orig_index'], 'FilteredVolume'] = filt_vals
+    else:
+        final_df['FilteredVolume'] = final_df['Volume']
+
+    if use_ratio_flag:
+        final_df['FilteredVolume'] = np.where(
+            final_df['CatVol']!=0,
+            final_df['FilteredVolume']/final_df['CatVol'],
+            0
+        )
+
+    final_df.fillna(0, inplace=True)
+
+    with stage("merge raw columns"):
+        # Merge keys for re-joining raw data
+        merge_keys = [d_channel, 'Date']
+        if pivot_keys:
+            merge_keys += pivot_keys
+
+        # Raw columns final_df doesn't have yet. Only numeric ones (Trend, Weekend, D1, ...)
+        # can be model predictors; text attributes of the extract stay out of the modelling frame.
+        additional_cols = [
+            c for c in raw_df.columns
+            if c not in final_df.columns and c not in merge_keys and c != d_date
+            and pd.api.types.is_numeric_dtype(raw_df[c])
+        ]
+
+        # Reduced DataFrame of merge-keys + the extra columns (a projection, not a copy of raw_df)
+        extra_df = project(raw_df, [k for k in merge_keys if k != 'Date'] + additional_cols)
+        extra_df['Date'] = lookup(raw_df, ["Day"], date_col=d_date, calendar=calendar)["Day"]
+        extra_df = extra_df[merge_keys + additional_cols].drop_duplicates(subset=merge_keys)
+
+        # Merge these columns into final_df. Its Date already holds the calendar Day (the pivot
+        # may have turned it into midnight timestamps), so it is only put back to dates
+        final_df['Date'] = pd.to_datetime(final_df['Date'], errors='coerce').dt.date
+        final_df = final_df.merge(extra_df, on=merge_keys, how='left')
+        final_df.fillna(0, inplace=True)
+
+        # === Merge brand_totals => 'Contribution' - same as before ===
+        keys_for_brand = [d_channel] + pivot_keys
+        final_df = final_df.merge(
+            brand_totals[keys_for_brand + ['MarketShare_overall']],
+            on=keys_for_brand, how='left'
+        )
+        final_df.rename(columns={'MarketShare_overall': 'Contribution'}, inplace=True)
+        final_df['Contribution'] = final_df['Contribution'].fillna(0)
+
+    return final_df
+
+
+# -----------------------------
+#   Model fits
+# -----------------------------
+def fit_group(group_vals, group_df, X_columns, target_col, k_folds, chosen_std_cols):
+    """
+    k-fold fits of every default_models() model on one group of the
+    modelling frame. Returns {"rows": {model: result row}, "predictions":
+    [test-fold frames, Fold numbered from 1], "warnings": [...],
+    "present_cols", "mean_x_cols", "n_folds"}; "rows" is empty when the
+    group is skipped (missing predictors, fewer rows than folds).
+    """
+    result = {"rows": {}, "predictions": [], "warnings": [], "n_folds": 0}
+    models = default_models()
+    try:
+        market_share_for_group = group_df["Contribution"].iloc[0]
+    except:
+        market_share_for_group = np.nan
+
+    if not isinstance(group_vals, tuple):
+        group_vals = (group_vals,)
+
+    present_cols = [col for col in X_columns if col in group_df.columns]
+    result["present_cols"] = present_cols
+    if len(present_cols) < len(X_columns):
+        result["warnings"].append(f"Not all predictors {X_columns} available in group {group_vals}. Skipping.")
+        return result
+
+    X_data = group_df[present_cols].copy()
+    y_data = group_df[target_col].copy()
+    if len(X_data)<k_folds:
+        return result
+
+    p_num = len(present_cols)
+
+    for col in present_cols:
+        if pd.api.types.is_numeric_dtype(X_data[col]):
+            X_data[col] = X_data[col].fillna(0)
+
+    kf = KFold(n_splits=k_folds, shuffle=True, random_state=42)
+    fold_store = {m: [] for m in models.keys()}
+    fold_means = {m: [] for m in models.keys()}
+    fold_stds = {m: [] for m in models.keys()}
+
+    fold = 0
+    for train_idx, test_idx in kf.split(X_data, y_data):
+        fold += 1
+        X_train = X_data.iloc[train_idx].copy()
+        X_test  = X_data.iloc[test_idx].copy()
+        y_train = y_data.iloc[train_idx]
+        y_test  = y_data.iloc[test_idx]
+
+        scaler_info = {}
+        if chosen_std_cols:
+            sc = StandardScaler()
+            sc.fit(X_train[chosen_std_cols])
+            means_ = sc.mean_
+            stds_  = sc.scale_
+            X_train[chosen_std_cols] = sc.transform(X_train[chosen_std_cols])
+            X_test[chosen_std_cols]  = sc.transform(X_test[chosen_std_cols])
+            for i, c in enumerate(chosen_std_cols):
+                scaler_info[c] = (means_[i], stds_[i])
+
+        for mname,mobj in models.items():
+            if mname in ["Custom Constrained Ridge","Constrained Linear Regression"]:
+                mobj.fit(X_train.values, y_train.values, X_train.columns.tolist())
+                y_train_pred = mobj.predict(X_train.values)
+                y_test_pred  = mobj.predict(X_test.values)
+                B0_std_ = getattr(mobj, "intercept_", 0)
+                B1s_std_ = getattr(mobj, "coef_", np.zeros(p_num))
+            else:
+                mobj.fit(X_train, y_train)
+                y_train_pred = mobj.predict(X_train)
+                y_test_pred  = mobj.predict(X_test)
+                B0_std_ = getattr(mobj, "intercept_", 0)
+                B1s_std_ = getattr(mobj, "coef_", np.zeros(p_num))
+
+            r2_tr = r2_score(y_train, y_train_pred)
+            r2_te = r2_score(y_test, y_test_pred)
+            n_tr = len(X_train)
+            n_te = len(X_test)
+            adj_tr = (1 - (1-r2_tr)*(n_tr-1)/(n_tr-p_num-1)) if (n_tr-p_num-1)>0 else np.nan
+            adj_te = (1 - (1-r2_te)*(n_te-1)/(n_te-p_num-1)) if (n_te-p_num-1)>0 else np.nan
+
+            mape_tr = safe_mape(y_train, y_train_pred)
+            mape_te = safe_mape(y_test, y_test_pred)
+
+            fold_store[mname].append({
+                "r2_train": r2_tr, "r2_test": r2_te,
+                "adj_tr": adj_tr, "adj_te": adj_te,
+                "mape_tr": mape_tr, "mape_te": mape_te,
+                "B0_std": B0_std_,
+                "B1s_std": B1s_std_,
+            })
+            fold_means[mname].append({c: scaler_info[c][0] if c in scaler_info else 0.0 for c in present_cols})
+            fold_stds[mname].append({c: scaler_info[c][1] if c in scaler_info else 1.0 for c in present_cols})
+
+            pred_df = group_df.loc[X_test.index].copy()
+            pred_df["Actual"] = y_test.values
+            pred_df["Predicted"] = y_test_pred
+            pred_df["Model"] = mname
+            pred_df["Fold"] = fold
+            result["predictions"].append(pred_df)
+
+    for mname in models.keys():
+        fdata = fold_store[mname]
+        if not fdata:
+            continue
+
+        r2_tr_ = np.mean([fd["r2_train"] for fd in fdata])
+        r2_te_ = np.mean([fd["r2_test"] for fd in fdata])
+        adj_tr_ = np.mean([fd["adj_tr"] for fd in fdata])
+        adj_te_ = np.mean([fd["adj_te"] for fd in fdata])
+        mape_tr_ = np.mean([fd["mape_tr"] for fd in fdata])
+        mape_te_ = np.mean([fd["mape_te"] for fd in fdata])
+
+        B0_std_mean = np.mean([fd["B0_std"] for fd in fdata])
+        B1s_std_arrays = [fd["B1s_std"] for fd in fdata]
+        B1s_std_mean = np.mean(B1s_std_arrays, axis=0)
+
+        avg_scale_info = {}
+        for cc in present_cols:
+            col_means = [d[cc] for d in fold_means[mname]]
+            col_stds  = [d[cc] for d in fold_stds[mname]]
+            avg_scale_info[cc] = (np.mean(col_means), np.mean(col_stds))
+
+        raw_intercept = B0_std_mean
+        raw_coefs = B1s_std_mean.copy()
+        for idx, cc in enumerate(present_cols):
+            if cc in chosen_std_cols:
+                mu_c, std_c = avg_scale_info[cc]
+                raw_coef_c = raw_coefs[idx]/std_c
+                raw_intercept -= (raw_coefs[idx]*(mu_c/std_c))
+                raw_coefs[idx] = raw_coef_c
+
+        predicted_Q = raw_intercept
+        mean_x_d = X_data.mean(numeric_only=True).to_dict()
+        for i, col_name in enumerate(present_cols):
+            predicted_Q += raw_coefs[i] * mean_x_d.get(col_name, 0.0)
+
+        derivative = 0.0
+        if "PPU" in present_cols:
+            ppu_idx = present_cols.index("PPU")
+            derivative += raw_coefs[ppu_idx]
+        competitor_ratio_cols = [cc for cc in present_cols if cc.endswith("_RPI")]
+        avg_own_price = mean_x_d.get("PPU", 0.0)
+        for c_ in competitor_ratio_cols:
+            i_idx = present_cols.index(c_)
+            ratio_beta = raw_coefs[i_idx]
+            ratio_avg  = X_data[c_].mean()
+            if ratio_avg and not np.isnan(ratio_avg) and avg_own_price>0:
+                competitor_price = avg_own_price / ratio_avg
+                if competitor_price>0:
+                    derivative += ratio_beta / competitor_price
+
+        if (predicted_Q>0) and (avg_own_price>0):
+            self_elas = derivative * (avg_own_price/predicted_Q)
+        else:
+            self_elas = np.nan
+        elasticity_flag = ""
+        if not np.isnan(self_elas) and abs(self_elas)>100:
+            elasticity_flag = "ELASTICITY>100"
+            result["warnings"].append(f"Elasticity > 100 for group {group_vals}: {self_elas:.2f}")
+
+        result["rows"][mname] = (
+            list(group_vals) + [market_share_for_group] +
+            [ raw_intercept, r2_tr_, r2_te_, adj_tr_, adj_te_,
+              mape_tr_, mape_te_, B0_std_mean ]
+            + list(mean_x_d.values())
+            + list(raw_coefs)
+            + [self_elas, elasticity_flag, avg_own_price]
+        )
+        result["mean_x_cols"] = list(mean_x_d.keys())
+
+    result["n_folds"] = fold
+    return result
+
+
+def run_model_pipeline(final_df, grouping_keys, X_columns, target_col, k_folds, chosen_std_cols,
+                       warn=None, executor=None, progress=None):
+    """
+    fit_group on every grouping_keys group of final_df (the modelling frame):
+    (one row per group and model with fit statistics, betas and elasticity,
+    test-fold predictions), or (None, None) if nothing could be fitted.
+    Groups are fitted through executor.map when an executor is given, and
+    progress(fraction) is called as they are done.
+    """
+    if grouping_keys:
+        groups = list(final_df.groupby(grouping_keys, observed=True))
+    else:
+        groups = [((None,), final_df)]
+
+    fit = partial(fit_group, X_columns=X_columns, target_col=target_col, k_folds=k_folds,
+                  chosen_std_cols=chosen_std_cols)
+    model_results = {m: [] for m in MODEL_NAMES}
+    predictions_records = []
+    present_cols, mean_x_cols = list(X_columns), []
+    fold_offset = 0
+
+    with stage("model fits"):
+        results = (executor.map if executor is not None else map)(
+            fit, [vals for vals, _ in groups], [df for _, df in groups]
+        )
+        for done, result in enumerate(results, start=1):
+            if progress is not None:
+                progress(done / len(groups))
+            for message in result["warnings"]:
+                _warn(warn, message)
+            present_cols = result.get("present_cols", present_cols)
+            if not result["rows"]:
+                continue
+            mean_x_cols = result["mean_x_cols"]
+            for mname, row in result["rows"].items():
+                model_results[mname].append(row)
+            # Folds are numbered across groups, in group order
+            for pred_df in result["predictions"]:
+                pred_df["Fold"] += fold_offset
+                predictions_records.append(pred_df)
+            fold_offset += result["n_folds"]
+
+    all_frames = []
+    for mname, rows in model_results.items():
+        if not rows:
+            continue
+        df_tmp = pd.DataFrame(
+            rows,
+            columns=(grouping_keys
+                + ["Contribution"]
+                + ["B0 (Original)","R2 Train","R2 Test","Adjusted R2 Train","Adjusted R2 Test",
+                   "MAPE Train","MAPE Test","B0_std_mean"]
+                + mean_x_cols
+                + ["Beta_" + c for c in present_cols]
+                + ["SelfElasticity","ElasticityFlag","PPU_at_Elasticity"]
+            )
+        )
+        df_tmp["Model"] = mname
+        all_frames.append(df_tmp)
+
+    if not all_frames:
+        _warn(warn, "No modeling results. Possibly no valid data/folds.")
+        return None, None
+
+    combined_results_df = pd.concat(all_frames, ignore_index=True)
+    date_col_model = next((c for c in final_df.columns if c.strip().lower()=='date'), None)
+    if date_col_model:
+        final_df[date_col_model] = pd.to_datetime(final_df[date_col_model])
+        latest_date = final_df[date_col_model].max()
+        last_period = final_df[final_df[date_col_model] >= (latest_date - pd.DateOffset(months=12))]
+        avg_PPU_by_group = (
+            last_period.groupby(grouping_keys, observed=True)["PPU"].mean()
+            .reset_index().rename(columns={"PPU":"PPU_last_12M"})
+        )
+        combined_results_df = combined_results_df.merge(avg_PPU_by_group, on=grouping_keys, how='left')
+        combined_results_df["CSF"] = combined_results_df["SelfElasticity"].apply(
+            lambda x: 1-(1/x) if x and x!=0 else np.nan
+        )
+        combined_results_df["MCV"] = combined_results_df["CSF"] * combined_results_df["PPU_at_Elasticity"]
+
+    new_order = (grouping_keys+["Model","CSF","MCV","SelfElasticity","PPU_last_12M"]+[
+        c for c in combined_results_df.columns
+        if c not in grouping_keys+["Model","CSF","MCV","SelfElasticity","PPU_last_12M"]
+    ])
+    combined_results_df = combined_results_df[new_order]
+    combined_results_df.sort_values(by=grouping_keys+["Model"], inplace=True, ignore_index=True)
+    preds_concat = None
+    if predictions_records:
+        preds_concat = pd.concat(predictions_records, ignore_index=True)
+    return combined_results_df, preds_concat
+
+
+def run_model_pipelines(specs, warn=None, progress=None):
+    """
+    run_model_pipeline for each named spec (a dict of its keyword arguments;
+    the Type 2 models, one spec per key): (results by name, predictions by
+    name for the specs that produced any).
+    """
+    results, predictions = {}, {}
+    for i, (name, spec) in enumerate(specs.items()):
+        step = None
+        if progress is not None:
+            step = lambda f, i=i: progress((i + f) / len(specs))
+        res, preds = run_model_pipeline(**spec, warn=warn, progress=step)
+        results[name] = res
+        if preds is not None:
+            predictions[name] = preds
+    return results, predictions
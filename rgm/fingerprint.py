@@ -0,0 +1,118 @@
+"""
+Cheap identity for DataFrames, for use as cache keys.
+
+Hashing a whole frame to look up a cache entry (what ``st.cache_data`` does
+with a DataFrame argument) costs about as much as the aggregation it is
+protecting. Instead, every frame gets
+
+* a version: a process-wide, monotonically increasing number, assigned the
+  first time the frame is seen and bumped whenever its structure changes
+  (rows, columns, dtypes, or the memory behind any column, which is what a
+  column write does under copy-on-write), or when bump_version is called
+  after an in-place edit; and
+* a sampled content hash over a fixed set of evenly spaced rows.
+
+fingerprint(df) combines the two. Computing it touches the column list and
+a few thousand rows, never the whole frame.
+"""
+import hashlib
+import itertools
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+
+# Rows hashed by content_hash (evenly spaced, first and last included)
+FINGERPRINT_SAMPLE_ROWS = 2048
+
+
+def buffer_key(series):
+    """Something identifying the memory behind a column, or None if unknown."""
+    arr = series.array
+    if isinstance(arr, pd.Categorical):
+        codes = arr.codes
+        return ("cat", codes.__array_interface__["data"][0], codes.strides, id(arr.categories))
+    if hasattr(arr, "__arrow_array__"):
+        chunks = arr.__arrow_array__().chunks
+        return ("arrow",) + tuple(
+            (chunk.offset, tuple(buf.address if buf is not None else None for buf in chunk.buffers()))
+            for chunk in chunks
+        )
+    values = np.asarray(arr)
+    if values is arr or isinstance(arr, (pd.arrays.NumpyExtensionArray, pd.arrays.DatetimeArray)):
+        return ("numpy", values.__array_interface__["data"][0], values.strides)
+    return None
+
+
+def _structure(df):
+    columns = tuple(
+        (col, str(dtype), buffer_key(df.iloc[:, i]))
+        for i, (col, dtype) in enumerate(df.dtypes.items())
+    )
+    return (len(df), columns)
+
+
+# -----------------------------
+#   Versions
+# -----------------------------
+_counter = itertools.count(1)
+_versions = {}      # id(df) -> (weakref to df, structure, version)
+_versions_lock = threading.Lock()
+
+
+def _drop(df_id):
+    with _versions_lock:
+        _versions.pop(df_id, None)
+
+
+def _assign(df, structure):
+    """Record a new version for df (lock held)."""
+    if id(df) not in _versions:
+        weakref.finalize(df, _drop, id(df))
+    entry = (weakref.ref(df), structure, next(_counter))
+    _versions[id(df)] = entry
+    return entry[2]
+
+
+def frame_version(df):
+    """The version of df: unchanged until df's structure changes or bump_version(df) is called."""
+    structure = _structure(df)
+    with _versions_lock:
+        entry = _versions.get(id(df))
+        if entry is not None and entry[0]() is df and entry[1] == structure:
+            return entry[2]
+        return _assign(df, structure)
+
+
+def bump_version(df):
+    """Give df a new version; call after editing its values in place (``df.loc[...] = ...``)."""
+    structure = _structure(df)
+    with _versions_lock:
+        return _assign(df, structure)
+
+
+# -----------------------------
+#   Content hash
+# -----------------------------
+def content_hash(df, sample_rows=FINGERPRINT_SAMPLE_ROWS):
+    """Hex digest of df's shape, columns, dtypes and a fixed sample of its rows."""
+    n = len(df)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((df.shape, [str(c) for c in df.columns], [str(t) for t in df.dtypes])).encode("utf-8"))
+    if n:
+        positions = np.unique(np.linspace(0, n - 1, min(n, sample_rows)).astype(np.int64))
+        sample = df if len(positions) == n else df.iloc[positions]
+        try:
+            hashed = pd.util.hash_pandas_object(sample, index=True)
+        except TypeError:
+            # Unhashable cells (lists, dicts, ...): hash their text instead
+            hashed = pd.util.hash_pandas_object(sample.astype(str), index=True)
+        h.update(hashed.to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def fingerprint(df):
+    """Cache key for df: "<version>-<sampled content hash>"."""
+    return f"{frame_version(df)}-{content_hash(df)}"
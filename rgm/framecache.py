@@ -0,0 +1,70 @@
+"""
+Per-frame cache for structures derived from a long-lived DataFrame.
+
+D0 and the upload handles live for the whole session, and the pages derive
+the same lookup structures from them on every rerun (the hierarchy index,
+the calendar table). FrameCache keeps one such structure per frame object
+and drops it when the frame is garbage collected. The frame's columns are
+treated as read-only; a change in row count rebuilds the entry.
+
+Structures that depend on the frame's values are keyed on its version
+(rgm.fingerprint.frame_version) as well. A versioned cache keeps only the
+entries of the latest version it has seen for a frame, so superseded
+results (and the column buffers they hold on to) are freed as soon as the
+frame changes; max_keys bounds how many keys it keeps per frame.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+
+
+class FrameCache:
+    def __init__(self, build, versioned=False, max_keys=None):
+        self._build = build          # build(df, *key) -> value
+        self._versioned = versioned  # key[0] is the frame's version
+        self._max_keys = max_keys    # per frame, least recently used dropped first
+        self._entries = {}           # id(df) -> [weakref to df, n_rows, version, {key: value}]
+        self._lock = threading.Lock()
+
+    def _drop(self, df_id):
+        with self._lock:
+            self._entries.pop(df_id, None)
+
+    def _slot(self, df, key):
+        """The {key: value} dict for df, registering df if it is new (lock held)."""
+        entry = self._entries.get(id(df))
+        if entry is None or entry[0]() is not df or entry[1] != len(df):
+            if entry is None:
+                weakref.finalize(df, self._drop, id(df))
+            entry = [weakref.ref(df), len(df), None, OrderedDict()]
+            self._entries[id(df)] = entry
+        if self._versioned and entry[2] != key[0]:
+            entry[2] = key[0]
+            entry[3].clear()
+        return entry[3]
+
+    def _keep(self, values, key, value):
+        """Store value under key as the most recently used one (lock held)."""
+        value = values.setdefault(key, value)
+        values.move_to_end(key)
+        while self._max_keys is not None and len(values) > self._max_keys:
+            values.popitem(last=False)
+        return value
+
+    def get(self, df, *key):
+        """The cached value for (df, key), built on first use."""
+        with self._lock:
+            values = self._slot(df, key)
+            if key in values:
+                values.move_to_end(key)
+                return values[key]
+        value = self._build(df, *key)
+        with self._lock:
+            return self._keep(self._slot(df, key), key, value)
+
+    def put(self, df, value, *key):
+        """Prime the cache with a value built elsewhere (e.g. at ingest)."""
+        with self._lock:
+            values = self._slot(df, key)
+            values.pop(key, None)
+            self._keep(values, key, value)
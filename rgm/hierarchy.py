@@ -0,0 +1,226 @@
+"""
+Product-hierarchy index over an RGM frame.
+
+The Base Price, Promo Depth, Calendar, Brand Ladder and Market Construct
+pages all cascade Channel → Brand → Variant/PackType/PackSize → PPG. Doing
+that with ``df[df["Channel"] == x]["Brand"].dropna().unique()`` chains means a
+full boolean scan of D0 per selector on every rerun.
+
+HierarchyIndex factorizes the dimension columns once and sorts the row
+positions by (Channel, Brand, aggregator, PPG). Every node of the hierarchy
+is then a contiguous slice of that order: listing a node's children is a
+dict lookup, and the rows under a node are an ``iloc`` take.
+
+Paths are given as values, outermost level first, e.g.
+``index.children("Tesco", "Brand A", aggregator="Variant")`` lists the
+variants of Brand A in Tesco, and ``index.take(df, "Tesco", "Brand A",
+"Classic", "PPG 1", aggregator="Variant")`` returns that PPG's rows. Without
+an aggregator the levels are Channel → Brand → PPG.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from rgm.framecache import FrameCache
+from rgm.schema import DIMENSION_COLUMNS
+
+
+# Middle level of the cascade; the pages let the user pick one of these
+AGGREGATOR_COLUMNS = ["Variant", "PackType", "PackSize"]
+
+_EMPTY_ROWS = np.empty(0, dtype=np.intp)
+
+
+class HierarchyIndex:
+    def __init__(self, df):
+        self._df_columns = set(df.columns)
+        self.n_rows = len(df)
+        self._source = {col: df[col] for col in DIMENSION_COLUMNS if col in df.columns}
+        self._lock = threading.RLock()
+        self._codes = {}        # column -> int codes, -1 where missing
+        self._uniques = {}      # column -> values by code, in order of first appearance
+        self._lookup = {}       # column -> {value: code}
+        self._chains = {}       # level columns -> (order, nodes, children)
+        self._value_order = {}  # column -> (row order by code, start offset per code)
+
+    # -----------------------------
+    #   Building (lazy, per column / per chain)
+    # -----------------------------
+    def _column(self, col):
+        with self._lock:
+            if col not in self._codes:
+                if col not in self._source:
+                    raise KeyError(col)
+                codes, uniques = pd.factorize(self._source.pop(col), sort=False)
+                self._codes[col] = codes
+                self._uniques[col] = pd.Index(uniques).tolist()
+                self._lookup[col] = {value: code for code, value in enumerate(self._uniques[col])}
+            return self._codes[col]
+
+    def _levels(self, aggregator):
+        return ("Channel", "Brand") + ((aggregator,) if aggregator else ()) + ("PPG",)
+
+    def _chain(self, levels):
+        with self._lock:
+            if levels not in self._chains:
+                self._chains[levels] = self._build_chain(levels)
+            return self._chains[levels]
+
+    def _build_chain(self, levels):
+        codes = [self._column(col) for col in levels]
+        radix = [len(self._uniques[col]) + 1 for col in levels]
+        if np.prod([float(r) for r in radix]) < 2 ** 62:
+            # One composite key (missing values shift to 0 and sort first) and a single stable argsort
+            key = np.zeros(self.n_rows, dtype=np.int64)
+            for c, r in zip(codes, radix):
+                key = key * r + (c.astype(np.int64) + 1)
+            order = np.argsort(key, kind="stable")
+        else:
+            order = np.lexsort(codes[::-1])
+
+        nodes = {}      # tuple of codes -> (start, stop) into order
+        children = {}   # tuple of codes -> child codes, in order of first row position
+        changed = np.zeros(self.n_rows, dtype=bool)
+        if self.n_rows:
+            changed[0] = True
+        sorted_codes = []
+        for depth, c in enumerate(codes, start=1):
+            sc = c[order]
+            sorted_codes.append(sc)
+            changed[1:] |= sc[1:] != sc[:-1]
+            starts = np.flatnonzero(changed)
+            stops = np.append(starts[1:], self.n_rows)
+            prefixes = np.column_stack([s[starts] for s in sorted_codes])
+            firsts = np.minimum.reduceat(order, starts) if len(starts) else starts
+            for path, start, stop, first in zip(
+                map(tuple, prefixes.tolist()), starts.tolist(), stops.tolist(), firsts.tolist()
+            ):
+                if min(path) < 0:
+                    continue
+                nodes[path] = (start, stop)
+                children.setdefault(path[:-1], []).append((first, path[-1]))
+        children = {parent: [code for _, code in sorted(kids)] for parent, kids in children.items()}
+        return order, nodes, children
+
+    def _path_codes(self, levels, path):
+        if len(path) > len(levels):
+            raise ValueError(f"Path {path!r} is deeper than the hierarchy {levels}")
+        codes = []
+        for col, value in zip(levels, path):
+            self._column(col)
+            code = self._lookup[col].get(value)
+            if code is None:
+                return None
+            codes.append(code)
+        return tuple(codes)
+
+    # -----------------------------
+    #   Cascade
+    # -----------------------------
+    def children(self, *path, aggregator=None):
+        """
+        Distinct non-null values one level below path (top level: Channels),
+        in order of first appearance among path's rows, like ``.unique()``
+        on the filtered frame.
+        """
+        levels = self._levels(aggregator)
+        if len(path) >= len(levels):
+            return []
+        _, _, children = self._chain(levels)
+        codes = self._path_codes(levels, path)
+        if codes is None:
+            return []
+        uniques = self._uniques[levels[len(path)]]
+        return [uniques[code] for code in children.get(codes, [])]
+
+    def rows(self, *path, aggregator=None):
+        """Ascending row positions under path (every row for an empty path)."""
+        if not path:
+            return np.arange(self.n_rows)
+        levels = self._levels(aggregator)
+        order, nodes, _ = self._chain(levels)
+        codes = self._path_codes(levels, path)
+        if codes is None or codes not in nodes:
+            return _EMPTY_ROWS
+        start, stop = nodes[codes]
+        return np.sort(order[start:stop])
+
+    def take(self, df, *path, aggregator=None):
+        """The rows of df under path (df must be the frame the index was built on)."""
+        return df.iloc[self.rows(*path, aggregator=aggregator)]
+
+    def take_any(self, df, paths, aggregator=None):
+        """The rows of df under any of paths (e.g. several brands of one channel)."""
+        rows = [self.rows(*path, aggregator=aggregator) for path in paths]
+        return df.iloc[np.sort(np.concatenate(rows)) if rows else _EMPTY_ROWS]
+
+    def leaves(self, aggregator=None):
+        """Every full (Channel, Brand[, aggregator value], PPG) path, in hierarchy order."""
+        levels = self._levels(aggregator)
+        _, nodes, _ = self._chain(levels)
+        for codes in nodes:
+            if len(codes) == len(levels):
+                yield tuple(self._uniques[col][code] for col, code in zip(levels, codes))
+
+    # -----------------------------
+    #   Single-column filters
+    # -----------------------------
+    def values(self, col, rows=None):
+        """
+        Distinct non-null values of a dimension column, optionally within rows
+        (ascending positions), in order of first appearance.
+        """
+        codes = self._column(col)
+        if rows is None:
+            return list(self._uniques[col])
+        present, first = np.unique(codes[rows], return_index=True)
+        return [self._uniques[col][code] for code in present[np.argsort(first)] if code >= 0]
+
+    def value_rows(self, col, value):
+        """Ascending row positions where col == value."""
+        codes = self._column(col)
+        with self._lock:
+            if col not in self._value_order:
+                order = np.argsort(codes, kind="stable")
+                offsets = np.searchsorted(codes[order], np.arange(len(self._uniques[col]) + 1))
+                self._value_order[col] = (order, offsets)
+        order, offsets = self._value_order[col]
+        code = self._lookup[col].get(value)
+        if code is None:
+            return _EMPTY_ROWS
+        return order[offsets[code]:offsets[code + 1]]
+
+    def filter_rows(self, filters, exclude=None):
+        """
+        Ascending row positions matching every {col: value} in filters and
+        none of the {col: value} in exclude. Columns the frame doesn't have
+        are ignored.
+        """
+        rows = None
+        for col, value in filters.items():
+            if col not in self._df_columns:
+                continue
+            hit = self.value_rows(col, value)
+            rows = hit if rows is None else np.intersect1d(rows, hit, assume_unique=True)
+        if rows is None:
+            rows = np.arange(self.n_rows)
+        for col, value in (exclude or {}).items():
+            if col in self._df_columns:
+                rows = np.setdiff1d(rows, self.value_rows(col, value), assume_unique=True)
+        return rows
+
+
+# -----------------------------
+#   Per-frame cache
+# -----------------------------
+_indexes = FrameCache(HierarchyIndex)
+
+
+def hierarchy_index(df):
+    """
+    The HierarchyIndex for df, built on first use and reused on later reruns
+    for as long as the same frame object is alive. The frame's dimension
+    columns are treated as read-only; a change in row count rebuilds it.
+    """
+    return _indexes.get(df)
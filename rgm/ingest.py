@@ -0,0 +1,616 @@
+"""
+Upload ingestion for the sidebar "File Management" block.
+
+Every uploaded CSV/XLSX is parsed once and written to an on-disk Arrow IPC
+file keyed by a hash of the uploaded bytes. Any later upload of the same bytes
+(same session or a brand-new one) is served from that file with a
+memory-mapped read instead of going through pd.read_csv / openpyxl again.
+
+CSVs are read in chunks: the first chunk is checked against the RGM schema
+so a malformed file fails within seconds, and each chunk is typed as it
+arrives so the untyped frame never exists in memory all at once.
+
+Workbooks with one sheet per retailer/channel can be read in "all sheets"
+mode: every sheet is parsed in its own worker process and the results are
+stacked, with Channel taken from the sheet name.
+
+Date is parsed to datetime64 here and the calendar table (rgm.calendar) is
+built from it, so the pages never parse dates themselves. Rows failing the
+data-quality rules (rgm.quality) are moved to a quarantine table that is
+cached next to the dataset; the pages only get the clean rows.
+
+A weekly drop can also be appended to an already loaded dataset: only rows
+whose (Date, Market, Channel, PPG) key is new are added, and the report lists the
+product groups that received rows and from which date, so downstream
+stages know what to recompute.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from rgm.calendar import build_calendar, parse_date_column, parse_dates
+from rgm.quality import QUALITY_RULES, check_quality
+from rgm.schema import (
+    CATEGORY_MAX_UNIQUE_RATIO,
+    DIMENSION_COLUMNS,
+    GROUP_COLUMNS,
+    MEASURE_COLUMNS,
+    ROW_KEY_COLUMNS,
+    SchemaError,
+    apply_dtype_plan,
+    optimize_dtypes,
+    plan_dtypes,
+    validate_columns,
+)
+
+
+# Root of the on-disk cache; override with RGM_CACHE_DIR on shared servers.
+CACHE_DIR = os.environ.get("RGM_CACHE_DIR", os.path.join(tempfile.gettempdir(), "rgm_cache"))
+
+# Bump whenever the layout of the cached frames changes (e.g. a new dtype plan)
+CACHE_FORMAT = "v4"
+
+# Rows per chunk for the streaming CSV reader
+CSV_CHUNK_ROWS = 500_000
+
+_HASH_CHUNK_BYTES = 8 * 1024 * 1024
+
+# Upper bound on worker processes for multi-sheet workbooks (default: one per core)
+EXCEL_MAX_WORKERS = int(os.environ.get("RGM_EXCEL_WORKERS", "0")) or os.cpu_count() or 1
+
+
+# -----------------------------
+#   Content hashing
+# -----------------------------
+def content_digest(file):
+    """Hex digest of a file-like object's bytes, read in chunks."""
+    h = hashlib.blake2b(digest_size=20)
+    file.seek(0)
+    for chunk in iter(lambda: file.read(_HASH_CHUNK_BYTES), b""):
+        h.update(chunk)
+    file.seek(0)
+    return h.hexdigest()
+
+
+def upload_key(digest, name, all_sheets=False):
+    """
+    Identity of the parsed dataset: the content digest, plus a suffix when the
+    same workbook is read in all-sheets mode (a different frame from the same bytes).
+    """
+    if all_sheets and name.endswith(".xlsx"):
+        return f"{digest}-sheets"
+    return digest
+
+
+def upload_cache_path(digest):
+    return os.path.join(CACHE_DIR, "uploads", CACHE_FORMAT, f"{digest}.arrow")
+
+
+def quarantine_cache_path(digest):
+    return os.path.join(CACHE_DIR, "uploads", CACHE_FORMAT, f"{digest}.quarantine.arrow")
+
+
+# -----------------------------
+#   Arrow read / write
+# -----------------------------
+def write_frame(df, path, metadata=None):
+    """
+    Write df as an uncompressed Arrow IPC file (so it can be memory-mapped).
+    Written to a temp name first and renamed, so a concurrent reader never
+    sees a half-written file. Returns False if Arrow can't represent df
+    (e.g. object columns mixing numbers and strings).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return False
+    if metadata:
+        schema_meta = dict(table.schema.metadata or {})
+        schema_meta[b"rgm"] = json.dumps(metadata).encode("utf-8")
+        table = table.replace_schema_metadata(schema_meta)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+    return True
+
+
+def read_frame(path, columns=None):
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def read_frame_metadata(path):
+    """The metadata dict stored by write_frame, without reading any column data."""
+    schema = feather.read_table(path, columns=[], memory_map=True).schema
+    raw = (schema.metadata or {}).get(b"rgm")
+    return json.loads(raw) if raw else {}
+
+
+# -----------------------------
+#   Streaming CSV reader
+# -----------------------------
+def _stream_size(file):
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+def _union_categories(chunks, col):
+    # All-NaN chunks carry empty (float) categories; leave them out of the union
+    parts = [ch[col] for ch in chunks if len(ch[col].cat.categories)]
+    if not parts:
+        return chunks[0][col].cat.categories
+    return pd.api.types.union_categoricals(parts, ignore_order=True).categories
+
+
+def concat_typed_chunks(chunks):
+    """
+    Concatenate chunks that were typed independently. Categorical columns are
+    first recoded onto the union of their categories; otherwise pd.concat
+    would silently fall back to object for any column whose categories differ
+    between chunks.
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+    for col in chunks[0].columns:
+        if not isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            continue
+        try:
+            categories = _union_categories(chunks, col)
+        except TypeError:
+            # Chunks inferred different category types (e.g. ints in one, strings in another)
+            for ch in chunks:
+                ch[col] = ch[col].cat.rename_categories(str)
+            categories = _union_categories(chunks, col)
+        for ch in chunks:
+            ch[col] = ch[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_csv_chunked(file, chunk_rows=CSV_CHUNK_ROWS, progress=None):
+    """
+    Read a CSV chunk by chunk and return (df, dtype_report).
+
+    The first chunk is validated against the RGM schema (raises SchemaError
+    before the rest of the file is read). Each chunk then gets the dtype plan
+    on arrival; which dimensions become categorical is decided on the first
+    chunk so every chunk agrees, while measures are downcast per chunk and
+    pd.concat widens them back if a later chunk needs it. progress(fraction)
+    is called after every chunk. Date is parsed per chunk too, if every
+    value of the first chunk parses.
+    """
+    total_bytes = _stream_size(file)
+    chunks = []
+    raw_dtypes = {}
+    bytes_before = 0
+    category_cols = []
+    parse_date = False
+
+    try:
+        reader = pd.read_csv(file, chunksize=chunk_rows)
+        for i, chunk in enumerate(reader):
+            if i == 0:
+                validate_columns(chunk.columns)
+                raw_dtypes = chunk.dtypes.astype(str).to_dict()
+            bytes_before += int(chunk.memory_usage(deep=True).sum())
+
+            plan = plan_dtypes(chunk)
+            if i == 0:
+                category_cols = [c for c, dtype in plan.items() if dtype == "category"]
+            plan = {c: d for c, d in plan.items() if d != "category"}
+            plan.update({c: "category" for c in category_cols})
+            chunks.append(apply_dtype_plan(chunk, plan))
+            if i == 0:
+                parse_date = parse_date_column(chunk)
+            elif parse_date:
+                parse_date_column(chunk, force=True)
+
+            if progress is not None and total_bytes:
+                progress(min(file.tell() / total_bytes, 1.0))
+    except pd.errors.EmptyDataError:
+        validate_columns([])
+
+    df = concat_typed_chunks(chunks)
+    del chunks
+    report = {
+        "bytes_before": bytes_before,
+        "bytes_after": int(df.memory_usage(deep=True).sum()),
+        "converted": {
+            col: f"{raw_dtypes[col]} → {df[col].dtype}"
+            for col in df.columns
+            if col in raw_dtypes and str(df[col].dtype) != raw_dtypes[col]
+        },
+    }
+    return df, report
+
+
+# -----------------------------
+#   Multi-sheet Excel reader
+# -----------------------------
+def _read_sheet(path, sheet_name):
+    """
+    Worker: parse one sheet, fill Channel from the sheet name and type it.
+    Every dimension becomes categorical here so the pickled result sent back
+    is small and all sheets agree; the parent undoes it where too many
+    values are distinct.
+    """
+    df = pd.read_excel(path, sheet_name=sheet_name)
+    if "Channel" not in df.columns:
+        df.insert(0, "Channel", str(sheet_name))
+    else:
+        df["Channel"] = df["Channel"].fillna(str(sheet_name))
+    bytes_before = int(df.memory_usage(deep=True).sum())
+    plan = {c: d for c, d in plan_dtypes(df).items() if d != "category"}
+    plan.update({c: "category" for c in DIMENSION_COLUMNS if c in df.columns})
+    raw_dtypes = df.dtypes.astype(str).to_dict()
+    return apply_dtype_plan(df, plan), raw_dtypes, bytes_before
+
+
+def read_excel_sheets(file, max_workers=None, progress=None):
+    """
+    Read every sheet of a workbook in parallel and return (df, dtype_report).
+
+    Sheets are parsed by a pool of worker processes (openpyxl is
+    single-threaded, so threads would not help) and concatenated in workbook
+    order. A sheet without a Channel column gets the sheet name as its
+    Channel. The combined frame is checked against the RGM schema.
+    progress(fraction) is called as sheets finish.
+    """
+    file.seek(0)
+    sheet_names = openpyxl.load_workbook(file, read_only=True).sheetnames
+    file.seek(0)
+
+    # Workers open the workbook by path; uploads only exist in memory
+    tmp_dir = os.path.join(CACHE_DIR, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=".xlsx", dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: file.read(_HASH_CHUNK_BYTES), b""):
+                out.write(chunk)
+        file.seek(0)
+
+        results = {}
+        workers = min(len(sheet_names), max_workers or EXCEL_MAX_WORKERS)
+        if workers <= 1:
+            for i, sheet in enumerate(sheet_names):
+                results[sheet] = _read_sheet(path, sheet)
+                if progress is not None:
+                    progress((i + 1) / len(sheet_names))
+        else:
+            # spawn, not fork: the Streamlit server process is multi-threaded
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                futures = {pool.submit(_read_sheet, path, sheet): sheet for sheet in sheet_names}
+                for done, future in enumerate(as_completed(futures), start=1):
+                    results[futures[future]] = future.result()
+                    if progress is not None:
+                        progress(done / len(sheet_names))
+    finally:
+        os.remove(path)
+
+    chunks = [results[sheet][0] for sheet in sheet_names if len(results[sheet][0].columns)]
+    if not chunks:
+        validate_columns([])
+    validate_columns(set().union(*(ch.columns for ch in chunks)))
+    raw_dtypes = {}
+    for sheet in sheet_names:
+        raw_dtypes.update(results[sheet][1])
+    bytes_before = sum(results[sheet][2] for sheet in sheet_names)
+    del results
+
+    # Sheets may not share every column; a dimension missing from a sheet
+    # joins it as an all-NaN categorical so the union of categories still works
+    all_columns = list(dict.fromkeys(c for ch in chunks for c in ch.columns))
+    for ch in chunks:
+        for col in all_columns:
+            if col not in ch.columns:
+                ch[col] = pd.Categorical([None] * len(ch)) if col in DIMENSION_COLUMNS else pd.NA
+    chunks = [ch[all_columns] for ch in chunks]
+
+    df = concat_typed_chunks(chunks)
+    del chunks
+    parse_date_column(df)
+    for col in DIMENSION_COLUMNS:
+        if col in df.columns and df[col].nunique(dropna=True) > CATEGORY_MAX_UNIQUE_RATIO * max(len(df), 1):
+            df[col] = df[col].astype(object)
+
+    report = {
+        "bytes_before": bytes_before,
+        "bytes_after": int(df.memory_usage(deep=True).sum()),
+        "converted": {
+            col: f"{raw_dtypes[col]} → {df[col].dtype}"
+            for col in df.columns
+            if col in raw_dtypes and str(df[col].dtype) != raw_dtypes[col]
+        },
+    }
+    return df, report
+
+
+# -----------------------------
+#   Data quality
+# -----------------------------
+def quarantine_rows(df, name):
+    """
+    check_quality(df) -> (clean, quarantine, quality). Raises SchemaError if
+    not a single row passes, since no page could do anything with the file.
+    """
+    clean, quarantine, quality = check_quality(df)
+    if quality["rows_checked"] and quality["rows_quarantined"] == quality["rows_checked"]:
+        broken = ", ".join(f"{QUALITY_RULES[rule]} ({n:,} rows)" for rule, n in quality["issues"].items())
+        raise SchemaError(f"No valid rows in {name}: {broken}.")
+    return clean, quarantine, quality
+
+
+def _write_quarantine(quarantine, digest):
+    # Written before the dataset itself: a cached dataset always has its quarantine
+    if len(quarantine):
+        write_frame(quarantine, quarantine_cache_path(digest))
+
+
+def read_quarantine(digest):
+    """The quarantine table cached with a dataset (empty if it had no bad rows)."""
+    path = quarantine_cache_path(digest)
+    if os.path.exists(path):
+        return read_frame(path)
+    return pd.DataFrame(columns=["Row", "Issues"])
+
+
+# -----------------------------
+#   Upload entry point
+# -----------------------------
+def parse_upload(file, name, progress=None, all_sheets=False):
+    """Parse, validate and type an upload; returns (df, dtype_report)."""
+    if name.endswith(".csv"):
+        return read_csv_chunked(file, progress=progress)
+    elif name.endswith(".xlsx") and all_sheets:
+        return read_excel_sheets(file, progress=progress)
+    elif name.endswith(".xlsx"):
+        df = pd.read_excel(file)
+        validate_columns(df.columns)
+        if progress is not None:
+            progress(1.0)
+        df, report = optimize_dtypes(df)
+        if parse_date_column(df):
+            report["converted"]["Date"] = f"text → {df['Date'].dtype}"
+        return df, report
+    raise ValueError(f"Unsupported file type: {name}")
+
+
+def load_upload(file, name=None, progress=None, digest=None, all_sheets=False):
+    """
+    Return (DataFrame, info) for an uploaded file.
+
+    The frame has already been through the schema check and the dtype plan
+    (rgm.schema), so a cached copy comes back typed. info holds the content
+    digest, the source file name, whether the frame came from the cache, the
+    dtype report from the first parse, and the calendar table of the Date
+    column (rgm.calendar). Raises SchemaError if required RGM columns are
+    missing or no row passes the data-quality rules.
+
+    Rows that fail a rule are not in the frame; info["quarantine"] lists
+    them and info["quality"] counts them per rule (see rgm.quality).
+
+    The cache key is the content hash, not the file name, so renamed copies of
+    the same extract hit the cache and an edited file with the same name
+    does not. Pass digest if the caller has already hashed the file.
+
+    With all_sheets, a workbook is read sheet by sheet in parallel (see
+    read_excel_sheets); that result is cached separately from the
+    first-sheet read of the same file.
+    """
+    name = name or file.name
+    digest = upload_key(digest or content_digest(file), name, all_sheets)
+    path = upload_cache_path(digest)
+    if os.path.exists(path):
+        meta = read_frame_metadata(path)
+        info = {
+            "digest": digest,
+            "source_name": name,
+            "from_cache": True,
+            "dtype_report": meta.get("dtype_report"),
+            "quality": meta.get("quality"),
+            "quarantine": read_quarantine(digest),
+        }
+        df = read_frame(path)
+        validate_columns(df.columns)
+        info["calendar"] = build_calendar(df.get("Date", []))
+        return df, info
+
+    df, dtype_report = parse_upload(file, name, progress=progress, all_sheets=all_sheets)
+    df, quarantine, quality = quarantine_rows(df, name)
+    _write_quarantine(quarantine, digest)
+    if write_frame(df, path, metadata={"source_name": name, "dtype_report": dtype_report, "quality": quality}):
+        # Hand back the memory-mapped copy so a fresh parse and a cache hit
+        # have the same layout (and the parsed buffers can be freed)
+        df = read_frame(path)
+    info = {
+        "digest": digest,
+        "source_name": name,
+        "from_cache": False,
+        "dtype_report": dtype_report,
+        "quality": quality,
+        "quarantine": quarantine,
+        "calendar": build_calendar(df.get("Date", [])),
+    }
+    return df, info
+
+
+# -----------------------------
+#   Append mode
+# -----------------------------
+def append_key(base_digest, new_digest):
+    """Identity of the dataset made by appending one upload to another."""
+    return hashlib.blake2b(f"{base_digest}+{new_digest}".encode("utf-8"), digest_size=20).hexdigest()
+
+
+def _empty_like(column, n_rows):
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return pd.Categorical([None] * n_rows)
+    return np.full(n_rows, np.nan)
+
+
+def append_rows(base, new):
+    """
+    Append the rows of new that base doesn't have yet; returns (df, report).
+
+    Rows are matched on ROW_KEY_COLUMNS. A new row whose key is already in
+    base is a duplicate if its measures are the same and a conflict if they
+    differ; both are skipped (base wins), as are repeated keys within new.
+    Columns new lacks are left empty on the added rows, columns only new
+    has are dropped. Only base rows from new's first date onwards are
+    searched for duplicates, so a weekly drop costs a scan of the tail.
+
+    report holds the row counts, the skipped/ignored details and
+    changed_groups: one row per GROUP_COLUMNS group that received rows,
+    with the first new date (recompute from there) and the number of rows.
+    """
+    keys = [c for c in ROW_KEY_COLUMNS if c in base.columns and c in new.columns]
+    ignored_columns = [c for c in new.columns if c not in base.columns]
+    new = new[[c for c in base.columns if c in new.columns]]
+
+    repeated = new.duplicated(subset=keys, keep="first")
+    new = new[~repeated]
+
+    first_date = parse_dates(new["Date"]).min()
+    if pd.isna(first_date):
+        tail = base
+    else:
+        tail = base[parse_dates(base["Date"]) >= first_date]
+    measures = [c for c in MEASURE_COLUMNS if c in new.columns and c in base.columns]
+    # Object keys so categoricals with different categories still match by value
+    left = new[keys + measures].astype({c: object for c in keys if c != "Date"}).reset_index(names="_row")
+    right = (
+        tail[keys + measures]
+        .drop_duplicates(subset=keys)
+        .astype({c: object for c in keys if c != "Date"})
+    )
+    matched = left.merge(right, on=keys, how="inner", suffixes=("", "_base"))
+    same = np.ones(len(matched), dtype=bool)
+    for col in measures:
+        a = matched[col].to_numpy(dtype=float, na_value=np.nan)
+        b = matched[f"{col}_base"].to_numpy(dtype=float, na_value=np.nan)
+        same &= (a == b) | (np.isnan(a) & np.isnan(b))
+    conflicts = matched.loc[~same, keys + measures + [f"{c}_base" for c in measures]]
+
+    added = new.drop(index=matched["_row"])
+    added = added.reset_index(drop=True)
+    for col in base.columns:
+        if col not in added.columns:
+            added[col] = _empty_like(base[col], len(added))
+        elif isinstance(base[col].dtype, pd.CategoricalDtype) and not isinstance(added[col].dtype, pd.CategoricalDtype):
+            # A small drop can leave a dimension uncategorised (too many distinct values for its size)
+            added[col] = pd.Categorical(added[col])
+    added = added[list(base.columns)]
+
+    group_cols = [c for c in GROUP_COLUMNS if c in added.columns]
+    changed_groups = (
+        added.groupby(group_cols, observed=True, dropna=False)["Date"]
+        .agg(FirstNewDate="min", Rows="size")
+        .reset_index()
+    )
+    for col in group_cols:
+        changed_groups[col] = changed_groups[col].astype(object)
+
+    # Shallow copy: recoding categories onto the union must not touch the caller's frame
+    df = concat_typed_chunks([base.copy(deep=False), added]) if len(added) else base.copy(deep=False)
+    report = {
+        "base_rows": len(base),
+        "added_rows": len(added),
+        "duplicate_rows": int(same.sum()),
+        "conflict_rows": len(conflicts),
+        "repeated_rows": int(repeated.sum()),
+        "ignored_columns": ignored_columns,
+        "conflicts": conflicts.reset_index(drop=True),
+        "changed_groups": changed_groups,
+    }
+    return df, report
+
+
+def _report_to_json(report):
+    out = dict(report)
+    for key in ("conflicts", "changed_groups"):
+        out[key] = json.loads(report[key].to_json(orient="records", date_format="iso"))
+    return out
+
+
+def _report_from_json(meta):
+    out = dict(meta)
+    for key in ("conflicts", "changed_groups"):
+        out[key] = pd.DataFrame(meta.get(key, []))
+    if "FirstNewDate" in out["changed_groups"].columns:
+        out["changed_groups"]["FirstNewDate"] = parse_dates(out["changed_groups"]["FirstNewDate"])
+    return out
+
+
+def append_upload(base, base_info, file, name=None, progress=None, digest=None):
+    """
+    Return (DataFrame, info) for base with the new rows of an uploaded file
+    appended (see append_rows). The upload itself goes through load_upload,
+    so it is schema-checked, typed and cached like any other upload; the
+    combined frame is cached under append_key(base digest, upload digest).
+    info is shaped like load_upload's, plus "append_report". The quality
+    rules are checked on the upload and again on the combined frame (a PPG
+    can conflict with the base's Brand); the quarantine's Source column
+    says which.
+    """
+    name = name or file.name
+    new_digest = digest or content_digest(file)
+    digest = append_key(base_info["digest"], new_digest)
+    source_name = f"{base_info['source_name']} + {name}"
+    path = upload_cache_path(digest)
+    if os.path.exists(path):
+        meta = read_frame_metadata(path)
+        df = read_frame(path)
+        append_report = _report_from_json(meta.get("append_report", {}))
+        quality = meta.get("quality")
+        quarantine = read_quarantine(digest)
+        from_cache = True
+    else:
+        new, new_info = load_upload(file, name=name, progress=progress, digest=new_digest)
+        df, append_report = append_rows(base, new)
+        del new
+        df, combined_quarantine, combined_quality = check_quality(df)
+        quarantine = pd.concat(
+            [new_info["quarantine"].assign(Source=name), combined_quarantine.assign(Source=source_name)],
+            ignore_index=True,
+        )
+        quality = dict(new_info["quality"])
+        quality["rows_quarantined"] += combined_quality["rows_quarantined"]
+        quality["issues"] = {
+            rule: quality["issues"].get(rule, 0) + combined_quality["issues"].get(rule, 0)
+            for rule in QUALITY_RULES
+            if rule in quality["issues"] or rule in combined_quality["issues"]
+        }
+        _write_quarantine(quarantine, digest)
+        metadata = {
+            "source_name": source_name,
+            "dtype_report": base_info.get("dtype_report"),
+            "quality": quality,
+            "append_report": _report_to_json(append_report),
+        }
+        if write_frame(df, path, metadata=metadata):
+            df = read_frame(path)
+        from_cache = False
+    info = {
+        "digest": digest,
+        "source_name": source_name,
+        "from_cache": from_cache,
+        "dtype_report": base_info.get("dtype_report"),
+        "quality": quality,
+        "quarantine": quarantine,
+        "calendar": build_calendar(df.get("Date", [])),
+        "append_report": append_report,
+    }
+    return df, info
@@ -0,0 +1,256 @@
+"""
+Background jobs: long computations run in worker processes while the app
+keeps serving reruns.
+
+A JobRunner (one per server process) runs module-level callables in a pool
+of spawned workers. Inside a job, job_progress(fraction) and
+job_warning(message) report back to the runner, so they can be passed as the
+progress= / warn= callbacks of the rgm functions. Cancelling a queued job
+drops it; a running job is cancelled cooperatively: its next job_progress
+call raises JobCancelled, which ends it.
+
+Every job belongs to an owner (a session) and names the session-state keys
+its result goes to; the owner picks finished jobs up with collect().
+"""
+import itertools
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import traceback
+import types
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+# Worker processes shared by every session of the server
+JOB_MAX_WORKERS = int(os.environ.get("RGM_JOB_WORKERS", "0")) or os.cpu_count() or 1
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job by job_progress once the job has been cancelled."""
+
+
+# -----------------------------
+#   Worker side
+# -----------------------------
+# (job id, shared progress dict, shared cancel dict, warnings) of the job this worker is running
+_current = None
+
+
+def job_progress(fraction):
+    """Report the running job's progress (0..1); raises JobCancelled if it was cancelled. No-op outside a job."""
+    if _current is None:
+        return
+    job_id, progress, cancelled, _ = _current
+    if cancelled.get(job_id, False):
+        raise JobCancelled()
+    progress[job_id] = float(fraction)
+
+
+def job_warning(message):
+    """Record a warning for the running job (shown with its result). No-op outside a job."""
+    if _current is not None:
+        _current[3].append(str(message))
+
+
+def available_workers():
+    """
+    Processes a computation may spread over: every CPU outside a job, and
+    inside one its share of the CPUs the job pool (JOB_MAX_WORKERS
+    processes) leaves, so jobs with pools of their own don't oversubscribe
+    the machine.
+    """
+    cpus = os.cpu_count() or 1
+    if _current is None:
+        return cpus
+    return max(1, cpus // JOB_MAX_WORKERS)
+
+
+def _run_job(job_id, progress, cancelled, fn, args, kwargs):
+    global _current
+    _current = (job_id, progress, cancelled, [])
+    try:
+        job_progress(0.0)
+        result = fn(*args, **kwargs)
+        return result, _current[3]
+    except JobCancelled:
+        raise
+    except Exception as e:
+        # The traceback object does not survive pickling back to the server
+        raise RuntimeError(f"{type(e).__name__}: {e}\n\n{traceback.format_exc()}") from None
+    finally:
+        _current = None
+
+
+# -----------------------------
+#   Server side
+# -----------------------------
+class Job:
+    """
+    One submitted job. Once collected, its future (and with it the result)
+    is dropped and state / error keep the outcome for the job table.
+    """
+
+    def __init__(self, job_id, owner, label, targets, future):
+        self.id = job_id
+        self.owner = owner
+        self.label = label
+        self.targets = targets
+        self.future = future
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.state = None
+        self.error = None
+        self.cancel_requested = False
+
+    @property
+    def collected(self):
+        return self.future is None
+
+
+def _spawn_safe_main():
+    """
+    Swap in an empty __main__ while worker processes start. During a script
+    run __main__ is the Streamlit app script, and spawn would re-run all of
+    it in every new worker (as __mp_main__).
+    """
+    main = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    return main
+
+
+class JobRunner:
+    """Process pool plus the table of submitted jobs, safe to share between sessions."""
+
+    def __init__(self, max_workers=JOB_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs = {}
+        self._pool = None
+        self._manager = None
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            # spawn, not fork: the Streamlit server process is multi-threaded
+            ctx = multiprocessing.get_context("spawn")
+            if self._manager is None:
+                self._manager = ctx.Manager()
+                self._progress = self._manager.dict()
+                self._cancelled = self._manager.dict()
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+        return self._pool
+
+    def submit(self, owner, label, fn, *args, targets=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) in a worker; returns the job id. fn must be
+        importable (module level) and its arguments picklable. targets names
+        the session-state key of the result, or one key per element of a
+        tuple result (None to skip an element, a tuple to store it under
+        several keys).
+        """
+        with self._lock:
+            job_id = next(self._ids)
+            # Workers (and the manager process) are started on demand, here
+            main = _spawn_safe_main()
+            try:
+                pool = self._ensure_pool()
+                try:
+                    future = pool.submit(_run_job, job_id, self._progress, self._cancelled, fn, args, kwargs)
+                except BrokenProcessPool:
+                    # A worker died (e.g. out of memory): start a fresh pool
+                    self._pool = None
+                    future = self._ensure_pool().submit(
+                        _run_job, job_id, self._progress, self._cancelled, fn, args, kwargs
+                    )
+            finally:
+                sys.modules["__main__"] = main
+            job = Job(job_id, owner, label, targets, future)
+            self._jobs[job_id] = job
+        future.add_done_callback(lambda _: setattr(job, "finished_at", time.time()))
+        return job_id
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None or job.collected or job.future.done():
+            return
+        job.cancel_requested = True
+        if not job.future.cancel():
+            self._cancelled[job_id] = True
+
+    def status(self, job):
+        if job.collected:
+            return job.state
+        future = job.future
+        if future.cancelled():
+            return CANCELLED
+        if future.done():
+            error = future.exception()
+            if error is None:
+                return DONE
+            return CANCELLED if isinstance(error, JobCancelled) else FAILED
+        return RUNNING if job.id in self._progress else QUEUED
+
+    def progress(self, job):
+        status = self.status(job)
+        if status == DONE:
+            return 1.0
+        if status in (FAILED, CANCELLED):
+            return 0.0
+        return self._progress.get(job.id, 0.0)
+
+    def jobs(self, owner):
+        """owner's jobs, oldest first."""
+        return [job for job in list(self._jobs.values()) if job.owner == owner]
+
+    def active(self, owner, label=None):
+        """owner's queued or running jobs (with this label)."""
+        return [
+            job for job in self.jobs(owner)
+            if not job.collected and not job.future.done() and (label is None or job.label == label)
+        ]
+
+    def collect(self, owner):
+        """
+        owner's jobs that finished since the last call, each once, as
+        (job, result, warnings, error): result and warnings for a job that
+        completed, error (a message) for one that failed, all None for a
+        cancelled job.
+        """
+        finished = []
+        for job in self.jobs(owner):
+            if job.collected or not job.future.done():
+                continue
+            self._progress.pop(job.id, None)
+            self._cancelled.pop(job.id, None)
+            status = self.status(job)
+            if status == DONE:
+                result, warnings = job.future.result()
+                finished.append((job, result, warnings, None))
+            elif status == FAILED:
+                job.error = str(job.future.exception())
+                finished.append((job, None, None, job.error))
+            else:
+                finished.append((job, None, None, None))
+            job.state = status
+            job.future = None
+        return finished
+
+    def forget(self, owner):
+        """Drop owner's collected jobs from the table."""
+        with self._lock:
+            for job in self.jobs(owner):
+                if job.collected:
+                    del self._jobs[job.id]
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
@@ -0,0 +1,156 @@
+"""
+Copy-on-write lineage for the feature-engineering frames (create_data /
+transform_data).
+
+The Create, Transform and Select pages used to take a full ``.copy()`` of
+their frame on every rerun and every button press. A FrameLineage instead
+describes the working frame as
+
+* a shared, read-only base frame (usually D0),
+* the rows kept by any row filters, as positions into the base, and
+* overlay columns: derived or modified columns, aligned to those rows.
+
+Each commit returns a new lineage that shares the base and every untouched
+overlay with its parent, so adding one column to a 10M-row frame costs that
+one column. Unchanged columns are recognised by their data buffers, which
+pandas copy-on-write keeps shared until a column is written.
+"""
+import pandas as pd
+
+from rgm.fingerprint import buffer_key
+
+
+def same_data(a, b):
+    """True if two equal-length columns are backed by the same memory."""
+    if len(a) != len(b) or a.dtype != b.dtype:
+        return False
+    key = buffer_key(a)
+    return key is not None and key == buffer_key(b)
+
+
+class FrameLineage:
+    def __init__(self, base, rows=None, overlay=None, columns=None, steps=()):
+        self.base = base
+        self.rows = rows                    # positions into base, None = every row
+        self.overlay = dict(overlay or {})  # column -> Series aligned to rows
+        self.columns = list(base.columns) if columns is None else list(columns)
+        self.steps = tuple(steps)
+        self._frame = None
+
+    @classmethod
+    def from_frame(cls, df, step="base"):
+        """Start a lineage on df; later in-place writes to df don't reach it."""
+        if not (isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1):
+            df = df.reset_index(drop=True)
+        return cls(df.copy(deep=False), steps=(f"{step}: {len(df):,} rows × {df.shape[1]} columns",))
+
+    @property
+    def n_rows(self):
+        return len(self.base) if self.rows is None else len(self.rows)
+
+    # -----------------------------
+    #   Materialise
+    # -----------------------------
+    def _build(self):
+        base_cols = [c for c in self.columns if c not in self.overlay]
+        df = self.base[base_cols]
+        if self.rows is not None:
+            df = df.take(self.rows)
+        for col, values in self.overlay.items():
+            df[col] = values
+        return df[self.columns]
+
+    def _current(self):
+        if self._frame is None:
+            self._frame = self._build()
+        return self._frame
+
+    def frame(self):
+        """
+        The working DataFrame (index = base row positions). It is built once
+        per lineage; each call returns a shallow copy, so callers' edits stay
+        out of the lineage until they are committed.
+        """
+        return self._current().copy(deep=False)
+
+    def describes(self, df):
+        """True if df is a shallow copy of this lineage's frame with nothing changed since."""
+        if df is None or list(df.columns) != self.columns:
+            return False
+        current = self._current()
+        return df.index.equals(current.index) and all(same_data(df[c], current[c]) for c in self.columns)
+
+    # -----------------------------
+    #   Commit
+    # -----------------------------
+    def commit(self, df, step="update"):
+        """
+        The lineage of df, a frame derived from self.frame(): rows it no longer
+        has become a row filter, new or changed columns become overlays, and
+        everything else stays a reference into the base. A frame that didn't
+        come from this lineage (unknown row labels) starts a new lineage.
+        """
+        current = self._current()
+        same_rows = df.index.equals(current.index)
+        if same_rows:
+            rows = self.rows
+        else:
+            labels = df.index
+            if not pd.api.types.is_integer_dtype(labels) or not labels.isin(current.index).all():
+                return FrameLineage.from_frame(df, step=f"{step} (new base)")
+            rows = labels.to_numpy()
+            relative = current.index.get_indexer(labels)
+
+        overlay = {}
+        changed = []
+        for col in df.columns:
+            values = df[col]
+            if col in current.columns:
+                if same_rows:
+                    unchanged = same_data(values, current[col])
+                else:
+                    # Rows were filtered, so buffers differ; compare against the same rows
+                    unchanged = values.equals(current[col].take(relative))
+                if unchanged:
+                    if col in self.overlay:
+                        overlay[col] = values if not same_rows else self.overlay[col]
+                    continue
+                changed.append(col)
+            overlay[col] = values
+
+        added = [c for c in df.columns if c not in current.columns]
+        dropped = [c for c in current.columns if c not in df.columns]
+        parts = [step]
+        if not same_rows:
+            parts.append(f"{len(df):,} of {len(current):,} rows kept")
+        if added:
+            parts.append("added " + ", ".join(map(str, added)))
+        if changed:
+            parts.append("modified " + ", ".join(map(str, changed)))
+        if dropped:
+            parts.append("dropped " + ", ".join(map(str, dropped)))
+
+        lineage = FrameLineage(
+            self.base, rows=rows, overlay=overlay, columns=df.columns, steps=self.steps + (" · ".join(parts),)
+        )
+        lineage._frame = df.copy(deep=False)
+        return lineage
+
+    # -----------------------------
+    #   Reporting
+    # -----------------------------
+    def overlay_bytes(self):
+        """Memory held by this lineage beyond the shared base (overlays and row positions)."""
+        nbytes = sum(int(s.memory_usage(deep=True, index=False)) for s in self.overlay.values())
+        if self.rows is not None:
+            nbytes += self.rows.nbytes
+        return nbytes
+
+    def summary(self):
+        return {
+            "rows": self.n_rows,
+            "base_rows": len(self.base),
+            "overlay_columns": list(self.overlay),
+            "overlay_bytes": self.overlay_bytes(),
+            "steps": list(self.steps),
+        }
@@ -0,0 +1,252 @@
+"""
+Per-session memory budget for the DataFrames the app keeps in st.session_state.
+
+Uploaded files, D0 and every derived frame (dataframe1, final_df, predictions_df,
+...) stay in session state for the lifetime of a session. SessionFrameStore
+keeps their total under a budget: when it is exceeded, the least recently
+used frames are written to Parquet in a per-session temp directory and
+replaced in session state by a SpilledFrame placeholder. The placeholder
+loads the frame back (and puts it back into session state) on first access,
+so pages that read session state directly keep working.
+"""
+import os
+import shutil
+import tempfile
+import time
+import uuid
+import weakref
+
+import pandas as pd
+
+
+DEFAULT_BUDGET_MB = int(os.environ.get("RGM_SESSION_MEMORY_MB", "2048"))
+
+# Session-state keys that hold a DataFrame, or a dict of DataFrames.
+# create_data / transform_data are not listed: they are FrameLineage views that
+# share their columns with D0 (rgm.lineage), so spilling them frees nothing.
+SPILLABLE_KEYS = [
+    "uploaded_files", "D0", "dataframe1",
+    "final_df", "type2_dfs", "predictions_df", "modified_data", "filtered_data",
+]
+
+
+def _slot_label(slot):
+    return " › ".join(str(part) for part in slot)
+
+
+class SpilledFrame:
+    """
+    Stand-in for a DataFrame that has been spilled to disk. Any attribute or
+    item access reloads the frame through the owning store and delegates to it.
+    """
+
+    def __init__(self, store, slots, path, nbytes, shape):
+        self._store = store
+        self._slots = slots
+        self._path = path
+        self._nbytes = nbytes
+        self._shape = shape
+        self._frame = None
+
+    def _load(self):
+        if self._frame is None:
+            self._frame = self._store.reload(self)
+        return self._frame
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._load(), name)
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __setitem__(self, key, value):
+        self._load()[key] = value
+
+    def __len__(self):
+        return len(self._load())
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __contains__(self, key):
+        return key in self._load()
+
+    def __repr__(self):
+        return f"<SpilledFrame {self._shape[0]}x{self._shape[1]} at {self._path}>"
+
+
+class SessionFrameStore:
+    """
+    Tracks the DataFrames held under SPILLABLE_KEYS in one session's state and
+    spills the least recently used ones once their total exceeds the budget.
+
+    A "slot" is (key,) for a frame stored directly under a key, or
+    (key, subkey) for a frame inside a dict (uploaded_files, type2_dfs).
+    Slots holding the same object (D0 is the selected upload) are counted
+    and spilled together. Frames for which is_shared(df) is true are handles
+    on a process-wide dataset (rgm.store); their data doesn't belong to this
+    session, so they are neither counted nor spilled.
+    """
+
+    def __init__(self, state, budget_mb=DEFAULT_BUDGET_MB, keys=SPILLABLE_KEYS, is_shared=None):
+        self.state = state
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.keys = list(keys)
+        self.is_shared = is_shared or (lambda df: False)
+        self.spill_dir = tempfile.mkdtemp(prefix="rgm_spill_")
+        self._cleanup = weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+        self._last_used = {}    # slot -> time of last use
+        self._seen = {}         # slot -> (id(frame), nbytes) when last measured
+        self._unspillable = set()
+
+    # -----------------------------
+    #   Slot access
+    # -----------------------------
+    def _slots(self):
+        for key in self.keys:
+            if key not in self.state:
+                continue
+            value = self.state[key]
+            if isinstance(value, (pd.DataFrame, SpilledFrame)):
+                yield (key,)
+            elif isinstance(value, dict):
+                for subkey, sub in value.items():
+                    if isinstance(sub, (pd.DataFrame, SpilledFrame)):
+                        yield (key, subkey)
+
+    def _get(self, slot):
+        value = self.state[slot[0]]
+        return value[slot[1]] if len(slot) == 2 else value
+
+    def _set(self, slot, value):
+        if len(slot) == 2:
+            self.state[slot[0]][slot[1]] = value
+        else:
+            self.state[slot[0]] = value
+
+    def _nbytes(self, slot, df):
+        seen = self._seen.get(slot)
+        if seen is not None and seen[0] == id(df):
+            return seen[1]
+        # A new object in this slot means it was just (re)written by a page
+        nbytes = int(df.memory_usage(deep=True).sum())
+        self._seen[slot] = (id(df), nbytes)
+        self._last_used[slot] = time.time()
+        return nbytes
+
+    # -----------------------------
+    #   Public API
+    # -----------------------------
+    def touch(self, keys):
+        """Mark every slot under keys as used now, reloading any that are spilled."""
+        now = time.time()
+        for slot in list(self._slots()):
+            if slot[0] in keys:
+                self._last_used[slot] = now
+                value = self._get(slot)
+                if isinstance(value, SpilledFrame):
+                    value._load()
+
+    def get(self, key, subkey=None):
+        """The resident DataFrame for a slot, reloading it if it was spilled."""
+        slot = (key,) if subkey is None else (key, subkey)
+        value = self._get(slot)
+        self._last_used[slot] = time.time()
+        if isinstance(value, SpilledFrame):
+            return value._load()
+        return value
+
+    def enforce(self, protect=()):
+        """Spill least recently used frames until the resident total fits the budget."""
+        groups = {}
+        for slot in self._slots():
+            df = self._get(slot)
+            if isinstance(df, pd.DataFrame):
+                groups.setdefault(id(df), []).append(slot)
+
+        resident = 0
+        candidates = []
+        for slots in groups.values():
+            df = self._get(slots[0])
+            if self.is_shared(df):
+                continue
+            nbytes = self._nbytes(slots[0], df)
+            for slot in slots[1:]:
+                self._seen[slot] = (id(df), nbytes)
+            resident += nbytes
+            if id(df) in self._unspillable or any(slot[0] in protect for slot in slots):
+                continue
+            last_used = max(self._last_used.get(slot, 0.0) for slot in slots)
+            candidates.append((last_used, slots, nbytes))
+
+        for _, slots, nbytes in sorted(candidates, key=lambda c: c[0]):
+            if resident <= self.budget_bytes:
+                break
+            if self._spill(slots, nbytes):
+                resident -= nbytes
+
+    def _spill(self, slots, nbytes):
+        df = self._get(slots[0])
+        path = os.path.join(self.spill_dir, f"{uuid.uuid4().hex}.parquet")
+        try:
+            df.to_parquet(path)
+        except Exception:
+            # Mixed-type object columns, non-string column names, ... keep it resident
+            self._unspillable.add(id(df))
+            if os.path.exists(path):
+                os.remove(path)
+            return False
+        placeholder = SpilledFrame(self, slots, path, nbytes, df.shape)
+        for slot in slots:
+            self._set(slot, placeholder)
+            self._seen.pop(slot, None)
+        return True
+
+    def reload(self, placeholder):
+        """Read a spilled frame back and put it into every slot still holding the placeholder."""
+        df = pd.read_parquet(placeholder._path)
+        now = time.time()
+        for slot in placeholder._slots:
+            try:
+                still_spilled = self._get(slot) is placeholder
+            except (KeyError, TypeError):
+                continue
+            if still_spilled:
+                self._set(slot, df)
+                self._seen[slot] = (id(df), placeholder._nbytes)
+                self._last_used[slot] = now
+        if os.path.exists(placeholder._path):
+            os.remove(placeholder._path)
+        return df
+
+    def summary(self):
+        """
+        One row per tracked slot: state, size and seconds since last use.
+        A slot sharing its frame with an earlier one (D0 and its upload) is
+        listed with size 0 so the MB column sums to the real footprint.
+        """
+        now = time.time()
+        rows = []
+        first_label = {}
+        for slot in self._slots():
+            value = self._get(slot)
+            if id(value) in first_label:
+                state, nbytes = f"same as {first_label[id(value)]}", 0
+                shape = value._shape if isinstance(value, SpilledFrame) else value.shape
+            elif isinstance(value, SpilledFrame):
+                state, nbytes, shape = "spilled", value._nbytes, value._shape
+            elif self.is_shared(value):
+                state, nbytes, shape = "shared", 0, value.shape
+            else:
+                state, nbytes, shape = "resident", self._nbytes(slot, value), value.shape
+            first_label.setdefault(id(value), _slot_label(slot))
+            rows.append({
+                "Frame": _slot_label(slot),
+                "State": state,
+                "Rows": shape[0],
+                "MB": round(nbytes / 1024 ** 2, 1),
+                "Idle (s)": int(now - self._last_used.get(slot, now)),
+            })
+        return pd.DataFrame(rows, columns=["Frame", "State", "Rows", "MB", "Idle (s)"])
@@ -0,0 +1,168 @@
+"""
+Stage-level profiling of one script run.
+
+With the sidebar's profiling toggle on, the main script starts a
+RerunProfile for each rerun and the pages wrap their major stages
+(aggregation, model fits, chart building, table rendering) in
+``with stage("..."):``. Each stage records when it started relative to the
+rerun, how long it took and the peak resident memory seen while it ran, so
+the sidebar can draw a waterfall and the runs can be exported as JSON and
+compared across releases. With no profile active, stage() costs one
+attribute lookup.
+
+Memory is the resident set size of the whole server process, sampled by a
+background thread every SAMPLE_INTERVAL_S seconds and at every stage
+boundary, so with several sessions running it includes their work too.
+"""
+import datetime
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Seconds between memory samples while a profile is running
+SAMPLE_INTERVAL_S = 0.01
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss():
+    """Resident set size of this process in bytes (peak RSS where the current one is unavailable), or None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _mb(n_bytes):
+    return None if n_bytes is None else round(n_bytes / 2**20, 1)
+
+
+class RerunProfile:
+    def __init__(self, label):
+        self.label = label
+        self.started_at = datetime.datetime.now().isoformat(timespec="seconds")
+        self.stages = []         # finished and open stages, in start order
+        self._open = []          # stack of open stages
+        self._t0 = time.perf_counter()
+        self._rss0 = current_rss()
+        self._peak = self._rss0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name="rerun-profile-sampler", daemon=True)
+        self._sampler.start()
+
+    def _observe(self, rss):
+        if rss is None:
+            return
+        with self._lock:
+            if self._peak is None or rss > self._peak:
+                self._peak = rss
+            for rec in self._open:
+                if rec["_peak"] is None or rss > rec["_peak"]:
+                    rec["_peak"] = rss
+
+    def _sample(self):
+        while not self._done.wait(SAMPLE_INTERVAL_S):
+            self._observe(current_rss())
+
+    @contextmanager
+    def stage(self, name):
+        """Time the block as a stage called name (nested stages are drawn indented)."""
+        rss = current_rss()
+        rec = {
+            "name": name,
+            "depth": len(self._open),
+            "start_s": time.perf_counter() - self._t0,
+            "_rss": rss,
+            "_peak": rss,
+        }
+        with self._lock:
+            self.stages.append(rec)
+            self._open.append(rec)
+        try:
+            yield
+        finally:
+            end = time.perf_counter() - self._t0
+            self._observe(current_rss())
+            with self._lock:
+                self._open.remove(rec)
+            rec["duration_s"] = end - rec["start_s"]
+
+    def finish(self, stopped=False):
+        """Stop sampling and return the run as a JSON-serialisable dict."""
+        self._done.set()
+        total = time.perf_counter() - self._t0
+        self._observe(current_rss())
+        stages = []
+        for rec in self.stages:
+            start_rss, peak = rec["_rss"], rec["_peak"]
+            stages.append({
+                "name": rec["name"],
+                "depth": rec["depth"],
+                "start_s": round(rec["start_s"], 6),
+                # A stage still open at the end was cut short (st.stop, st.rerun)
+                "duration_s": round(rec.get("duration_s", total - rec["start_s"]), 6),
+                "peak_rss_mb": _mb(peak),
+                "peak_delta_mb": None if start_rss is None or peak is None else _mb(peak - start_rss),
+            })
+        return {
+            "label": self.label,
+            "started_at": self.started_at,
+            "stopped": stopped,
+            "total_s": round(total, 6),
+            "start_rss_mb": _mb(self._rss0),
+            "peak_rss_mb": _mb(self._peak),
+            "stages": stages,
+        }
+
+
+# -----------------------------
+#   Active profile
+# -----------------------------
+_active = threading.local()
+
+
+def activate(profile):
+    """Make profile the one stage() records into on this thread (None to stop recording)."""
+    _active.profile = profile
+
+
+@contextmanager
+def stage(name):
+    """profile.stage(name) on this thread's active profile; a no-op when none is active."""
+    profile = getattr(_active, "profile", None)
+    if profile is None:
+        yield
+        return
+    with profile.stage(name):
+        yield
+
+
+# -----------------------------
+#   Export
+# -----------------------------
+def environment():
+    """Versions that matter when comparing profiles across releases."""
+    versions = {"python": platform.python_version(), "platform": platform.platform()}
+    for module in ("pandas", "numpy", "pyarrow", "streamlit"):
+        mod = sys.modules.get(module)
+        if mod is not None:
+            versions[module] = getattr(mod, "__version__", None)
+    return versions
+
+
+def profiles_to_json(runs):
+    """The runs (RerunProfile.finish() dicts) and the environment, as a JSON document."""
+    return json.dumps({"environment": environment(), "runs": list(runs)}, indent=2)
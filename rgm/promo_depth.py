@@ -0,0 +1,162 @@
+"""
+Promo depth clustering (the Promo Depth page's compute, without Streamlit).
+
+A week's promo depth is how far its price sits below the base price, as a
+fraction of the base price. The discounted weeks of a PPG are clustered
+with K-Means on the standardised depth, k defaulting to the elbow of the
+inertia curve, and the sorted cluster centres give the promo bins: each
+bin runs from the midpoint with the previous centre to the midpoint with
+the next (0% and 100% at the ends).
+"""
+import math
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from rgm.calendar import calendar_for, week_start
+from rgm.schema import CALENDAR_KEY_COLUMNS
+
+
+# Largest k tried for the elbow and allowed for the final clustering
+MAX_CLUSTERS = 7
+
+
+def find_elbow_k(k_values, inertias):
+    x1, y1 = k_values[0], inertias[0]
+    x2, y2 = k_values[-1], inertias[-1]
+    line_len = math.dist((x1, y1), (x2, y2))
+    if line_len == 0:
+        return k_values[0]
+    distances = []
+    for i, k_val in enumerate(k_values):
+        x0, y0 = k_val, inertias[i]
+        # Perpendicular distance from point (x0,y0) to line (x1,y1)->(x2,y2)
+        num = abs((y2 - y1)*x0 - (x2 - x1)*y0 + x2*y1 - y2*x1)
+        distances.append(num / line_len)
+    return k_values[np.argmax(distances)]
+
+
+def promo_depth(price, base_price):
+    """(base_price - price) / base_price, clipped to [0, 1]."""
+    return ((base_price - price) / base_price).clip(0, 1)
+
+
+def scale_depths(depths):
+    """(fitted StandardScaler, standardised depths as a column vector)."""
+    scaler = StandardScaler()
+    return scaler, scaler.fit_transform(np.asarray(depths).reshape(-1, 1))
+
+
+def elbow_inertias(X_scaled, max_k=MAX_CLUSTERS):
+    """(k values, K-Means inertia for each) for k = 1 .. min(max_k, number of points)."""
+    k_values = list(range(1, min(max_k + 1, len(X_scaled) + 1)))
+    inertias = []
+    for k in k_values:
+        km_test = KMeans(n_clusters=k, random_state=42)
+        km_test.fit(X_scaled)
+        inertias.append(km_test.inertia_)
+    return k_values, inertias
+
+
+def fit_clusters(X_scaled, k):
+    km = KMeans(n_clusters=k, random_state=42)
+    km.fit(X_scaled)
+    return km
+
+
+def auto_bins(km, scaler):
+    """Bins (ClusterID, name, min, max, centroid; in % of base price) from the cluster centres, shallowest first."""
+    centers_real = np.clip(scaler.inverse_transform(km.cluster_centers_).flatten(), 0, 1)
+    sorted_pairs = sorted(dict(enumerate(centers_real)).items(), key=lambda x: x[1])
+
+    def midpoint(a, b):
+        return (a + b) / 2
+
+    bins = []
+    for i in range(len(sorted_pairs)):
+        cid, cval = sorted_pairs[i]
+        left = 0.0 if i == 0 else midpoint(sorted_pairs[i-1][1], cval)
+        right = 1.0 if i == len(sorted_pairs) - 1 else midpoint(cval, sorted_pairs[i+1][1])
+        bins.append({
+            "ClusterID": cid,
+            "name": f"Promo{i+1}",
+            "min": round(left * 100, 2),
+            "max": round(right * 100, 2),
+            "centroid": round(cval * 100, 2)
+        })
+    return bins
+
+
+def cluster_depths(depths, k=None, max_k=MAX_CLUSTERS):
+    """
+    Cluster promo depths (discounted weeks only, in time order): a dict with
+    the elbow curve, recommended and used k, each depth's ClusterID and the bins.
+    """
+    scaler, X_scaled = scale_depths(depths)
+    k_values, inertias = elbow_inertias(X_scaled, max_k)
+    recommended_k = find_elbow_k(k_values, inertias)
+    km = fit_clusters(X_scaled, int(k or recommended_k))
+    return {
+        "k_values": k_values,
+        "inertias": inertias,
+        "recommended_k": recommended_k,
+        "k": km.n_clusters,
+        "labels": km.labels_,
+        "bins": auto_bins(km, scaler),
+    }
+
+
+def weekly_promo_depths(df, keys):
+    """
+    Weekly SalesValue, Volume, mean Price and BasePrice and PromoDepth per
+    keys group of df, with WeekStartDate, in time order within each group
+    (weeks that are not real ISO weeks are dropped).
+    """
+    weekly = df.groupby(keys + CALENDAR_KEY_COLUMNS, observed=True, as_index=False).agg(
+        {"SalesValue": "sum", "Volume": "sum", "Price": "mean", "BasePrice": "mean"}
+    )
+    weekly["PromoDepth"] = promo_depth(weekly["Price"], weekly["BasePrice"])
+    weekly["WeekStartDate"] = week_start(weekly["Year"], weekly["Week"], calendar_for(df))
+    weekly = weekly.dropna(subset=["WeekStartDate"])
+    return weekly.sort_values(keys + ["WeekStartDate"], kind="stable").reset_index(drop=True)
+
+
+def promo_depth_tables(df, aggregator="Variant", max_k=MAX_CLUSTERS):
+    """
+    (weekly depths with PromoBin / ClusterID, bins) for every (Channel,
+    Brand, aggregator, PPG) group of df with discounted weeks, k chosen by
+    the elbow. df must have Price and BasePrice.
+    """
+    keys = ["Channel", "Brand", aggregator, "PPG"]
+    weekly = weekly_promo_depths(df, keys)
+    weekly["ClusterID"] = -1
+    weekly["PromoBin"] = "No Promo"
+    cluster_ids = weekly["ClusterID"].to_numpy(copy=True)
+    promo_bins = weekly["PromoBin"].to_numpy(dtype=object, copy=True)
+    depths = weekly["PromoDepth"].to_numpy(dtype=float)
+
+    bin_rows = []
+    for group, positions in weekly.groupby(keys, observed=True, sort=False).indices.items():
+        discounted = positions[depths[positions] > 0]
+        if len(discounted) == 0:
+            continue
+        result = cluster_depths(depths[discounted], max_k=max_k)
+        names = {b["ClusterID"]: b["name"] for b in result["bins"]}
+        cluster_ids[discounted] = result["labels"]
+        promo_bins[discounted] = [names[c] for c in result["labels"]]
+        for b in result["bins"]:
+            bin_rows.append(dict(zip(keys, group), **{
+                "ClusterID": b["ClusterID"],
+                "PromoBin": b["name"],
+                "Min": b["min"],
+                "Max": b["max"],
+                "Centroid": b["centroid"],
+                "NumWeeks": int(np.sum(result["labels"] == b["ClusterID"])),
+                "K": result["k"],
+            }))
+
+    weekly["ClusterID"] = cluster_ids
+    weekly["PromoBin"] = promo_bins
+    return weekly, pd.DataFrame(bin_rows)
@@ -0,0 +1,108 @@
+"""
+Data-quality checks run on every upload, before any page sees the data.
+
+Bad rows used to surface deep inside the slow stages: a negative volume
+skews the base price, ``Volume == 0`` with sales gives an ``inf`` Price in
+the Base Price page, duplicate keys double-count, and a PPG filed under two
+brands splits its history between them. check_quality evaluates every rule
+as a vectorized mask over the whole frame in one pass; rows breaking any
+rule are moved to a compact quarantine table (key columns, measures and the
+rules broken) and the pages only ever get the clean rows.
+"""
+import numpy as np
+import pandas as pd
+
+from rgm.calendar import parse_dates
+from rgm.schema import ROW_KEY_COLUMNS
+
+
+# Rule name -> description shown in the quarantine report
+QUALITY_RULES = {
+    "missing_date": "Date is missing or could not be parsed",
+    "negative_volume": "Volume < 0",
+    "zero_volume_with_sales": "Volume == 0 but SalesValue != 0 (Price would be inf)",
+    "duplicate_key": "Repeats the (Date, Channel, PPG) key of an earlier row",
+    "ppg_brand_conflict": "PPG is also mapped to another Brand (kept the Brand with most rows)",
+}
+
+# Columns copied into the quarantine table (those the frame has)
+QUARANTINE_COLUMNS = ["Date", "Market", "Channel", "Brand", "PPG", "SalesValue", "Volume"]
+
+
+def _measure(df, col):
+    if col not in df.columns:
+        return None
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def _ppg_brand_conflicts(df):
+    """Rows whose Brand is not the majority Brand of their PPG."""
+    ppg, ppg_values = pd.factorize(df["PPG"])
+    brand, brand_values = pd.factorize(df["Brand"])
+    valid = (ppg >= 0) & (brand >= 0)
+    pair = ppg[valid].astype(np.int64) * len(brand_values) + brand[valid]
+    counts = pd.Series(pair).value_counts()
+    pair_ppg = counts.index.to_numpy() // max(len(brand_values), 1)
+    if len(np.unique(pair_ppg)) == len(pair_ppg):
+        return np.zeros(len(df), dtype=bool)
+    # value_counts is sorted by count, so the first pair seen per PPG is its majority Brand
+    first = ~pd.Series(pair_ppg).duplicated().to_numpy()
+    majority = np.full(len(ppg_values), -1, dtype=np.int64)
+    majority[pair_ppg[first]] = counts.index.to_numpy()[first] % len(brand_values)
+    return valid & (brand != majority[np.maximum(ppg, 0)])
+
+
+def quality_masks(df):
+    """{rule: boolean mask over the rows of df} for every rule that applies to df's columns."""
+    masks = {}
+    if "Date" in df.columns:
+        masks["missing_date"] = parse_dates(df["Date"]).isna().to_numpy()
+    volume, sales = _measure(df, "Volume"), _measure(df, "SalesValue")
+    if volume is not None:
+        masks["negative_volume"] = volume < 0
+        if sales is not None:
+            masks["zero_volume_with_sales"] = (volume == 0) & ~np.isnan(sales) & (sales != 0)
+    keys = [c for c in ROW_KEY_COLUMNS if c in df.columns]
+    if keys:
+        masks["duplicate_key"] = df.duplicated(subset=keys, keep="first").to_numpy()
+    if "PPG" in df.columns and "Brand" in df.columns:
+        masks["ppg_brand_conflict"] = _ppg_brand_conflicts(df)
+    return masks
+
+
+def check_quality(df):
+    """
+    Split df into (clean, quarantine, report).
+
+    clean holds the rows that pass every rule (index reset). quarantine has
+    one row per rejected row: its position in df ("Row"), the
+    QUARANTINE_COLUMNS it has, and "Issues", the rules it breaks. report
+    holds the row counts and the number of rows breaking each rule.
+    """
+    masks = quality_masks(df)
+    bad = np.zeros(len(df), dtype=bool)
+    for mask in masks.values():
+        bad |= mask
+
+    report = {
+        "rows_checked": len(df),
+        "rows_quarantined": int(bad.sum()),
+        "issues": {rule: int(mask.sum()) for rule, mask in masks.items() if mask.any()},
+    }
+    if not bad.any():
+        return df, pd.DataFrame(columns=["Row"] + QUARANTINE_COLUMNS + ["Issues"]), report
+
+    rows = np.flatnonzero(bad)
+    quarantine = df.iloc[rows][[c for c in QUARANTINE_COLUMNS if c in df.columns]].reset_index(drop=True)
+    for col in quarantine.columns:
+        if isinstance(quarantine[col].dtype, pd.CategoricalDtype):
+            quarantine[col] = quarantine[col].astype(object)
+    issues = pd.Series("", index=quarantine.index, dtype=object)
+    for rule, mask in masks.items():
+        hit = mask[rows]
+        issues[hit] = issues[hit] + np.where(issues[hit] == "", "", ", ") + rule
+    quarantine.insert(0, "Row", rows)
+    quarantine["Issues"] = issues
+
+    clean = df.iloc[np.flatnonzero(~bad)].reset_index(drop=True)
+    return clean, quarantine, report
@@ -0,0 +1,98 @@
+"""
+Stratified interactive sample of an RGM frame.
+
+The exploratory pages (Feature Overview, Market Construct, EDA) recompute
+over every row on each widget change, which stops being interactive long
+before a 50M-row extract. With the sidebar's interactive-sample toggle on
+they work on a sample instead: every Channel × Brand × PPG stratum keeps its
+share of the rows (and at least a minimum, so small PPGs still show up).
+
+The sample is reproducible (fixed seed) and its row positions are drawn
+once per dataset version and shared by every session on that version.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from rgm.framecache import FrameCache
+
+
+# Strata the sample preserves
+SAMPLE_STRATA = ["Channel", "Brand", "PPG"]
+
+# Default sample size; override with RGM_SAMPLE_ROWS
+DEFAULT_SAMPLE_ROWS = int(os.environ.get("RGM_SAMPLE_ROWS", "200000"))
+
+# Each stratum keeps at least this many rows (or all of them, if it has fewer)
+MIN_ROWS_PER_STRATUM = 100
+
+SAMPLE_SEED = 20240101
+
+# Versions whose sample positions are kept (the oldest is dropped first)
+MAX_CACHED_SAMPLES = 16
+
+
+def stratified_positions(df, n_rows, strata=SAMPLE_STRATA, seed=SAMPLE_SEED):
+    """
+    Ascending row positions of a sample of about n_rows rows, allocated to
+    the strata columns present in df in proportion to their size. Rows are
+    picked by one random key per row, so the same frame and seed always
+    give the same sample.
+    """
+    n = len(df)
+    cols = [c for c in strata if c in df.columns]
+    if cols:
+        codes = df.groupby(cols, observed=True, dropna=False, sort=False).ngroup().to_numpy()
+    else:
+        codes = np.zeros(n, dtype=np.int64)
+    sizes = np.bincount(codes)
+    quota = np.maximum(np.floor(sizes * (n_rows / max(n, 1))), np.minimum(sizes, MIN_ROWS_PER_STRATUM))
+
+    # Shuffle within each stratum (random key, then stratum) and keep the first quota rows
+    keys = np.random.default_rng(seed).random(n)
+    order = np.lexsort((keys, codes))
+    sorted_codes = codes[order]
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank = np.arange(n) - starts[sorted_codes]
+    return np.sort(order[rank < quota[sorted_codes]])
+
+
+# -----------------------------
+#   Caches
+# -----------------------------
+_positions = OrderedDict()     # (version, n_rows) -> positions, most recently used last
+_positions_lock = threading.Lock()
+
+
+def sample_positions(df, n_rows, version=None):
+    """stratified_positions(df, n_rows), drawn once per dataset version."""
+    if version is None:
+        return stratified_positions(df, n_rows)
+    key = (version, n_rows)
+    with _positions_lock:
+        positions = _positions.get(key)
+        if positions is not None:
+            _positions.move_to_end(key)
+            return positions
+    positions = stratified_positions(df, n_rows)
+    with _positions_lock:
+        positions = _positions.setdefault(key, positions)
+        while len(_positions) > MAX_CACHED_SAMPLES:
+            _positions.popitem(last=False)
+    return positions
+
+
+_samples = FrameCache(lambda df, n_rows, version: df.iloc[sample_positions(df, n_rows, version)])
+
+
+def interactive_sample(df, n_rows=DEFAULT_SAMPLE_ROWS, version=None):
+    """
+    The interactive sample of df (df itself if it has no more than n_rows
+    rows). The sampled frame is kept for as long as df is alive, so reruns
+    get the same object back.
+    """
+    if len(df) <= n_rows:
+        return df
+    return _samples.get(df, n_rows, version)
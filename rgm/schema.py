@@ -0,0 +1,158 @@
+"""
+RGM column conventions and the ingest-time dtype plan.
+
+Low-cardinality dimension columns (Channel, Brand, PPG, ...) become pandas
+``category`` and numeric measures are downcast only where the round trip is
+exact, so the frame that lands in st.session_state["D0"] is several times
+smaller and its == filters / groupbys work on integer codes.
+
+It also holds the minimal column contract an upload must satisfy before any
+page can use it, and the projection pages use to take only the columns they
+declare.
+"""
+import numpy as np
+import pandas as pd
+
+from rgm.fingerprint import frame_version
+from rgm.framecache import FrameCache
+
+
+# Columns every RGM upload must carry (names matched exactly)
+REQUIRED_COLUMNS = ["Date", "Channel", "Brand", "PPG", "SalesValue", "Volume"]
+
+# Product / market dimensions every page filters on
+DIMENSION_COLUMNS = ["Market", "Channel", "Brand", "Variant", "PackType", "PackSize", "PPG"]
+
+# Numeric measures the pages do arithmetic on
+MEASURE_COLUMNS = ["SalesValue", "Volume", "VolumeUnits", "Price", "BasePrice"]
+
+# Prices: stage outputs written back to these are fractional, so they are never made integer
+PRICE_COLUMNS = ["Price", "BasePrice"]
+
+# Integer calendar keys used in the weekly groupbys
+CALENDAR_KEY_COLUMNS = ["Year", "Month", "Week"]
+
+# Identity of one row: a product (PPG) in a channel (and market) on a date
+ROW_KEY_COLUMNS = ["Date", "Market", "Channel", "PPG"]
+
+# Level at which downstream stages (base price, promo depth, ...) recompute
+GROUP_COLUMNS = ["Channel", "Brand", "PPG"]
+
+# A dimension is only made categorical if it has at most this share of distinct values
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+class SchemaError(ValueError):
+    """Raised when an upload does not match the RGM column contract."""
+
+
+def validate_columns(columns):
+    """
+    Raise SchemaError listing any REQUIRED_COLUMNS missing from columns.
+    Names must match exactly (the pages index them that way); a column that
+    only differs in case or surrounding spaces is named in the message.
+    """
+    present = {str(c) for c in columns}
+    missing = [c for c in REQUIRED_COLUMNS if c not in present]
+    if missing:
+        near = {str(c).strip().lower(): str(c) for c in columns}
+        hints = [f"'{near[c.lower()]}' should be '{c}'" for c in missing if c.lower() in near]
+        raise SchemaError(
+            f"Missing required column(s): {', '.join(missing)}. "
+            f"Expected at least: {', '.join(REQUIRED_COLUMNS)}."
+            + (f" Rename: {'; '.join(hints)}." if hints else "")
+        )
+
+
+def plan_dtypes(df):
+    """
+    Return {column: target dtype} for the columns of df that can be stored
+    more compactly. Columns that are missing or already optimal are skipped.
+    """
+    plan = {}
+    n_rows = max(len(df), 1)
+
+    for col in DIMENSION_COLUMNS:
+        if col not in df.columns or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        if df[col].nunique(dropna=True) <= CATEGORY_MAX_UNIQUE_RATIO * n_rows:
+            plan[col] = "category"
+
+    for col in MEASURE_COLUMNS + CALENDAR_KEY_COLUMNS:
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if pd.api.types.is_float_dtype(s) and s.dtype != np.float32:
+            # float32 only if every value survives the round trip unchanged
+            values = s.to_numpy(dtype=np.float64)
+            with np.errstate(over="ignore"):
+                narrowed = values.astype(np.float32).astype(np.float64)
+            if np.array_equal(values, narrowed, equal_nan=True):
+                plan[col] = "float32"
+        elif pd.api.types.is_integer_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            if col in PRICE_COLUMNS:
+                # Whole-number prices in the upload: float32 if exact, else float64
+                values = s.to_numpy(dtype=np.float64, na_value=np.nan)
+                exact = np.array_equal(values, values.astype(np.float32).astype(np.float64), equal_nan=True)
+                plan[col] = "float32" if exact else "float64"
+                continue
+            downcast = pd.to_numeric(s, downcast="integer").dtype
+            if downcast != s.dtype:
+                plan[col] = str(downcast)
+    return plan
+
+
+def project(df, columns):
+    """
+    df restricted to columns (in that order, skipping any df lacks). The
+    result shares its data with df under copy-on-write, so the columns left
+    out are never copied by the caller's ``.copy()``, merges or writes.
+    """
+    return df[[c for c in dict.fromkeys(columns) if c in df.columns]]
+
+
+# Only the current version's projections are kept: an older one would keep superseded columns alive
+_projections = FrameCache(lambda df, version, columns: project(df, columns), versioned=True)
+
+
+def projection(df, columns):
+    """
+    project(df, columns), built once per frame version and column list, so a
+    page gets the same projected frame back on every rerun (and structures
+    cached per frame, like the hierarchy index, are not rebuilt). Treat it
+    as read-only; writing to df gives it a new version and a new projection.
+    """
+    return _projections.get(df, frame_version(df), tuple(columns))
+
+
+def apply_dtype_plan(df, plan):
+    """Cast df (in place) to the dtypes in plan; columns not in df are ignored."""
+    for col, dtype in plan.items():
+        if col in df.columns:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def optimize_dtypes(df):
+    """
+    Apply the dtype plan to df and return (df, report), where report holds
+    the resident size before/after and which columns were converted.
+    """
+    bytes_before = int(df.memory_usage(deep=True).sum())
+    plan = plan_dtypes(df)
+    converted = {col: f"{df[col].dtype} → {dtype}" for col, dtype in plan.items()}
+    apply_dtype_plan(df, plan)
+    bytes_after = int(df.memory_usage(deep=True).sum())
+    report = {
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "converted": converted,
+    }
+    return df, report
+
+
+def format_bytes(n):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
@@ -0,0 +1,26 @@
+"""
+Feature selection compute (the Select page's model-based importances,
+without Streamlit).
+"""
+import pandas as pd
+
+
+def xgb_feature_importances(X, y, task_type="Classifier"):
+    """
+    Feature / Importance of every column of X (numeric) in an XGBoost model
+    of y, most important first. task_type is "Classifier" (y as class codes)
+    or "Regressor".
+    """
+    from xgboost import XGBClassifier, XGBRegressor
+
+    if task_type == "Classifier":
+        model = XGBClassifier(use_label_encoder=False, eval_metric="logloss")
+    else:
+        model = XGBRegressor()
+    model.fit(X, y)
+    col_importances = sorted(
+        zip(X.columns, model.feature_importances_),
+        key=lambda x: x[1],
+        reverse=True
+    )
+    return pd.DataFrame(col_importances, columns=["Feature", "Importance"])
@@ -0,0 +1,93 @@
+"""
+Process-wide registry of uploaded datasets, shared by every session.
+
+When several analysts upload the same extract, the server keeps a single
+read-only copy of it, keyed by content digest. Each session gets a handle: a
+shallow copy of the shared frame. With pandas copy-on-write, adding or
+overwriting columns on a handle (e.g. the BasePrice write-backs) copies only
+the touched columns into that session, so the shared base is never modified
+and memory grows with distinct datasets, not with users.
+
+Copy-on-write is always on from pandas 3, which requirements.txt pins for
+this reason.
+
+A dataset is dropped from the registry once the last handle on it has been
+garbage collected.
+"""
+import threading
+import weakref
+
+import pandas as pd
+
+
+class DatasetRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}        # digest -> {"frame", "info", "handles"}
+        self._load_locks = {}     # digest -> Lock held while the dataset loads
+        self._handle_ids = {}     # id(handle) -> digest
+
+    def __contains__(self, digest):
+        with self._lock:
+            return digest in self._entries
+
+    def open(self, digest, loader):
+        """
+        Return (handle, info) for the dataset with this digest. If no session
+        holds it yet, loader() -> (df, info) is called once to load it; other
+        sessions asking for the same digest meanwhile wait for that load
+        instead of parsing it again.
+        """
+        with self._lock:
+            load_lock = self._load_locks.setdefault(digest, threading.Lock())
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(digest)
+            if entry is None:
+                df, info = loader()
+                entry = {"frame": df, "info": info, "handles": 0}
+                with self._lock:
+                    self._entries[digest] = entry
+            with self._lock:
+                handle = entry["frame"].copy(deep=False)
+                entry["handles"] += 1
+                self._handle_ids[id(handle)] = digest
+            weakref.finalize(handle, self._release, digest, id(handle))
+        return handle, entry["info"]
+
+    def frame(self, digest):
+        """The shared frame of a loaded dataset (read-only, without any session's edits), or None."""
+        with self._lock:
+            entry = self._entries.get(digest)
+            return None if entry is None else entry["frame"]
+
+    def _release(self, digest, handle_id):
+        with self._lock:
+            self._handle_ids.pop(handle_id, None)
+            entry = self._entries.get(digest)
+            if entry is None:
+                return
+            entry["handles"] -= 1
+            if entry["handles"] <= 0:
+                del self._entries[digest]
+                self._load_locks.pop(digest, None)
+
+    def is_shared(self, df):
+        """True if df is a handle on a registry dataset (its data is not per-session)."""
+        with self._lock:
+            return id(df) in self._handle_ids
+
+    def stats(self):
+        """One row per shared dataset: size and number of live handles."""
+        with self._lock:
+            entries = list(self._entries.items())
+        rows = []
+        for digest, entry in entries:
+            frame = entry["frame"]
+            rows.append({
+                "Dataset": (entry["info"] or {}).get("source_name", digest[:12]),
+                "Rows": len(frame),
+                "MB": round(frame.memory_usage(deep=False).sum() / 1024 ** 2, 1),
+                "Handles": entry["handles"],
+            })
+        return pd.DataFrame(rows, columns=["Dataset", "Rows", "MB", "Handles"])
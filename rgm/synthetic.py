@@ -0,0 +1,189 @@
+"""
+Reproducible synthetic scan data in the app's schema.
+
+Benchmarks and demos need data with the structure the pages look for, at
+any scale from 10k to 50M rows: weekly rows per (Channel, PPG) series with
+base-price steps, promo dips and seasonality. Every series is drawn from
+its own seeded generator, so the same settings always give the same frame
+and a bigger dataset contains the series of a smaller one with the same
+seed and weeks.
+
+BasePrice holds the true (generated) base price, which is what the Base
+Price page should recover; drop or blank it to have the page estimate it.
+
+    python -m rgm.synthetic --rows 1000000 --out synthetic.parquet
+"""
+import argparse
+import math
+
+import numpy as np
+import pandas as pd
+
+from rgm.ingest import concat_typed_chunks
+
+
+# Column order of the generated frame
+SYNTHETIC_COLUMNS = [
+    "Date", "Year", "Month", "Week", "Market", "Channel", "Brand", "Variant", "PackType", "PackSize", "PPG",
+    "SalesValue", "Volume", "Price", "BasePrice",
+]
+
+DEFAULT_WEEKS = 156
+DEFAULT_START = "2021-01-04"
+DEFAULT_SEED = 7
+
+# Series generated per chunk (bounds peak memory at large scales)
+SERIES_PER_CHUNK = 20_000
+
+CHANNELS = ["Tesco", "Asda", "Sainsbury", "Morrisons", "Aldi", "Lidl", "Waitrose", "Coop", "Iceland", "Ocado"]
+VARIANTS = ["Original", "Light", "Zero", "Cherry", "Vanilla", "Lemon"]
+PACK_TYPES = ["Bottle", "Can", "Multipack", "Glass"]
+PACK_SIZES = ["330ml", "500ml", "1L", "1.5L", "2L", "6x330ml", "12x330ml"]
+
+# Promo depths drawn for promo weeks
+PROMO_DEPTHS = np.array([0.10, 0.15, 0.20, 0.25, 0.33, 0.50])
+
+PPGS_PER_BRAND = 12
+
+
+def layout(n_rows, weeks=DEFAULT_WEEKS, n_channels=None):
+    """(n_channels, n_ppgs) giving about n_rows rows of weeks weekly rows per Channel × PPG series."""
+    n_series = max(1, math.ceil(n_rows / weeks))
+    if n_channels is None:
+        n_channels = min(len(CHANNELS), max(1, round(math.sqrt(n_series) / 4)))
+    n_channels = max(1, min(n_channels, n_series))
+    return n_channels, math.ceil(n_series / n_channels)
+
+
+def _channel_name(i):
+    return CHANNELS[i] if i < len(CHANNELS) else f"Channel{i + 1:03d}"
+
+
+def _series_values(series_id, n_weeks, seed):
+    """Price, Volume and BasePrice of one series, from its own generator."""
+    rng = np.random.default_rng([seed, series_id])
+
+    # Base price: a starting level with occasional steps, mostly upward
+    base = np.full(n_weeks, rng.uniform(1.0, 8.0))
+    n_steps = rng.poisson(n_weeks / 52)
+    for week in np.sort(rng.integers(13, max(n_weeks, 14), size=n_steps)):
+        base[week:] *= 1 + rng.choice([-1, 1], p=[0.2, 0.8]) * rng.uniform(0.04, 0.12)
+
+    # Promo runs of 1-3 weeks at one depth each (overlapping runs merge)
+    weeks = np.arange(n_weeks)
+    starts = rng.random(n_weeks) < rng.uniform(0.04, 0.15)
+    run_end = np.maximum.accumulate(np.where(starts, weeks + rng.integers(1, 4, n_weeks), 0))
+    last_start = np.maximum.accumulate(np.where(starts, weeks, 0))
+    depth = np.where(run_end > weeks, rng.choice(PROMO_DEPTHS, n_weeks)[last_start], 0.0)
+    price = base * (1 - depth) * rng.normal(1.0, 0.005, n_weeks)
+
+    # Volume: seasonal baseline, price response around the base price, noise
+    season = 1 + rng.uniform(0.05, 0.35) * np.sin(2 * np.pi * weeks / 52 + rng.uniform(0, 2 * np.pi))
+    elasticity = rng.uniform(-3.5, -1.2)
+    level = rng.lognormal(6.0, 1.0)
+    volume = level * season * (price / base) ** elasticity * rng.lognormal(0.0, 0.08, n_weeks)
+    return price, volume, base
+
+
+def _chunk(series_ids, dates, n_channels, seed):
+    n_weeks = len(dates)
+    channel = series_ids % n_channels
+    ppg = series_ids // n_channels
+    brand = ppg // PPGS_PER_BRAND
+
+    prices, volumes, bases = zip(*(_series_values(int(s), n_weeks, seed) for s in series_ids))
+    price = np.concatenate(prices)
+    volume = np.concatenate(volumes)
+    iso = dates.isocalendar()
+
+    def per_series(values, name):
+        """One label per series (name(value)), repeated for each of its weeks, as a category."""
+        uniques, codes = np.unique(values, return_inverse=True)
+        return pd.Categorical.from_codes(np.repeat(codes, n_weeks), [name(u) for u in uniques])
+
+    return pd.DataFrame({
+        "Date": np.tile(dates.to_numpy(), len(series_ids)),
+        "Year": np.tile(iso["year"].to_numpy(dtype="int16"), len(series_ids)),
+        "Month": np.tile(dates.month.to_numpy(dtype="int8"), len(series_ids)),
+        "Week": np.tile(iso["week"].to_numpy(dtype="int8"), len(series_ids)),
+        "Market": per_series(np.zeros(len(series_ids), dtype=int), lambda _: "National"),
+        "Channel": per_series(channel, _channel_name),
+        "Brand": per_series(brand, lambda b: f"Brand{b + 1:03d}"),
+        "Variant": per_series(ppg % len(VARIANTS), lambda v: VARIANTS[v]),
+        "PackType": per_series(ppg % len(PACK_TYPES), lambda v: PACK_TYPES[v]),
+        "PackSize": per_series((ppg // len(PACK_TYPES)) % len(PACK_SIZES), lambda v: PACK_SIZES[v]),
+        "PPG": per_series(ppg, lambda p: f"PPG{p + 1:05d}"),
+        "SalesValue": (price * volume).astype("float32"),
+        "Volume": volume.astype("float32"),
+        "Price": price.astype("float32"),
+        "BasePrice": np.concatenate(bases).astype("float32"),
+    })
+
+
+def iter_synthetic(n_rows, weeks=DEFAULT_WEEKS, start=DEFAULT_START, seed=DEFAULT_SEED, n_channels=None,
+                   series_per_chunk=SERIES_PER_CHUNK):
+    """Yield the synthetic frame in chunks of whole series (see generate)."""
+    n_channels, _ = layout(n_rows, weeks, n_channels)
+    n_series = max(1, math.ceil(n_rows / weeks))
+    dates = pd.date_range(start, periods=weeks, freq="W-MON")
+    # Series are numbered channel-fastest, so every channel gets PPGs in the same order
+    for first in range(0, n_series, series_per_chunk):
+        ids = np.arange(first, min(first + series_per_chunk, n_series))
+        yield _chunk(ids, dates, n_channels, seed)
+
+
+def generate(n_rows, weeks=DEFAULT_WEEKS, start=DEFAULT_START, seed=DEFAULT_SEED, n_channels=None):
+    """
+    About n_rows rows (rounded up to whole series) of weekly scan data:
+    ceil(n_rows / weeks) Channel × PPG series, PPGS_PER_BRAND PPGs per brand,
+    dimensions as category and measures as float32, as ingest would store them.
+    """
+    return concat_typed_chunks(list(iter_synthetic(n_rows, weeks, start, seed, n_channels)))
+
+
+def write_synthetic(path, n_rows, weeks=DEFAULT_WEEKS, start=DEFAULT_START, seed=DEFAULT_SEED, n_channels=None):
+    """Write the synthetic data to path (.parquet or .csv) chunk by chunk; returns the row count."""
+    written = 0
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in iter_synthetic(n_rows, weeks, start, seed, n_channels):
+                # Categories differ between chunks; store the text so the file has one schema
+                table = pa.Table.from_pandas(
+                    chunk.astype({c: "string" for c in chunk.columns if isinstance(chunk[c].dtype, pd.CategoricalDtype)}),
+                    preserve_index=False,
+                )
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                written += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    elif path.endswith(".csv"):
+        for i, chunk in enumerate(iter_synthetic(n_rows, weeks, start, seed, n_channels)):
+            chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False, date_format="%Y-%m-%d")
+            written += len(chunk)
+    else:
+        raise ValueError(f"Unsupported output format: {path} (use .parquet or .csv)")
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic RGM scan data.")
+    parser.add_argument("--rows", type=int, required=True, help="approximate number of rows")
+    parser.add_argument("--out", required=True, help="output file (.parquet or .csv)")
+    parser.add_argument("--weeks", type=int, default=DEFAULT_WEEKS)
+    parser.add_argument("--start", default=DEFAULT_START, help="first week (a Monday)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--channels", type=int, default=None)
+    args = parser.parse_args(argv)
+    n = write_synthetic(args.out, args.rows, args.weeks, args.start, args.seed, args.channels)
+    print(f"Wrote {n:,} rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
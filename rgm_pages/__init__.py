@@ -0,0 +1,110 @@
+"""
+The app's pages, one module per page (or family of pages).
+
+STYLEGUIDE.py used to define every page inline, so each rerun re-executed
+about 10k lines of definitions, and the start-up imports included plotly for
+pages nobody had opened yet. The main script now only draws the shell
+(styling, sidebar) and dispatches through PAGES: a page's module is imported
+the first time that page is visited and stays in sys.modules for the rest of
+the server process, so later visits and reruns cost a dict lookup. Heavy
+libraries (plotly, statsmodels, sklearn, xgboost, ...) are imported by the
+page modules or inside the page functions, never by the shell.
+
+The start-up timings (server start to first rendered page, per-rerun
+overhead, page module imports) are kept in STARTUP for the sidebar report.
+"""
+import importlib
+import os
+import sys
+import time
+from collections import deque
+
+
+# Page name (st.session_state.page) -> (module in rgm_pages, function)
+PAGES = {
+    "home": ("home", "home_page"),
+    "myEDA": ("eda", "myEDA"),
+    "modelingSuite": ("modeling_suite", "modeling_suite_page"),
+    "section1_baseprice": ("base_price", "base_price_estimator_page"),
+    "section1_promodepth": ("promo_depth", "promo_depth_page"),
+    "section1_calendar": ("calendar_comparison", "calendar_comparison_page"),
+    "section1_market_construct": ("market_construct", "market_construct_page"),
+    "section2_module1": ("pipeline", "section2_module1_page"),
+    "section2_module2": ("post_modelling", "section2_module2_page"),
+    "section2_module3": ("section2_module3", "section2_module3_page"),
+    "section3_module2": ("section3_module2", "section3_module2_page"),
+    "section3_module4": ("section3_module4", "section3_module4_page"),
+    "section4_feature_overview": ("feature_engineering", "Feature_Overview_page"),
+    "section4_transform": ("feature_engineering", "Transform_page"),
+    "section4_create": ("feature_engineering", "Create_page"),
+    "section4_select": ("feature_engineering", "Select_page"),
+    "results_browser": ("results_browser", "results_browser_page"),
+}
+
+# Reruns kept for the timing report
+MAX_TIMED_RUNS = 50
+
+
+# -----------------------------
+#   Start-up timing
+# -----------------------------
+def process_uptime():
+    """Seconds since this server process started, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+
+
+STARTUP = {
+    "first_page_s": None,       # server start -> end of the first script run
+    "first_run_s": None,        # duration of the first script run
+    "imports_s": {},            # page module -> seconds to import it
+    "runs": deque(maxlen=MAX_TIMED_RUNS),   # {"page", "shell_s", "page_s", "total_s"} per rerun
+}
+
+
+def record_run(page, started, page_started, page_finished):
+    """Record one script run: shell overhead, page time, total (perf_counter stamps)."""
+    finished = time.perf_counter()
+    run = {
+        "page": page,
+        "shell_s": (page_started - started) + (finished - page_finished),
+        "page_s": page_finished - page_started,
+        "total_s": finished - started,
+    }
+    if STARTUP["first_run_s"] is None:
+        STARTUP["first_run_s"] = run["total_s"]
+        STARTUP["first_page_s"] = process_uptime()
+    STARTUP["runs"].append(run)
+    return run
+
+
+# -----------------------------
+#   Dispatch
+# -----------------------------
+def page_module(name):
+    """rgm_pages.<name>, imported (and timed) on first use."""
+    qualified = f"{__name__}.{name}"
+    module = sys.modules.get(qualified)
+    if module is None:
+        started = time.perf_counter()
+        module = importlib.import_module(qualified)
+        STARTUP["imports_s"][name] = time.perf_counter() - started
+    return module
+
+
+def render_page(page):
+    """Draw page; False if there is no such page."""
+    if page.startswith("section") and "_" not in page:
+        page_module("home").section_page(page.replace("section", ""))
+        return True
+    if page not in PAGES:
+        return False
+    module, function = PAGES[page]
+    getattr(page_module(module), function)()
+    return True
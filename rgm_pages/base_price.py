@@ -0,0 +1,283 @@
+"""Base Price Estimator page (section 1)."""
+import streamlit as st
+
+from rgm.artifacts import ArtifactStore, dataset_fingerprint
+from rgm.base_price import (
+    BASE_PRICE_DEFAULTS,
+    SWEEP_CHOICES,
+    parallel_base_prices,
+    parallel_sweep,
+    ppg_base_price,
+    ppg_weekly,
+    price_series,
+    sweep_grid,
+    write_base_prices,
+)
+from rgm.fingerprint import bump_version, frame_version
+from rgm.hierarchy import AGGREGATOR_COLUMNS, hierarchy_index
+from rgm.jobs import DONE, job_progress
+from rgm.profiling import stage
+from rgm_pages.jobs import finished_job, job_running, show_job_messages, submit_job
+from rgm_pages.navigation import go_back, go_home
+from rgm_pages.results_browser import store_session_value
+
+
+# Background job of "Save All Base Prices" (see rgm_pages.jobs)
+SAVE_ALL_JOB = "Save All Base Prices"
+SWEEP_JOB = "Base Price Settings Sweep"
+
+# Labels of the Advanced Settings a sweep varies
+SWEEP_LABELS = {
+    "rolling_period": "Rolling Period (weeks)",
+    "upward_threshold": "Upward Threshold (%)",
+    "downward_threshold": "Downward Threshold (%)",
+    "promo_weeks": "Weeks for Validation",
+    "percentile": "Percentile",
+}
+
+# Artifact (stage, dataset) of the latest Save All weekly table, whatever dataset it came from
+BASE_PRICE_STATE = ("base_price_state", "latest")
+
+
+# def Engineer_page():
+    
+def base_price_estimator_page():
+
+    
+    import numpy as np
+    import plotly.graph_objects as go
+
+    st.subheader("📊 Automated Base Price Estimator")
+    
+    
+        # Retrieve the uploaded dataframe from session state (set in the file management section)
+    dataframe = st.session_state.get("D0", None) 
+    
+    # Make sure the global 'dataframe' is not None (it comes from your file upload module)
+    if dataframe is not None:
+        # Ensure "BasePrice" column exists
+        if "BasePrice" not in dataframe.columns:
+            dataframe["BasePrice"] = np.nan
+
+        # --- User selections ---
+        # Options and subsets come from the hierarchy index (built once per dataset)
+        hier = hierarchy_index(dataframe)
+        channel_selected = st.selectbox("Select a Channel", options=hier.children())
+        channel_data = hier.take(dataframe, channel_selected)
+
+        if channel_data.empty:
+            st.warning(f"No data available for the selected Channel: {channel_selected}")
+        else:
+            brands_in_channel = hier.children(channel_selected)
+            brand_selected = st.radio("Select a Brand", options=brands_in_channel, horizontal=True)
+            brand_data = hier.take(dataframe, channel_selected, brand_selected)
+
+            aggregator_options = ["Variant", "PackType", "PackSize"]
+            aggregator_col = st.selectbox("Select Aggregator Dimension", aggregator_options)
+            if aggregator_col not in brand_data.columns:
+                st.warning(f"Column '{aggregator_col}' not found in the data.")
+                st.stop()
+            aggregator_values = hier.children(channel_selected, brand_selected, aggregator=aggregator_col)
+            if len(aggregator_values) == 0:
+                st.warning(f"No non-empty values for '{aggregator_col}' in Brand: {brand_selected}")
+                st.stop()
+            aggregator_selected = st.radio(f"Select {aggregator_col}", options=aggregator_values, horizontal=True)
+            aggregator_path = (channel_selected, brand_selected, aggregator_selected)
+            aggregator_data = hier.take(dataframe, *aggregator_path, aggregator=aggregator_col)
+            if aggregator_data.empty:
+                st.warning(f"No data available for {aggregator_col} = {aggregator_selected}")
+                st.stop()
+                            
+            # Save aggregator selection in session state
+            st.session_state['aggregator_selected'] = aggregator_selected
+
+            # Settings sweep: score a grid of Advanced Settings on one PPG or the whole brand (in the background)
+            with st.expander("Settings Sweep", expanded=False):
+                st.caption(
+                    "Scores every combination of the values below. Lower AboveBaseShare (weeks priced above the base), "
+                    "TransitionsPerYear and BaseVolatility (mean weekly base change) rank higher; "
+                    "PromoShare is the share of weeks below the base."
+                )
+                brand_scope = f"All of {brand_selected}"
+                sweep_scope = st.selectbox(
+                    "Sweep on:", [brand_scope] + list(hier.children(*aggregator_path, aggregator=aggregator_col)),
+                    format_func=lambda s: s if s == brand_scope else f"PPG: {s}", key="sweep_scope"
+                )
+                cols = st.columns(len(SWEEP_CHOICES))
+                choices = {
+                    name: cols[i].multiselect(SWEEP_LABELS[name], values, default=values, key=f"sweep_{name}")
+                    for i, (name, values) in enumerate(SWEEP_CHOICES.items())
+                }
+                grid = sweep_grid({name: values or [BASE_PRICE_DEFAULTS[name]] for name, values in choices.items()})
+                if st.button(f"Run Sweep ({len(grid)} settings)", disabled=job_running(SWEEP_JOB)):
+                    if sweep_scope == brand_scope:
+                        series = price_series(brand_data, [aggregator_col, "PPG"])
+                    else:
+                        ppg_data = hier.take(dataframe, *aggregator_path, sweep_scope, aggregator=aggregator_col)
+                        series = price_series(ppg_data, ["PPG"])
+                    st.session_state["base_price_sweep_scope"] = f"{channel_selected} - {sweep_scope}"
+                    submit_job(
+                        SWEEP_JOB, parallel_sweep, list(series.values()), grid, progress=job_progress,
+                        targets="base_price_sweep",
+                    )
+                if job_running(SWEEP_JOB):
+                    st.info("Running the settings sweep in the background – see Background Jobs in the sidebar.")
+                outcome = finished_job(SWEEP_JOB)
+                if outcome is not None:
+                    show_job_messages(outcome, failure="Settings sweep failed")
+                sweep = st.session_state.get("base_price_sweep")
+                if sweep is not None:
+                    st.markdown(f"**Ranked settings for {st.session_state.get('base_price_sweep_scope', '')}**")
+                    st.dataframe(
+                        sweep[["Rank"] + [c for c in sweep.columns if c != "Rank"]].rename(columns=SWEEP_LABELS),
+                        hide_index=True, use_container_width=True
+                    )
+
+            # Loop over each PPG in aggregator_data.
+            # Weekly tables and base prices are cached per dataset version, PPG and settings,
+            # so a rerun only recomputes the PPGs whose data or settings changed.
+            version = frame_version(dataframe)
+            ppgs_in_aggregator = hier.children(*aggregator_path, aggregator=aggregator_col)
+            for idx, ppg in enumerate(ppgs_in_aggregator):
+                ppg_path = aggregator_path + (ppg,)
+                weekly_data, has_base_price = ppg_weekly(dataframe, aggregator_col, ppg_path, version)
+                if weekly_data.empty:
+                    continue
+
+                # Advanced settings expander with force recalculation option.
+                key_suffix = f"_{brand_selected}_{aggregator_selected}_{ppg}_{idx}"
+                with st.expander(f"Advanced Settings for {brand_selected}, {aggregator_col}: {aggregator_selected}, PPG: {ppg}", expanded=False):
+                    force_modification = st.checkbox(
+                        "Force recalculation even if BasePrice exists", 
+                        value=False, 
+                        key=f"force_mod{key_suffix}"
+                    )
+                    col1, col2, col3, col4, col5 = st.columns(5)
+                    rolling_period = col1.number_input(
+                        "Rolling Period (weeks):", min_value=4, max_value=52, value=12, step=1,
+                        key=f"rolling_period{key_suffix}"
+                    )
+                    upward_threshold = col2.number_input(
+                        "Upward Transition Threshold (%):", min_value=1.0, max_value=20.0, value=5.0, step=0.5,
+                        key=f"upward_threshold{key_suffix}"
+                    )
+                    downward_threshold = col3.number_input(
+                        "Downward Transition Threshold (%):", min_value=1.0, max_value=20.0, value=5.0, step=0.5,
+                        key=f"downward_threshold{key_suffix}"
+                    )
+                    weeks_for_promo_check = col4.number_input(
+                        "Weeks for Validation:", min_value=2, max_value=18, value=12, step=1,
+                        key=f"promo_weeks{key_suffix}"
+                    )
+                    promo_percentile = col5.number_input(
+                        "Percentile for Base Price:", min_value=50.0, max_value=100.0, value=75.0, step=5.0,
+                        key=f"promo_percentile{key_suffix}"
+                    )
+
+                # If BasePrice is already computed for all rows and not forcing recalculation, skip heavy calculation.
+                if has_base_price and not force_modification:
+                    st.info(f"BasePrice already exists for {brand_selected} - {aggregator_selected} - {ppg}. Skipping calculations...")
+                    fig = go.Figure()
+                    fig.add_trace(go.Scatter(
+                        x=weekly_data["WeekYear"],
+                        y=weekly_data["Price"],
+                        mode="lines+markers",
+                        name="Weekly Price",
+                        line=dict(color="blue")
+                    ))
+                    fig.add_trace(go.Scatter(
+                        x=weekly_data["WeekYear"],
+                        y=weekly_data["BasePrice"],
+                        mode="lines",
+                        name="Base Price",
+                        line=dict(color="red", dash="dash")
+                    ))
+                    st.plotly_chart(fig, use_container_width=True)
+                    continue  # Skip heavy calculation for this PPG
+
+                # Otherwise, perform the heavy calculation:
+                with stage(f"base price: {ppg}"):
+                    weekly_data, transition_points = ppg_base_price(
+                        dataframe, aggregator_col, ppg_path, version,
+                        rolling_period=rolling_period,
+                        upward_threshold=upward_threshold,
+                        downward_threshold=downward_threshold,
+                        promo_weeks=weeks_for_promo_check,
+                        percentile=promo_percentile,
+                    )
+                if weekly_data is None:
+                    st.warning(f"Not enough data for PPG: {ppg}, {aggregator_col}: {aggregator_selected}, Brand: {brand_selected}")
+                    continue
+
+                with stage(f"chart: {ppg}"):
+                    fig = go.Figure()
+                    fig.add_trace(go.Scatter(
+                        x=weekly_data["WeekYear"],
+                        y=weekly_data["Price"],
+                        mode="lines+markers",
+                        name="Weekly Price",
+                        line=dict(color="blue")
+                    ))
+                    fig.add_trace(go.Scatter(
+                        x=weekly_data["WeekYear"],
+                        y=weekly_data["BasePrice"],
+                        mode="lines",
+                        name="Base Price",
+                        line=dict(color="red", dash="dash")
+                    ))
+                    for t in transition_points:
+                        fig.add_trace(go.Scatter(
+                            x=[weekly_data["WeekYear"].iloc[t]],
+                            y=[weekly_data["BasePrice"].iloc[t]],
+                            mode="markers",
+                            name="Transition Point",
+                            marker=dict(color="orange", size=12, symbol="diamond")
+                        ))
+                    st.plotly_chart(fig, use_container_width=True)
+
+                if st.button(f"Save {brand_selected} - {aggregator_selected} - {ppg}"):
+                    dataframe["BasePrice"] = write_base_prices(
+                        dataframe, weekly_data, {"Brand": brand_selected, aggregator_col: aggregator_selected, "PPG": ppg}
+                    )
+                    bump_version(dataframe)
+                    st.success(f"Base Price saved for {brand_selected} - {aggregator_selected} - {ppg}")
+
+            # Save All Base Prices button (computed in the background, or taken from the artifact store).
+            # The last run's weekly table lets series whose history is unchanged resume after new weeks.
+            save_all_params = dict(BASE_PRICE_DEFAULTS, aggregators=list(AGGREGATOR_COLUMNS))
+            if st.button("Save All Base Prices", disabled=job_running(SAVE_ALL_JOB)):
+                previous = st.session_state.get("base_price_table")
+                if previous is None:
+                    stored = ArtifactStore().load(*BASE_PRICE_STATE, save_all_params)
+                    previous = stored[0] if stored is not None else None
+                submit_job(
+                    SAVE_ALL_JOB, parallel_base_prices, dataframe, progress=job_progress, previous=previous,
+                    targets=("dataframe1", "base_price_table"),
+                    artifact=("base_prices", dataset_fingerprint(dataframe), save_all_params),
+                )
+            if job_running(SAVE_ALL_JOB):
+                st.info("Computing all base prices in the background – see Background Jobs in the sidebar.")
+            outcome = finished_job(SAVE_ALL_JOB)
+            if outcome is not None:
+                show_job_messages(outcome, failure="Saving all base prices failed")
+                if outcome["state"] == DONE:
+                    store_session_value("base_price_table", *BASE_PRICE_STATE, save_all_params, label="Base price state")
+                    dataframe = st.session_state["dataframe1"]
+                    st.success("✅ Missing Base Prices computed & updated!")
+                    st.download_button(label="📥 Download Updated Dataset",
+                                    data=dataframe.to_csv(index=False),
+                                    file_name="updated_dataset_with_base_price.csv",
+                                    mime="text/csv",
+                                    key="download_updated_data")
+    else:
+        st.warning("No data available.")
+
+    # Navigation buttons
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Back"):
+            go_back()
+    with col2:
+        if st.button("Home"):
+            go_home()
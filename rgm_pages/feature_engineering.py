@@ -0,0 +1,1202 @@
+"""Engineer section: Feature Overview, Transform, Create and Select pages."""
+from rgm.schema import format_bytes
+from rgm.selection import xgb_feature_importances
+from rgm_pages.frames import commit_frame, exploration_frame, load_lineage, save_lineage
+from rgm_pages.jobs import finished_job, job_running, show_job_messages, submit_job
+from rgm_pages.navigation import go_back, go_home
+
+
+# Background job of the Select page (see rgm_pages.jobs)
+XGB_JOB = "XGBoost Feature Importances"
+
+
+#########################################def Engineer
+###############inter page navigation
+
+
+
+################################################
+
+def Feature_Overview_page():
+
+
+    import streamlit as st
+    import pandas as pd
+    import numpy as np
+    import plotly.express as px
+
+    # -----------------------------------------------------------------------
+    # 1) CUSTOM CSS (Your Style Guide)
+    # -----------------------------------------------------------------------
+    st.markdown("""
+    <style>
+    .stApp {
+        background-color: #F5F5F5;
+    }
+    .custom-header {
+        font-family: 'Inter', sans-serif;
+        font-size: 36px;
+        font-weight: 600;
+        color: #333333;
+        margin-bottom: 0.2rem;
+    }
+    .subheader {
+        font-family: 'Inter', sans-serif;
+        font-size: 18px;
+        color: #666666;
+        margin-top: 0;
+        margin-bottom: 1rem;
+    }
+    .accent-hr {
+        border: 0;
+        height: 2px;
+        background: linear-gradient(to right, #FFBD59, #FFC87A);
+        margin: 0.5rem 0 1.5rem 0;
+    }
+    .card {
+        background-color: #FFFFFF; 
+        padding: 1.2rem 1.2rem;
+        margin-bottom: 1rem;
+        border-radius: 8px;
+        box-shadow: 2px 2px 10px rgba(0,0,0,0.05);
+    }
+    .card h2 {
+        font-family: 'Inter', sans-serif;
+        font-size: 24px;
+        margin: 0.2rem 0 1rem 0;
+        color: #333333;
+    }
+    div[data-testid="stHorizontalBlock"] button {
+        background-color: #FFBD59 !important; 
+        color: #333333 !important;
+        font-weight: 600 !important;
+        border-radius: 4px !important;
+        border: none !important;
+        margin-bottom: 0.5rem;
+    }
+    div[data-testid="stHorizontalBlock"] button:hover {
+        background-color: #FFC87A !important;
+    }
+    .dataframe-table {
+        font-family: 'Inter', sans-serif;
+        font-size: 14px;
+        color: #333333;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    # Accent colors for your charts
+    STYLE_COLORS = [
+        "#FFBD59",  # gold
+        "#FFC87A",  # lighter gold
+        "#41C185",  # green
+        "#458EE2",  # blue
+        "#FF7F7F",  # red
+    ]
+
+    # -----------------------------------------------------------------------
+    # 2) MAIN HEADER & NAVIGATION
+    # -----------------------------------------------------------------------
+    st.markdown('<h1 class="custom-header">Feature Overview</h1>', unsafe_allow_html=True)
+    st.markdown('<p class="subheader">Radio-based aggregator filtering plus advanced analysis features – all in a user-friendly layout.</p>', unsafe_allow_html=True)
+    st.markdown('<hr class="accent-hr">', unsafe_allow_html=True)
+
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Back"):
+            go_back()
+    with col2:
+        if st.button("Home"):
+            go_home()
+
+    # -----------------------------------------------------------------------
+    # 3) RETRIEVE DATA
+    # -----------------------------------------------------------------------
+    df = st.session_state.get("D0", None)
+    if df is None or df.empty:
+        st.warning("No data found in st.session_state['D0']. Please load your dataset.")
+        st.stop()
+    df = exploration_frame(df, "feature_overview")
+
+    # -----------------------------------------------------------------------
+    # CARD 0: MULTI-COLUMN FILTER (RADIO-BASED)
+    # -----------------------------------------------------------------------
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+
+
+    cat_cols_all = df.select_dtypes(include=["object","category"]).columns.tolist()
+    if not cat_cols_all:
+        st.info("No categorical columns found. No aggregator filter applied.")
+    else:
+        agg_cols_picked = st.multiselect(
+            "Pick aggregator columns to filter (radio-based):",
+            cat_cols_all,
+            default=[]
+        )
+        for colname in agg_cols_picked:
+            distinct_vals = sorted(df[colname].dropna().unique().tolist())
+            all_option = "All"
+            options_for_radio = [all_option] + distinct_vals
+            selected_val = st.radio(
+                f"{colname}:",
+                options_for_radio,
+                index=0,  # default to "All"
+                key=f"AggRadio_{colname}",
+                horizontal=True
+            )
+            if selected_val != all_option:
+                df = df[df[colname]==selected_val]
+                if df.empty:
+                    st.warning(f"No data left after filtering on {colname} = {selected_val}.")
+                    st.markdown('</div>', unsafe_allow_html=True)
+                    st.stop()
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # # -----------------------------------------------------------------------
+    # # CARD 1: QUICK STATS
+    # # -----------------------------------------------------------------------
+    # st.markdown('<div class="card">', unsafe_allow_html=True)
+    # st.write("## 1) Quick Stats")
+
+    # n_rows, n_cols = df.shape
+    # mem_mb = df.memory_usage(deep=True).sum()/1e6
+    # total_cells = n_rows*n_cols
+    # missing_count = df.isna().sum().sum()
+    # perc_missing = (missing_count/total_cells*100) if total_cells else 0
+
+    # colA, colB, colC = st.columns(3)
+    # with colA:
+    #     st.markdown("**Shape**")
+    #     st.write(f"{n_rows} rows × {n_cols} columns")
+
+    # with colB:
+    #     st.markdown("**Memory Usage**")
+    #     st.write(f"{mem_mb:.2f} MB")
+
+    # with colC:
+    #     st.markdown("**Overall Missing**")
+    #     st.write(f"{missing_count} ({perc_missing:.2f}%)")
+
+    # st.markdown('</div>', unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # CARD 2: COLUMN DETAILS
+    # -----------------------------------------------------------------------
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 1) Column Details")
+
+    column_info = []
+    for c in df.columns:
+        ctype = str(df[c].dtype)
+        miss = df[c].isna().sum()
+        uniq = df[c].nunique(dropna=True)
+        sample_vals = df[c].dropna().unique()[:3]
+        sample_str = ", ".join(map(str, sample_vals)) if len(sample_vals)>0 else "N/A"
+        column_info.append({
+            "Column": c,
+            "Type": ctype,
+            "Missing": miss,
+            "Unique": uniq,
+            "Examples": sample_str
+        })
+    detail_df = pd.DataFrame(column_info)
+    st.dataframe(detail_df, use_container_width=True)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # Identify numeric/categorical columns in the aggregator-filtered dataset
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    cat_cols = df.select_dtypes(include=["object","category"]).columns.tolist()
+
+    # -----------------------------------------------------------------------
+    # CARD 3: NUMERIC & CATEGORICAL INSIGHTS
+    # -----------------------------------------------------------------------
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 3) Numeric & Categorical Insights")
+
+    cNum, cCat = st.columns(2)
+
+    # 3.1 Numeric side
+    with cNum:
+        st.markdown("### Numeric Columns")
+        if numeric_cols:
+            desc_stats = df[numeric_cols].describe().T
+            st.write("**Descriptive Stats**")
+            st.dataframe(desc_stats, use_container_width=True)
+
+            outlier_toggle = st.checkbox("Check for Potential Outliers (1.5×IQR)?", key="OutlierCheck")
+            if outlier_toggle:
+                outlier_info = []
+                for coln in numeric_cols:
+                    q1 = df[coln].quantile(0.25)
+                    q3 = df[coln].quantile(0.75)
+                    iqr = q3 - q1
+                    lb = q1 - 1.5*iqr
+                    ub = q3 + 1.5*iqr
+                    out_count = ((df[coln]<lb)|(df[coln]>ub)).sum()
+                    outlier_info.append({
+                        "Column": coln,
+                        "Outliers": out_count,
+                        "LowerBound": f"{lb:.2f}",
+                        "UpperBound": f"{ub:.2f}"
+                    })
+                st.dataframe(pd.DataFrame(outlier_info), use_container_width=True)
+        else:
+            st.info("No numeric columns in the filtered subset.")
+
+    # 3.2 Categorical side
+    with cCat:
+        st.markdown("### Categorical Columns")
+        if cat_cols:
+            st.write("**Frequency Table**")
+            pick_cat = st.selectbox("Pick a categorical column:", cat_cols, key="CatColPick")
+            top_k = st.slider("Show top K categories:", 1, 20, 5, key="CatTopK")
+            freq_s = df[pick_cat].value_counts(dropna=False).head(top_k)
+            freq_df = freq_s.rename_axis(pick_cat).reset_index(name="Count")
+            freq_df["Percent"] = freq_df["Count"]/freq_df["Count"].sum()*100
+            st.dataframe(freq_df, use_container_width=True)
+        else:
+            st.info("No categorical columns in the filtered subset.")
+
+    # Now we do a full-width advanced cat-cat section, **below** the columns
+    st.markdown("---")  # a separator
+    st.markdown("### Advanced Categorical-Categorical Analysis (Full Width)")
+
+    if len(cat_cols) >= 2:
+        adv_catcat_toggle = st.checkbox("Enable cross-tab analysis?", key="CatCatToggle")
+        if adv_catcat_toggle:
+            # user picks two distinct cat columns
+            st.write("Pick two different categorical columns for cross-tab analysis:")
+            cat1 = st.selectbox("Column A:", cat_cols, key="CatCatCol1")
+            cat2 = st.selectbox("Column B:", cat_cols, key="CatCatCol2")
+
+            if cat1 and cat2 and cat1!=cat2:
+                crosstab_data = pd.crosstab(df[cat1], df[cat2])
+                st.write("**Cross-Tab (Counts)**")
+                st.dataframe(crosstab_data, use_container_width=True)
+
+                # optional heatmap
+                show_heatmap = st.checkbox("Show Cross-Tab Heatmap?", key="CatCatHeatmap")
+                if show_heatmap:
+                    fig_heat = px.imshow(
+                        crosstab_data,
+                        text_auto=True,
+                        aspect="auto",
+                        title=f"{cat1} vs. {cat2} Cross-Tab"
+                    )
+                    st.plotly_chart(fig_heat, use_container_width=True)
+            else:
+                st.info("Please pick two distinct columns for cross-tab.")
+    else:
+        st.info("Fewer than 2 categorical columns remain after filtering, so cross-tab is not available.")
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # CARD 4: DISTRIBUTIONS
+    # -----------------------------------------------------------------------
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 4) Distributions")
+
+    distL, distR = st.columns(2)
+
+    # numeric histogram
+    with distL:
+        st.markdown("**Histogram (Numeric)**")
+        if numeric_cols:
+            pick_num = st.selectbox("Select numeric column:", ["(None)"]+numeric_cols, key="NumDistPick")
+            if pick_num!="(None)":
+                log_check = st.checkbox("Log-scale Y-axis?", key="HistLogY")
+                fig_hist = px.histogram(
+                    df, x=pick_num, nbins=30,
+                    title=f"Distribution of {pick_num}",
+                    color_discrete_sequence=[STYLE_COLORS[0]]
+                )
+                if log_check:
+                    fig_hist.update_yaxes(type="log")
+                st.plotly_chart(fig_hist, use_container_width=True)
+
+    # categorical bar
+    with distR:
+        st.markdown("**Bar Chart (Categorical)**")
+        if cat_cols:
+            pick_cat2 = st.selectbox("Select categorical column:", ["(None)"]+cat_cols, key="CatDistPick2")
+            if pick_cat2!="(None)":
+                freq_s = df[pick_cat2].value_counts(dropna=False)
+                freq_df = freq_s.rename_axis(pick_cat2).reset_index(name="Count")
+                freq_df["Percent"] = freq_df["Count"] / freq_df["Count"].sum()*100
+
+                bar_mode = st.selectbox("Bar Mode:", ["Absolute Count","Percent"], key="CatBarMode")
+                y_axis = "Count" if bar_mode=="Absolute Count" else "Percent"
+                fig_bar = px.bar(
+                    freq_df, x=pick_cat2, y=y_axis,
+                    title=f"Bar Chart of {pick_cat2}",
+                    color_discrete_sequence=[STYLE_COLORS[1]]
+                )
+                if bar_mode=="Percent":
+                    fig_bar.update_yaxes(title="Percent")
+                st.plotly_chart(fig_bar, use_container_width=True)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # CARD 5: CORRELATION (FULL WIDTH)
+    # -----------------------------------------------------------------------
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 5) Correlation Matrix")
+
+    numeric_cols_filtered = [nc for nc in numeric_cols if df[nc].nunique() > 1]
+    if len(numeric_cols_filtered) > 1:
+        corr_method = st.selectbox("Correlation method:", ["pearson","spearman","kendall"], key="CorrMethodPick")
+        corr_thresh = st.slider("Correlation threshold (mask smaller correlations):", 0.0,1.0,0.0,0.01, key="CorrThresh")
+        corr_mat = df[numeric_cols_filtered].corr(method=corr_method)
+        if corr_thresh>0:
+            mask = corr_mat.abs()<corr_thresh
+            corr_mat = corr_mat.mask(mask, np.nan)
+
+        fig_corr = px.imshow(
+            corr_mat, text_auto=True, aspect="auto",
+            title=f"{corr_method.capitalize()} Correlation (≥ |{corr_thresh}| shown)",
+            color_continuous_scale="RdBu"
+        )
+        st.plotly_chart(fig_corr, use_container_width=True)
+    else:
+        st.info("Not enough numeric columns (with variety) for correlation in the filtered data.")
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # CARD 6: SAMPLE ROWS
+    # -----------------------------------------------------------------------
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 6) Sample Rows")
+
+    n_samp = st.slider("Number of sample rows:",1,50,5)
+    st.dataframe(df.head(n_samp), use_container_width=True)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+def Transform_page():
+    
+    
+    import streamlit as st
+    import pandas as pd
+    import numpy as np
+    import plotly.express as px
+
+
+
+    # =============================================================================
+    # CUSTOM CSS
+    # =============================================================================
+    st.markdown("""
+    <style>
+    .stApp {
+        background-color: #F5F5F5;
+    }
+    .custom-header {
+        font-family: 'Inter', sans-serif;
+        font-size: 36px; 
+        font-weight: 600;
+        color: #333333;
+        margin-bottom: 0.2rem;
+    }
+    .subheader {
+        font-family: 'Inter', sans-serif;
+        font-size: 18px;
+        color: #666666;
+        margin-top: 0;
+        margin-bottom: 1rem;
+    }
+    .accent-hr {
+        border: 0;
+        height: 2px;
+        background: linear-gradient(to right, #FFBD59, #FFC87A);
+        margin: 0.5rem 0 1.5rem 0;
+    }
+    .card {
+        background-color: #FFFFFF; 
+        padding: 1.2rem;
+        margin-bottom: 1rem;
+        border-radius: 8px;
+        box-shadow: 2px 2px 10px rgba(0,0,0,0.05);
+    }
+    .card h2 {
+        font-family: 'Inter', sans-serif;
+        font-size: 24px;
+        margin: 0.2rem 0 1rem 0;
+        color: #333333;
+    }
+    div[data-testid="stHorizontalBlock"] button {
+        background-color: #FFBD59 !important; 
+        color: #333333 !important;
+        font-weight: 600 !important;
+        border-radius: 4px !important;
+        border: none !important;
+        margin-bottom: 0.5rem;
+    }
+    div[data-testid="stHorizontalBlock"] button:hover {
+        background-color: #FFC87A !important;
+    }
+    .dataframe-table {
+        font-family: 'Inter', sans-serif;
+        font-size: 14px;
+        color: #333333;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    # =============================================================================
+    # MAIN HEADER & NAVIGATION
+    # =============================================================================
+    st.markdown('<h1 class="custom-header">Transform Page</h1>', unsafe_allow_html=True)
+    st.markdown('<p class="subheader">Filter data from your "Create" page, apply scaling transformations, and compare before–after results.</p>', unsafe_allow_html=True)
+    st.markdown('<hr class="accent-hr">', unsafe_allow_html=True)
+
+    nav_left, nav_right = st.columns(2)
+    with nav_left:
+        if st.button("Back", key="transform_btnBack"):
+            go_back()
+    with nav_right:
+        if st.button("Home", key="transform_btnHome"):
+            go_home()
+
+    # =============================================================================
+    # RETRIEVE Data from st.session_state["create_data"]
+    # =============================================================================
+    if "create_data" not in st.session_state:
+        st.warning("No data found in st.session_state['create_data']. Please ensure your 'Create' page populates it.")
+        st.stop()
+
+    # Start with the latest saved data (a copy-on-write working frame, not a full copy).
+    df = load_lineage("create_data").frame()
+
+    # =============================================================================
+    # CARD 0: Aggregator Filter (Categorical)
+    # =============================================================================
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 0) Aggregator Filter (Categorical)")
+
+    # Get the list of categorical columns.
+    cat_cols = df.select_dtypes(include=["object", "category"]).columns.tolist()
+    if cat_cols:
+        # Allow user to choose which categorical columns they want to filter
+        filter_cols = st.multiselect("Select categorical columns to filter:", cat_cols, key="filter_cols")
+        for col in filter_cols:
+            # Build options: "All" plus all unique non-null values
+            unique_vals = sorted(df[col].dropna().unique().tolist())
+            opts = ["All"] + unique_vals
+            chosen_val = st.radio(f"Filter {col} by:", opts, index=0, horizontal=True, key=f"filter_{col}")
+            if chosen_val != "All":
+                df = df[df[col] == chosen_val]
+                if df.empty:
+                    st.warning(f"No data left after filtering {col} = {chosen_val}")
+                    st.markdown('</div>', unsafe_allow_html=True)
+                    st.stop()
+    else:
+        st.info("No categorical columns available for filtering.")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # =============================================================================
+    # CARD 1: Scaling Transformations for X and Y Columns
+    # =============================================================================
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 1) Scaling Transformations")
+
+    # Identify numeric columns from the (possibly filtered) DataFrame.
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+
+    colX, colY = st.columns(2)
+
+    with colX:
+        st.markdown("### X Columns (Multiple)")
+        if numeric_cols:
+            x_cols = st.multiselect("Choose one or more X numeric columns:", numeric_cols, key="x_cols")
+            x_method = st.selectbox("Select scaling method (X):", ["Standard", "MinMax", "Robust", "MeanNorm"], key="x_method")
+            x_suffix = st.text_input("Suffix for transformed X columns:", "_xScaled", key="x_suffix")
+        else:
+            st.info("No numeric columns available for X transformations.")
+            x_cols = []
+
+    with colY:
+        st.markdown("### Y Column (Single)")
+        if numeric_cols:
+            y_col = st.selectbox("Choose one Y numeric column:", ["None"] + numeric_cols, key="y_col")
+            if y_col != "None":
+                y_method = st.selectbox("Select scaling method (Y):", ["Standard", "MinMax", "Robust", "MeanNorm"], key="y_method")
+                y_suffix = st.text_input("Suffix for transformed Y column:", "_yScaled", key="y_suffix")
+            else:
+                y_method, y_suffix = None, ""
+        else:
+            st.info("No numeric columns available for Y transformation.")
+            y_col = "None"
+
+    # Helper function to perform scaling transformation.
+    def do_scale_transform(series: pd.Series, method: str) -> pd.Series:
+        s_clean = series.dropna()
+        if method == "Standard":
+            mu = s_clean.mean()
+            sigma = s_clean.std()
+            if sigma == 0:
+                return pd.Series(np.nan, index=series.index)
+            return (series - mu) / sigma
+        elif method == "MinMax":
+            mn = s_clean.min()
+            mx = s_clean.max()
+            if mx == mn:
+                return pd.Series(np.nan, index=series.index)
+            return (series - mn) / (mx - mn)
+        elif method == "Robust":
+            med = s_clean.median()
+            q1 = s_clean.quantile(0.25)
+            q3 = s_clean.quantile(0.75)
+            iqr = q3 - q1
+            if iqr == 0:
+                return pd.Series(np.nan, index=series.index)
+            return (series - med) / iqr
+        else:  # "MeanNorm"
+            mu = s_clean.mean()
+            mn = s_clean.min()
+            mx = s_clean.max()
+            denom = mx - mn
+            if denom == 0:
+                return pd.Series(np.nan, index=series.index)
+            return (series - mu) / denom
+
+    if st.button("Apply & Save Transformations", key="apply_transform_btn"):
+        # Apply transformation for each X column.
+        for col in x_cols:
+            new_col = col + x_suffix
+            df[new_col] = do_scale_transform(df[col], x_method)
+        # Apply transformation for the Y column.
+        if y_col != "None":
+            new_y = y_col + y_suffix
+            df[new_y] = do_scale_transform(df[y_col], y_method)
+        # Save updated data.
+        commit_frame("create_data", df, "Transform: scaling")
+        st.success("Transformations applied and data updated.")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # =============================================================================
+    # CARD 2: Comparison Chart ("Before vs After")
+    # =============================================================================
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 2) Comparison Chart")
+
+    # Re-read the latest updated data.
+    df_latest = load_lineage("create_data").frame()
+
+    # Build dynamic options for "original" and "transformed" columns.
+    orig_options = []
+    trans_options = []
+
+    # Original options come from the selected X columns and Y column.
+    if x_cols:
+        orig_options.extend(x_cols)
+    if y_col != "None":
+        orig_options.append(y_col)
+
+    # Build list of transformed column names.
+    for col in x_cols:
+        candidate = col + x_suffix
+        if candidate in df_latest.columns:
+            trans_options.append(candidate)
+    if y_col != "None":
+        candidate = y_col + y_suffix
+        if candidate in df_latest.columns:
+            trans_options.append(candidate)
+
+    orig_choice = st.selectbox("Select Original Column:", ["None"] + orig_options, key="orig_choice")
+    trans_choice = st.selectbox("Select Transformed Column:", ["None"] + trans_options, key="trans_choice")
+
+    chart_choice = st.radio("Select Chart Type:", ["Line", "Bar"], horizontal=True, key="chart_choice")
+    n_rows = st.slider("Rows to display in chart:", 5, 50, 10, key="chart_rows")
+
+    if orig_choice != "None" and trans_choice != "None":
+        comp_df = df_latest[[orig_choice, trans_choice]].head(n_rows).reset_index()
+        if chart_choice == "Line":
+            fig = px.line(comp_df, x="index", y=[orig_choice, trans_choice], markers=True)
+        else:
+            fig = px.bar(comp_df, x="index", y=[orig_choice, trans_choice], barmode="group")
+        fig.update_layout(margin=dict(l=40, r=40, t=40, b=40))
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Select an original and a transformed column to display a comparison chart.")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # =============================================================================
+    # CARD 3: Final DataFrame Preview and Universal Save Button
+    # =============================================================================
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 3) Final DataFrame Preview (Top 10 Rows)")
+    st.dataframe(df_latest.head(10), use_container_width=True)
+
+    # Universal Save Button: Save all current changes.
+    if st.button("Universal Save: Save All Changes", key="universal_save"):
+        commit_frame("create_data", df_latest, "Transform: universal save")
+        st.success("All changes have been universally saved to session state!")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Back"):
+            go_back()
+    with col2:
+        if st.button("Home"):
+            go_home()
+
+
+def Create_page():
+    
+    
+    import streamlit as st
+    import pandas as pd
+    import numpy as np
+
+    # -----------------------------------------------------------------------
+    # Load the DataFrame: Use updated data if available, otherwise use D0.
+    # -----------------------------------------------------------------------
+    if "create_data" not in st.session_state:
+        df = st.session_state.get("D0", None)
+        if df is None or df.empty:
+            st.warning("No data found in st.session_state['D0']. Please load or define it first.")
+            st.stop()
+        load_lineage("create_data", source=df)
+    local_df = load_lineage("create_data").frame()
+
+    # -----------------------------------------------------------------------
+    # 1) Custom CSS
+    # -----------------------------------------------------------------------
+    st.markdown("""
+    <style>
+    .stApp {
+        background-color: #F5F5F5;
+    }
+    .custom-header {
+        font-family: 'Inter', sans-serif;
+        font-size: 36px; 
+        font-weight: 600;
+        color: #333333;
+        margin-bottom: 0.2rem;
+    }
+    .subheader {
+        font-family: 'Inter', sans-serif;
+        font-size: 18px;
+        color: #666666;
+        margin-top: 0;
+        margin-bottom: 1rem;
+    }
+    .accent-hr {
+        border: 0;
+        height: 2px;
+        background: linear-gradient(to right, #FFBD59, #FFC87A);
+        margin: 0.5rem 0 1.5rem 0;
+    }
+    .card {
+        background-color: #FFFFFF; 
+        padding: 1.2rem 1.2rem;
+        margin-bottom: 1rem;
+        border-radius: 8px;
+        box-shadow: 2px 2px 10px rgba(0,0,0,0.05);
+    }
+    .card h2 {
+        font-family: 'Inter', sans-serif;
+        font-size: 24px;
+        margin: 0.2rem 0 1rem 0;
+        color: #333333;
+    }
+    div[data-testid="stHorizontalBlock"] button {
+        background-color: #FFBD59 !important; 
+        color: #333333 !important;
+        font-weight: 600 !important;
+        border-radius: 4px !important;
+        border: none !important;
+        margin-bottom: 0.5rem;
+    }
+    div[data-testid="stHorizontalBlock"] button:hover {
+        background-color: #FFC87A !important;
+    }
+    .dataframe-table {
+        font-family: 'Inter', sans-serif;
+        font-size: 14px;
+        color: #333333;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    st.markdown('<h1 class="custom-header">New Feature Creation</h1>', unsafe_allow_html=True)
+    st.markdown('<p class="subheader">Side-by-side aggregator filtering, numeric transforms, interactions, group-based, and date/time features. Final save at the bottom.</p>', unsafe_allow_html=True)
+    st.markdown('<hr class="accent-hr">', unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # CARD 0: Aggregator Filter
+    # -----------------------------------------------------------------------
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 0) Aggregator (Categorical) Filter")
+
+    cat_cols = local_df.select_dtypes(include=["object", "category"]).columns.tolist()
+    if cat_cols:
+        colAggLeft, colAggRight = st.columns(2)
+        with colAggLeft:
+            st.markdown("**Pick aggregator columns:**")
+            agg_multisel = st.multiselect(
+                "Aggregator columns",
+                cat_cols,
+                default=[],
+                key="agg_cols_multisel"
+            )
+        with colAggRight:
+            if agg_multisel:
+                st.markdown("**Choose category values**")
+                for colname in agg_multisel:
+                    distinct_vals = sorted(local_df[colname].dropna().unique())
+                    all_opt = "All"
+                    radio_opts = [all_opt] + list(distinct_vals)
+                    chosen_val = st.radio(
+                        f"{colname} Filter:",
+                        radio_opts,
+                        index=0,
+                        horizontal=True,
+                        key=f"aggfilter_{colname}"
+                    )
+                    if chosen_val != all_opt:
+                        local_df = local_df[local_df[colname] == chosen_val]
+                        if local_df.empty:
+                            st.warning(f"No data left after {colname} = {chosen_val}")
+                            st.markdown('</div>', unsafe_allow_html=True)
+                            st.stop()
+        # Button to apply the aggregator filter changes
+        if st.button("Apply Aggregator Filter", key="btn_apply_agg"):
+            commit_frame("create_data", local_df, "Create: Aggregator filter")
+            st.success("Aggregator filter applied.")
+    else:
+        st.info("No categorical columns found.")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # Get numeric columns from the updated DataFrame.
+    numeric_cols = local_df.select_dtypes(include=[np.number]).columns.tolist()
+
+    # -----------------------------------------------------------------------
+    # CARD 1: Basic Numeric Transforms
+    # -----------------------------------------------------------------------
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 1) Basic Numeric Transforms")
+
+    colNumLeft, colNumRight = st.columns(2)
+    with colNumLeft:
+        new_basic_col = st.text_input("New Numeric Feature Name", "NewNumeric1", key="basic_newcol")
+        basic_mode = st.radio("Mode:", ["Two-Column Arithmetic", "Single-Column"], horizontal=True, key="basic_mode_radio")
+    with colNumRight:
+        if basic_mode == "Two-Column Arithmetic":
+            if numeric_cols:
+                cA = st.selectbox("Column A:", ["(None)"] + numeric_cols, key="arith_colA")
+                cB_ = st.selectbox("Column B:", ["(None)"] + numeric_cols, key="arith_colB")
+                operation = st.selectbox("Operation:", ["Add", "Subtract", "Multiply", "Divide"], key="arith_op_sel")
+                if cA != "(None)" and cB_ != "(None)" and cA != cB_:
+                    if st.button("Create Feature", key="btn_basic_two"):
+                        if operation == "Add":
+                            local_df[new_basic_col] = local_df[cA] + local_df[cB_]
+                        elif operation == "Subtract":
+                            local_df[new_basic_col] = local_df[cA] - local_df[cB_]
+                        elif operation == "Multiply":
+                            local_df[new_basic_col] = local_df[cA] * local_df[cB_]
+                        else:  # "Divide"
+                            local_df[new_basic_col] = np.where(local_df[cB_] != 0, local_df[cA] / local_df[cB_], np.nan)
+                        commit_frame("create_data", local_df, "Create: Basic numeric transform")
+                        st.success(f"Created '{new_basic_col}' (not saved yet).")
+            else:
+                st.info("No numeric columns to transform.")
+        else:
+            if numeric_cols:
+                single_col = st.selectbox("Pick numeric column:", ["(None)"] + numeric_cols, key="single_sel")
+                single_op = st.selectbox("Transform:", ["Log", "Sqrt", "Negate"], key="single_op")
+                if single_col != "(None)":
+                    if st.button("Create Feature", key="btn_basic_single"):
+                        if single_op == "Log":
+                            local_df[new_basic_col] = np.where(local_df[single_col] > 0, np.log(local_df[single_col]), np.nan)
+                        elif single_op == "Sqrt":
+                            local_df[new_basic_col] = np.where(local_df[single_col] >= 0, np.sqrt(local_df[single_col]), np.nan)
+                        else:
+                            local_df[new_basic_col] = -1 * local_df[single_col]
+                        commit_frame("create_data", local_df, "Create: Single-column transform")
+                        st.success(f"Created '{new_basic_col}' (not saved yet).")
+            else:
+                st.info("No numeric columns to transform.")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # CARD 2: Interaction Features
+    # -----------------------------------------------------------------------
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 2) Interaction Features")
+
+    colIntLeft, colIntRight = st.columns(2)
+    with colIntLeft:
+        interact_mode = st.radio("Interaction:", ["Pairwise Numeric", "Feature Crossing (Categorical)", "Min/Max of Columns"], horizontal=True, key="interact_mode_sel")
+        new_interact_col = st.text_input("New Interaction Column:", "NewInteract1", key="interact_col_name")
+    with colIntRight:
+        if interact_mode == "Pairwise Numeric":
+            if numeric_cols:
+                x_col = st.selectbox("Numeric X:", ["(None)"] + numeric_cols, key="pairwise_x")
+                y_col = st.selectbox("Numeric Y:", ["(None)"] + numeric_cols, key="pairwise_y")
+                if x_col != "(None)" and y_col != "(None)" and x_col != y_col:
+                    if st.button("Create Pairwise Numeric", key="btn_pairwise"):
+                        local_df[new_interact_col] = local_df[x_col] * local_df[y_col]
+                        commit_frame("create_data", local_df, "Create: Pairwise numeric")
+                        st.success(f"Created '{new_interact_col}' (not saved yet).")
+            else:
+                st.info("No numeric columns remain.")
+        elif interact_mode == "Feature Crossing (Categorical)":
+            cat_after = local_df.select_dtypes(include=["object", "category"]).columns.tolist()
+            if cat_after:
+                catA = st.selectbox("Categorical A:", ["(None)"] + cat_after, key="catA_sel")
+                catB = st.selectbox("Categorical B:", ["(None)"] + cat_after, key="catB_sel")
+                if catA != "(None)" and catB != "(None)" and catA != catB:
+                    if st.button("Create Feature Crossing", key="btn_catCross"):
+                        local_df[new_interact_col] = local_df[catA].astype(str) + "_" + local_df[catB].astype(str)
+                        commit_frame("create_data", local_df, "Create: Feature crossing")
+                        st.success(f"Created '{new_interact_col}' (not saved yet).")
+            else:
+                st.info("No categorical columns remain.")
+        else:
+            multi_sel = st.multiselect("Pick numeric columns:", numeric_cols, key="minmax_multi")
+            mm_mode = st.selectbox("Compute:", ["Min", "Max"], key="minmax_mode")
+            if multi_sel:
+                if st.button("Create Min/Max", key="btn_minmax"):
+                    if mm_mode == "Min":
+                        local_df[new_interact_col] = local_df[multi_sel].min(axis=1)
+                    else:
+                        local_df[new_interact_col] = local_df[multi_sel].max(axis=1)
+                    commit_frame("create_data", local_df, "Create: Min/Max of columns")
+                    st.success(f"Created '{new_interact_col}' (not saved yet).")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # CARD 3: Group-Based Features
+    # -----------------------------------------------------------------------
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 3) Group-Based Features")
+
+    colGrpLeft, colGrpRight = st.columns(2)
+    with colGrpLeft:
+        cat_after_filter = local_df.select_dtypes(include=["object", "category"]).columns.tolist()
+        group_col = st.selectbox("Group Column:", ["(None)"] + cat_after_filter, key="group_col_sel")
+        group_newcol = st.text_input("New Group Feature Name:", "NewGroup1", key="group_newcol_name")
+    with colGrpRight:
+        group_op = st.selectbox("Operation:", ["Mean", "Count", "Difference from Mean"], key="group_op_mode")
+        if numeric_cols:
+            group_num = st.selectbox("Numeric Column for group stats:", ["(None)"] + numeric_cols, key="group_num_sel")
+        else:
+            group_num = "(None)"
+        if group_col != "(None)" and group_num != "(None)" and group_op and group_newcol:
+            if st.button("Create Group Feature", key="btn_group_feat"):
+                grouping = local_df.groupby(group_col, observed=True)[group_num]
+                if group_op == "Mean":
+                    local_df[group_newcol] = grouping.transform("mean")
+                elif group_op == "Count":
+                    local_df[group_newcol] = local_df.groupby(group_col, observed=True)[group_col].transform("count")
+                else:
+                    mean_vals = grouping.transform("mean")
+                    local_df[group_newcol] = local_df[group_num] - mean_vals
+                commit_frame("create_data", local_df, "Create: Group feature")
+                st.success(f"Created '{group_newcol}' with {group_op} of {group_num} (not saved yet).")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # CARD 4: Date/Time Features
+    # -----------------------------------------------------------------------
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 4) Date/Time Features")
+
+    colDtLeft, colDtRight = st.columns(2)
+    with colDtLeft:
+        all_cols = local_df.columns.tolist()
+        time_col_pick = st.selectbox("Pick a date/time column:", ["(None)"] + all_cols, key="time_colPick")
+        new_timecol = st.text_input("New Time Feature Name:", "NewTime1", key="new_timecol_text")
+    with colDtRight:
+        time_op = st.selectbox("Time Operation:", ["Extract Day/Month", "Delta from Now", "Lag by 1 row"], key="time_op_type")
+        if time_col_pick != "(None)":
+            if np.issubdtype(local_df[time_col_pick].dtype, np.datetime64):
+                pass
+            elif local_df[time_col_pick].dtype == object:
+                local_df[time_col_pick] = pd.to_datetime(local_df[time_col_pick], errors="coerce")
+                st.info(f"Converted {time_col_pick} to datetime64. Some rows might be NaT if parse failed.")
+            if not np.issubdtype(local_df[time_col_pick].dtype, np.datetime64):
+                st.warning(f"Column '{time_col_pick}' not valid datetime. Time-based transform might fail.")
+            else:
+                if st.button("Create Time Feature", key="btn_timefeat"):
+                    if time_op == "Extract Day/Month":
+                        local_df[new_timecol + "_day"] = local_df[time_col_pick].dt.day
+                        local_df[new_timecol + "_month"] = local_df[time_col_pick].dt.month
+                        st.success(f"Created {new_timecol+'_day'} and {new_timecol+'_month'} (not saved yet).")
+                    elif time_op == "Delta from Now":
+                        now = pd.to_datetime("today")
+                        local_df[new_timecol] = (now - local_df[time_col_pick]).dt.days
+                        st.success(f"Created '{new_timecol}' as day difference from now (not saved yet).")
+                    else:  # Lag by 1 row
+                        local_df[new_timecol] = local_df[time_col_pick].shift(1)
+                        st.success(f"Created lag column '{new_timecol}' from {time_col_pick} (not saved yet).")
+                    commit_frame("create_data", local_df, "Create: Time feature")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # CARD 5: Preview & Save
+    # -----------------------------------------------------------------------
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## 5) Preview & Save")
+    st.dataframe(local_df.head(10), use_container_width=True)
+    create_lineage = load_lineage("create_data")
+    with st.expander("Lineage (changes on top of the uploaded data)"):
+        st.caption(
+            f"{create_lineage.n_rows:,} of {len(create_lineage.base):,} rows · "
+            f"derived columns use {format_bytes(create_lineage.overlay_bytes())}"
+        )
+        for step in create_lineage.steps:
+            st.write(f"- {step}")
+    st.write("Confirm & Save new features to st.session_state['transform_data'].")
+    if st.button("Save All Changes", key="save_all_final"):
+        save_lineage("transform_data", create_lineage.commit(local_df, "Create: saved"))
+        st.success("All changes have been saved to st.session_state['transform_data']!")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # Navigation Buttons
+    # -----------------------------------------------------------------------
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Back"):
+            go_back()
+    with col2:
+        if st.button("Home"):
+            go_home()
+
+
+def Select_page():
+    import streamlit as st
+    import pandas as pd
+    import numpy as np
+
+    from sklearn.feature_selection import VarianceThreshold
+
+    st.title("Feature Selection Page")
+    st.write("Select features from the data in `st.session_state['transform_data']` using various techniques.")
+
+    # -----------------------------------------------------------------------
+    # A) Check for transform_data in session_state
+    # -----------------------------------------------------------------------
+    if "transform_data" not in st.session_state:
+        st.error("No data found in st.session_state['transform_data']. Please run the transform page first.")
+        st.stop()
+
+    # Copy-on-write working frame for local use
+    df = load_lineage("transform_data").frame()
+
+    st.markdown("### Initial Data Preview")
+    st.dataframe(df.head(10), use_container_width=True)
+
+    all_columns = df.columns.tolist()
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+
+    # -----------------------------------------------------------------------
+    # B) Pick Your Target (Y) and XGBoost Task
+    # -----------------------------------------------------------------------
+    st.markdown("## Select Target Variable & Task Type")
+    y_col = st.selectbox("Pick your target (Y) column:", ["(None)"] + all_columns, index=0)
+    task_type = st.radio("Task type for XGBoost:", ["Classifier", "Regressor"], index=0)
+    st.write("---")
+
+    # Helper: Minimal label encoding for classification if Y is not numeric
+    def label_encode_series(series: pd.Series) -> pd.Series:
+        """Converts any series into numeric codes (0, 1, 2...) for classification."""
+        return pd.Series(pd.factorize(series)[0], index=series.index)
+
+    # -----------------------------------------------------------------------
+    # C) Manual Feature Selection
+    # -----------------------------------------------------------------------
+    st.markdown("## A. Manual Feature Selection")
+    selected_manual = st.multiselect(
+        "Manually pick columns to keep:",
+        options=all_columns,
+        default=all_columns
+    )
+
+    st.write("Preview of manually selected columns:")
+    st.dataframe(df[selected_manual].head(10), use_container_width=True)
+
+    # -----------------------------------------------------------------------
+    # D) Correlation-Based Selection
+    # -----------------------------------------------------------------------
+    st.markdown("## B. Correlation-Based Selection")
+    selected_corr_cols = []
+
+    # Only attempt correlation if Y is numeric and not None
+    if y_col != "(None)" and y_col in numeric_cols:
+        corr_threshold = st.slider(
+            "Correlation threshold (absolute value):",
+            min_value=0.0, max_value=1.0,
+            value=0.0,  # default to minimal threshold
+            step=0.01
+        )
+        # DataFrame of only numeric columns
+        numeric_data = df[numeric_cols]
+        corrs = numeric_data.corr()[y_col].dropna()
+        # Filter columns by correlation threshold
+        high_corr = corrs[abs(corrs) >= corr_threshold]
+        selected_corr_cols = high_corr.index.tolist()  # includes y_col as well
+
+        st.write(f"Correlation with target '{y_col}' (above ±{corr_threshold}):")
+        st.dataframe(corrs.to_frame("Correlation"), use_container_width=True)
+        st.write(f"Columns with |corr| ≥ {corr_threshold}: {selected_corr_cols}")
+    else:
+        st.info("Correlation-based filtering skipped (either target is '(None)' or not numeric).")
+
+    # -----------------------------------------------------------------------
+    # E) Variance Threshold Filtering
+    # -----------------------------------------------------------------------
+    st.markdown("## C. Variance Threshold Filtering")
+    selected_var_cols = []
+
+    if numeric_cols:
+        var_threshold_value = st.slider(
+            "Variance threshold:",
+            min_value=0.0, max_value=10.0,
+            value=0.0, step=0.1
+        )
+
+        if st.button("Apply Variance Threshold"):
+            vt = VarianceThreshold(threshold=var_threshold_value)
+            numeric_data = df[numeric_cols].copy()
+
+            vt.fit(numeric_data)
+            keep_mask = vt.get_support()  # Boolean array
+            selected_var_cols = [col for col, keep in zip(numeric_cols, keep_mask) if keep]
+
+            st.write(f"Columns passing variance threshold of {var_threshold_value}:")
+            st.write(selected_var_cols if selected_var_cols else "(None)")
+        else:
+            st.info("Click 'Apply Variance Threshold' to see which columns pass the filter.")
+    else:
+        st.info("No numeric columns found for variance threshold selection.")
+
+    # -----------------------------------------------------------------------
+    # F) XGBoost Feature Importance
+    # -----------------------------------------------------------------------
+    st.markdown("## D. XGBoost Feature Importance")
+    selected_xgb_cols = []
+
+    # We'll fit a quick XGBoost model if the user has chosen a valid Y.
+    if y_col != "(None)":
+        # Let user trigger the feature-importance calculation (fitted in the background).
+        if st.button("Compute XGBoost Feature Importances", disabled=job_running(XGB_JOB)):
+            # Prepare X, y for XGBoost
+            X = df.drop(columns=[y_col], errors="ignore")
+
+            # Filter to numeric columns only for X
+            X = X.select_dtypes(include=[np.number])
+            # If Y is not numeric but the user wants classification, label-encode
+            y_series = df[y_col]
+            if task_type == "Classifier":
+                if y_series.dtype not in [np.number, np.float64, np.int64]:
+                    # Perform label encoding
+                    y_series = label_encode_series(y_series)
+            else:
+                # Regressor
+                # If y is not numeric, we can't do a simple regression
+                if y_series.dtype not in [np.number, np.float64, np.int64]:
+                    st.warning("Y is non-numeric. XGBRegressor won't work properly. Skipping.")
+                    st.stop()
+
+            submit_job(XGB_JOB, xgb_feature_importances, X, y_series, task_type, targets="xgb_importances")
+            st.session_state["xgb_importances_for"] = (y_col, task_type)
+            st.session_state.pop("xgb_importances", None)
+
+        outcome = finished_job(XGB_JOB)
+        if outcome is not None:
+            show_job_messages(outcome, failure="Error training XGBoost model")
+        importances = st.session_state.get("xgb_importances")
+        if job_running(XGB_JOB):
+            st.info("Training XGBoost in the background – see Background Jobs in the sidebar.")
+        elif importances is not None and st.session_state.get("xgb_importances_for") == (y_col, task_type):
+            st.write("XGBoost Feature Importances (descending):")
+            st.dataframe(importances, use_container_width=True)
+
+            # Let user set an importance threshold or top-k
+            imp_threshold = st.slider("Minimum importance threshold:", 0.0, 1.0, 0.0, 0.01)
+            # Filter columns by threshold
+            selected_xgb_cols = importances.loc[importances["Importance"] >= imp_threshold, "Feature"].tolist()
+
+            st.write(f"Columns with importance ≥ {imp_threshold}: {selected_xgb_cols if selected_xgb_cols else '(None)'}")
+        else:
+            st.info("Click 'Compute XGBoost Feature Importances' to see XGBoost-based filtering.")
+    else:
+        st.info("XGBoost feature importance skipped (no Y selected).")
+
+    # -----------------------------------------------------------------------
+    # G) Combine & Save Final Selection
+    # -----------------------------------------------------------------------
+    st.markdown("## E. Combine & Save Final Selection")
+    st.write("""
+    You can choose how to combine your selected sets:
+
+    - **Manual Only**  
+    - **Intersection of All** (Manual ∩ Correlation ∩ Variance ∩ XGBoost)  
+    - **Union of All** (Manual ∪ Correlation ∪ Variance ∪ XGBoost)
+    """)
+
+    combine_option = st.radio(
+        "How do you want to combine the selected sets?",
+        ["Manual Only", "Intersection of All", "Union of All"],
+        index=0
+    )
+
+    # Build sets from each selection method
+    manual_set = set(selected_manual)
+    corr_set = set(selected_corr_cols) if selected_corr_cols else set()
+    var_set = set(selected_var_cols) if selected_var_cols else set()
+    xgb_set = set(selected_xgb_cols) if selected_xgb_cols else set()
+
+    if combine_option == "Manual Only":
+        final_selection = list(manual_set)
+    elif combine_option == "Intersection of All":
+        # Intersect only the non-empty sets
+        sets_to_combine = [manual_set]
+        if corr_set:
+            sets_to_combine.append(corr_set)
+        if var_set:
+            sets_to_combine.append(var_set)
+        if xgb_set:
+            sets_to_combine.append(xgb_set)
+
+        final_selection = list(set.intersection(*sets_to_combine)) if sets_to_combine else []
+    else:  # "Union of All"
+        sets_to_combine = [manual_set, corr_set, var_set, xgb_set]
+        final_selection = list(set.union(*sets_to_combine))
+
+    st.write(f"**Final selection**: {final_selection if final_selection else '(None)'}")
+
+    if final_selection:
+        st.dataframe(df[final_selection].head(10), use_container_width=True)
+    else:
+        st.warning("No columns selected!")
+
+    # Button to save final selection
+    if st.button("Save Final Selection"):
+        st.session_state["selected_features"] = final_selection
+        st.success(f"Selected features saved to session_state['selected_features']: {final_selection}")
+
+
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Back"):
+            go_back()
+    with col2:
+        if st.button("Home"):
+            go_home()
@@ -0,0 +1,103 @@
+"""
+Session frames the pages share: which frames and columns each page reads,
+the interactive sample the exploratory pages chart, and the lineage of the
+feature-engineering frames.
+"""
+import streamlit as st
+
+from rgm.lineage import FrameLineage
+from rgm.sampling import DEFAULT_SAMPLE_ROWS, interactive_sample
+from rgm.schema import projection
+
+
+# Session-state frames each page reads besides D0. They are reloaded before the
+# page runs and never spilled while it is the current page; anything else is
+# spilled least-recently-used first once the session goes over its budget.
+PAGE_FRAME_KEYS = {
+    "section1_baseprice": ["dataframe1"],
+    "section1_promodepth": ["dataframe1"],
+    "section1_calendar": ["dataframe1"],
+    "section2_module1": ["final_df", "type2_dfs", "predictions_df"],
+    "section2_module2": ["dataframe1"],
+    "section3_module2": ["dataframe1"],
+    "myEDA": ["modified_data", "filtered_data"],
+}
+
+# Columns a page reads from its input frame. The page works on a projection of
+# D0 / dataframe1 to these, so the extract's other attributes are never copied,
+# hashed or merged by it (run_full_pipeline projects on its own group keys).
+PAGE_COLUMNS = {
+    "section1_market_construct": ["Date", "Market", "Channel", "Brand", "Variant", "PackType", "PPG", "SalesValue", "Volume"],
+    "section1_calendar": ["Date", "Channel", "Brand", "PPG", "Year", "Week", "SalesValue", "Volume", "Price", "BasePrice"],
+    "section2_module2": ["Date", "Channel", "Brand", "PPG", "Volume", "SalesValue"],
+}
+
+
+def page_columns(df, page):
+    """df projected to the columns PAGE_COLUMNS declares for page (the same object on every rerun)."""
+    return projection(df, PAGE_COLUMNS[page])
+
+
+# ----------------
+#   INTERACTIVE SAMPLE
+# ----------------
+def dataset_version(df):
+    """Digest of the uploaded dataset df is a handle on, or None for any other frame."""
+    for name, frame in st.session_state.get("uploaded_files", {}).items():
+        if frame is df:
+            return st.session_state.upload_info.get(name, {}).get("digest")
+    return None
+
+
+def exploration_frame(df, key):
+    """
+    The frame an exploratory page should chart: df itself, or its stratified
+    Channel × Brand × PPG sample while the sidebar's interactive-sample toggle
+    is on. Draws a "Run on full data" button; the rerun it triggers uses all
+    of df, so the numbers it shows are the final ones.
+    """
+    n_rows = int(st.session_state.get("interactive_sample_rows", DEFAULT_SAMPLE_ROWS))
+    if df is None or not st.session_state.get("interactive_sample", False) or len(df) <= n_rows:
+        return df
+    if st.button("▶ Run on full data", key=f"{key}_full_run"):
+        st.info(f"Computed on the full data ({len(df):,} rows).")
+        return df
+    sample = interactive_sample(df, n_rows, version=dataset_version(df))
+    st.caption(
+        f"🔬 Interactive sample: {len(sample):,} of {len(df):,} rows, stratified by Channel × Brand × PPG. "
+        "Use **Run on full data** for final numbers."
+    )
+    return sample
+
+
+# -------------------------------------------------------------------------
+# Dataset lineage for create_data / transform_data (Create, Transform, Select)
+# -------------------------------------------------------------------------
+# Each of these frames is kept as a FrameLineage (shared base + row filter +
+# overlay columns) under "<key>_lineage", and st.session_state[key] holds its
+# frame. Pages work on lineage.frame() and commit instead of copying.
+def load_lineage(key, source=None):
+    """
+    The FrameLineage behind st.session_state[key]. If the key was set some
+    other way, a new lineage starts from its frame; if it is empty, from source.
+    """
+    lineage = st.session_state.get(f"{key}_lineage")
+    frame = st.session_state.get(key)
+    if frame is None:
+        lineage = FrameLineage.from_frame(source)
+    elif lineage is None or not lineage.describes(frame):
+        lineage = FrameLineage.from_frame(frame)
+    else:
+        return lineage
+    save_lineage(key, lineage)
+    return lineage
+
+
+def save_lineage(key, lineage):
+    st.session_state[f"{key}_lineage"] = lineage
+    st.session_state[key] = lineage.frame()
+
+
+def commit_frame(key, df, step):
+    """Store df (a frame derived from load_lineage(key).frame()) as the new st.session_state[key]."""
+    save_lineage(key, load_lineage(key).commit(df, step))
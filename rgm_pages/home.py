@@ -0,0 +1,396 @@
+"""Home page and the section landing pages."""
+import streamlit as st
+
+from rgm_pages.navigation import go_back, go_home, go_to, section_names
+
+
+# ----------------
+#     HOME PAGE
+# ----------------
+def home_page():
+    st.title("Welcome to RGM App")
+    st.write("Below are three sections of the app. Click on their respective buttons to navigate.")
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    # Card for Section 1
+    with col1:
+        st.markdown(
+            """
+            <div class='custom-card'>
+              <h3 style="margin-top:0;">Base/Promo Detection</h3>
+              <p>Analyze, detect, and manage base/promo scenarios with advanced logic.</p>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+        if st.button("Go to Base/Promo Detection"):
+            go_to("section1")
+
+    # Card for Section 2
+    with col2:
+        st.markdown(
+            f"""
+            <div class='custom-card'>
+              <h3 style="margin-top:0;">{section_names['2']}</h3>
+              <p>Additional functionalities, data processing, or analytics for Section 2.</p>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+        if st.button("Go to Price/Promo Elasticity"):
+            go_to("section2")
+
+    # Card for Section 3
+    with col3:
+        st.markdown(
+            f"""
+            <div class='custom-card'>
+              <h3 style="margin-top:0;">{section_names['3']}</h3>
+              <p>Expand or explore tasks, visualizations, or reports for Section 3.</p>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+        if st.button("Go to RGM Pillars"):
+            go_to("section3")
+
+    # --- New Section 4: Engineer ---
+    with col4:
+        st.markdown(
+            f"""
+            <div class='custom-card'>
+              <h3 style="margin-top:0;">{section_names['4']}</h3>
+              <p>Manage engineering tasks, processes, or workflows.</p>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+        if st.button("Go to Engineer"):
+            go_to("section4")
+    
+    
+    # --------------------------------------------------------
+    # Subheading: "Other Advanced Tools from Quant Matrix AI"
+    # --------------------------------------------------------
+    st.markdown("---")  # horizontal rule
+    st.markdown("## Additional Advanced Solutions from Quant Matrix AI")
+
+# 4th Card: EDA (QuantMatrix Solutions)
+    st.markdown(
+        """
+        <div class='custom-card'>
+          <h3 style="margin-top:0;">QuantMatrix EDA Suite</h3>
+          <p>Perform advanced Exploratory Data Analysis, Clustering, Feature Importance, and more.</p>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+    if st.button("Go to EDA App"):
+        go_to("myEDA")  
+        
+        
+        
+# 4th Card: EDA (QuantMatrix Solutions)
+    st.markdown(
+        """
+        <div class='custom-card'>
+          <h3 style="margin-top:0;">QuantMatrix Modeling Suite</h3>
+          <p>Perform advanced Exploratory Data Analysis, Clustering, Feature Importance, and more.</p>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+    if st.button("Go to Modeling Suite"):
+        go_to("modelingSuite")  # or whichever route you use
+
+    st.markdown(
+        """
+        <div class='custom-card'>
+          <h3 style="margin-top:0;">Results Browser</h3>
+          <p>Reload base prices, promo bins, model results and saved models from earlier runs.</p>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+    if st.button("Go to Results Browser"):
+        go_to("results_browser")
+
+
+
+    st.markdown("""
+    ---
+    <div style='text-align:center; color:#666; font-size:0.9rem;'>
+    © 2025 RGM Tool &nbsp;|&nbsp; Powered by Quant Matrix AI &nbsp;–&nbsp; All Rights Reserved
+    </div>
+    """, unsafe_allow_html=True)
+
+
+# ------------------------------
+#  SECTION PAGE (Multi-Purpose)
+# ------------------------------
+def section_page(section_number):
+    displayed_name = section_names.get(section_number, f"Section {section_number}")
+    st.header(displayed_name)
+
+    # Only do special layout for section 1
+    if section_number == "1":
+        st.write("Below are the **three modules** for Base/Promo Detection.")
+        col1, col2, col3 = st.columns(3)
+        
+        # 1) Automated Base Price Estimator
+        with col1:
+            st.markdown(
+                """
+                <div class='custom-card'>
+                  <h4 style="margin-top:0;">Automated Base Price Estimator</h4>
+                  <p>Automatically estimate base prices using advanced ML or rule-based methods.</p>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+            if st.button("Go to Base Price Estimator"):
+                go_to("section1_baseprice")
+        
+        # 2) Automatic Promo Depth Estimator
+        with col2:
+            st.markdown(
+                """
+                <div class='custom-card'>
+                  <h4 style="margin-top:0;">Automatic Promo Depth Estimator</h4>
+                  <p>Automatically suggest promo depths or discounts based on historical data.</p>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+            if st.button("Go to Promo Depth Estimator"):
+                go_to("section1_promodepth")
+        
+        # 3) Promo Calendar Comparison
+        with col3:
+            st.markdown(
+                """
+                <div class='custom-card'>
+                  <h4 style="margin-top:0;">Promo Calendar Comparison</h4>
+                  <p>Compare different promo calendars, overlaps, and timing impact.</p>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+            if st.button("Go to Calendar Comparison"):
+                go_to("section1_calendar")
+                
+                
+        with col1:
+            st.markdown(
+                """
+                <div class='custom-card'>
+                  <h4 style="margin-top:0;">Market Construct</h4>
+                  <p>Compare different promo calendars, overlaps, and timing impact.</p>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+            if st.button("Go to Market Construct",key= "market"):
+                go_to("section1_market_construct")
+                
+                        # Divider + Navigation
+            st.markdown("---")
+            col_a, col_b = st.columns(2)
+            with col_a:
+                if st.button("Back"):
+                    go_back()
+            with col_b:
+                if st.button("Home"):
+                    go_home()
+                    
+
+                
+
+                
+    elif section_number == "2":
+            st.write("Below are the **three modules** for Price/Promo Elasticity.")
+            
+            col1, col2, col3 = st.columns(3)
+
+            # ============= MODULE 1 =============
+            with col1:
+                st.markdown(
+                    """
+                    <div class='custom-card'>
+                    <h4 style="margin-top:0;">Price/Promo Elasticity</h4>
+                    <p>Compute and analyze price/promo elasticity using various models.</p>
+                    </div>
+                    """,
+                    unsafe_allow_html=True
+                )
+                if st.button("Go to Price/Promo Elasticity"):
+                    go_to("section2_module1")  # route name
+
+            # ============= MODULE 2 =============
+            with col2:
+                st.markdown(
+                    """
+                    <div class='custom-card'>
+                    <h4 style="margin-top:0;">Post Modelling</h4>
+                    <p>Assess model outputs, validate results, and refine assumptions.</p>
+                    </div>
+                    """,
+                    unsafe_allow_html=True
+                )
+                if st.button("Go to Post Modelling"):
+                    go_to("section2_module2")
+
+            # ============= MODULE 3 =============
+            with col3:
+                st.markdown(
+                    """
+                    <div class='custom-card'>
+                    <h4 style="margin-top:0;">Scenario Planner</h4>
+                    <p>Explore ‘what-if’ scenarios and potential outcomes.</p>
+                    </div>
+                    """,
+                    unsafe_allow_html=True
+                )
+                if st.button("Go to Scenario Planner"):
+                    go_to("section2_module3")
+
+            # Divider + Navigation
+            st.markdown("---")
+            col_a, col_b = st.columns(2)
+            with col_a:
+                if st.button("Back"):
+                    go_back()
+            with col_b:
+                if st.button("Home"):
+                    go_home()
+
+                
+                
+    elif section_number == "3":
+            st.write("Below are the advanced modules for RGM analsyis.")
+            
+            col1, col2, col3 = st.columns(3)
+
+            # ============= MODULE 1 =============
+            with col1:
+                st.markdown(
+                    """
+                    <div class='custom-card'>
+                    <h4 style="margin-top:0;">🔖 Price Pack Architecture</h4>
+                    <p>Compute and analyze price/promo elasticity using various models.</p>
+                    </div>
+                    """,
+                    unsafe_allow_html=True
+                )
+                if st.button("Go to Price Pack Architecture"):
+                    go_to("section3_module1")  # route name
+
+            # ============= MODULE 2 =============
+            with col2:
+                st.markdown(
+                    """
+                    <div class='custom-card'>
+                    <h4 style="margin-top:0;">📶 Brand Ladder Analysis</h4>
+                    <p>Assess model outputs, validate results, and refine assumptions.</p>
+                    </div>
+                    """,
+                    unsafe_allow_html=True
+                )
+                if st.button("Go to Brand Ladder Analysis"):
+                    go_to("section3_module2")
+
+            # ============= MODULE 3 =============
+            with col3:
+                st.markdown(
+                    """
+                    <div class='custom-card'>
+                    <h4 style="margin-top:0;">🧮 Distribution Opportunity Analysis</h4>
+                    <p>Explore ‘what-if’ scenarios and potential outcomes.</p>
+                    </div>
+                    """,
+                    unsafe_allow_html=True
+                )
+                if st.button("Go to Distribution Opportunity Analysis"):
+                    go_to("section3_module3")
+                    
+                    
+
+
+
+
+    # 2) New Section 4 Layout
+    elif section_number == "4":
+        st.write("Below are the modules available for our Engineering workflows.")
+
+        # Four columns for the four modules
+        col1, col2, col3, col4 = st.columns(4)
+
+        # Module: Feature Overview
+        with col1:
+            st.markdown(
+                """
+                <div class='custom-card'>
+                  <h4 style="margin-top:0;">Feature Overview</h4>
+                  <p>Inspect and manage high-level feature sets.</p>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+            if st.button("Go to Feature Overview"):
+                go_to("section4_feature_overview")
+
+        # Module: Transform
+        with col3:
+            st.markdown(
+                """
+                <div class='custom-card'>
+                  <h4 style="margin-top:0;">Transform</h4>
+                  <p>Clean, transform, or reshape data through automated pipelines.</p>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+            if st.button("Go to Transform"):
+                go_to("section4_transform")
+
+        # Module: Create
+        with col2:
+            st.markdown(
+                """
+                <div class='custom-card'>
+                  <h4 style="margin-top:0;">Create</h4>
+                  <p>Generate new models, features, or engineering workflows.</p>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+            if st.button("Go to Create"):
+                go_to("section4_create")
+
+        # Module: Select
+        with col4:
+            st.markdown(
+                """
+                <div class='custom-card'>
+                  <h4 style="margin-top:0;">Select</h4>
+                  <p>Choose from different engineering strategies and approaches.</p>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+            if st.button("Go to Select"):
+                go_to("section4_select")
+
+        # Navigation controls
+        st.markdown("---")
+        nav_col1, nav_col2 = st.columns(2)
+        with nav_col1:
+            if st.button("Back"):
+                go_back()
+        with nav_col2:
+            if st.button("Home"):
+                go_home()
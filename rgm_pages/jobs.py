@@ -0,0 +1,156 @@
+"""
+Background jobs in the app (see rgm.jobs): submitting a page's long
+computation as a job of the current session, moving finished jobs' results
+into session state, and the sidebar job table.
+
+A job can name an artifact (stage, dataset fingerprint, parameters; see
+rgm.artifacts): if the store already has it, the result is attached at once
+and no job runs, otherwise the job stores its result when it finishes.
+
+Results are attached at the top of a full rerun (attach_finished_jobs, before
+the page runs), so a page sees them like any other session frame and can
+tell with finished_job(label) that a job of its own has just finished. The
+job table refreshes on its own while jobs are active and starts a full rerun
+as soon as one of them ends.
+"""
+import time
+import uuid
+
+import streamlit as st
+
+from rgm.artifacts import ArtifactStore, compute_and_save
+from rgm.jobs import CANCELLED, DONE, FAILED, JobRunner, job_warning
+
+
+# Seconds between job table refreshes while this session has active jobs
+JOB_POLL_SECONDS = 1.0
+
+
+@st.cache_resource
+def get_job_runner():
+    # One process pool per server process, shared by every session
+    return JobRunner()
+
+
+def session_owner():
+    if "job_owner" not in st.session_state:
+        st.session_state.job_owner = uuid.uuid4().hex
+    return st.session_state.job_owner
+
+
+def submit_job(label, fn, *args, targets=None, artifact=None, **kwargs):
+    """
+    Run fn(*args, **kwargs) in the background as a job of this session (see
+    JobRunner.submit). With artifact=(stage, dataset, params), a stored
+    result is used instead when there is one: it goes to targets right away,
+    finished_job(label) reports it (with its "artifact" metadata) and None
+    is returned.
+    """
+    if artifact is not None:
+        store = ArtifactStore()
+        stage, dataset, params = artifact
+        hit = store.load(stage, dataset, params)
+        if hit is not None:
+            result, meta = hit
+            store_result(targets, result)
+            st.session_state.setdefault("finished_jobs", {})[label] = {
+                "state": DONE, "warnings": [], "error": None, "artifact": meta,
+            }
+            return None
+        args = (store.root, stage, dataset, params, targets, label, fn, args, kwargs)
+        fn, kwargs = compute_and_save, {"warn": job_warning}
+    return get_job_runner().submit(session_owner(), label, fn, *args, targets=targets, **kwargs)
+
+
+def job_running(label):
+    """Whether this session has a queued or running job with this label."""
+    return bool(get_job_runner().active(session_owner(), label))
+
+
+def store_result(targets, result):
+    """Put result in session state under targets (see JobRunner.submit)."""
+    if targets is None:
+        return
+    if isinstance(targets, str):
+        st.session_state[targets] = result
+        return
+    for target, value in zip(targets, result):
+        for key in (target,) if isinstance(target, str) else (target or ()):
+            st.session_state[key] = value
+
+
+def attach_finished_jobs():
+    """
+    Store the results of this session's jobs that finished since the last
+    rerun under their targets. Their outcomes ({"state", "warnings",
+    "error"} by label) are kept for finished_job until the next rerun.
+    """
+    finished = {}
+    for job, result, warnings, error in get_job_runner().collect(session_owner()):
+        if job.state == DONE:
+            store_result(job.targets, result)
+        finished[job.label] = {"state": job.state, "warnings": warnings or [], "error": error}
+    st.session_state.finished_jobs = finished
+    return finished
+
+
+def finished_job(label):
+    """The outcome of this session's job with this label if it finished just before this rerun, else None."""
+    return st.session_state.get("finished_jobs", {}).get(label)
+
+
+def show_job_messages(outcome, failure="Background job failed"):
+    """Draw a finished job's warnings and error (if any) on the page."""
+    if "artifact" in outcome:
+        st.info(f"⚡ Loaded from the artifact store (computed {outcome['artifact']['created_at']}).")
+    for message in outcome["warnings"]:
+        st.warning(message)
+    if outcome["state"] == FAILED:
+        first_line = outcome["error"].splitlines()[0] if outcome["error"] else ""
+        st.error(f"{failure}: {first_line}")
+    elif outcome["state"] == CANCELLED:
+        st.info("Cancelled.")
+
+
+def _elapsed(job):
+    end = job.finished_at or time.time()
+    return f"{end - job.submitted_at:,.0f} s"
+
+
+def _job_table():
+    runner = get_job_runner()
+    owner = session_owner()
+    jobs = runner.jobs(owner)
+    if any(not job.collected and job.future.done() for job in jobs):
+        # Attach the result (and let the page show it) on a full rerun
+        st.rerun()
+
+    for job in reversed(jobs):
+        status = runner.status(job)
+        st.caption(f"**{job.label}** · {status} · {_elapsed(job)}")
+        if not job.collected:
+            st.progress(runner.progress(job))
+            st.button(
+                "Cancel",
+                key=f"job_cancel_{job.id}",
+                on_click=runner.cancel,
+                args=(job.id,),
+                disabled=job.cancel_requested,
+            )
+        elif status == FAILED:
+            with st.expander("Error"):
+                st.code(job.error)
+    if any(job.collected for job in jobs):
+        st.button("Clear finished jobs", key="job_clear", on_click=runner.forget, args=(owner,))
+
+
+def job_sidebar():
+    """The sidebar job table (nothing if this session never submitted a job)."""
+    runner = get_job_runner()
+    jobs = runner.jobs(session_owner())
+    if not jobs:
+        return
+    active = any(not job.collected for job in jobs)
+    with st.sidebar:
+        st.header("⚙️ Background Jobs")
+        st.fragment(_job_table, run_every=JOB_POLL_SECONDS if active else None)()
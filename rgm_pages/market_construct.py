@@ -0,0 +1,720 @@
+"""Market Construct page (section 1)."""
+from rgm.calendar import calendar_for, lookup, parse_dates
+from rgm.hierarchy import hierarchy_index
+from rgm.profiling import stage
+from rgm_pages.frames import exploration_frame, page_columns
+from rgm_pages.navigation import go_back, go_home
+
+
+# def market_construct_page():
+#     import streamlit as st
+#     import pandas as pd
+#     import numpy as np
+#     import plotly.express as px
+
+#     # -----------------------------------------------------------------------
+#     # 1) Retrieve Data
+#     # -----------------------------------------------------------------------
+#     df = st.session_state.get("D0", None)
+#     if df is None or df.empty:
+#         st.warning("No data uploaded yet. Please upload a file in the sidebar.")
+#         st.stop()
+
+#     # -----------------------------------------------------------------------
+#     # 2) Prepare Filter Options
+#     # -----------------------------------------------------------------------
+#     def sorted_or_all(col):
+#         if col in df.columns:
+#             return ["All"] + sorted(df[col].unique())
+#         else:
+#             return ["All"]
+
+#     market_options   = sorted_or_all("Market")
+#     channel_options  = sorted_or_all("Channel")
+#     metric_options   = ["MS Value", "Volume", "Price", "MS Volume"]
+#     time_options     = ["Weekly", "Monthly", "Yearly"]
+#     brand_options    = sorted_or_all("Brand")
+#     variant_options  = sorted_or_all("Variant")
+#     packtype_options = sorted_or_all("PackType")
+#     ppg_options      = sorted_or_all("PPG")
+
+#     # If any dimension has >5 items, enable radio wrap
+#     max_length = max(len(brand_options), len(variant_options), 
+#                      len(packtype_options), len(ppg_options))
+#     if max_length > 5:
+#         st.markdown("""
+#         <style>
+#         div[data-baseweb="radio"] > div {
+#             display: flex !important;
+#             flex-wrap: wrap !important;
+#         }
+#         div[data-baseweb="radio"] label {
+#             margin-right: 1rem; 
+#             margin-bottom: 0.5rem;
+#         }
+#         </style>
+#         """, unsafe_allow_html=True)
+
+#     # -----------------------------------------------------------------------
+#     # 3) CUSTOM CSS
+#     # -----------------------------------------------------------------------
+#     st.markdown("""
+#     <style>
+#     .stApp {
+#         background-color: #F5F5F5;
+#     }
+#     .custom-header {
+#         font-family: 'Inter', sans-serif;
+#         font-size: 36px; 
+#         font-weight: 600;
+#         color: #333333;
+#         margin-bottom: 0.2rem;
+#     }
+#     .accent-hr {
+#         border: 0;
+#         height: 2px;
+#         background: linear-gradient(to right, #FFBD59, #FFC87A);
+#         margin: 0.5rem 0 1.5rem 0;
+#     }
+#     div[data-testid="stHorizontalBlock"] button {
+#         background-color: #FFBD59 !important; 
+#         color: #333333 !important;
+#         font-weight: 600 !important;
+#         border-radius: 4px !important;
+#         border: none !important;
+#         margin-bottom: 0.5rem;
+#     }
+#     div[data-testid="stHorizontalBlock"] button:hover {
+#         background-color: #FFC87A !important;
+#     }
+#     </style>
+#     """, unsafe_allow_html=True)
+
+#     # -----------------------------------------------------------------------
+#     # 4) Page Header
+#     # -----------------------------------------------------------------------
+#     st.markdown('<h1 class="custom-header">Market Construct</h1>', unsafe_allow_html=True)
+
+#     # -----------------------------------------------------------------------
+#     # 5) Two-column layout for top filters
+#     # -----------------------------------------------------------------------
+#     left_col, right_col = st.columns([2, 3])
+
+#     with right_col:
+#         # Market & Channel
+#         top_r1_c1, top_r1_c2 = st.columns(2)
+#         with top_r1_c1:
+#             st.markdown("##### Market")
+#             chosen_market = st.selectbox("", market_options)
+#         with top_r1_c2:
+#             st.markdown("##### Channel")
+#             chosen_channel = st.selectbox("", channel_options)
+
+#         # Metric & Time
+#         st.markdown("##### Metric & Time")
+#         bottom_r_c1, bottom_r_c2 = st.columns(2)
+#         with bottom_r_c1:
+#             chosen_metric = st.radio("Metric:", metric_options, horizontal=True)
+#         with bottom_r_c2:
+#             chosen_time = st.radio("Time:", time_options, horizontal=True)
+
+#     with left_col:
+#         st.markdown("##### Product Filters")
+#         # 4 columns in a single row
+#         c_brand, c_variant, c_pt, c_ppg = st.columns(4)
+#         with c_brand:
+#             chosen_brand = st.radio("Brand:", brand_options, index=0, horizontal=True)
+#         with c_variant:
+#             chosen_variant = st.radio("Variant:", variant_options, index=0, horizontal=True)
+#         with c_pt:
+#             chosen_packtype = st.radio("PackType:", packtype_options, index=0, horizontal=True)
+#         with c_ppg:
+#             chosen_ppg = st.radio("PPG:", ppg_options, index=0, horizontal=True)
+
+#     st.markdown('<hr class="accent-hr">', unsafe_allow_html=True)
+
+#     # -----------------------------------------------------------------------
+#     # 6) Filter Data
+#     # -----------------------------------------------------------------------
+#     # Category-level subset => only Market & Channel
+#     cat_df = df.copy()
+#     if "Market" in cat_df.columns and chosen_market != "All":
+#         cat_df = cat_df[cat_df["Market"] == chosen_market]
+#     if "Channel" in cat_df.columns and chosen_channel != "All":
+#         cat_df = cat_df[cat_df["Channel"] == chosen_channel]
+
+#     # brand-level subset => also brand, variant, packtype, ppg
+#     brand_subset = cat_df.copy()
+#     if "Brand" in brand_subset.columns and chosen_brand != "All":
+#         brand_subset = brand_subset[brand_subset["Brand"] == chosen_brand]
+#     if "Variant" in brand_subset.columns and chosen_variant != "All":
+#         brand_subset = brand_subset[brand_subset["Variant"] == chosen_variant]
+#     if "PackType" in brand_subset.columns and chosen_packtype != "All":
+#         brand_subset = brand_subset[brand_subset["PackType"] == chosen_packtype]
+#     if "PPG" in brand_subset.columns and chosen_ppg != "All":
+#         brand_subset = brand_subset[brand_subset["PPG"] == chosen_ppg]
+
+#     # If cat_df is empty => no Category data
+#     # If brand_subset empty => no brand-level data
+
+#     # -----------------------------------------------------------------------
+#     # 7) Time Grouping
+#     # -----------------------------------------------------------------------
+#     cat_df["Date"] = pd.to_datetime(cat_df.get("Date",""), errors="coerce")
+#     cat_df.dropna(subset=["Date"], inplace=True)
+#     brand_subset["Date"] = pd.to_datetime(brand_subset.get("Date",""), errors="coerce")
+#     brand_subset.dropna(subset=["Date"], inplace=True)
+
+#     def set_time_key(df_, freq):
+#         df_ = df_.copy()
+#         if df_.empty:
+#             df_["TimeKey"] = []
+#             return df_
+#         if freq == "Weekly":
+#             df_["TimeKey"] = df_["Date"].dt.to_period("W").apply(lambda r: r.start_time)
+#         elif freq == "Monthly":
+#             df_["TimeKey"] = df_["Date"].dt.to_period("M").apply(lambda r: r.start_time)
+#         elif freq == "Yearly":
+#             df_["TimeKey"] = df_["Date"].dt.year
+#         else:
+#             df_["TimeKey"] = df_["Date"]
+#         return df_
+
+#     cat_df = set_time_key(cat_df, chosen_time)
+#     brand_subset = set_time_key(brand_subset, chosen_time)
+
+#     for col in ["SalesValue","Volume"]:
+#         if col not in cat_df.columns:
+#             cat_df[col] = 0.0
+#         if col not in brand_subset.columns:
+#             brand_subset[col] = 0.0
+
+#     # -----------------------------------------------------------------------
+#     # 8) Category aggregator => correct denominator
+#     # -----------------------------------------------------------------------
+#     cat_agg = cat_df.groupby("TimeKey", as_index=False).agg(
+#         CatSalesValue=("SalesValue","sum"),
+#         CatVolume=("Volume","sum")
+#     )
+
+#     # We'll define a function that merges brand-level aggregator with cat_agg
+#     # but also EXCLUDES aggregator dimension values that are e.g. "Cat1", "AllVariant", etc.
+
+#     # Let's define sets of dimension values to exclude:
+#     # You can adapt as needed
+#     EXCLUDED_BRANDS    = {"Cat1", "AllVariant", "AllBrand", "AllPPG", "AnyOtherAggregator"}
+#     EXCLUDED_VARIANTS  = {"AllVariantGroup", "CatVariant"}
+#     EXCLUDED_PACKTYPES = {"AllPack", "CatPack"}
+#     EXCLUDED_PPG       = {"AllPPG", "CatPPG"}
+
+#     def aggregator_for_dimension(df_, dim_col):
+#         """
+#         Groups brand_subset by [TimeKey, dim_col],
+#         merges with cat_agg for correct denominator,
+#         excludes aggregator dimension labels (like 'AllVariant'),
+#         and then computes 'Value' based on chosen_metric.
+#         """
+#         if df_.empty:
+#             return df_.assign(Value=[], CatSalesValue=[], CatVolume=[])
+
+#         # group
+#         grouped = df_.groupby(["TimeKey", dim_col], as_index=False).agg(
+#             SalesValue=("SalesValue","sum"),
+#             Volume=("Volume","sum")
+#         )
+#         # exclude aggregator dimension values
+#         # e.g. if dimension==Brand => skip brand in EXCLUDED_BRANDS
+#         if dim_col == "Brand":
+#             grouped = grouped[~grouped["Brand"].isin(EXCLUDED_BRANDS)]
+#         elif dim_col == "Variant":
+#             grouped = grouped[~grouped["Variant"].isin(EXCLUDED_VARIANTS)]
+#         elif dim_col == "PackType":
+#             grouped = grouped[~grouped["PackType"].isin(EXCLUDED_PACKTYPES)]
+#         elif dim_col == "PPG":
+#             grouped = grouped[~grouped["PPG"].isin(EXCLUDED_PPG)]
+
+#         # merge cat_agg => get CatSalesValue, CatVolume
+#         merged = pd.merge(grouped, cat_agg, on="TimeKey", how="left")
+
+#         if chosen_metric == "MS Value":
+#             merged["Value"] = np.where(
+#                 merged["CatSalesValue"]!=0,
+#                 merged["SalesValue"]/merged["CatSalesValue"],
+#                 0
+#             )
+#         elif chosen_metric == "Volume":
+#             merged["Value"] = merged["Volume"]
+#         elif chosen_metric == "Price":
+#             merged["Value"] = np.where(
+#                 merged["Volume"]!=0,
+#                 merged["SalesValue"]/merged["Volume"],
+#                 0
+#             )
+#         elif chosen_metric == "MS Volume":
+#             merged["Value"] = np.where(
+#                 merged["CatVolume"]!=0,
+#                 merged["Volume"]/merged["CatVolume"],
+#                 0
+#             )
+#         else:
+#             merged["Value"] = 0
+#         return merged
+
+#     # Category aggregator
+#     # We'll store for Category the dimension col "Dimension"= "Category"
+#     category_agg = cat_agg.copy()
+#     # compute "Value" for category itself
+#     if chosen_metric == "MS Value":
+#         # total / total => 1 if >0
+#         category_agg["Value"] = np.where(
+#             category_agg["CatSalesValue"]!=0, 1, 0
+#         )
+#     elif chosen_metric == "Volume":
+#         category_agg["Value"] = category_agg["CatVolume"]
+#     elif chosen_metric == "Price":
+#         category_agg["Value"] = np.where(
+#             category_agg["CatVolume"]!=0,
+#             category_agg["CatSalesValue"]/category_agg["CatVolume"],
+#             0
+#         )
+#     elif chosen_metric == "MS Volume":
+#         category_agg["Value"] = np.where(
+#             category_agg["CatVolume"]!=0, 1, 0
+#         )
+#     else:
+#         category_agg["Value"] = 0
+#     category_agg["Dimension"] = "Category"
+
+#     # brand aggregator
+#     brand_agg = aggregator_for_dimension(brand_subset, "Brand")
+#     # packtype aggregator
+#     packtype_agg = aggregator_for_dimension(brand_subset, "PackType")
+#     # ppg aggregator
+#     ppg_agg = aggregator_for_dimension(brand_subset, "PPG")
+#     # variant aggregator
+#     variant_agg = aggregator_for_dimension(brand_subset, "Variant")
+
+#     st.markdown(f"### {chosen_metric} ({chosen_time})")
+
+#     # We'll store them in a list
+#     all_charts = []
+#     if not category_agg.empty:
+#         all_charts.append(("Category", category_agg, "Dimension"))
+#     if not brand_agg.empty:
+#         all_charts.append(("Brand", brand_agg, "Brand"))
+#     if not packtype_agg.empty:
+#         all_charts.append(("PackType", packtype_agg, "PackType"))
+#     if not ppg_agg.empty:
+#         all_charts.append(("PPG", ppg_agg, "PPG"))
+#     if not variant_agg.empty:
+#         all_charts.append(("Variant", variant_agg, "Variant"))
+
+#     def build_chart(df_, dim_col):
+#         df_ = df_.copy().sort_values("TimeKey")
+#         if chosen_time == "Weekly":
+#             fig = px.line(df_, x="TimeKey", y="Value", color=dim_col,
+#                           markers=True, template="plotly_white")
+#         else:
+#             fig = px.bar(df_, x="TimeKey", y="Value", color=dim_col,
+#                          barmode="group", template="plotly_white")
+#         fig.update_layout(margin=dict(l=10, r=10, t=40, b=40))
+#         return fig
+
+#     # layout logic for multiple charts
+#     def layout_chunks(n):
+#         if n <= 4:
+#             return [n]
+#         elif n == 5:
+#             return [3,2]
+#         elif n == 6:
+#             return [3,3]
+#         elif n == 7:
+#             return [4,3]
+#         elif n == 8:
+#             return [4,4]
+#         else:
+#             leftover = n - 8
+#             return [4,4,leftover]
+
+#     n_charts = len(all_charts)
+#     if n_charts == 0:
+#         st.info("No dimension charts to display.")
+#         return
+
+#     chunk_sizes = layout_chunks(n_charts)
+#     idx = 0
+#     for size in chunk_sizes:
+#         row_data = all_charts[idx: idx+size]
+#         idx += size
+#         cols = st.columns(size)
+#         for i, (title, aggregator_df, dimension_col) in enumerate(row_data):
+#             with cols[i]:
+#                 st.write(f"#### {title} ({chosen_metric})")
+#                 fig = build_chart(aggregator_df, dimension_col)
+#                 st.plotly_chart(fig, use_container_width=True)
+#                 st.text_area(f"Comments ({title})", "")
+
+#     st.markdown('<hr class="accent-hr">', unsafe_allow_html=True)
+def market_construct_page():
+    import streamlit as st
+    import pandas as pd
+    import numpy as np
+    import plotly.express as px
+
+    # -----------------------------------------------------------------------
+    # 1) Retrieve Data
+    # -----------------------------------------------------------------------
+    df = st.session_state.get("D0", None)
+    if df is None or df.empty:
+        st.warning("No data uploaded yet. Please upload a file in the sidebar.")
+        st.stop()
+    df = page_columns(exploration_frame(df, "market_construct"), "section1_market_construct")
+
+    # -----------------------------------------------------------------------
+    # 1a) Leave out any rows where Brand == "cat 1"
+    #     (Happens before any filters/options so "cat 1" is never visible)
+    #     Options and subsets are row positions from the hierarchy index.
+    # -----------------------------------------------------------------------
+    hier = hierarchy_index(df)
+    excluded = {"Brand": "cat1"}
+    kept_rows = hier.filter_rows({}, exclude=excluded)
+    if len(kept_rows) == hier.n_rows:
+        kept_rows = None
+
+    # -----------------------------------------------------------------------
+    # 2) Prepare Options
+    # -----------------------------------------------------------------------
+    def sorted_or_all(col):
+        if col in df.columns:
+            return ["All"] + sorted(hier.values(col, rows=kept_rows))
+        else:
+            return ["All"]
+
+    market_options   = sorted_or_all("Market")
+    channel_options  = sorted_or_all("Channel")
+    metric_options   = ["MS Value", "Volume", "Price", "MS Volume"]
+    time_options     = ["Weekly", "Monthly", "Yearly"]
+    brand_options    = sorted_or_all("Brand")
+    variant_options  = sorted_or_all("Variant")
+    packtype_options = sorted_or_all("PackType")
+    ppg_options      = sorted_or_all("PPG")
+
+    # If large dimension, wrap radios
+    max_length = max(len(brand_options), len(variant_options), len(packtype_options), len(ppg_options))
+    if max_length > 5:
+        st.markdown("""
+        <style>
+        div[data-baseweb="radio"] > div {
+            display: flex !important;
+            flex-wrap: wrap !important;
+        }
+        div[data-baseweb="radio"] label {
+            margin-right: 1rem; 
+            margin-bottom: 0.5rem;
+        }
+        </style>
+        """, unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # 3) CUSTOM CSS
+    # -----------------------------------------------------------------------
+    st.markdown("""
+    <style>
+    .stApp {
+        background-color: #F5F5F5;
+    }
+    .custom-header {
+        font-family: 'Inter', sans-serif;
+        font-size: 36px; 
+        font-weight: 600;
+        color: #333333;
+        margin-bottom: 0.2rem;
+    }
+    .accent-hr {
+        border: 0;
+        height: 2px;
+        background: linear-gradient(to right, #FFBD59, #FFC87A);
+        margin: 0.5rem 0 1.5rem 0;
+    }
+    div[data-testid="stHorizontalBlock"] button {
+        background-color: #FFBD59 !important;
+        color: #333333 !important;
+        font-weight: 600 !important;
+        border-radius: 4px !important;
+        border: none !important;
+        margin-bottom: 0.5rem;
+    }
+    div[data-testid="stHorizontalBlock"] button:hover {
+        background-color: #FFC87A !important;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # 4) Page Header
+    # -----------------------------------------------------------------------
+    st.markdown('<h1 class="custom-header">Market Construct</h1>', unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # 5) Two-column layout for top filters
+    # -----------------------------------------------------------------------
+    left_col, right_col = st.columns([2,3])
+
+    with right_col:
+        # Market & Channel
+        top_c1, top_c2 = st.columns(2)
+        with top_c1:
+            st.markdown("##### Market")
+            chosen_market = st.selectbox("", market_options)
+        with top_c2:
+            st.markdown("##### Channel")
+            chosen_channel = st.selectbox("", channel_options)
+
+        st.markdown("##### Metric & Time")
+        bot_c1, bot_c2 = st.columns(2)
+        with bot_c1:
+            chosen_metric = st.radio("Metric:", metric_options, horizontal=True)
+        with bot_c2:
+            chosen_time = st.radio("Time:", time_options, horizontal=True)
+
+    with left_col:
+        st.markdown("##### Product Filters")
+        c1, c2, c3, c4 = st.columns(4)
+        with c1:
+            chosen_brand = st.radio("Brand:", brand_options, index=0, horizontal=True)
+        with c2:
+            chosen_variant = st.radio("Variant:", variant_options, index=0, horizontal=True)
+        with c3:
+            chosen_packtype = st.radio("PackType:", packtype_options, index=0, horizontal=True)
+        with c4:
+            chosen_ppg = st.radio("PPG:", ppg_options, index=0, horizontal=True)
+
+    st.markdown('<hr class="accent-hr">', unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # 6) Category Filter => Market & Channel
+    # -----------------------------------------------------------------------
+    cat_filters = {"Market": chosen_market, "Channel": chosen_channel}
+    cat_filters = {col: val for col, val in cat_filters.items() if val != "All"}
+    cat_df = df.iloc[hier.filter_rows(cat_filters, exclude=excluded)]
+
+    # brand-level subset => brand, variant, packtype, ppg
+    brand_filters = {"Brand": chosen_brand, "Variant": chosen_variant, "PackType": chosen_packtype, "PPG": chosen_ppg}
+    brand_filters = {col: val for col, val in brand_filters.items() if val != "All"}
+    brand_subset = df.iloc[hier.filter_rows({**cat_filters, **brand_filters}, exclude=excluded)]
+
+    # -----------------------------------------------------------------------
+    # 7) Time Key
+    # -----------------------------------------------------------------------
+    # Week / month starts come from D0's calendar table (parsed once at ingest)
+    calendar = calendar_for(st.session_state["D0"])
+
+    def set_time(df_, freq):
+        df_["Date"] = parse_dates(df_["Date"])
+        df_ = df_.dropna(subset=["Date"])
+        if df_.empty:
+            df_["TimeKey"] = []
+            return df_
+        key_col = {"Weekly": "WeekStart", "Monthly": "MonthStart", "Yearly": "Year"}.get(freq)
+        if key_col:
+            df_["TimeKey"] = lookup(df_, [key_col], calendar=calendar)[key_col]
+        else:
+            df_["TimeKey"] = df_["Date"]
+        return df_
+
+    cat_df = set_time(cat_df, chosen_time)
+    brand_subset = set_time(brand_subset, chosen_time)
+
+    for col in ["SalesValue","Volume"]:
+        if col not in cat_df.columns:
+            cat_df[col] = 0
+        if col not in brand_subset.columns:
+            brand_subset[col] = 0
+
+    # -----------------------------------------------------------------------
+    # 8) Category aggregator => sums for correct denominator
+    # -----------------------------------------------------------------------
+    with stage("category aggregation"):
+        cat_agg = cat_df.groupby("TimeKey", as_index=False).agg(
+            CatSalesValue=("SalesValue","sum"),
+            CatVolume=("Volume","sum")
+        )
+
+    # aggregator for dimension with correct share
+    def aggregator_for_dimension(df_, dim_col):
+        if df_.empty:
+            return df_.assign(Value=[], CatSalesValue=[], CatVolume=[])
+
+        grouped = df_.groupby(["TimeKey",dim_col], as_index=False, observed=True).agg(
+            SalesValue=("SalesValue","sum"),
+            Volume=("Volume","sum")
+        )
+
+        # Merge with cat_agg => get CatSalesValue, CatVolume
+        merged = pd.merge(grouped, cat_agg, on="TimeKey", how="left")
+
+        if chosen_metric == "MS Value":
+            merged["Value"] = np.where(
+                merged["CatSalesValue"] != 0,
+                merged["SalesValue"] / merged["CatSalesValue"],
+                0
+            )
+        elif chosen_metric == "Volume":
+            merged["Value"] = merged["Volume"]
+        elif chosen_metric == "Price":
+            merged["Value"] = np.where(
+                merged["Volume"] != 0,
+                merged["SalesValue"] / merged["Volume"],
+                0
+            )
+        elif chosen_metric == "MS Volume":
+            merged["Value"] = np.where(
+                merged["CatVolume"] != 0,
+                merged["Volume"] / merged["CatVolume"],
+                0
+            )
+        else:
+            merged["Value"] = 0
+        return merged
+
+    # We also define a function to check if dimension aggregator has only 1 unique value
+    # if user left dimension == "All", we'll skip aggregator if it has 1 unique dimension label
+    def skip_if_only_one(dim_df, dim_col, user_chosen):
+        """
+        Return True if we should skip aggregator because it has only 1 distinct dim_col
+        AND user_chosen is "All".
+        """
+        if user_chosen != "All":
+            return False  # user explicitly picked, so don't skip
+        distinct_vals = dim_df[dim_col].nunique()
+        return (distinct_vals <= 1)
+
+    # Category aggregator => dimension col "Dimension" = "Category"
+    # We'll compute Value for category aggregator
+    category_agg = cat_agg.copy()
+    if chosen_metric == "MS Value":
+        category_agg["Value"] = np.where(category_agg["CatSalesValue"]!=0, 1, 0)
+    elif chosen_metric == "Volume":
+        category_agg["Value"] = category_agg["CatVolume"]
+    elif chosen_metric == "Price":
+        category_agg["Value"] = np.where(
+            category_agg["CatVolume"]!=0,
+            category_agg["CatSalesValue"]/category_agg["CatVolume"],
+            0
+        )
+    elif chosen_metric == "MS Volume":
+        category_agg["Value"] = np.where(category_agg["CatVolume"]!=0, 1, 0)
+    else:
+        category_agg["Value"] = 0
+    category_agg["Dimension"] = "Category"
+
+    with stage("dimension aggregation"):
+        brand_agg = aggregator_for_dimension(brand_subset, "Brand")
+        pt_agg = aggregator_for_dimension(brand_subset, "PackType")
+        ppg_agg = aggregator_for_dimension(brand_subset, "PPG")
+        var_agg = aggregator_for_dimension(brand_subset, "Variant")
+
+    st.markdown(f"### {chosen_metric} ({chosen_time})")
+
+    # Collect all dimension chart data
+    dimension_charts = []
+
+    # Category aggregator is always included if not empty
+    if not category_agg.empty:
+        dimension_charts.append(("Category", category_agg, "Dimension"))
+
+    # Brand aggregator
+    if not brand_agg.empty:
+        if not skip_if_only_one(brand_agg, "Brand", chosen_brand):
+            dimension_charts.append(("Brand", brand_agg, "Brand"))
+        else:
+            st.warning("Skipped Brand aggregator because it has only one distinct brand, and user is at 'All' brand.")
+    else:
+        st.warning("No brand data after product filters.")
+
+    # PackType aggregator
+    if not pt_agg.empty:
+        if not skip_if_only_one(pt_agg, "PackType", chosen_packtype):
+            dimension_charts.append(("PackType", pt_agg, "PackType"))
+        else:
+            st.warning("Skipped PackType aggregator because it has only one distinct packtype, and user is at 'All'.")
+    else:
+        st.warning("No packtype data after product filters.")
+
+    # PPG aggregator
+    if not ppg_agg.empty:
+        if not skip_if_only_one(ppg_agg, "PPG", chosen_ppg):
+            dimension_charts.append(("PPG", ppg_agg, "PPG"))
+        else:
+            st.warning("Skipped PPG aggregator because it has only one distinct PPG, and user is at 'All'.")
+    else:
+        st.warning("No PPG data after product filters.")
+
+    # Variant aggregator
+    if not var_agg.empty:
+        if not skip_if_only_one(var_agg, "Variant", chosen_variant):
+            dimension_charts.append(("Variant", var_agg, "Variant"))
+        else:
+            st.warning("Skipped Variant aggregator because it has only one distinct variant, and user is at 'All'.")
+    else:
+        st.warning("No variant data after product filters.")
+
+    # Chart-building function
+    def build_chart(df_, dim_col):
+        df_ = df_.copy().sort_values("TimeKey")
+        if chosen_time == "Weekly":
+            fig = px.line(df_, x="TimeKey", y="Value", color=dim_col, markers=True, template="plotly_white")
+        else:
+            fig = px.bar(df_, x="TimeKey", y="Value", color=dim_col, barmode="group", template="plotly_white")
+        fig.update_layout(margin=dict(l=10, r=10, t=40, b=40))
+        return fig
+
+    # Layout logic
+    def layout_chunks(n):
+        if n <= 4:
+            return [n]
+        elif n == 5:
+            return [3,2]
+        elif n == 6:
+            return [3,3]
+        elif n == 7:
+            return [4,3]
+        elif n == 8:
+            return [4,4]
+        else:
+            leftover = n - 8
+            return [4,4,leftover]
+
+    # Output the aggregator charts
+    n_charts = len(dimension_charts)
+    if n_charts == 0:
+        st.info("No dimension charts to display.")
+        return
+
+    chunk_sizes = layout_chunks(n_charts)
+    idx = 0
+    with stage("charts"):
+        for row_size in chunk_sizes:
+            row_data = dimension_charts[idx : idx+row_size]
+            idx += row_size
+            cols = st.columns(row_size)
+            for i, (title, aggregator_df, dimension_col) in enumerate(row_data):
+                with cols[i]:
+                    st.write(f"#### {title} ({chosen_metric})")
+                    fig = build_chart(aggregator_df, dimension_col)
+                    st.plotly_chart(fig, use_container_width=True)
+                    st.text_area(f"Comments ({title})", "")
+
+    st.markdown('<hr class="accent-hr">', unsafe_allow_html=True)
+
+
+
+
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Back"):
+            go_back()
+    with col2:
+        if st.button("Home"):
+            go_home()
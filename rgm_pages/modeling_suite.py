@@ -0,0 +1,1119 @@
+"""Advanced regression modelling suite app."""
+from rgm_pages.navigation import go_home
+
+
+def modeling_suite_page():
+
+
+    import streamlit as st
+    # st.set_page_config(layout="wide", page_title="Advanced Regression Analysis Tool")
+
+    import pandas as pd
+    import numpy as np
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
+    from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler, LabelEncoder, OneHotEncoder
+    from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+    from sklearn.linear_model import LogisticRegression, LinearRegression
+    from sklearn.svm import SVC, SVR
+    from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor
+    from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor, plot_tree
+    from sklearn.metrics import (accuracy_score, precision_score, recall_score, f1_score, confusion_matrix,
+                                mean_squared_error, r2_score, classification_report, roc_curve, auc, mean_absolute_error)
+    from sklearn.feature_selection import SelectKBest, chi2, f_classif
+    from sklearn.decomposition import PCA
+    from scipy import stats
+    import io, base64, time, pickle, os
+
+    # ---------------------------------------------------
+    # Custom Constrained Ridge Regression
+    # ---------------------------------------------------
+    from sklearn.base import BaseEstimator, RegressorMixin
+
+    class ConstrainedRidge(BaseEstimator, RegressorMixin):
+        """
+        A custom ridge regression that enforces sign constraints on selected coefficients.
+        Constraints: dict { feature_index: 'positive'/'negative' }.
+        Minimizes MSE + alpha * ||w||^2 using a simple gradient descent approach.
+        """
+        def __init__(self, alpha=1.0, learning_rate=0.001, max_iter=5000,
+                    constraints=None, random_state=42, tol=1e-6):
+            self.alpha = alpha
+            self.learning_rate = learning_rate
+            self.max_iter = max_iter
+            self.constraints = constraints if constraints else {}
+            self.random_state = random_state
+            self.tol = tol
+            
+        def fit(self, X, y):
+            np.random.seed(self.random_state)
+            X = np.array(X)
+            y = np.array(y)
+            n, d = X.shape
+            self.coef_ = np.zeros(d)
+            self.intercept_ = 0.0
+            prev_loss = float('inf')
+            for iteration in range(self.max_iter):
+                y_pred = self.predict(X)
+                error = y_pred - y
+                mse = np.mean(error**2)
+                l2_reg = self.alpha * np.sum(self.coef_**2)
+                current_loss = mse + l2_reg
+                if abs(prev_loss - current_loss) < self.tol:
+                    break
+                prev_loss = current_loss
+                grad_w = (2/n)*X.T.dot(error) + 2*self.alpha*self.coef_
+                grad_b = (2/n)*np.sum(error)
+                lr = self.learning_rate / np.sqrt(iteration + 1) if iteration > 100 else self.learning_rate
+                self.coef_ -= lr * grad_w
+                self.intercept_ -= lr * grad_b
+                for idx, sign_req in self.constraints.items():
+                    if sign_req == "positive" and self.coef_[idx] < 0:
+                        self.coef_[idx] = 0.0001
+                    elif sign_req == "negative" and self.coef_[idx] > 0:
+                        self.coef_[idx] = -0.0001
+            self.n_iter_ = iteration + 1
+            return self
+
+        def predict(self, X):
+            return np.array(X).dot(self.coef_) + self.intercept_
+
+    # ---------------------------------------------------
+    # Utility: Restore Original Coefficients
+    # ---------------------------------------------------
+    def restore_original_coeffs_intercept(model, scaler, scaled_columns, original_feature_names):
+        """
+        Given a fitted linear model that was trained on scaled data,
+        restore the coefficients and intercept to the original scale.
+        This function assumes that the scaler has attributes scale_ and mean_.
+        Restoration is performed only for those features that were scaled.
+        """
+        if not hasattr(model, "coef_"):
+            return None, None
+        w_scaled = model.coef_
+        b_scaled = model.intercept_
+        if scaler is None or scaled_columns is None:
+            return w_scaled, b_scaled
+        if hasattr(scaler, "scale_") and hasattr(scaler, "mean_"):
+            scales = scaler.scale_
+            means = scaler.mean_
+            w_original = np.copy(w_scaled)
+            b_original = b_scaled
+            for i, feat in enumerate(original_feature_names):
+                if feat in scaled_columns:
+                    idx = scaled_columns.index(feat)
+                    w_original[i] = w_scaled[i] / scales[idx]
+                    b_original -= (w_scaled[i] * means[idx] / scales[idx])
+            return w_original, b_original
+        else:
+            return w_scaled, b_scaled
+
+    # ---------------------------------------------------
+    # Utility: Mean Absolute Percentage Error (MAPE)
+    # ---------------------------------------------------
+    def mean_absolute_percentage_error(y_true, y_pred):
+        y_true, y_pred = np.array(y_true), np.array(y_pred)
+        mask = y_true != 0
+        if not np.any(mask):
+            return np.nan
+        return np.mean(np.abs((y_true[mask] - y_pred[mask]) / y_true[mask])) * 100
+
+    # ---------------------------------------------------
+    # Outlier Functions
+    # ---------------------------------------------------
+    def remove_outliers_zscore(data, threshold, columns=None):
+        if columns is None:
+            columns = data.select_dtypes(include=['number']).columns
+        original_shape = data.shape[0]
+        outlier_info = {}
+        df_clean = data.copy()
+        for col in columns:
+            if col in df_clean.columns:
+                # Calculate z-scores on non-null values
+                z_scores = np.abs(stats.zscore(df_clean[col].dropna()))
+                # Create mask for rows with valid z-scores
+                mask = np.abs(stats.zscore(df_clean[col].dropna())) <= threshold
+                # Record outliers for reporting
+                outliers = df_clean[col].dropna()[~mask]
+                outlier_info[col] = {
+                    'count': len(outliers),
+                    'values': outliers.tolist() if len(outliers) <= 10 else outliers.tolist()[:10] + ['...more...']
+                }
+                # Remove outliers (retain rows that are NaN or where z-score <= threshold)
+                df_clean = df_clean[(np.abs(stats.zscore(df_clean[col].dropna())) <= threshold) | df_clean[col].isna()]
+        rows_removed = original_shape - df_clean.shape[0]
+        return df_clean, outlier_info, rows_removed
+
+    def remove_outliers_iqr(data, multiplier, columns=None):
+        if columns is None:
+            columns = data.select_dtypes(include=['number']).columns
+        original_shape = data.shape[0]
+        outlier_info = {}
+        df_clean = data.copy()
+        for col in columns:
+            if col in df_clean.columns:
+                Q1 = df_clean[col].quantile(0.25)
+                Q3 = df_clean[col].quantile(0.75)
+                IQR = Q3 - Q1
+                lower_bound = Q1 - multiplier * IQR
+                upper_bound = Q3 + multiplier * IQR
+                outliers = df_clean[col][(df_clean[col] < lower_bound) | (df_clean[col] > upper_bound)]
+                outlier_info[col] = {
+                    'count': len(outliers),
+                    'values': outliers.tolist() if len(outliers) <= 10 else outliers.tolist()[:10] + ['...more...'],
+                    'bounds': f"Lower: {lower_bound:.2f}, Upper: {upper_bound:.2f}"
+                }
+                df_clean = df_clean[~((df_clean[col] < lower_bound) | (df_clean[col] > upper_bound)) | df_clean[col].isna()]
+        rows_removed = original_shape - df_clean.shape[0]
+        return df_clean, outlier_info, rows_removed
+
+    # ---------------------------------------------------
+    # Multicollinearity Analysis Function
+    # ---------------------------------------------------
+    def plot_multicollinearity(df, threshold=0.8):
+        numeric_cols = df.select_dtypes(include=np.number).columns
+        if len(numeric_cols) < 2:
+            st.write("Not enough numeric features for multicollinearity analysis.")
+            return
+        corr_matrix = df[numeric_cols].corr().abs()
+        # Mask to show only correlations above the threshold (excluding 1.0)
+        high_corr = corr_matrix.where((corr_matrix >= threshold) & (corr_matrix < 1))
+        fig = px.imshow(high_corr, text_auto=True, color_continuous_scale='Reds', title=f'Multicollinearity (|corr| ≥ {threshold})')
+        st.plotly_chart(fig)
+
+    # ---------------------------------------------------
+    # Data Profiling Function (Modified)
+    # ---------------------------------------------------
+    def data_profiling(df):
+        st.markdown("### Data Summary")
+        st.write(df.describe().T)
+        st.markdown("### Unique Values per Column")
+        unique_df = pd.DataFrame({
+            "Column": df.columns,
+            "Unique Values": [", ".join(map(str, df[col].unique())) for col in df.columns]
+        })
+        st.dataframe(unique_df)
+        st.markdown("### Correlation Heatmap (Numeric Columns)")
+        numeric_cols = df.select_dtypes(include=np.number).columns
+        if len(numeric_cols) > 1:
+            corr = df[numeric_cols].corr()
+            fig = px.imshow(corr, text_auto=True, color_continuous_scale='RdBu_r', zmin=-1, zmax=1)
+            st.plotly_chart(fig)
+        else:
+            st.write("Not enough numeric columns for correlation analysis.")
+
+    # ---------------------------------------------------
+    # Feature Selection Functions
+    # ---------------------------------------------------
+    def correlation_feature_selection(df, target_col, threshold=0.1):
+        numeric_features = df.select_dtypes(include=np.number).columns.drop(target_col, errors='ignore')
+        corr_series = df[numeric_features].corrwith(df[target_col]).abs()
+        selected = corr_series[corr_series >= threshold].index.tolist()
+        return selected, corr_series.sort_values(ascending=False)
+
+    def selectkbest_feature_selection(df, target_col, k=5):
+        from sklearn.feature_selection import SelectKBest, f_regression, f_classif
+        numeric_features = df.select_dtypes(include=np.number).columns.drop(target_col, errors='ignore')
+        X = df[numeric_features]
+        y = df[target_col]
+        scoring = f_regression if np.issubdtype(y.dtype, np.number) else f_classif
+        selector = SelectKBest(scoring, k=min(k, X.shape[1]))
+        selector.fit(X, y)
+        mask = selector.get_support()
+        selected = X.columns[mask].tolist()
+        scores = selector.scores_
+        score_df = pd.DataFrame({"Feature": X.columns, "Score": scores}).sort_values("Score", ascending=False)
+        return selected, score_df
+
+    # ---------------------------------------------------
+    # Custom CSS for Styling (as provided)
+    # ---------------------------------------------------
+    st.markdown("""
+    <style>
+        .main-header {
+            font-size: 2.5rem;
+            color: #4682B4;
+            text-align: center;
+            margin-bottom: 30px;
+        }
+        .section-header {
+            color: #4682B4;
+            margin-top: 20px;
+            margin-bottom: 10px;
+        }
+        .card {
+            border-radius: 10px;
+            padding: 20px;
+            margin-bottom: 20px;
+            background-color: #f8f9fa;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+            transition: transform 0.3s ease;
+        }
+        .card:hover {
+            transform: translateY(-5px);
+        }
+        .card-title {
+            font-size: 1.5rem;
+            font-weight: bold;
+            margin-bottom: 10px;
+            color: #2c3e50;
+        }
+        .card-text {
+            color: #555;
+            margin-bottom: 15px;
+        }
+        .card-icon {
+            font-size: 2.5rem;
+            margin-bottom: 15px;
+            color: #4682B4;
+        }
+        .success-box {
+            padding: 10px;
+            background-color: #d4edda;
+            border-color: #c3e6cb;
+            color: #155724;
+            border-radius: 5px;
+            margin-bottom: 10px;
+        }
+        .warning-box {
+            padding: 10px;
+            background-color: #fff3cd;
+            border-color: #ffeeba;
+            color: #856404;
+            border-radius: 5px;
+            margin-bottom: 10px;
+        }
+        .info-box {
+            padding: 10px;
+            background-color: #d1ecf1;
+            border-color: #bee5eb;
+            color: #0c5460;
+            border-radius: 5px;
+            margin-bottom: 10px;
+        }
+    </style>
+    """, unsafe_allow_html=True)
+
+    # ---------------------------------------------------
+    # Session State Initialization
+    # ---------------------------------------------------
+    if 'progress' not in st.session_state:
+        st.session_state.progress = {
+            'data_uploaded': False,
+            'data_processed': False,
+            'features_engineered': False,
+            'model_built': False,
+            'model_evaluated': False
+        }
+    if 'page' not in st.session_state:
+        st.session_state.page = 'home'
+    if 'data' not in st.session_state:
+        st.session_state.data = None
+        st.session_state.X = None
+        st.session_state.y = None
+        st.session_state.X_train = None
+        st.session_state.X_test = None
+        st.session_state.y_train = None
+        st.session_state.y_test = None
+        st.session_state.model = None
+        st.session_state.predictions = None
+        st.session_state.target_column = None
+        st.session_state.feature_columns = None
+        st.session_state.numeric_columns = None
+        st.session_state.categorical_columns = None
+        st.session_state.transformations_applied = []
+        st.session_state.outliers_removed = False
+        st.session_state.removed_outliers_info = None
+        st.session_state.feature_importance = None
+        st.session_state.model_type = None
+        st.session_state.problem_type = None
+        st.session_state.metrics = {}
+        st.session_state.tree_fig = None
+        st.session_state.scaler = None
+        st.session_state.scaled_columns = None
+
+    # ---------------------------------------------------
+    # Utility Functions and Navigation Helpers
+    # ---------------------------------------------------
+    def create_tree_visualization(model, feature_names, class_names=None):
+        try:
+            fig = plt.figure(figsize=(20, 10))
+            if hasattr(model, 'estimators_'):
+                tree_to_plot = model.estimators_[0]
+            else:
+                tree_to_plot = model
+            plot_tree(tree_to_plot, feature_names=feature_names, class_names=class_names,
+                    filled=True, rounded=True, proportion=True)
+            plt.tight_layout()
+            return fig
+        except Exception as e:
+            st.error(f"Error creating tree visualization: {str(e)}")
+            return None
+
+    def create_card(title, description, icon, button_text, button_key, disabled=False):
+        st.markdown(f"""
+        <div class="card">
+            <div class="card-icon">{icon}</div>
+            <div class="card-title">{title}</div>
+            <div class="card-text">{description}</div>
+        </div>
+        """, unsafe_allow_html=True)
+        if st.button(button_text, key=button_key, disabled=disabled):
+            return True
+        return False
+
+    def show_progress_bar():
+        steps = ['data_uploaded', 'data_processed', 'features_engineered', 'model_built', 'model_evaluated']
+        step_names = ['Data Upload', 'Data Processing', 'Feature Engineering', 'Model Building', 'Evaluation']
+        completed = sum(st.session_state.progress[step] for step in steps)
+        progress_percentage = int((completed / len(steps)) * 100)
+        st.markdown(f"""
+        <div style="width:100%; background-color:#f1f1f1; border-radius:5px; margin-bottom:20px;">
+            <div style="width:{progress_percentage}%; height:10px; background-color:#4682B4; border-radius:5px;"></div>
+        </div>
+        """, unsafe_allow_html=True)
+        cols = st.columns(len(steps))
+        for i, (col, step, name) in enumerate(zip(cols, steps, step_names)):
+            with col:
+                if st.session_state.progress[step]:
+                    st.markdown(f'<div style="color:#28a745; font-weight:bold;">✓ {name}</div>', unsafe_allow_html=True)
+                elif i == completed:
+                    st.markdown(f'<div style="color:#4682B4; font-weight:bold;">→ {name}</div>', unsafe_allow_html=True)
+                else:
+                    st.markdown(f'<div style="color:#999;">{name}</div>', unsafe_allow_html=True)
+
+    def download_link(object_to_download, download_filename, download_link_text):
+        if isinstance(object_to_download, pd.DataFrame):
+            object_to_download = object_to_download.to_csv(index=False)
+        b64 = base64.b64encode(object_to_download.encode()).decode()
+        return f'<a href="data:file/txt;base64,{b64}" download="{download_filename}">{download_link_text}</a>'
+
+    # ---------------------------------------------------
+    # Pages of the App
+    # ---------------------------------------------------
+    def home_page():
+        st.markdown('<h1 class="main-header">Machine Learning Model Builder</h1>', unsafe_allow_html=True)
+        st.markdown('<p style="text-align: center; font-size: 1.2rem; margin-bottom: 30px;">Build machine learning models with ease - no coding required!</p>', unsafe_allow_html=True)
+        if any(st.session_state.progress.values()):
+            show_progress_bar()
+        col1, col2 = st.columns(2)
+        with col1:
+            if create_card("Data Upload", "Upload your dataset and explore its characteristics", "📊", "Start Data Upload", "start_data_upload"):
+                st.session_state.page = 'data_upload'
+                st.rerun()
+            if create_card("Feature Engineering", "Transform and create features to improve model performance", "🔧", "Start Feature Engineering", "start_feature_engineering", disabled=not st.session_state.progress['data_processed']):
+                st.session_state.page = 'feature_engineering'
+                st.rerun()
+        with col2:
+            if create_card("Data Processing", "Clean your data and prepare it for modeling", "🧹", "Start Data Processing", "start_data_processing", disabled=not st.session_state.progress['data_uploaded']):
+                st.session_state.page = 'data_processing'
+                st.rerun()
+            if create_card("Model Building", "Train machine learning models on your processed data", "🤖", "Start Model Building", "start_model_building", disabled=not st.session_state.progress['features_engineered']):
+                st.session_state.page = 'model_building'
+                st.rerun()
+        col1, col2 = st.columns(2)
+        with col1:
+            if create_card("Model Evaluation", "Evaluate your model's performance with detailed metrics", "📈", "Start Evaluation", "start_evaluation", disabled=not st.session_state.progress['model_built']):
+                st.session_state.page = 'evaluation'
+                st.rerun()
+        with col2:
+            if create_card("Export Results", "Export your model, predictions, and processed data", "💾", "Start Export", "start_export", disabled=not st.session_state.progress['model_evaluated']):
+                st.session_state.page = 'export'
+                st.rerun()
+        st.markdown('<h2 class="section-header">Or try with an example dataset</h2>', unsafe_allow_html=True)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("Iris Dataset", key="iris_example"):
+                from sklearn import datasets
+                data = datasets.load_iris()
+                df = pd.DataFrame(data.data, columns=data.feature_names)
+                df['target'] = data.target
+                st.session_state.data = df
+                st.session_state.progress['data_uploaded'] = True
+                st.success("Iris dataset loaded successfully!")
+                time.sleep(1)
+                st.session_state.page = 'data_upload'
+                st.rerun()
+        with col2:
+            if st.button("Wine Dataset", key="wine_example"):
+                from sklearn import datasets
+                data = datasets.load_wine()
+                df = pd.DataFrame(data.data, columns=data.feature_names)
+                df['target'] = data.target
+                st.session_state.data = df
+                st.session_state.progress['data_uploaded'] = True
+                st.success("Wine dataset loaded successfully!")
+                time.sleep(1)
+                st.session_state.page = 'data_upload'
+                st.rerun()
+        with col3:
+            if st.button("Breast Cancer Dataset", key="cancer_example"):
+                from sklearn import datasets
+                data = datasets.load_breast_cancer()
+                df = pd.DataFrame(data.data, columns=data.feature_names)
+                df['target'] = data.target
+                st.session_state.data = df
+                st.session_state.progress['data_uploaded'] = True
+                st.success("Breast Cancer dataset loaded successfully!")
+                time.sleep(1)
+                st.session_state.page = 'data_upload'
+                st.rerun()
+
+    def data_upload_page():
+        st.markdown('<h1 class="main-header">Data Upload</h1>', unsafe_allow_html=True)
+        show_progress_bar()
+        if st.session_state.data is None:
+            uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
+            if uploaded_file is not None:
+                try:
+                    df = pd.read_csv(uploaded_file)
+                    st.session_state.data = df
+                    st.session_state.progress['data_uploaded'] = True
+                    st.success("Dataset uploaded successfully!")
+                except Exception as e:
+                    st.error(f"Error: {e}")
+        if st.session_state.data is not None:
+            df = st.session_state.data
+            st.markdown('<h2 class="section-header">Dataset Overview</h2>', unsafe_allow_html=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write(f"**Rows:** {df.shape[0]}")
+                st.write(f"**Columns:** {df.shape[1]}")
+                st.write("**Memory Usage:** {:.2f} MB".format(df.memory_usage(deep=True).sum() / 1024**2))
+            with col2:
+                st.write("**Column Types:**")
+                dtypes = pd.DataFrame(df.dtypes.astype(str), columns=['Data Type'])
+                st.dataframe(dtypes)
+            st.markdown('<h3 class="section-header">Data Preview</h3>', unsafe_allow_html=True)
+            st.dataframe(df.head())
+            st.markdown('<h3 class="section-header">Missing Values</h3>', unsafe_allow_html=True)
+            missing_data = pd.DataFrame(df.isnull().sum(), columns=['Missing Values'])
+            missing_data['Percentage (%)'] = (df.isnull().sum() / len(df) * 100).round(2)
+            missing_data = missing_data[missing_data['Missing Values'] > 0]
+            if not missing_data.empty:
+                st.dataframe(missing_data)
+                fig = px.bar(missing_data, x=missing_data.index, y='Percentage (%)', title='Missing Values by Column')
+                st.plotly_chart(fig)
+            else:
+                st.write("No missing values found in the dataset.")
+            with st.expander("Data Profiling"):
+                data_profiling(df)
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("← Back to Home", key="data_upload_back"):
+                    st.session_state.page = 'home'
+                    st.rerun()
+            with col2:
+                if st.button("Proceed to Data Processing →", key="data_upload_next"):
+                    st.session_state.page = 'data_processing'
+                    st.rerun()
+
+    def data_processing_page():
+        st.markdown('<h1 class="main-header">Data Processing</h1>', unsafe_allow_html=True)
+        show_progress_bar()
+        if st.session_state.data is None:
+            st.warning("Please upload data first!")
+            return
+        df = st.session_state.data.copy()
+        st.markdown('<h2 class="section-header">Target Variable Selection</h2>', unsafe_allow_html=True)
+        target_col = st.selectbox("Select your target variable", df.columns)
+        st.session_state.target_column = target_col
+        feature_cols = [col for col in df.columns if col != target_col]
+        st.markdown('<h2 class="section-header">Feature Selection</h2>', unsafe_allow_html=True)
+        technique = st.radio("Select feature selection technique:", ["Manual", "Correlation-based", "SelectKBest", "All features except target"])
+        if technique == "Manual":
+            selected_features = st.multiselect("Select features to include", feature_cols, default=feature_cols)
+        elif technique == "Correlation-based":
+            threshold_corr = st.slider("Minimum absolute correlation with target", 0.0, 1.0, 0.1, 0.05)
+            selected_features, corr_scores = correlation_feature_selection(df, target_col, threshold_corr)
+            st.write("Features selected by correlation:")
+            st.dataframe(corr_scores.to_frame("Correlation"))
+            with st.expander("Multicollinearity Analysis"):
+                st.write("The heatmap below shows features that are highly correlated (|corr| ≥ 0.8) with each other.")
+                plot_multicollinearity(df[selected_features], threshold=0.8)
+        else:
+            selected_features = feature_cols
+            st.write("Using all features except the target.")
+        st.markdown('<h2 class="section-header">Missing Values Handling</h2>', unsafe_allow_html=True)
+        numeric_cols = df[selected_features].select_dtypes(include=np.number).columns.tolist()
+        categorical_cols = df[selected_features].select_dtypes(exclude=np.number).columns.tolist()
+        if df[selected_features].isnull().sum().sum() > 0:
+            st.markdown('<div class="info-box">Missing values detected in selected features</div>', unsafe_allow_html=True)
+            if len(numeric_cols) > 0:
+                num_impute = st.selectbox("Numeric columns imputation method:", ["Mean", "Median", "Zero", "Drop rows"])
+            if len(categorical_cols) > 0:
+                cat_impute = st.selectbox("Categorical columns imputation method:", ["Mode", "Constant value", "Drop rows"])
+                if cat_impute == "Constant value":
+                    constant_val = st.text_input("Enter constant value for missing data", "MISSING")
+        else:
+            st.markdown('<div class="success-box">No missing values in selected features</div>', unsafe_allow_html=True)
+        st.markdown('<h2 class="section-header">Outlier Detection</h2>', unsafe_allow_html=True)
+        if len(numeric_cols) > 0:
+            outlier_method = st.radio("Outlier detection method:", ["Z-Score", "IQR"])
+            if outlier_method == "Z-Score":
+                z_threshold = st.slider("Z-Score threshold", 2.0, 5.0, 3.0)
+            else:
+                iqr_multiplier = st.slider("IQR multiplier", 1.0, 3.0, 1.5)
+        else:
+            st.write("No numeric columns for outlier detection")
+        if st.button("Process Data", key="process_data"):
+            try:
+                processed_df = df[selected_features + [target_col]].copy()
+                for col in numeric_cols:
+                    if processed_df[col].isnull().sum() > 0:
+                        if num_impute == "Mean":
+                            processed_df[col] = processed_df[col].fillna(processed_df[col].mean())
+                        elif num_impute == "Median":
+                            processed_df[col] = processed_df[col].fillna(processed_df[col].median())
+                        elif num_impute == "Zero":
+                            processed_df[col] = processed_df[col].fillna(0)
+                        elif num_impute == "Drop rows":
+                            processed_df.dropna(subset=[col], inplace=True)
+                for col in categorical_cols:
+                    if processed_df[col].isnull().sum() > 0:
+                        if cat_impute == "Mode":
+                            processed_df[col] = processed_df[col].fillna(processed_df[col].mode()[0])
+                        elif cat_impute == "Constant value":
+                            processed_df[col] = processed_df[col].fillna(constant_val)
+                        elif cat_impute == "Drop rows":
+                            processed_df.dropna(subset=[col], inplace=True)
+                if len(numeric_cols) > 0:
+                    if outlier_method == "Z-Score":
+                        processed_df, outlier_info, rows_removed = remove_outliers_zscore(processed_df, z_threshold, numeric_cols)
+                        st.session_state.removed_outliers_info = {"method": "Z-Score", "info": outlier_info, "rows_removed": rows_removed}
+                    else:
+                        processed_df, outlier_info, rows_removed = remove_outliers_iqr(processed_df, iqr_multiplier, numeric_cols)
+                        st.session_state.removed_outliers_info = {"method": "IQR", "info": outlier_info, "rows_removed": rows_removed}
+                    if rows_removed > 0:
+                        st.session_state.outliers_removed = True
+                        st.info(f"Removed {rows_removed} outlier rows from the dataset.")
+                st.session_state.X = processed_df[selected_features]
+                st.session_state.y = processed_df[target_col]
+                st.session_state.numeric_columns = numeric_cols
+                st.session_state.categorical_columns = categorical_cols
+                st.session_state.feature_columns = selected_features
+                st.session_state.progress['data_processed'] = True
+                st.success("Data processing completed successfully!")
+                st.write(f"Processed data shape: {processed_df.shape}")
+            except Exception as e:
+                st.error(f"Error processing data: {str(e)}")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("← Back to Data Upload", key="data_proc_back"):
+                st.session_state.page = 'data_upload'
+                st.rerun()
+        with col2:
+            if st.button("Proceed to Feature Engineering →", key="data_proc_next") and st.session_state.progress['data_processed']:
+                st.session_state.page = 'feature_engineering'
+                st.rerun()
+
+    def feature_engineering_page():
+        st.markdown('<h1 class="main-header">Feature Engineering</h1>', unsafe_allow_html=True)
+        show_progress_bar()
+        if not st.session_state.progress['data_processed']:
+            st.warning("Please process data first!")
+            if st.button("Go to Data Processing"):
+                st.session_state.page = 'data_processing'
+                st.rerun()
+            return
+        X = st.session_state.X.copy()
+        numeric_cols = st.session_state.numeric_columns
+        categorical_cols = st.session_state.categorical_columns
+        st.markdown('<h2 class="section-header">Feature Transformations</h2>', unsafe_allow_html=True)
+        with st.expander("Basic Numeric Transformations", expanded=True):
+            st.markdown('<div class="info-box">Select columns for basic transformations</div>', unsafe_allow_html=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                log_cols = st.multiselect("Log transform (log(x+1))", numeric_cols)
+                sqrt_cols = st.multiselect("Square root transform", numeric_cols)
+            with col2:
+                square_cols = st.multiselect("Square transform", numeric_cols)
+                abs_cols = st.multiselect("Absolute value transform", numeric_cols)
+        with st.expander("Feature Scaling", expanded=True):
+            st.markdown('<div class="info-box">Scale numeric features for better model performance</div>', unsafe_allow_html=True)
+            scale_features = st.checkbox("Apply scaling to numeric features")
+            if scale_features:
+                scaling_method = st.selectbox("Select scaling method", ["StandardScaler (mean=0, std=1)", "MinMaxScaler (0-1 range)", "RobustScaler (robust to outliers)"])
+                scale_cols = st.multiselect("Select columns to scale", numeric_cols, default=numeric_cols)
+        if len(categorical_cols) > 0:
+            with st.expander("Categorical Encoding", expanded=True):
+                st.markdown('<div class="info-box">Convert categorical features to numeric format</div>', unsafe_allow_html=True)
+                encoding_method = st.selectbox("Select encoding method", ["One-Hot Encoding", "Label Encoding"])
+                encode_cols = st.multiselect("Select columns to encode", categorical_cols, default=categorical_cols)
+        with st.expander("Advanced Feature Generation"):
+            st.markdown('<div class="info-box">Create new features from existing ones</div>', unsafe_allow_html=True)
+            create_interactions = st.checkbox("Create interaction features")
+            if create_interactions and len(numeric_cols) >= 2:
+                interaction_cols = st.multiselect("Select columns for interactions", numeric_cols, default=numeric_cols[:min(2, len(numeric_cols))])
+            create_poly = st.checkbox("Create polynomial features")
+            if create_poly and len(numeric_cols) > 0:
+                poly_degree = st.slider("Polynomial degree", 2, 3, 2)
+                poly_cols = st.multiselect("Select columns for polynomial features", numeric_cols, default=numeric_cols[:min(2, len(numeric_cols))])
+        with st.expander("Custom Multiple Transformations"):
+            st.markdown('<div class="info-box">Apply a custom transformation to selected columns</div>', unsafe_allow_html=True)
+            trans_method = st.selectbox("Select transformation method", ["StandardScaler", "MinMaxScaler", "RobustScaler", "Log", "Sqrt", "Square", "Absolute"])
+            trans_columns = st.multiselect("Select columns to apply", numeric_cols)
+            if st.button("Apply Custom Transformation"):
+                df_temp = st.session_state.X.copy()
+                if trans_method == "StandardScaler":
+                    scaler_custom = StandardScaler()
+                    df_temp[trans_columns] = scaler_custom.fit_transform(df_temp[trans_columns])
+                    transformation_desc = f"Applied StandardScaler to {trans_columns}"
+                    st.session_state.scaler = scaler_custom
+                    st.session_state.scaled_columns = trans_columns
+                elif trans_method == "MinMaxScaler":
+                    scaler_custom = MinMaxScaler()
+                    df_temp[trans_columns] = scaler_custom.fit_transform(df_temp[trans_columns])
+                    transformation_desc = f"Applied MinMaxScaler to {trans_columns}"
+                    st.session_state.scaler = scaler_custom
+                    st.session_state.scaled_columns = trans_columns
+                elif trans_method == "RobustScaler":
+                    scaler_custom = RobustScaler()
+                    df_temp[trans_columns] = scaler_custom.fit_transform(df_temp[trans_columns])
+                    transformation_desc = f"Applied RobustScaler to {trans_columns}"
+                    st.session_state.scaler = scaler_custom
+                    st.session_state.scaled_columns = trans_columns
+                elif trans_method == "Log":
+                    df_temp[trans_columns] = np.log1p(df_temp[trans_columns])
+                    transformation_desc = f"Applied Log transform to {trans_columns}"
+                elif trans_method == "Sqrt":
+                    df_temp[trans_columns] = np.sqrt(np.abs(df_temp[trans_columns]))
+                    transformation_desc = f"Applied Sqrt transform to {trans_columns}"
+                elif trans_method == "Square":
+                    df_temp[trans_columns] = df_temp[trans_columns] ** 2
+                    transformation_desc = f"Applied Square transform to {trans_columns}"
+                elif trans_method == "Absolute":
+                    df_temp[trans_columns] = np.abs(df_temp[trans_columns])
+                    transformation_desc = f"Applied Absolute transform to {trans_columns}"
+                st.session_state.X = df_temp
+                st.session_state.transformations_applied.append(transformation_desc)
+                st.success(transformation_desc)
+        if st.button("Apply Feature Engineering", key="apply_transformations"):
+            try:
+                transformations_applied = []
+                X_transformed = st.session_state.X.copy()
+                for col in log_cols:
+                    X_transformed[f"log_{col}"] = np.log1p(X_transformed[col])
+                    transformations_applied.append(f"Applied log transform to {col}")
+                for col in sqrt_cols:
+                    X_transformed[f"sqrt_{col}"] = np.sqrt(np.abs(X_transformed[col]))
+                    transformations_applied.append(f"Applied sqrt transform to {col}")
+                for col in square_cols:
+                    X_transformed[f"square_{col}"] = X_transformed[col] ** 2
+                    transformations_applied.append(f"Applied square transform to {col}")
+                for col in abs_cols:
+                    X_transformed[f"abs_{col}"] = np.abs(X_transformed[col])
+                    transformations_applied.append(f"Applied absolute transform to {col}")
+                if scale_features and scale_cols:
+                    if scaling_method.startswith("StandardScaler"):
+                        scaler = StandardScaler()
+                        X_transformed[scale_cols] = scaler.fit_transform(X_transformed[scale_cols])
+                    elif scaling_method.startswith("MinMaxScaler"):
+                        scaler = MinMaxScaler()
+                        X_transformed[scale_cols] = scaler.fit_transform(X_transformed[scale_cols])
+                    else:
+                        scaler = RobustScaler()
+                        X_transformed[scale_cols] = scaler.fit_transform(X_transformed[scale_cols])
+                    transformations_applied.append(f"Applied {scaling_method.split()[0]} to {len(scale_cols)} features")
+                    st.session_state.scaler = scaler
+                    st.session_state.scaled_columns = scale_cols
+                if len(categorical_cols) > 0 and encode_cols:
+                    if encoding_method == "One-Hot Encoding":
+                        X_encoded = pd.get_dummies(X_transformed, columns=encode_cols)
+                        X_transformed = X_encoded
+                        transformations_applied.append(f"Applied one-hot encoding to {len(encode_cols)} features")
+                    else:
+                        encoders = {}
+                        for col in encode_cols:
+                            le = LabelEncoder()
+                            X_transformed[col] = le.fit_transform(X_transformed[col].astype(str))
+                            encoders[col] = le
+                        transformations_applied.append(f"Applied label encoding to {len(encode_cols)} features")
+                if create_interactions and len(interaction_cols) >= 2:
+                    for i in range(len(interaction_cols)):
+                        for j in range(i+1, len(interaction_cols)):
+                            col1, col2 = interaction_cols[i], interaction_cols[j]
+                            X_transformed[f"{col1}_x_{col2}"] = X_transformed[col1] * X_transformed[col2]
+                    num_interactions = len(interaction_cols) * (len(interaction_cols) - 1) // 2
+                    transformations_applied.append(f"Created {num_interactions} interaction features")
+                if create_poly and poly_cols:
+                    from sklearn.preprocessing import PolynomialFeatures
+                    poly = PolynomialFeatures(degree=poly_degree, include_bias=False)
+                    poly_features = poly.fit_transform(X_transformed[poly_cols])
+                    feature_names = poly.get_feature_names_out(poly_cols)
+                    orig_features_count = len(poly_cols)
+                    poly_df = pd.DataFrame(poly_features[:, orig_features_count:], columns=feature_names[orig_features_count:], index=X_transformed.index)
+                    X_transformed = pd.concat([X_transformed, poly_df], axis=1)
+                    transformations_applied.append(f"Created {poly_df.shape[1]} polynomial features (degree {poly_degree})")
+                st.session_state.X = X_transformed
+                st.session_state.transformations_applied.extend(transformations_applied)
+                st.session_state.progress['features_engineered'] = True
+                st.success("Feature engineering completed successfully!")
+                st.markdown('<h3 class="section-header">Transformation Summary</h3>', unsafe_allow_html=True)
+                for transform in transformations_applied:
+                    st.write(f"- {transform}")
+                st.markdown('<h3 class="section-header">Transformed Dataset Preview</h3>', unsafe_allow_html=True)
+                st.write(f"Original features: {st.session_state.X.shape[1] - len(transformations_applied)}, New features: {st.session_state.X.shape[1]}")
+                st.dataframe(st.session_state.X.head())
+            except Exception as e:
+                st.error(f"Error during feature engineering: {str(e)}")
+                import traceback
+                st.text(traceback.format_exc())
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("← Back to Data Processing", key="feat_eng_back"):
+                st.session_state.page = 'data_processing'
+                st.rerun()
+        with col2:
+            if st.button("Proceed to Model Building →", key="feat_eng_next") and st.session_state.progress['features_engineered']:
+                st.session_state.page = 'model_building'
+                st.rerun()
+
+    def model_building_page():
+        st.markdown('<h1 class="main-header">Model Building</h1>', unsafe_allow_html=True)
+        show_progress_bar()
+        if not st.session_state.progress['features_engineered']:
+            st.warning("Please complete feature engineering first!")
+            if st.button("Go to Feature Engineering"):
+                st.session_state.page = 'feature_engineering'
+                st.rerun()
+            return
+        X = st.session_state.X
+        y = st.session_state.y
+        if y.dtype == 'object' or len(y.unique()) <= 10:
+            st.error("This section is for regression models only. Please ensure your target variable is numeric.")
+            return
+        problem_type = "Regression"
+        st.session_state.problem_type = problem_type
+        st.markdown('<h2 class="section-header">Model Selection</h2>', unsafe_allow_html=True)
+        st.markdown('<div class="info-box">Regression Problem Detected</div>', unsafe_allow_html=True)
+        reg_models = ["Random Forest", "Decision Tree", "Linear Regression", "Gradient Boosting",
+                    "Support Vector Machine", "K-Nearest Neighbors", "Ridge Regression",
+                    "Constrained Ridge Regression", "Bayesian Ridge Regression"]
+        model_choice = st.selectbox("Select a model", reg_models)
+        st.session_state.model_type = model_choice
+        st.markdown('<h2 class="section-header">Model Configuration</h2>', unsafe_allow_html=True)
+        random_state = st.number_input("Random seed", 0, 999, 42)
+        if model_choice == "Random Forest":
+            n_estimators = st.slider("Number of estimators", 10, 500, 100, 10)
+            max_depth = st.slider("Maximum depth", 1, 30, 10)
+            min_samples_split = st.slider("Minimum samples to split", 2, 20, 2)
+            min_samples_leaf = st.slider("Minimum samples in leaf", 1, 20, 1)
+        elif model_choice == "Decision Tree":
+            max_depth = st.slider("Maximum depth", 1, 30, 10)
+            min_samples_split = st.slider("Minimum samples to split", 2, 20, 2)
+            min_samples_leaf = st.slider("Minimum samples in leaf", 1, 20, 1)
+        elif model_choice == "Linear Regression":
+            pass
+        elif model_choice == "Gradient Boosting":
+            n_estimators = st.slider("Number of estimators", 10, 500, 100, 10)
+            max_depth = st.slider("Maximum depth", 1, 30, 10)
+            learning_rate = st.slider("Learning rate", 0.01, 0.5, 0.1, 0.01)
+            min_samples_split = st.slider("Minimum samples to split", 2, 20, 2)
+            min_samples_leaf = st.slider("Minimum samples in leaf", 1, 20, 1)
+        elif model_choice == "Support Vector Machine":
+            C = st.slider("Regularization strength (C)", 0.1, 10.0, 1.0, 0.1)
+            kernel = st.selectbox("Kernel", ["rbf", "linear", "poly", "sigmoid"])
+            gamma = st.selectbox("Gamma", ["scale", "auto"]) if kernel in ["rbf", "poly", "sigmoid"] else None
+        elif model_choice == "K-Nearest Neighbors":
+            n_neighbors = st.slider("Number of neighbors", 1, 20, 5)
+            weights = st.selectbox("Weight function", ["uniform", "distance"])
+        elif model_choice == "Ridge Regression":
+            alpha = st.slider("Alpha (regularization strength)", 0.01, 10.0, 1.0, 0.01)
+        elif model_choice == "Constrained Ridge Regression":
+            alpha = st.slider("Alpha (regularization strength)", 0.01, 10.0, 1.0, 0.01)
+            learning_rate = st.slider("Learning Rate", 0.0001, 0.1, 0.001, 0.0001)
+            max_iter = st.slider("Max Iterations", 1000, 10000, 5000, 500)
+            st.write("Specify sign constraints for features (optional):")
+            constraints = {}
+            for i, feature in enumerate(st.session_state.feature_columns):
+                constraint = st.selectbox(f"Constraint for {feature}", ["None", "Positive", "Negative"], key=f"constraint_{feature}")
+                if constraint == "Positive":
+                    constraints[i] = "positive"
+                elif constraint == "Negative":
+                    constraints[i] = "negative"
+        elif model_choice == "Bayesian Ridge Regression":
+            alpha_1 = st.slider("Alpha 1", 1e-7, 1e-5, 1e-6, 1e-7)
+            alpha_2 = st.slider("Alpha 2", 1e-7, 1e-5, 1e-6, 1e-7)
+            lambda_1 = st.slider("Lambda 1", 1e-7, 1e-5, 1e-6, 1e-7)
+            lambda_2 = st.slider("Lambda 2", 1e-7, 1e-5, 1e-6, 1e-7)
+        st.markdown('<h2 class="section-header">Train-Test Split</h2>', unsafe_allow_html=True)
+        test_size = st.slider("Test size (%)", 10, 40, 20) / 100
+        if st.button("Train Model", key="train_model_btn"):
+            with st.spinner("Training model..."):
+                X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+                if model_choice == "Random Forest":
+                    from sklearn.ensemble import RandomForestRegressor
+                    model = RandomForestRegressor(n_estimators=n_estimators, max_depth=max_depth,
+                                                min_samples_split=min_samples_split, min_samples_leaf=min_samples_leaf,
+                                                random_state=random_state)
+                elif model_choice == "Decision Tree":
+                    from sklearn.tree import DecisionTreeRegressor
+                    model = DecisionTreeRegressor(max_depth=max_depth, min_samples_split=min_samples_split,
+                                                min_samples_leaf=min_samples_leaf, random_state=random_state)
+                elif model_choice == "Linear Regression":
+                    model = LinearRegression()
+                elif model_choice == "Gradient Boosting":
+                    from sklearn.ensemble import GradientBoostingRegressor
+                    model = GradientBoostingRegressor(n_estimators=n_estimators, max_depth=max_depth,
+                                                    learning_rate=learning_rate, min_samples_split=min_samples_split,
+                                                    min_samples_leaf=min_samples_leaf, random_state=random_state)
+                elif model_choice == "Support Vector Machine":
+                    if kernel in ["rbf", "poly", "sigmoid"]:
+                        model = SVR(C=C, kernel=kernel, gamma=gamma)
+                    else:
+                        model = SVR(C=C, kernel=kernel)
+                elif model_choice == "K-Nearest Neighbors":
+                    model = KNeighborsRegressor(n_neighbors=n_neighbors, weights=weights)
+                elif model_choice == "Ridge Regression":
+                    from sklearn.linear_model import Ridge
+                    model = Ridge(alpha=alpha, random_state=random_state)
+                elif model_choice == "Constrained Ridge Regression":
+                    model = ConstrainedRidge(alpha=alpha, learning_rate=learning_rate, max_iter=max_iter,
+                                            constraints=constraints, random_state=random_state)
+                elif model_choice == "Bayesian Ridge Regression":
+                    from sklearn.linear_model import BayesianRidge
+                    model = BayesianRidge(alpha_1=alpha_1, alpha_2=alpha_2, lambda_1=lambda_1, lambda_2=lambda_2,
+                                        random_state=random_state)
+                model.fit(X_train, y_train)
+                y_pred = model.predict(X_test)
+                st.session_state.model = model
+                st.session_state.X_train = X_train
+                st.session_state.X_test = X_test
+                st.session_state.y_train = y_train
+                st.session_state.y_test = y_test
+                st.session_state.predictions = y_pred
+                st.session_state.progress['model_built'] = True
+                mse = mean_squared_error(y_test, y_pred)
+                r2 = r2_score(y_test, y_pred)
+                rmse = np.sqrt(mse)
+                mae = mean_absolute_error(y_test, y_pred)
+                mape = mean_absolute_percentage_error(y_test, y_pred)
+                st.metric("Mean Squared Error", f"{mse:.4f}")
+                st.metric("R² Score", f"{r2:.4f}")
+                st.metric("MAE", f"{mae:.4f}")
+                st.metric("MAPE (%)", f"{mape:.2f}")
+                st.session_state.metrics = {'mse': mse, 'r2': r2, 'rmse': rmse, 'mae': mae, 'mape': mape}
+                if hasattr(model, "coef_"):
+                    coef_names = list(st.session_state.X.columns)
+                    if st.session_state.scaler is not None and st.session_state.scaled_columns is not None:
+                        w_orig, b_orig = restore_original_coeffs_intercept(model, st.session_state.scaler,
+                                                                        st.session_state.scaled_columns, coef_names)
+                    else:
+                        w_orig, b_orig = model.coef_, model.intercept_
+                    coef_df = pd.DataFrame({
+                        "Feature": coef_names,
+                        "Coefficient": w_orig,
+                        "Absolute Coefficient": np.abs(w_orig)
+                    }).sort_values(by="Absolute Coefficient", ascending=False)
+                    st.markdown("<h3 class='section-header'>Model Coefficients (Betas) and Equation</h3>", unsafe_allow_html=True)
+                    st.dataframe(coef_df)
+                    st.write(f"Intercept: {b_orig:.4f}")
+                    eq_terms = []
+                    for i, feat in enumerate(coef_names):
+                        if i >= 5:
+                            eq_terms.append("...")
+                            break
+                        eq_terms.append(f"({w_orig[i]:.4f})*{feat}")
+                    equation = f"y = {b_orig:.4f} + " + " + ".join(eq_terms)
+                    st.write("**Regression Equation:**")
+                    st.code(equation)
+                else:
+                    st.write("Model does not provide coefficients.")
+                st.success("Model training completed successfully!")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("← Back to Feature Engineering", key="model_back"):
+                st.session_state.page = 'feature_engineering'
+                st.rerun()
+        with col2:
+            if st.button("Proceed to Evaluation →", key="model_next") and st.session_state.progress['model_built']:
+                st.session_state.page = 'evaluation'
+                st.rerun()
+
+    def evaluation_page():
+        st.markdown('<h1 class="main-header">Model Evaluation</h1>', unsafe_allow_html=True)
+        show_progress_bar()
+        if not st.session_state.progress['model_built']:
+            st.warning("Please build a model first!")
+            if st.button("Go to Model Building"):
+                st.session_state.page = 'model_building'
+                st.rerun()
+            return
+        problem_type = st.session_state.problem_type
+        model = st.session_state.model
+        X_test = st.session_state.X_test
+        y_test = st.session_state.y_test
+        y_pred = st.session_state.predictions
+        st.markdown('<h2 class="section-header">Model Information</h2>', unsafe_allow_html=True)
+        st.write(f"**Model Type:** {st.session_state.model_type}")
+        st.write(f"**Problem Type:** {problem_type}")
+        st.markdown('<h2 class="section-header">Regression Metrics</h2>', unsafe_allow_html=True)
+        mse = mean_squared_error(y_test, y_pred)
+        rmse = np.sqrt(mse)
+        r2 = r2_score(y_test, y_pred)
+        mae = mean_absolute_error(y_test, y_pred)
+        mape = mean_absolute_percentage_error(y_test, y_pred)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Mean Squared Error (MSE)", f"{mse:.4f}")
+            st.metric("Root Mean Squared Error (RMSE)", f"{rmse:.4f}")
+            st.metric("MAE", f"{mae:.4f}")
+        with col2:
+            st.metric("R² Score", f"{r2:.4f}")
+            st.metric("MAPE (%)", f"{mape:.2f}")
+        st.markdown('<h3 class="section-header">Predictions vs Actual Values</h3>', unsafe_allow_html=True)
+        fig = px.scatter(x=y_test, y=y_pred, labels=dict(x='Actual Values', y='Predicted Values'), title='Predicted vs Actual Values')
+        min_val = min(min(y_test), min(y_pred))
+        max_val = max(max(y_test), max(y_pred))
+        fig.add_shape(type='line', line=dict(dash='dash', color='red'), x0=min_val, y0=min_val, x1=max_val, y1=max_val)
+        st.plotly_chart(fig)
+        st.markdown('<h3 class="section-header">Residuals Analysis</h3>', unsafe_allow_html=True)
+        residuals = y_test - y_pred
+        fig = px.scatter(x=y_pred, y=residuals, labels=dict(x='Predicted Values', y='Residuals'), title='Residuals vs Predicted Values')
+        fig.add_hline(y=0, line_dash='dash', line_color='red')
+        st.plotly_chart(fig)
+        fig = px.histogram(residuals, title='Distribution of Residuals', labels=dict(x='Residuals', y='Count'))
+        st.plotly_chart(fig)
+        st.markdown('<h2 class="section-header">Cross-Validation</h2>', unsafe_allow_html=True)
+        cv_folds = st.slider("Number of cross-validation folds", 2, 10, 5)
+        if st.button("Perform Cross-Validation", key="perform_cv"):
+            with st.spinner("Running cross-validation..."):
+                scoring = 'r2'
+                cv_scores = cross_val_score(model, pd.concat([st.session_state.X_train, st.session_state.X_test]),
+                                            pd.concat([st.session_state.y_train, st.session_state.y_test]),
+                                            cv=cv_folds, scoring=scoring)
+                st.markdown('<h3 class="section-header">Cross-Validation Results</h3>', unsafe_allow_html=True)
+                cv_df = pd.DataFrame({'Fold': range(1, cv_folds+1), 'Score': cv_scores})
+                fig = px.bar(cv_df, x='Fold', y='Score', title=f'Cross-Validation Scores ({scoring})')
+                fig.add_hline(y=cv_scores.mean(), line_dash='dash', line_color='red')
+                st.plotly_chart(fig)
+                st.write(f"**Mean {scoring}:** {cv_scores.mean():.4f}")
+                st.write(f"**Standard Deviation:** {cv_scores.std():.4f}")
+        st.session_state.progress['model_evaluated'] = True
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("← Back to Model Building", key="eval_back"):
+                st.session_state.page = 'model_building'
+                st.rerun()
+        with col2:
+            if st.button("Proceed to Export →", key="eval_next"):
+                st.session_state.page = 'export'
+                st.rerun()
+
+    def export_page():
+        st.markdown('<h1 class="main-header">Export Results</h1>', unsafe_allow_html=True)
+        show_progress_bar()
+        if not st.session_state.progress['model_evaluated']:
+            st.warning("Please evaluate your model first!")
+            if st.button("Go to Evaluation"):
+                st.session_state.page = 'evaluation'
+                st.rerun()
+            return
+        st.markdown('<h2 class="section-header">Download Options</h2>', unsafe_allow_html=True)
+        st.markdown("""
+        <div class="info-box">
+            Export your model, processed data, and results for future use.
+        </div>
+        """, unsafe_allow_html=True)
+        st.markdown('<h3 class="section-header">Processed Data</h3>', unsafe_allow_html=True)
+        if st.button("Export Processed Data", key="export_data_btn"):
+            processed_data = pd.concat([st.session_state.X, st.session_state.y], axis=1)
+            csv = processed_data.to_csv(index=False)
+            st.download_button(label="Download CSV", data=csv, file_name="processed_data.csv", mime="text/csv")
+        st.markdown('<h3 class="section-header">Predictions</h3>', unsafe_allow_html=True)
+        if st.button("Export Predictions", key="export_pred_btn"):
+            predictions_df = pd.DataFrame({'Actual': st.session_state.y_test, 'Predicted': st.session_state.predictions})
+            csv = predictions_df.to_csv(index=False)
+            st.download_button(label="Download Predictions", data=csv, file_name="predictions.csv", mime="text/csv")
+        if st.session_state.tree_fig is not None:
+            st.markdown('<h3 class="section-header">Tree Visualization</h3>', unsafe_allow_html=True)
+            if st.button("Export Tree Visualization", key="export_tree_viz_btn"):
+                buf = io.BytesIO()
+                st.session_state.tree_fig.savefig(buf, format='png', dpi=300, bbox_inches='tight')
+                buf.seek(0)
+                st.download_button(label="Download Tree Visualization (PNG)", data=buf, file_name="decision_tree.png", mime="image/png")
+        st.markdown('<h3 class="section-header">Trained Model</h3>', unsafe_allow_html=True)
+        if st.button("Export Model (pickle format)", key="export_model_btn"):
+            model_pickle = pickle.dumps(st.session_state.model)
+            st.download_button(label="Download Model", data=model_pickle, file_name="trained_model.pkl", mime="application/octet-stream")
+        st.markdown('<h3 class="section-header">Model Report</h3>', unsafe_allow_html=True)
+        if st.button("Generate Model Report", key="export_report_btn"):
+            problem_type = st.session_state.problem_type
+            model_type = st.session_state.model_type
+            report_content = f"""
+            # Machine Learning Model Report
+
+            ## Model Information
+            - **Model Type**: {model_type}
+            - **Problem Type**: {problem_type}
+            - **Date Created**: {time.strftime("%Y-%m-%d %H:%M:%S")}
+
+            ## Dataset Information
+            - **Original Features**: {len(st.session_state.feature_columns)}
+            - **Engineered Features**: {len(st.session_state.X.columns)}
+            - **Total Samples**: {len(st.session_state.X)}
+            - **Training Samples**: {len(st.session_state.X_train)}
+            - **Testing Samples**: {len(st.session_state.X_test)}
+
+            ## Feature Transformations Applied
+            """
+            for transform in st.session_state.transformations_applied:
+                report_content += f"- {transform}\n"
+            report_content += "\n## Model Performance\n"
+            y_test = st.session_state.y_test
+            y_pred = st.session_state.predictions
+            mse = mean_squared_error(y_test, y_pred)
+            r2 = r2_score(y_test, y_pred)
+            mae = mean_absolute_error(y_test, y_pred)
+            mape = mean_absolute_percentage_error(y_test, y_pred)
+            report_content += f"- **Mean Squared Error (MSE)**: {mse:.4f}\n"
+            report_content += f"- **R² Score**: {r2:.4f}\n"
+            report_content += f"- **MAE**: {mae:.4f}\n"
+            report_content += f"- **MAPE (%)**: {mape:.2f}\n"
+            if hasattr(st.session_state.model, 'coef_'):
+                report_content += "\n## Model Coefficients (Betas)\n"
+                if st.session_state.scaler is not None and st.session_state.scaled_columns is not None:
+                    w_orig, b_orig = restore_original_coeffs_intercept(st.session_state.model, st.session_state.scaler,
+                                                                        st.session_state.scaled_columns, list(st.session_state.X.columns))
+                else:
+                    w_orig, b_orig = st.session_state.model.coef_, st.session_state.model.intercept_
+                for feat, coef_val in zip(list(st.session_state.X.columns), w_orig):
+                    report_content += f"- **{feat}**: {coef_val:.4f}\n"
+                report_content += f"- **Intercept**: {b_orig:.4f}\n"
+            st.download_button(label="Download Report", data=report_content, file_name="model_report.md", mime="text/markdown")
+        st.markdown('<h3 class="section-header">Start New Project</h3>', unsafe_allow_html=True)
+        if st.button("Start New Project", key="new_project_btn"):
+            for key in list(st.session_state.keys()):
+                del st.session_state[key]
+            st.session_state.page = 'home'
+            st.rerun()
+        if st.button("← Back to Evaluation", key="export_back"):
+            st.session_state.page = 'evaluation'
+            st.rerun()
+
+    def main():
+        pages = {
+            'home': home_page,
+            'data_upload': data_upload_page,
+            'data_processing': data_processing_page,
+            'feature_engineering': feature_engineering_page,
+            'model_building': model_building_page,
+            'evaluation': evaluation_page,
+            'export': export_page
+        }
+        if st.session_state.page in pages:
+            pages[st.session_state.page]()
+        else:
+            home_page()
+
+    main()
+
+
+ # Add a "Return to Home" button below the footer
+    if st.button("Return to Home"):
+        # Option A: if you have go_home() function
+        go_home() 
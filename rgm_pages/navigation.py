@@ -0,0 +1,41 @@
+"""Page navigation shared by every page: the page stack in st.session_state."""
+import streamlit as st
+
+
+def go_to(page_name):
+    st.session_state.history.append(st.session_state.page)
+    st.session_state.page = page_name
+    st.rerun()
+
+
+def go_back():
+    if st.session_state.history:
+        st.session_state.page = st.session_state.history.pop()
+    else:
+        st.session_state.page = "home"
+    st.rerun()
+
+
+def go_home():
+    st.session_state.page = "home"
+    st.session_state.history = []
+    st.rerun()
+
+
+# Section Names
+section_names = {
+    "1": "Base/Promo Detection",
+    "2": "Price/Promo Elasticity",
+    "3": "RGM Pillars",
+    "4": "Engineer"  # <-- newly added
+}
+
+
+def go_to_modelling():
+    st.session_state.page = "section2_module1"   # <- must match router
+    st.rerun()                                   # use experimental_rerun() on Streamlit < 1.25
+
+
+def go_to_post_modelling():
+    st.session_state.page = "section2_module2"
+    st.rerun()
@@ -0,0 +1,892 @@
+"""Modelling pipeline page (section 2, module 1)."""
+from rgm.artifacts import dataset_fingerprint
+from rgm.elasticity import run_full_pipeline, run_model_pipeline, run_model_pipelines
+from rgm.jobs import DONE, job_progress, job_warning
+from rgm.profiling import stage
+from rgm.schema import SchemaError
+from rgm_pages.jobs import finished_job, job_running, show_job_messages, submit_job
+from rgm_pages.navigation import go_back, go_home, go_to_post_modelling
+from rgm_pages.results_browser import store_session_value
+
+
+# Background jobs of the modelling buttons (see rgm_pages.jobs)
+RUN_MODELS_JOB = "Run Models"
+RUN_TYPE2_MODELS_JOB = "Run Models (Type 2)"
+
+
+###############def funtion for calendar
+def section2_module1_page():
+    """
+    COMPLETE: Price/Promo Elasticity code + Model Selection & Filtering in a single page.
+
+    This function:
+      1) Runs the aggregator pipeline, modeling, storing results in session_state.
+      2) Lets the user filter & select models with st_aggrid.
+      3) Displays contribution, radar, and bar charts.
+      4) Allows final saving of models.
+    """
+
+    import streamlit as st
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode
+
+    # ------------------------------------------------------------------------
+    # PART 1: AGGREGATION & MODELING
+    # ------------------------------------------------------------------------
+    st.subheader("Price/Promo Elasticity – Aggregation & Modeling")
+
+    # Retrieve main data
+    dataframe = st.session_state.get("D0", None)
+    if dataframe is None:
+        st.error("No data found (st.session_state['D0']). Please upload a file.")
+        return
+
+    # UI for aggregator
+    colA,colB,colC = st.columns(3)
+    with colA:
+        channels = dataframe["Channel"].dropna().unique().tolist()
+        selected_channel = st.selectbox("Select a Channel:", options=channels)
+    with colB:
+        vol_options = []
+        if "Volume" in dataframe.columns:
+            vol_options.append("Volume")
+        if "VolumeUnits" in dataframe.columns:
+            vol_options.append("VolumeUnits")
+        selected_volume = st.selectbox("Select Volume column:", options=vol_options)
+        st.session_state["selected_volume"] = selected_volume
+    with colC:
+        model_type = st.radio("Select Model Type:", options=["Type 1 (Three Distinct Keys)","Type 2 (Multiple Single Keys)"])
+
+    if model_type == "Type 1 (Three Distinct Keys)":
+        possible_keys = [c for c in ["Brand","Variant","PackType","PPG","PackSize"] if c in dataframe.columns]
+        c1,c2,c3 = st.columns(3)
+        with c1:
+            key1 = st.selectbox("Key 1:", options=possible_keys)
+        with c2:
+            remainA = [x for x in possible_keys if x!=key1]
+            key2 = st.selectbox("Key 2:", options=remainA)
+        with c3:
+            remainB = [x for x in remainA if x!=key2]
+            key3 = st.selectbox("Key 3:", options=remainB)
+        selected_keys = [key1,key2,key3]
+        pivot_keys = [key1,key2,key3]
+
+        use_kalman = st.checkbox("Use Kalman Filter?", value=True)
+        use_ratio  = st.checkbox("Use FilteredVolume as Ratio?", value=False)
+        group_keys = [
+            next((c for c in dataframe.columns if c.strip().lower()=='date'), 'date'),
+            next((c for c in dataframe.columns if c.strip().lower()=='channel'),'Channel')
+        ] + selected_keys
+
+        try:
+            with stage("run_full_pipeline"):
+                final_agg_df = run_full_pipeline(
+                    dataframe,
+                    group_keys=group_keys,
+                    pivot_keys=pivot_keys,
+                    use_kalman=use_kalman,
+                    use_ratio_flag=use_ratio,
+                    selected_volume=selected_volume,
+                    warn=st.warning,
+                )
+        except SchemaError as e:
+            st.error(str(e))
+            st.stop()
+        st.subheader("Aggregated Data (Type 1)")
+        with stage("render table"):
+            st.dataframe(final_agg_df, height=600, use_container_width=True)
+
+        st.session_state.final_df = final_agg_df
+        st.session_state.model_type = "Type 1"
+
+    else:
+        st.session_state.type2_dfs = {}
+        use_kalman = st.checkbox("Use Kalman Filter?", value=True)
+        use_ratio  = st.checkbox("Use FilteredVolume as Ratio?", value=False)
+
+        multi_keys = st.multiselect(
+            "Select L0 keys to aggregate separately:",
+            options=[c for c in ["Brand","Variant","PackType","PPG","PackSize"] if c in dataframe.columns]
+        )
+        for key in multi_keys:
+            group_keys = [
+                next((c for c in dataframe.columns if c.strip().lower()=='date'), 'date'),
+                next((c for c in dataframe.columns if c.strip().lower()=='channel'),'Channel'),
+                key
+            ]
+            try:
+                with stage(f"run_full_pipeline: {key}"):
+                    agg_df_key = run_full_pipeline(
+                        dataframe,
+                        group_keys,
+                        [key],
+                        use_kalman=use_kalman,
+                        use_ratio_flag=use_ratio,
+                        selected_volume=selected_volume,
+                        warn=st.warning,
+                    )
+            except SchemaError as e:
+                st.error(str(e))
+                st.stop()
+            st.markdown(f"### Aggregated Data for key: **{key}**")
+            with stage(f"render table: {key}"):
+                st.dataframe(agg_df_key, height=600, use_container_width=True)
+            st.session_state.type2_dfs[key] = agg_df_key
+        st.session_state.model_type = "Type 2"
+
+    # MODELING
+    st.title("Modeling")
+
+    if st.session_state.model_type == "Type 1":
+        modeling_df = st.session_state.get("final_df", None)
+        if modeling_df is None:
+            st.warning("No aggregated DataFrame found for Type 1.")
+            return
+        available_cols = sorted(modeling_df.columns)
+        default_predictors = [
+            c for c in available_cols
+            if c.endswith("_RPI") or c in ["PPU","D1","is_outlier","NetCatVol","Cat_Down_Up"]
+        ]
+        selected_predictors = st.multiselect(
+            "Select Predictor Columns:",
+            options=available_cols,
+            default=default_predictors
+        )
+        grouping_keys_model = [
+            next((col for col in modeling_df.columns if col.strip().lower()=='channel'),'Channel')
+        ] + selected_keys
+        X_columns = [c for c in selected_predictors if c not in grouping_keys_model]
+        target_col = "FilteredVolume"
+        if target_col not in modeling_df.columns:
+            st.error("No 'FilteredVolume' in final DataFrame. Check pipeline.")
+            return
+        k_folds = st.number_input("Number of folds (k):", min_value=2, max_value=20, value=5)
+        numeric_in_X = [
+            c for c in X_columns
+            if c in modeling_df.columns and pd.api.types.is_numeric_dtype(modeling_df[c])
+        ]
+        default_std = [
+            c for c in numeric_in_X
+            if c in ["D1","PPU","NetCatVol","Cat_Weighted_Price","Cat_Down_Up"]
+        ]
+        chosen_std_cols = st.multiselect(
+            "Select columns to standardize:",
+            numeric_in_X,
+            default=default_std
+        )
+
+        if st.button("Run Models", disabled=job_running(RUN_MODELS_JOB)):
+            submit_job(
+                RUN_MODELS_JOB,
+                run_model_pipeline,
+                modeling_df,
+                grouping_keys_model,
+                X_columns,
+                target_col,
+                k_folds,
+                chosen_std_cols,
+                warn=job_warning,
+                progress=job_progress,
+                targets=("combined_results", ("predictions_df", "type1_predictions")),
+                artifact=(
+                    "models_type1",
+                    dataset_fingerprint(modeling_df),
+                    {
+                        "grouping_keys": grouping_keys_model,
+                        "X_columns": X_columns,
+                        "target_col": target_col,
+                        "k_folds": k_folds,
+                        "chosen_std_cols": chosen_std_cols,
+                    },
+                ),
+            )
+        if job_running(RUN_MODELS_JOB):
+            st.info("Fitting models in the background – see Background Jobs in the sidebar.")
+        outcome = finished_job(RUN_MODELS_JOB)
+        if outcome is not None:
+            show_job_messages(outcome, failure="Model run failed")
+            if outcome["state"] == DONE:
+                res = st.session_state.combined_results
+                preds = st.session_state.predictions_df
+                if res is not None:
+                    st.dataframe(res, height=500, use_container_width=True)
+                if preds is not None:
+                    st.subheader("Sample Actual vs. Predicted (Type 1)")
+                    st.dataframe(preds.head(20))
+
+    else:
+        st.markdown("## Type 2 Modeling Parameters")
+        if "type2_dfs" not in st.session_state:
+            st.warning("No Type 2 aggregated data found.")
+            return
+        type2_params = {}
+        for key, agg_df in st.session_state["type2_dfs"].items():
+            st.markdown(f"### Parameters for key: **{key}**")
+            available_cols = sorted(agg_df.columns)
+            default_predictors = [
+                c for c in available_cols
+                if c.endswith("_RPI") or c in ["PPU","D1","is_outlier","NetCatVol","Cat_Down_Up","Cat_Price_trend_over_time"]
+            ]
+            selected_predictors = st.multiselect(
+                f"Select Predictor Columns for '{key}':",
+                options=available_cols,
+                default=default_predictors,
+                key=f"pred_cols_{key}"
+            )
+            grouping_keys_model = [
+                next((col for col in agg_df.columns if col.strip().lower()=='channel'),'Channel'),
+                key
+            ]
+            X_cols = [c for c in selected_predictors if c not in grouping_keys_model]
+            target_col = "FilteredVolume"
+            if target_col not in agg_df.columns:
+                st.error(f"No '{target_col}' found for key {key}.")
+                continue
+            k_folds = st.number_input(
+                f"Number of folds (k) for {key}:",
+                min_value=2, max_value=20, value=5,
+                key=f"kfold_{key}"
+            )
+            numeric_in_X = [
+                c for c in X_cols
+                if c in agg_df.columns and pd.api.types.is_numeric_dtype(agg_df[c])
+            ]
+            default_std = [
+                c for c in numeric_in_X
+                if c in ["D1","PPU","NetCatVol","Cat_Weighted_Price",
+                         "Cat_Down_Up","Cat_Price_trend_over_time","is_outlier"]
+            ]
+            chosen_std = st.multiselect(
+                f"Select columns to standardize for {key}:",
+                numeric_in_X,
+                default=default_std,
+                key=f"std_{key}"
+            )
+            type2_params[key] = {
+                "agg_df": agg_df,
+                "grouping_keys_model": grouping_keys_model,
+                "X_cols": X_cols,
+                "target_col": target_col,
+                "k_folds": k_folds,
+                "chosen_std": chosen_std
+            }
+
+        if st.button("Run Models for all Type 2 Keys", disabled=job_running(RUN_TYPE2_MODELS_JOB)):
+            specs = {
+                key: {
+                    "final_df": params["agg_df"],
+                    "grouping_keys": params["grouping_keys_model"],
+                    "X_columns": params["X_cols"],
+                    "target_col": params["target_col"],
+                    "k_folds": params["k_folds"],
+                    "chosen_std_cols": params["chosen_std"],
+                }
+                for key, params in type2_params.items()
+            }
+            submit_job(
+                RUN_TYPE2_MODELS_JOB,
+                run_model_pipelines,
+                specs,
+                warn=job_warning,
+                progress=job_progress,
+                targets=("type2_results", "type2_predictions"),
+                artifact=(
+                    "models_type2",
+                    dataset_fingerprint({key: spec["final_df"] for key, spec in specs.items()}),
+                    {key: {k: v for k, v in spec.items() if k != "final_df"} for key, spec in specs.items()},
+                ),
+            )
+        if job_running(RUN_TYPE2_MODELS_JOB):
+            st.info("Fitting models in the background – see Background Jobs in the sidebar.")
+        outcome = finished_job(RUN_TYPE2_MODELS_JOB)
+        if outcome is not None:
+            show_job_messages(outcome, failure="Model run failed")
+            if outcome["state"] == DONE:
+                for key, res in st.session_state.type2_results.items():
+                    st.markdown(f"### Results for **{key}**")
+                    if res is not None:
+                        st.dataframe(res, height=500, use_container_width=True)
+                    preds = st.session_state.type2_predictions.get(key)
+                    if preds is not None:
+                        st.markdown(f"#### Sample Actual vs. Predicted for **{key}**")
+                        st.dataframe(preds.head(20))
+
+    # ------------------------------------------------------------------------
+    # PART 2: MODEL SELECTION & FILTERING, CHARTS, FINAL MODEL SAVE
+    # ------------------------------------------------------------------------
+    st.markdown("---")
+    st.title("Model Selection & Post-Modeling Analysis")
+
+    ###############################################################################
+    # Helper function for combined label
+    ###############################################################################
+    def build_model_label(row, l0_key=None, l2_key=None):
+        label = str(row.get("Model", "UnknownModel"))
+        relevant_keys = ["Channel", "Brand", "Variant", "PackType", "PPG", "PackSize"]
+        if l0_key and l0_key not in relevant_keys:
+            relevant_keys.append(l0_key)
+        if l2_key and l2_key not in relevant_keys:
+            relevant_keys.append(l2_key)
+        sub_vals = []
+        for k in relevant_keys:
+            if k in row and pd.notnull(row[k]):
+                sub_vals.append(f"{k}={row[k]}")
+        if sub_vals:
+            label += " (" + ", ".join(sub_vals) + ")"
+        return label
+
+    st.markdown("## Model Selection & Filtering")
+
+    # 1) Check if modeling results exist in session state
+    if st.session_state.model_type == "Type 1":
+        if "combined_results" not in st.session_state:
+            st.info("Modeling results are not available yet. Please run the modeling page first.")
+            st.stop()
+        df_all = st.session_state["combined_results"].copy()
+
+    elif st.session_state.model_type == "Type 2":
+        if "type2_results" not in st.session_state or not st.session_state["type2_results"]:
+            st.info("Modeling results are not available yet. Please run the modeling page first.")
+            st.stop()
+        keys = list(st.session_state["type2_results"].keys())
+        selected_key = st.selectbox("Select Key for Model Results", options=keys)
+        df_all = st.session_state["type2_results"][selected_key].copy()
+    else:
+        st.error("Unknown model type in session state.")
+        st.stop()
+
+    # 2) Optional L0, L2 keys from session
+    l0_key = st.session_state.get("selected_key_L0", "L0")
+    l2_key = st.session_state.get("selected_key_L2", "L2")
+
+    # ------------------------------------------------------------------------
+    # CREATE WIDGETS (7 columns + 2 more for the extra row)
+    # We won't filter immediately. We'll store the user choices, then do filtering
+    # only when the user clicks "Apply Filters".
+    # ------------------------------------------------------------------------
+    col1, col2, col3, col4, col5, col6, col7 = st.columns(7)
+
+    with col1:
+        if "Channel" in df_all.columns:
+            channel_opts = ["All"] + sorted(df_all["Channel"].dropna().unique().tolist())
+            channel_choice = st.selectbox("Channel", channel_opts, index=0)
+        else:
+            channel_choice = "All"
+
+        # Additional keys to filter
+        keys_to_filter = ["Brand", "Variant", "PackType", "PPG", "PackSize"]
+        key_filter_choices = {}
+        for k_ in keys_to_filter:
+            if k_ in df_all.columns:
+                opts = ["All"] + sorted(df_all[k_].dropna().unique().tolist())
+                key_filter_choices[k_] = st.selectbox(k_, opts, index=0)
+            else:
+                key_filter_choices[k_] = "All"
+
+    with col2:
+        if l0_key in df_all.columns:
+            l0_opts = ["All"] + sorted(df_all[l0_key].dropna().unique().tolist())
+            l0_choice = st.selectbox(f"{l0_key}", l0_opts, index=0)
+        else:
+            l0_choice = "All"
+
+    with col3:
+        if l2_key in df_all.columns:
+            l2_opts = ["All"] + sorted(df_all[l2_key].dropna().unique().tolist())
+            l2_choice = st.selectbox(f"{l2_key}", l2_opts, index=0)
+        else:
+            l2_choice = "All"
+
+    with col4:
+        if "Model" in df_all.columns:
+            model_opts = ["All"] + sorted(df_all["Model"].dropna().unique().tolist())
+            model_choice = st.selectbox("Model", model_opts, index=0)
+        else:
+            model_choice = "All"
+
+    with col5:
+        st.write("Self Elas.")
+        min_self_elas, max_self_elas = st.slider(
+            " ",
+            min_value=-10.0,
+            max_value=10.0,
+            value=(-10.0, 10.0),
+            step=0.5,
+            label_visibility="collapsed"
+        )
+
+    with col7:
+        st.write("R2 Range")
+        min_r2, max_r2 = st.slider(
+            "   ",
+            min_value=0.0,
+            max_value=1.0,
+            value=(0.0,1.0),
+            step=0.01,
+            label_visibility="collapsed"
+        )
+
+    # Extra row for Contribution & CSF
+    colC, colCSF = st.columns(2)
+    with colC:
+        st.write("Contribution")
+        min_contrib, max_contrib = st.slider(
+            " ",
+            min_value=0.0,
+            max_value=100.0,
+            value=(0.0, 100.0),
+            step=1.0,
+            label_visibility="collapsed"
+        )
+    with colCSF:
+        st.write("CSF")
+        min_csf, max_csf = st.slider(
+            "  ",
+            min_value=0.0,
+            max_value=10.0,
+            value=(0.0,10.0),
+            step=0.1,
+            label_visibility="collapsed"
+        )
+
+    # ------------------------------------------------------------------------
+    # CHANGED: Single "Apply Filters" button
+    # We'll store the filtered DataFrame in st.session_state["df_filteredPromo"]
+    # so we don't re-run on every slider change.
+    # ------------------------------------------------------------------------
+    apply_button = st.button("Apply Filters")
+
+    if "df_filteredPromo" not in st.session_state:
+        st.session_state["df_filteredPromo"] = df_all.copy()  # default
+
+    if apply_button:
+        # Re-run the same filter logic, but only now
+        df_temp = df_all.copy()
+
+        # Filter
+        if channel_choice != "All" and "Channel" in df_temp.columns:
+            df_temp = df_temp[df_temp["Channel"] == channel_choice]
+        if l0_choice != "All" and l0_key in df_temp.columns:
+            df_temp = df_temp[df_temp[l0_key] == l0_choice]
+        if l2_choice != "All" and l2_key in df_temp.columns:
+            df_temp = df_temp[df_temp[l2_key] == l2_choice]
+        if model_choice != "All" and "Model" in df_temp.columns:
+            df_temp = df_temp[df_temp["Model"] == model_choice]
+        for k_, choice_ in key_filter_choices.items():
+            if choice_ != "All":
+                df_temp = df_temp[df_temp[k_] == choice_]
+
+        # Sliders
+        if "SelfElasticity" in df_temp.columns:
+            df_temp = df_temp[
+                (df_temp["SelfElasticity"] >= min_self_elas) &
+                (df_temp["SelfElasticity"] <= max_self_elas)
+            ]
+        if "R2 Test" in df_temp.columns:
+            df_temp = df_temp[
+                (df_temp["R2 Test"] >= min_r2) &
+                (df_temp["R2 Test"] <= max_r2)
+            ]
+        if "Contribution" in df_temp.columns:
+            df_temp = df_temp[
+                (df_temp["Contribution"] >= min_contrib) &
+                (df_temp["Contribution"] <= max_contrib)
+            ]
+        if "CSF" in df_temp.columns:
+            df_temp = df_temp[
+                (df_temp["CSF"] >= min_csf) &
+                (df_temp["CSF"] <= max_csf)
+            ]
+
+        st.session_state["df_filteredPromo"] = df_temp.copy()
+
+    # Now we use st.session_state["df_filteredPromo"] for the grid
+    df_filtered = st.session_state["df_filteredPromo"]
+
+    st.write(f"Rows after filtering: {len(df_filtered)}")
+
+    # 5) Ensure "Comment"
+    if "Comment" not in df_filtered.columns:
+        df_filtered.insert(0, "Comment", "")
+
+    st.write("### Editable Grid with Pinned Columns & Row Selection")
+    pinned_columns = ["Comment","Channel","Brand","PPG","PackSize","Model"]
+    pinned_columns = [c for c in pinned_columns if c in df_filtered.columns]
+
+    from st_aggrid import GridOptionsBuilder, GridUpdateMode, DataReturnMode
+
+    gb = GridOptionsBuilder.from_dataframe(df_filtered)
+    for col_ in pinned_columns:
+        if col_ == "Comment":
+            gb.configure_column(col_, pinned="left", editable=True)
+        else:
+            gb.configure_column(col_, pinned="left", editable=False)
+    for col_ in df_filtered.columns:
+        if col_ not in pinned_columns:
+            gb.configure_column(col_, editable=True)
+    gb.configure_selection("multiple", use_checkbox=True)
+    gb.configure_grid_options(enableRangeSelection=True)
+
+    # Optionally, reduce update_mode so it doesn't re-run on row selection if you want
+    grid_options = gb.build()
+
+    grid_response = AgGrid(
+        df_filtered,
+        gridOptions=grid_options,
+        update_mode=GridUpdateMode.SELECTION_CHANGED,
+        data_return_mode=DataReturnMode.FILTERED_AND_SORTED,
+        allow_unsafe_jscode=True,
+        theme="material",
+        height=400,
+        width="100%",
+    )
+    df_edited = pd.DataFrame(grid_response["data"])
+    selected_rows = grid_response["selected_rows"]
+    df_selected = pd.DataFrame(selected_rows)
+
+    st.write("Selected Rows:")
+    st.dataframe(df_selected, use_container_width=True)
+
+    # 9) Button to save
+    if st.session_state.model_type == "Type 1":
+        if st.button("Save Selected Models", key="save_sel_type1"):
+            df_selected["ModelName"] = df_selected.apply(
+                lambda r: build_model_label(r, l0_key, l2_key), axis=1
+            )
+            st.session_state["selected_models_type1"] = df_selected.copy()
+            st.success("Selected models (Type 1) saved successfully!")
+    elif st.session_state.model_type == "Type 2":
+        if "selected_models_type2" not in st.session_state:
+            st.session_state["selected_models_type2"] = {}
+        if st.button("Save Selected Models", key="save_sel_type2"):
+            df_selected["ModelName"] = df_selected.apply(
+                lambda r: build_model_label(r, l0_key, l2_key), axis=1
+            )
+            st.session_state["selected_models_type2"][selected_key] = df_selected.copy()
+            st.success(f"Selected models for key '{selected_key}' (Type 2) saved successfully!")
+
+    st.markdown("## Saved Models Summary")
+    summary_cols = ["ModelName","Channel","Brand","Variant","PackType","PPG","PackSize","Model"]
+    if st.session_state.model_type == "Type 1":
+        if "selected_models_type1" in st.session_state and not st.session_state["selected_models_type1"].empty:
+            saved_df_ = st.session_state["selected_models_type1"]
+            show_cols = [c for c in summary_cols if c in saved_df_.columns]
+            st.dataframe(saved_df_[show_cols], use_container_width=True)
+        else:
+            st.info("No saved models for Type 1 yet.")
+    else:
+        # Type 2
+        if "selected_models_type2" in st.session_state and st.session_state["selected_models_type2"]:
+            import pandas as pd
+            summary_dfs = []
+            for key_, df_saved_ in st.session_state["selected_models_type2"].items():
+                if isinstance(df_saved_, pd.DataFrame) and not df_saved_.empty:
+                    temp = df_saved_.copy()
+                    temp["Selected Key"] = key_
+                    show_cols = [c for c in summary_cols if c in temp.columns]
+                    summary_dfs.append(temp[show_cols])
+            if summary_dfs:
+                combined_summary = pd.concat(summary_dfs, ignore_index=True)
+                st.dataframe(combined_summary, use_container_width=True)
+            else:
+                st.info("No saved models for Type 2 yet.")
+        else:
+            st.info("No saved models for Type 2 yet.")
+
+
+    # ------------------------------------------------------------------------
+    # Key Driver Contribution Analysis
+    # ------------------------------------------------------------------------
+    st.title("Key Driver Contribution Analysis (Separate Charts)")
+
+    if st.session_state.model_type=="Type 1":
+        if "selected_models_type1" not in st.session_state or st.session_state["selected_models_type1"].empty:
+            st.error("No saved models for Type 1. Please save models first.")
+            return
+        saved_df = st.session_state["selected_models_type1"].copy()
+    else:
+        # Type 2
+        if "selected_models_type2" not in st.session_state or not st.session_state["selected_models_type2"]:
+            st.error("No saved models for Type 2. Please save models first.")
+            return
+        keys_ = list(st.session_state["selected_models_type2"].keys())
+        selected_saved_key = st.selectbox("Select Key for Contribution Analysis", options=keys_)
+        saved_df = st.session_state["selected_models_type2"][selected_saved_key].copy()
+
+    if saved_df.empty:
+        st.info("No saved models found.")
+        return
+
+    beta_cols = [c for c in saved_df.columns if c.startswith("Beta_")]
+    if not beta_cols:
+        st.error("No 'Beta_' columns found in the saved model data.")
+        return
+
+    st.markdown("### Contribution Charts for Each Saved Model")
+    for idx, row in saved_df.iterrows():
+        model_label = row.get("ModelName", row.get("Model", f"Row {idx}"))
+        st.subheader(f"Contribution Chart for Model (Row #{idx}) – {model_label}")
+        if "B0_std_mean" not in row or pd.isna(row["B0_std_mean"]) or row["B0_std_mean"]==0:
+            st.warning("Skipping model due to missing or invalid 'B0_std_mean'.")
+            continue
+        mean_y = row["B0_std_mean"]
+
+        contrib_list = []
+        for bc in beta_cols:
+            predictor = bc.replace("Beta_","")
+            if predictor not in row:
+                continue
+            beta_val = row[bc]
+            avg_x = row[predictor]
+            contrib_val = (beta_val*avg_x)/mean_y if mean_y!=0 else 0
+            if contrib_val==0:
+                continue
+            contrib_list.append((predictor, contrib_val))
+
+        if not contrib_list:
+            st.info("No valid contributions computed for this model.")
+            continue
+        contrib_df = pd.DataFrame(contrib_list, columns=["Predictor","Contribution"])
+        contrib_df.sort_values("Contribution", ascending=False, inplace=True)
+
+        fig_bar = px.bar(
+            contrib_df,
+            x="Predictor",
+            y="Contribution",
+            color="Contribution",
+            color_continuous_scale="RdBu",
+            title=f"Predictor Contributions (Model Row #{idx})",
+            labels={"Contribution":"Contribution Value"}
+        )
+        fig_bar.update_coloraxes(cmid=0)
+        fig_bar.update_layout(
+            xaxis_tickangle=-45,
+            template="plotly_white",
+            margin=dict(l=20,r=20,t=40,b=20)
+        )
+        table_col, chart_col = st.columns([1,2])
+        with table_col:
+            st.write("Contributions Table:")
+            st.dataframe(contrib_df, use_container_width=True)
+        with chart_col:
+            st.write("Contributions Chart:")
+            st.plotly_chart(fig_bar, use_container_width=True)
+        st.markdown("---")
+        
+        
+
+
+
+
+    # ------------------------------------------------------------------------
+    # Comparison of CSF, MCV, and SelfElasticity
+    # ------------------------------------------------------------------------
+    st.title("Comparison of CSF, MCV, and SelfElasticity (Separate Scales)")
+
+    if st.session_state.model_type=="Type 1":
+        if "selected_models_type1" not in st.session_state or st.session_state["selected_models_type1"].empty:
+            st.error("No saved models for Type 1. Please select and save models first.")
+            return
+        saved_df = st.session_state["selected_models_type1"].copy()
+    else:
+        if "selected_models_type2" not in st.session_state or not st.session_state["selected_models_type2"]:
+            st.error("No saved models for Type 2. Please select and save models first.")
+            return
+        keys_ = list(st.session_state["selected_models_type2"].keys())
+        selected_key_ = st.selectbox("Select Key for Contribution Metrics", options=keys_)
+        saved_df = st.session_state["selected_models_type2"][selected_key_].copy()
+
+    if saved_df.empty:
+        st.info("No saved models available.")
+        return
+
+    label_col = "ModelName" if "ModelName" in saved_df.columns else "Model"
+    required_cols = [label_col,"CSF","MCV","SelfElasticity","Contribution"]
+    missing_cols = [c for c in required_cols if c not in saved_df.columns]
+    if missing_cols:
+        st.error(f"Missing columns: {missing_cols}")
+        return
+
+    for c_ in ["CSF","MCV","SelfElasticity","Contribution"]:
+        saved_df[c_] = pd.to_numeric(saved_df[c_], errors="coerce")
+
+    fig_3metrics = make_subplots(rows=1, cols=4,
+        subplot_titles=["CSF","MCV","SelfElasticity","Contribution"],
+        shared_yaxes=False
+    )
+    fig_4metrics = make_subplots(
+        rows=1, cols=4,
+        subplot_titles=["CSF", "MCV", "SelfElasticity", "Contribution"],
+        shared_yaxes=False
+    )
+
+    # 1) CSF
+    fig_4metrics.add_trace(
+        go.Bar(
+            x=saved_df[label_col],  
+            y=saved_df["CSF"],
+            text=saved_df["CSF"].round(2).astype(str),
+            textposition="inside",             # <--- place labels inside
+            textfont_color="white",            # <--- so text is visible against bar
+            marker_color="#FFBD59",            # primary yellow
+            name="CSF"
+        ),
+        row=1, col=1
+    )
+
+    # 2) MCV
+    fig_4metrics.add_trace(
+        go.Bar(
+            x=saved_df[label_col],
+            y=saved_df["MCV"],
+            text=saved_df["MCV"].round(2).astype(str),
+            textposition="inside",
+            textfont_color="white",
+            marker_color="#41C185",            # secondary green
+            name="MCV"
+        ),
+        row=1, col=2
+    )
+
+    # 3) SelfElasticity
+    fig_4metrics.add_trace(
+        go.Bar(
+            x=saved_df[label_col],
+            y=saved_df["SelfElasticity"],
+            text=saved_df["SelfElasticity"].round(2).astype(str),
+            textposition="inside",
+            textfont_color="white",
+            marker_color="#458EE2",            # tertiary blue
+            name="SelfElasticity"
+        ),
+        row=1, col=3
+    )
+
+    # 4) Contribution – using blue-violet (#8A2BE2)
+    fig_4metrics.add_trace(
+        go.Bar(
+            x=saved_df[label_col],
+            y=saved_df["Contribution"],
+            text=saved_df["Contribution"].round(2).astype(str),
+            textposition="inside",
+            textfont_color="white",
+            marker_color="#8A2BE2",  # blue-violet
+            name="Contribution"
+        ),
+        row=1, col=4
+    )
+
+    fig_4metrics.update_layout(
+        title_text="Comparison of CSF, MCV, SelfElasticity, and Contribution",
+        showlegend=False,
+        template="plotly_white",
+        margin=dict(l=20, r=20, t=60, b=60),
+        font=dict(
+            family="Inter, sans-serif",
+            size=14,
+            color="#333333"
+        )
+    )
+
+    # Optionally label each axis
+    fig_4metrics.update_yaxes(title_text="CSF", row=1, col=1)
+    fig_4metrics.update_yaxes(title_text="MCV", row=1, col=2)
+    fig_4metrics.update_yaxes(title_text="SelfElasticity", row=1, col=3)
+    fig_4metrics.update_yaxes(title_text="Contribution", row=1, col=4)
+
+    # Finally display in Streamlit
+    st.plotly_chart(fig_4metrics, use_container_width=True)
+
+    # ------------------------------------------------------------------------
+    # Final Model Save and Summary
+    # ------------------------------------------------------------------------
+    st.title("Final Model Save and Summary")
+
+    if st.session_state.model_type=="Type 1":
+        if "selected_models_type1" not in st.session_state or st.session_state["selected_models_type1"].empty:
+            st.error("No saved models for Type 1 found. Please select and save models first.")
+            return
+        saved_df2 = st.session_state["selected_models_type1"].copy()
+        if "Model" not in saved_df2.columns:
+            saved_df2 = saved_df2.reset_index().rename(columns={"index":"Model"})
+        if "ModelName" not in saved_df2.columns:
+            saved_df2["ModelName"] = saved_df2.apply(lambda r: build_model_label(r,l0_key,l2_key), axis=1)
+        final_mod_options = saved_df2["ModelName"].unique().tolist()
+        selected_mods = st.multiselect("Select Final Model(s) to Save (Type 1)", options=final_mod_options)
+        if "final_saved_models_type1" not in st.session_state:
+            st.session_state["final_saved_models_type1"] = []
+        if st.button("Save Selected Final Model(s) for Type 1"):
+            for nm in selected_mods:
+                fm = saved_df2[saved_df2["ModelName"]==nm].iloc[0]
+                st.session_state["final_saved_models_type1"].append(fm)
+            store_session_value(
+                "final_saved_models_type1", "saved_models_type1",
+                dataset_fingerprint(st.session_state["final_df"]), {}, label="Saved final models (Type 1)",
+            )
+            st.success("Selected final model(s) for Type 1 saved successfully!")
+        st.markdown("### Saved Final Models for Type 1")
+        if st.session_state["final_saved_models_type1"]:
+            df_final = pd.DataFrame(st.session_state["final_saved_models_type1"])
+            st.dataframe(df_final, use_container_width=True)
+        else:
+            st.info("No final models saved for Type 1 yet.")
+
+    else:
+        # Type 2
+        if "selected_models_type2" not in st.session_state or not st.session_state["selected_models_type2"]:
+            st.error("No saved models for Type 2 found. Please select and save models first.")
+            return
+        keys_2 = list(st.session_state["selected_models_type2"].keys())
+        sel_key_2 = st.selectbox("Select Key for Final Model Save (Type 2)", options=keys_2)
+        key_df2 = st.session_state["selected_models_type2"][sel_key_2].copy()
+        if "Model" not in key_df2.columns:
+            key_df2 = key_df2.reset_index().rename(columns={"index":"Model"})
+        if "ModelName" not in key_df2.columns:
+            key_df2["ModelName"] = key_df2.apply(lambda r: build_model_label(r,l0_key,l2_key), axis=1)
+        final_mod_opts = key_df2["ModelName"].unique().tolist()
+        sel_mods = st.multiselect(
+            f"Select Final Model(s) to Save for Key '{sel_key_2}'",
+            options=final_mod_opts
+        )
+        if "saved_models_type2" not in st.session_state:
+            st.session_state["saved_models_type2"] = {}
+        if st.button(f"Save Selected Final Model(s) for Key '{sel_key_2}'"):
+            if sel_key_2 not in st.session_state["saved_models_type2"]:
+                st.session_state["saved_models_type2"][sel_key_2] = []
+            for nm in sel_mods:
+                fm = key_df2[key_df2["ModelName"]==nm].iloc[0]
+                st.session_state["saved_models_type2"][sel_key_2].append(fm)
+            store_session_value(
+                "saved_models_type2", "saved_models_type2",
+                dataset_fingerprint(st.session_state["type2_dfs"]), {}, label="Saved final models (Type 2)",
+            )
+            st.success(f"Selected final model(s) for key '{sel_key_2}' saved successfully!")
+
+        st.markdown("### Saved Final Models for Type 2")
+        if st.session_state["saved_models_type2"]:
+            for k_, model_list_ in st.session_state["saved_models_type2"].items():
+                st.subheader(f"Key: {k_}")
+                df_key_ = pd.DataFrame(model_list_)
+                st.dataframe(df_key_, use_container_width=True)
+        else:
+            st.info("No final models saved for Type 2 yet.")
+
+    # ------------------------------------------------------------------------
+    # NAVIGATION BUTTONS
+    # ------------------------------------------------------------------------
+    st.markdown("---")
+    cBack, cHome, cPM = st.columns(3)
+    with cBack:
+        if st.button("Back", key="section2_module1_back"):
+            go_back()
+    with cHome:
+        if st.button("Home", key="section2_module1_home"):
+            go_home()
+            
+    with cPM:
+        if st.button(" Go to Post‑Modelling"):
+            go_to_post_modelling()
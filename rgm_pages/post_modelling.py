@@ -0,0 +1,1121 @@
+"""Post-modelling page (section 2, module 2)."""
+from rgm.calendar import calendar_for, lookup, parse_dates
+from rgm.demand import build_curve_df, compute_current_volume, compute_elasticity_full
+from rgm.profiling import stage
+from rgm_pages.frames import page_columns
+from rgm_pages.navigation import go_to_modelling
+
+
+def section2_module2_page():
+    """
+    SECTION 2 – MODULE 2: Post Modeling
+    This encapsulates all your "final model summary" code, 
+    competitor pricing, elasticity, scenario planning, etc.
+    """
+
+    import streamlit as st
+    import pandas as pd
+    import numpy as np
+    import plotly.graph_objects as go
+
+    # ------------------------------
+    # Helper: MAPE ignoring zero actuals
+    # ------------------------------
+    def compute_mape(actual_vals, pred_vals):
+        mask = (actual_vals != 0)
+        if not np.any(mask):
+            return np.nan
+        return np.mean(np.abs((actual_vals[mask] - pred_vals[mask]) / actual_vals[mask])) * 100
+
+    # ------------------------------
+    # For neat elasticity display
+    # ------------------------------
+    def format_elas(e_):
+        if e_ is not None and not np.isnan(e_):
+            return f"{e_:.2f}"
+        return "N/A"
+
+    # ------------------------------
+    # Helper functions for back navigation
+    # ------------------------------
+    def go_back():
+        # Implement navigation logic
+        st.session_state["current_page"] = "previous_page"
+        
+    def go_home():
+        # Implement navigation logic
+        st.session_state["current_page"] = "home_page"
+
+    # ------------------------------
+    # Inject enhanced CSS style
+    # ------------------------------
+    st.markdown(
+        """
+        <style>
+        /* Overall background color */
+        body {
+            background: linear-gradient(120deg, #f0f4f8, #f8faff);
+        }
+
+        /* Card-like container styling */
+        .card-container {
+            background-color: white;
+            border-radius: 0.5rem;
+            padding: 1.5rem;
+            box-shadow: 0 1px 3px rgba(0,0,0,0.12), 0 1px 2px rgba(0,0,0,0.24);
+            margin-bottom: 1rem;
+        }
+        
+        /* Section headers */
+        .section-header {
+            color: #1F618D;
+            font-size: 1.3rem;
+            font-weight: 600;
+            margin-bottom: 1rem;
+            padding-bottom: 0.5rem;
+            border-bottom: 1px solid #EBF5FB;
+        }
+        
+        /* Metric tiles */
+        .metric-container {
+            background-color: #F8F9F9;
+            padding: 1rem;
+            border-radius: 0.3rem;
+            text-align: center;
+        }
+        
+        .metric-value {
+            font-size: 1.8rem;
+            font-weight: 700;
+            color: #2C3E50;
+        }
+        
+        .metric-label {
+            font-size: 0.9rem;
+            color: #7F8C8D;
+        }
+        
+        /* Make tables more readable */
+        .dataframe-container {
+            font-size: 0.9rem !important;
+        }
+        
+        .dataframe-container td, .dataframe-container th {
+            padding: 0.5rem !important;
+        }
+
+        /* Slightly larger font for subheaders */
+        .custom-subheader {
+            font-size: 1.15rem !important;
+            font-weight: 600 !important;
+            color: #2C3E50 !important;
+            margin-top: 1rem !important;
+            margin-bottom: 0.5rem !important;
+        }
+
+        /* Table text smaller */
+        .dataframe table td, .dataframe table th {
+            font-size: 0.95rem !important;
+        }
+
+        /* Additional margin for code clarity */
+        .stMarkdown {
+            margin-bottom: 1rem !important;
+        }
+
+        /* Make expander headers more colorful */
+        .streamlit-expanderHeader {
+            font-size: 1.05rem;
+            font-weight: 600;
+            color: #1F618D;
+        }
+
+        /* Slight accent for number input fields */
+        .stNumberInput>div>div>input {
+            background-color: #FBFCFC;
+            border: 1px solid #BBBDC1;
+            color: #2C3E50;
+        }
+
+        /* Tweak st.info, st.warning, st.success with pastel backgrounds */
+        .stAlert, .stWarning, .stInfo, .stSuccess {
+            border-radius: 0.5rem;
+        }
+        .stAlert {
+            background-color: #FEF9E7; /* pale yellow */
+        }
+        .stInfo {
+            background-color: #EBF5FB; /* pale blue */
+        }
+        .stSuccess {
+            background-color: #E9F7EF; /* pale green */
+        }
+        .stWarning {
+            background-color: #FDF2E9; /* pale orange */
+        }
+        </style>
+        """,
+        unsafe_allow_html=True
+    )
+
+    # ------------------------------
+    # MAIN "Post Modelling" content
+    # ------------------------------
+
+    st.title("Post Modelling – Final Model Summary (Type 1 & Type 2)")
+
+
+
+    if st.button("← Back to Modelling"):
+        go_to_modelling()
+        
+    # (A) Let user pick a data source from session state
+    st.markdown("<div class='custom-subheader'>Data Source for Post Modelling</div>", unsafe_allow_html=True)
+    possible_sources = []
+    if "D0" in st.session_state and st.session_state["D0"] is not None:
+        possible_sources.append("D0")
+    if "dataframe1" in st.session_state and st.session_state["dataframe1"] is not None:
+        possible_sources.append("dataframe1")
+    if "dataframe" in st.session_state and st.session_state["dataframe"] is not None:
+        possible_sources.append("dataframe")
+
+    if not possible_sources:
+        st.error("No suitable data sources found in session.")
+        st.stop()
+
+    chosen_data_source = st.selectbox("Select Data Source:", possible_sources)
+    df_source = page_columns(st.session_state[chosen_data_source], "section2_module2").copy()
+    st.markdown(f"**Chosen data source**: {chosen_data_source}")
+
+    # ------------- Check for Type1 or Type2 final models -------------
+    def have_type1_models():
+        if "final_saved_models_type1" not in st.session_state:
+            return False
+        val = st.session_state["final_saved_models_type1"]
+        if val is None:
+            return False
+        if isinstance(val, list):
+            return (len(val) > 0)
+        if isinstance(val, pd.DataFrame):
+            return not val.empty
+        return False
+
+    def have_type2_models():
+        if "saved_models_type2" not in st.session_state:
+            return False
+        val = st.session_state["saved_models_type2"]
+        return (val is not None) and (len(val) > 0)
+
+    is_type1 = have_type1_models()
+    is_type2 = have_type2_models()
+
+    if not is_type1 and not is_type2:
+        st.error("No Type 1 or Type 2 final models found in session.")
+        st.stop()
+
+    model_options = []
+    if is_type1:
+        model_options.append("Type 1")
+    if is_type2:
+        model_options.append("Type 2")
+
+    if len(model_options) == 1:
+        selected_model_type = model_options[0]
+        st.markdown(f"<b>Only one model type found:</b> **{selected_model_type}**", unsafe_allow_html=True)
+    else:
+        selected_model_type = st.radio("Choose Model Type:", model_options, horizontal=True)
+
+    st.markdown("---", unsafe_allow_html=True)
+
+    # ============================= TYPE 1 =============================
+# ============================= TYPE 1 =============================
+# ============================= TYPE 1 =============================
+    if selected_model_type == "Type 1":
+        st.markdown("## Type 1: Single Aggregated Model Analysis")
+
+        # — Load & validate your saved Type 1 models —
+        raw_models = st.session_state.get("final_saved_models_type1")
+        if not raw_models:
+            st.error("No Type 1 models found in session.")
+            st.stop()
+        df_type1 = pd.DataFrame(raw_models) if isinstance(raw_models, list) else raw_models.copy()
+        if df_type1.empty:
+            st.error("Type 1 model list is empty.")
+            st.stop()
+
+        # — Build unified labels showing Model + keys —
+        label_to_index = {}
+        options = []
+        for idx, row in df_type1.iterrows():
+            model_name = row.get("Model", f"Model {idx}")
+            attrs = []
+            for key in ("Channel", "Brand", "Variant", "PPG"):
+                if key in df_type1.columns:
+                    attrs.append(f"{key}:{row[key]}")
+            label = model_name + (f" ({' | '.join(attrs)})" if attrs else "")
+            label_to_index[label] = idx
+            options.append(label)
+
+        # Replace radio buttons with a dropdown
+        chosen_label = st.selectbox("Select a Type 1 model to analyze:", options)
+        sel_idx = label_to_index[chosen_label]
+        row_selected = df_type1.loc[sel_idx]
+
+        # — Show key attributes and metrics in a compact layout —
+        col1, col2, col3 = st.columns(3)
+        if "R2" in row_selected:
+            col1.metric("R²", f"{row_selected['R2']:.4f}")
+        if "MAPE" in row_selected:
+            col2.metric("MAPE", f"{row_selected['MAPE']:.2f}%")
+        
+        # Show channel/brand in the third column
+        if "Channel" in row_selected and "Brand" in row_selected:
+            col3.metric("Scope", f"{row_selected['Channel']}-{row_selected['Brand']}")
+
+        # — Show full details in an expander to save space —
+        with st.expander("View Complete Model Details", expanded=False):
+            st.dataframe(row_selected.to_frame().T, use_container_width=True)
+
+
+        # Identify the model name from the chosen row
+        if "Model" not in row_selected:
+            st.error("No 'Model' column found in final Type 1 DataFrame. Cannot identify the model automatically.")
+            st.stop()
+        model_name_in_row = row_selected["Model"]
+
+        # aggregator columns
+        channel_ = row_selected.get("Channel", None)
+        brand_   = row_selected.get("Brand", None)
+        variant_ = row_selected.get("Variant", None)
+        ppg_     = row_selected.get("PPG", None)
+
+        # intercept
+        intercept_col = "B0 (Original)"
+        if intercept_col not in row_selected:
+            st.error(f"Missing intercept col '{intercept_col}'. Aborting.")
+            st.stop()
+        raw_intercept = float(row_selected[intercept_col])
+
+        # Identify Beta_ columns
+        beta_cols = [c for c in df_type1.columns if c.startswith("Beta_")]
+        if not beta_cols:
+            st.error("No Beta_ columns found. Stopping.")
+            st.stop()
+        betas = {}
+        for bc in beta_cols:
+            predictor = bc.replace("Beta_", "")
+            betas[predictor] = float(row_selected[bc])
+
+        # gather default values
+        missing_cols = []
+        default_vals = {}
+        for p_ in betas.keys():
+            if p_ not in row_selected or pd.isna(row_selected[p_]):
+                missing_cols.append(p_)
+            else:
+                default_vals[p_] = float(row_selected[p_])
+        if missing_cols:
+            st.error(f"Missing or NaN columns for {missing_cols}. Aborting.")
+            st.stop()
+
+        # competitor ratio columns
+        rpi_cols = []
+        for predictor in betas:
+            if predictor.endswith("_RPI") and betas[predictor] != 0:
+                rpi_cols.append(predictor)
+
+        # IMPROVED PRICE & SCENARIO SETUP
+        st.markdown("### Analysis Parameters")
+        
+        param_col1, param_col2 = st.columns(2)
+        
+        with param_col1:
+            user_own_price = st.number_input("My Current Price (PPU):", 
+                                            value=default_vals.get("PPU", 5.0), 
+                                            step=0.5)
+        
+        with param_col2:
+            competitor_impact = st.checkbox("Enable Competitor Impact Analysis", value=False)
+
+        # Advanced parameter configuration
+        with st.expander("Advanced: Predictor Configuration", expanded=False):
+            config_col1, config_col2 = st.columns(2)
+            
+            user_overrides_orig = {}
+            user_competitor_prices = {}
+            
+            with config_col1:
+                st.markdown("#### Non-Price Predictors")
+                non_rpi_predictors = [p for p in betas.keys() if not p.endswith("_RPI") and p != "PPU"]
+                for p_ in non_rpi_predictors:
+                    user_overrides_orig[p_] = st.number_input(
+                        f"{p_}:",
+                        value=default_vals[p_],
+                        step=0.5
+                    )
+            
+            if competitor_impact and rpi_cols:
+                with config_col2:
+                    st.markdown("#### Competitor Prices")
+                    old_own_price = default_vals.get("PPU", 5.0)
+                    for rp_ in rpi_cols:
+                        old_ratio = default_vals[rp_]
+                        old_comp_price = old_own_price / old_ratio if old_ratio != 0 else 0.0
+                        user_competitor_prices[rp_] = st.number_input(
+                            f"{rp_[:-4]} Price:",
+                            value=old_comp_price,
+                            step=0.5
+                        )
+
+        # Check PPU validity
+        if ("PPU" not in betas) or (betas["PPU"] == 0):
+            st.error("No 'PPU' or Beta_PPU=0 => can't invert volume vs price. Aborting.")
+            st.stop()
+
+        b_own = betas["PPU"]
+
+        # Helper functions for scenario generation and elasticity
+        def scenario_rpi_dict(my_price: float, new_scenario: bool) -> dict:
+            d_out = {}
+            for rp_ in rpi_cols:
+                if (not competitor_impact) or (not new_scenario):
+                    d_out[rp_] = default_vals[rp_]
+                else:
+                    new_cp = user_competitor_prices[rp_]
+                    ratio = 0.0 if (new_cp == 0) else (my_price / new_cp)
+                    d_out[rp_] = ratio
+            return d_out
+
+        # Original scenario
+        rpi_old = scenario_rpi_dict(user_own_price, new_scenario=False)
+        df_old = build_curve_df(betas, raw_intercept, user_own_price, user_overrides_orig, rpi_old, 15)
+        Q_cur_old = compute_current_volume(betas, raw_intercept, user_own_price, user_overrides_orig, rpi_old)
+        elas_old = compute_elasticity_full(betas, user_own_price, Q_cur_old, rpi_old)
+
+        idx_oldmax = df_old["Revenue"].idxmax() if not df_old["Revenue"].empty else None
+        vol_oldmax, pri_oldmax = 0, 0
+        if idx_oldmax is not None:
+            vol_oldmax = df_old.loc[idx_oldmax, "Volume"]
+            pri_oldmax = df_old.loc[idx_oldmax, "Price"]
+
+        df_new = None
+        Q_cur_new = None
+        elas_new = np.nan
+        if competitor_impact and (rpi_cols):
+            rpi_new = scenario_rpi_dict(user_own_price, new_scenario=True)
+            df_new = build_curve_df(betas, raw_intercept, user_own_price, user_overrides_orig, rpi_new, 15)
+            Q_cur_new = compute_current_volume(betas, raw_intercept, user_own_price, user_overrides_orig, rpi_new)
+            elas_new = compute_elasticity_full(betas, user_own_price, Q_cur_new, rpi_new)
+
+        # Plotly figure
+        fig = go.Figure()
+        fig.update_layout(
+            colorway=["#1F77B4", "#D62728", "#2CA02C", "#FF7F0E"],
+            plot_bgcolor="rgba(245,245,250,0.9)",
+            paper_bgcolor="rgba(245,245,250,0.9)"
+        )
+
+        # Original scenario line
+        fig.add_trace(go.Scatter(
+            x=df_old["Volume"], y=df_old["Price"],
+            mode="lines+markers",
+            name="Original RPI",
+            line=dict(color="blue", width=2),
+        ))
+        if (Q_cur_old > 0) and (user_own_price > 0):
+            fig.add_shape(
+                type="rect", xref="x", yref="y",
+                x0=0, y0=0, x1=Q_cur_old, y1=user_own_price,
+                fillcolor="blue", opacity=0.25,
+                line=dict(color="blue", width=2, dash="dash")
+            )
+            fig.add_trace(go.Scatter(
+                x=[Q_cur_old], y=[user_own_price],
+                mode="markers",
+                name="My Price (Orig)",
+                marker=dict(color="blue", size=8, symbol="x")
+            ))
+        if (vol_oldmax > 0) and (pri_oldmax > 0):
+            fig.add_shape(
+                type="rect", xref="x", yref="y",
+                x0=0, y0=0, x1=vol_oldmax, y1=pri_oldmax,
+                fillcolor="blue", opacity=0.10,
+                line=dict(color="blue", width=1, dash="dot")
+            )
+            fig.add_trace(go.Scatter(
+                x=[vol_oldmax], y=[pri_oldmax],
+                mode="markers",
+                name="MaxRev (Orig)",
+                marker=dict(color="blue", size=6),
+            ))
+
+        # Competitor scenario line
+        if competitor_impact and (df_new is not None) and not df_new.empty:
+            fig.add_trace(go.Scatter(
+                x=df_new["Volume"], y=df_new["Price"],
+                mode="lines+markers",
+                name="New RPI",
+                line=dict(color="purple", width=2, dash="dot")
+            ))
+            if (Q_cur_new is not None) and (Q_cur_new > 0) and (user_own_price > 0):
+                fig.add_shape(
+                    type="rect", xref="x", yref="y",
+                    x0=0, y0=0, x1=Q_cur_new, y1=user_own_price,
+                    fillcolor="purple", opacity=0.25,
+                    line=dict(color="purple", width=2, dash="dash")
+                )
+                fig.add_trace(go.Scatter(
+                    x=[Q_cur_new], y=[user_own_price],
+                    mode="markers",
+                    name="My Price (New)",
+                    marker=dict(color="purple", size=8, symbol="x")
+                ))
+
+        elas_old_str = f"Elas(Orig)= {format_elas(elas_old)}"
+        fig.add_annotation(
+            x=0.98, y=0.85, xref="paper", yref="paper",
+            text=elas_old_str,
+            showarrow=False,
+            font=dict(size=12, color="blue"),
+            bgcolor="white"
+        )
+        if competitor_impact and df_new is not None:
+            elas_new_str = f"Elas(New)= {format_elas(elas_new)}"
+            fig.add_annotation(
+                x=0.98, y=0.75, xref="paper", yref="paper",
+                text=elas_new_str,
+                showarrow=False,
+                font=dict(size=12, color="purple"),
+                bgcolor="white"
+            )
+
+        fig.update_layout(
+            title="Demand Curve – Own Price + Competitor Impact",
+            xaxis_title="Volume (Q)",
+            yaxis_title="Price (P)",
+            template="plotly_white"
+        )
+        
+        
+        # ────────────────────────────────────────────────────────────────
+        #  BASELINE  (avg PPU, default predictors, default RPI)
+        # ────────────────────────────────────────────────────────────────
+        baseline_key = f"baseline_type1_{sel_idx}"
+
+        if baseline_key not in st.session_state:
+            # --- 1.  Baseline inputs ------------------------------------
+            base_price = default_vals.get("PPU", 5.0)
+
+            # Non‑price predictors at their stored averages
+            non_rpi_predictors = [p for p in betas if (p != "PPU") and (not p.endswith("_RPI"))]
+            base_overrides = {p: default_vals[p] for p in non_rpi_predictors}
+
+            # Competitor ratios at their stored averages
+            base_rpi = {rp: default_vals[rp] for rp in rpi_cols}
+
+            # --- 2.  Compute baseline volume, revenue, elasticity -------
+            base_vol  = compute_current_volume(betas, raw_intercept,
+                                            base_price, base_overrides, base_rpi)
+            base_rev  = base_price * base_vol
+            base_elas = compute_elasticity_full(betas, base_price, base_vol, base_rpi)
+
+            # --- 3.  Save so it never recalculates on rerun --------------
+            st.session_state[baseline_key] = {
+                "price":       base_price,
+                "volume":      base_vol,
+                "revenue":     base_rev,
+                "elasticity":  base_elas
+            }
+
+        # Retrieve stored metrics
+        baseline = st.session_state[baseline_key]
+
+        # --- 4.  Display strip of metrics right above the demand curve --
+        st.markdown("### Baseline (Avg PPU) Metrics")
+        b1, b2, b3, b4 = st.columns(4)
+        b1.metric("Avg PPU",     f"${baseline['price']:.2f}")
+        b2.metric("Volume",      f"{baseline['volume']:.0f}")
+        b3.metric("Revenue",     f"${baseline['revenue']:,.0f}")
+        b4.metric("Elasticity",  format_elas(baseline['elasticity']))
+        st.markdown("---")   # visual divider before the demand‑curve section
+
+        # IMPROVED DEMAND CURVE VISUALIZATION
+        st.markdown("### Demand Curve Analysis")
+        
+        curve_col1, curve_col2 = st.columns([3, 1])
+        
+        with curve_col1:
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with curve_col2:
+            # More compact metrics display
+            metric_col1, metric_col2 = st.columns(2)
+            
+            metric_col1.metric(
+                label="Current Price",
+                value=f"${user_own_price:.2f}"
+            )
+            
+            Q_cur_old_val = max(0, Q_cur_old)
+            metric_col2.metric(
+                label="Volume", 
+                value=f"{Q_cur_old_val:.0f}"
+            )
+            
+            # Second row of metrics
+            metric_col3, metric_col4 = st.columns(2)
+            
+            metric_col3.metric(
+                label="Revenue",
+                value=f"${Q_cur_old_val * user_own_price:,.0f}"
+            )
+            
+            metric_col4.metric(
+                label="Elasticity",
+                value=format_elas(elas_old)
+            )
+            
+            # Optional divider for visual separation
+            st.markdown("---")
+            
+            # Revenue max info in more compact format
+            if idx_oldmax is not None:
+                st.markdown("#### Revenue Maximization")
+                max_col1, max_col2 = st.columns(2)
+                
+                rev_old_max_ = df_old.loc[idx_oldmax, "Revenue"]
+                pri_old_max_ = df_old.loc[idx_oldmax, "Price"]
+                vol_old_max_ = df_old.loc[idx_oldmax, "Volume"]
+                
+                max_col1.metric(
+                    label="Optimal Price",
+                    value=f"${pri_old_max_:.2f}"
+                )
+                
+                max_col2.metric(
+                    label="Max Revenue",
+                    value=f"${rev_old_max_:.0f}"
+                )
+                
+        # ---------------------------------------------------------------
+        #  PRICE‑vs‑REVENUE CURVE  (place at ROOT level, not in a column)
+        #  (paste just BEFORE the promo‑elasticity section)
+        # ---------------------------------------------------------------
+        st.markdown("### Price ⇢ Revenue Curve")
+
+        # ----------------------------------------------------------------
+        # 1) Ensure your current price appears in the data grid
+        # ----------------------------------------------------------------
+        if competitor_impact and (Q_cur_new is not None):
+            cur_Q = Q_cur_new       # scenario with new RPI
+            use_df = df_new.copy() if df_new is not None else df_old.copy()
+        else:
+            cur_Q = Q_cur_old
+            use_df = df_old.copy()
+
+        cur_rev = user_own_price * cur_Q if (cur_Q is not None) else np.nan
+
+        # If the point is outside the existing price range, append it
+        if user_own_price not in use_df["Price"].values:
+            use_df.loc[len(use_df)] = {
+                "Price": user_own_price,
+                "Revenue": cur_rev,
+                # columns you don’t care about can be NaN
+            }
+
+        # Re‑establish df_old / df_new for plotting (so they now include the point)
+        if use_df is df_old:
+            df_old = use_df.sort_values("Price")
+        else:
+            df_new = use_df.sort_values("Price")
+
+        # ----------------------------------------------------------------
+        # 2) Build the plot
+        # ----------------------------------------------------------------
+        fig_rev = go.Figure()
+        fig_rev.update_layout(
+            plot_bgcolor="rgba(245,245,250,0.9)",
+            paper_bgcolor="rgba(245,245,250,0.9)",
+            xaxis_title="Price (P)",
+            yaxis_title="Revenue (P × Q)",
+            template="plotly_white",
+            colorway=["#1F77B4", "#8E44AD"]
+        )
+
+        # ---------- original scenario ----------
+        fig_rev.add_trace(go.Scatter(
+            x=df_old["Price"],
+            y=df_old["Revenue"],
+            mode="lines+markers",
+            name="Orig RPI"
+        ))
+        if idx_oldmax is not None:
+            fig_rev.add_trace(go.Scatter(
+                x=[pri_oldmax],
+                y=[df_old.loc[idx_oldmax, "Revenue"]],
+                mode="markers+text",
+                text=["Max rev"],
+                textposition="bottom center",
+                marker=dict(size=9, symbol="diamond", color="#1F77B4"),
+                showlegend=False
+            ))
+
+        # ---------- competitor‑impact ----------
+        if competitor_impact and (df_new is not None) and not df_new.empty:
+            fig_rev.add_trace(go.Scatter(
+                x=df_new["Price"],
+                y=df_new["Revenue"],
+                mode="lines+markers",
+                name="New RPI",
+                line=dict(dash="dot")
+            ))
+            idx_newmax = df_new["Revenue"].idxmax()
+            fig_rev.add_trace(go.Scatter(
+                x=[df_new.loc[idx_newmax, "Price"]],
+                y=[df_new.loc[idx_newmax, "Revenue"]],
+                mode="markers+text",
+                text=["Max rev (new)"],
+                textposition="bottom center",
+                marker=dict(size=9, symbol="diamond", color="#8E44AD"),
+                showlegend=False
+            ))
+
+        # ---------- YOUR CURRENT POSITION ----------
+        fig_rev.add_trace(go.Scatter(
+            x=[user_own_price],
+            y=[cur_rev],
+            mode="markers+text",
+            text=[f"Current (${user_own_price:.2f}, {cur_rev:,.0f})"],
+            textposition="top center",
+            marker=dict(size=12, symbol="diamond", color="#27AE60"),
+            name="My current price",
+            showlegend=False
+        ))
+
+        st.plotly_chart(fig_rev, use_container_width=True)
+
+        # Data tables in expanders for less vertical space
+        with st.expander("View Detailed Data Tables", expanded=False):
+            st.markdown("#### Original Scenario Data")
+            st.dataframe(df_old, use_container_width=True)
+            
+            if competitor_impact and df_new is not None and not df_new.empty:
+                st.markdown("#### Competitor Impact Scenario Data")
+                st.dataframe(df_new, use_container_width=True)
+                
+                idx_new_max_ = df_new["Revenue"].idxmax()
+                rev_new_max_ = df_new.loc[idx_new_max_, "Revenue"]
+                pri_new_max_ = df_new.loc[idx_new_max_, "Price"]
+                vol_new_max_ = df_new.loc[idx_new_max_, "Volume"]
+                
+                st.markdown(
+                    f"**New scenario:** Max Revenue= **{rev_new_max_:.2f}** "
+                    f"at Price=**{pri_new_max_:.2f}**, Volume=**{vol_new_max_:.2f}**"
+                )
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # PROMO CLUSTERS (Type 1) – Additional Promo Elasticities
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        st.markdown("### Promotional Elasticity Analysis")
+        
+        if "final_clusters_depth" in st.session_state and st.session_state["final_clusters_depth"]:
+            final_data = st.session_state["final_clusters_depth"]
+            key_tup = (channel_, brand_, variant_, ppg_)
+            
+            if key_tup in final_data:
+                st.markdown(f"**Found cluster definitions** for: {key_tup}")
+                cluster_defs = final_data[key_tup]
+                
+                if not cluster_defs:
+                    st.info("No promotional cluster bins defined for this model.")
+                else:
+                    promo_col1, promo_col2 = st.columns([1, 2])
+                    
+                    with promo_col1:
+                        st.markdown("**Cluster Definitions:**")
+                        st.dataframe(pd.DataFrame(cluster_defs))
+                        
+                        cluster_names = [cd["ClusterName"] for cd in cluster_defs]
+                        chosen_cluster = st.selectbox("Select a promotion bin:", cluster_names)
+                        cobj = next(cd for cd in cluster_defs if cd["ClusterName"] == chosen_cluster)
+                        discount_pct = float(cobj["Centroid"])
+                        
+                        st.markdown(f"**Selected discount**: {discount_pct}%")
+                        promo_price = user_own_price * (1 - discount_pct / 100.0)
+                        st.metric(label="Promotional Price", value=f"${promo_price:.2f}")
+                    
+                    with promo_col2:
+                        # Scenario calculation
+                        Q_promo = compute_current_volume(betas, raw_intercept, promo_price, user_overrides_orig, rpi_old)
+                        elas_promo = compute_elasticity_full(betas, promo_price, Q_promo, rpi_old)
+                        
+                        # Build summary table for all bins
+                        base_vol = Q_cur_old
+                        bins_info = []
+                        bins_info.append({"BinName":"Promo1 (Base)","Discount":0.0})
+                        for cd_ in cluster_defs:
+                            bins_info.append({
+                                "BinName": cd_["ClusterName"],
+                                "Discount": float(cd_["Centroid"])
+                            })
+                        
+                        table_rows = []
+                        for binrow in bins_info:
+                            binname = binrow["BinName"]
+                            disc_ = binrow["Discount"]
+                            new_price = user_own_price * (1 - disc_ / 100.0)
+                            Q_ = compute_current_volume(betas, raw_intercept, new_price, user_overrides_orig, rpi_old)
+                            e_ = compute_elasticity_full(betas, new_price, Q_, rpi_old)
+                            
+                            if binname == "Promo1 (Base)":
+                                vol_chg_str = "-"
+                            else:
+                                if base_vol > 0:
+                                    vol_chg_pct = (Q_ - base_vol) / base_vol * 100.0
+                                    vol_chg_str = f"{vol_chg_pct:.1f}%"
+                                else:
+                                    vol_chg_str = "N/A"
+                                    
+                            table_rows.append({
+                                "PromoBin": binname,
+                                "Discount%": round(disc_, 2),
+                                "Price": round(new_price, 2),
+                                "VolumeChange%": vol_chg_str,
+                                "Volume": round(Q_, 2),
+                                "Elasticity": round(e_, 2) if not np.isnan(e_) else None
+                            })
+                        
+                        df_summary = pd.DataFrame(table_rows)
+                        df_summary = df_summary[["PromoBin", "Discount%", "Price", "VolumeChange%", "Volume", "Elasticity"]]
+                        
+                        st.markdown("**Promotional Bin Summary:**")
+                        st.dataframe(df_summary, use_container_width=True)
+            else:
+                st.info(f"No promotional clusters defined for {key_tup}")
+        else:
+            st.info("No promotional clusters data available in session.")
+
+        # ────────────────────────────────────────────────────────────────
+        #  CROSS‑ELASTICITY ANALYSIS  (drop‑in replacement)
+        # ────────────────────────────────────────────────────────────────
+        st.markdown("### Cross‑Elasticity Analysis")
+
+        if len(rpi_cols) == 0:
+            st.info("No competitor RPI columns found. Cross‑elasticity analysis not applicable.")
+        else:
+            cross_col1, cross_col2 = st.columns([1, 1])
+
+            with cross_col1:
+                # Decide which volume (Q) to use in the elasticity denominator
+                if competitor_impact and (Q_cur_new is not None):
+                    Q_scenario = Q_cur_new
+                    st.info(f"Using competitor‑impact scenario volume: {Q_scenario:.2f}")
+                else:
+                    Q_scenario = Q_cur_old if (Q_cur_old is not None) else 1.0
+                    st.info(f"Using original scenario volume: {Q_scenario:.2f}")
+
+                competitor_data = []
+                st.markdown("#### Competitor Price Overrides")
+
+                # ── LOOP OVER EVERY *_RPI COLUMN ─────────────────────────
+                for rp_ in rpi_cols:
+                    comp_name  = rp_[:-4]          # strip "_RPI"
+                    beta_i     = betas[rp_]
+                    old_ratio  = default_vals.get(rp_, 0.0)
+
+                    # 1) KEY for this competitor price box (fixed → no resets)
+                    key_price = f"{comp_name}_price"
+
+                    # 2) Initialise once: average‑price / average‑ratio
+                    if key_price not in st.session_state:
+                        base_comp_price = default_vals["PPU"] / old_ratio if old_ratio else 0.0
+                        st.session_state[key_price] = round(base_comp_price, 2)
+
+                    col1, col2 = st.columns([3, 2])
+
+                    # 3) NUMBER INPUT always shows the stored value
+                    with col1:
+                        user_price = st.number_input(
+                            f"{comp_name} Price:",
+                            value=st.session_state[key_price],
+                            step=0.5,
+                            key=key_price
+                        )
+
+                    # 4) Compute cross elasticity with live ratio
+                    with col2:
+                        if (user_price > 0) and (Q_scenario > 0):
+                            cross_elas = -beta_i * (user_own_price / user_price) / Q_scenario
+                        else:
+                            cross_elas = np.nan
+                        st.markdown(f"**Cross‑Elasticity**: {cross_elas:.4f}")
+
+                    # 5) Store for summary table
+                    competitor_data.append({
+                        "Competitor": comp_name,
+                        "Beta": round(beta_i, 5),
+                        "Price": round(user_price, 2),
+                        "CrossElasticity": round(cross_elas, 4) if not np.isnan(cross_elas) else None
+                    })
+
+            with cross_col2:
+                st.markdown("#### Cross‑Elasticity Summary")
+                df_cross = pd.DataFrame(competitor_data)
+                df_cross.sort_values("CrossElasticity", ascending=False, inplace=True, ignore_index=True)
+                st.dataframe(df_cross, use_container_width=True)
+
+                if not df_cross.empty:
+                    st.markdown("#### Interpretation")
+                    st.markdown("""
+                    * **Positive value** → competitor is a **substitute**  
+                    (they raise price, you gain volume)  
+                    * **Negative value** → competitor is a **complement**  
+                    (they raise price, you lose volume)  
+                    * **Higher magnitude** → stronger competitive link
+                    """)
+
+        st.stop()
+
+    # ============================= TYPE 2 =============================
+    st.title("Post Modelling – Final Model Summary (Brand + PPG, Shares Computed From Data)")
+    st.subheader("Final Saved Models (Type 2)")
+
+    if "saved_models_type2" in st.session_state and st.session_state["saved_models_type2"]:
+        for key_name, model_list in st.session_state["saved_models_type2"].items():
+            with st.expander(f"Type 2 Models – Key: {key_name}", expanded=False):
+                if model_list:
+                    df_type2 = pd.DataFrame(model_list)
+                    st.dataframe(df_type2, use_container_width=True)
+                else:
+                    st.write(f"No final models under key='{key_name}'.")
+    else:
+        st.info("No final models for Type 2 found.")
+
+    st.write("---")
+    st.subheader("Promo Depth Clusters (if any)")
+    if "final_clusters_depth" in st.session_state and st.session_state["final_clusters_depth"]:
+        final_data = st.session_state["final_clusters_depth"]
+        all_rows= []
+        for combo_key, bins_list in final_data.items():
+            all_rows.extend(bins_list)
+        if all_rows:
+            df_clusters = pd.DataFrame(all_rows)
+            st.markdown("Below are the cluster definitions from the Promo Depth Estimator:")
+            st.dataframe(df_clusters, use_container_width=True)
+        else:
+            st.info("final_clusters_depth is present but empty.")
+    else:
+        st.info("No final clusters from the Promo Depth module found.")
+
+    st.write("---")
+    st.subheader("Data for Post-Modelling Analysis (Type 2 aggregator)")
+    with st.expander("Show DataFrame", expanded=False):
+        st.dataframe(df_source, use_container_width=True)
+
+    required_cols = {"Date","Channel","Brand","PPG","Volume","SalesValue"}
+    if not required_cols.issubset(df_source.columns):
+        st.error(f"The chosen DataFrame must have columns: {required_cols}.")
+        st.stop()
+
+    df_source["Date"] = parse_dates(df_source["Date"])
+    if df_source["Date"].isna().all():
+        st.error("All dates are NaN after converting 'Date'.")
+        st.stop()
+
+    st.markdown("#### Select Time Range (Type 2)")
+    time_options= ["Last Quarter (3 mo)","Last 12 Months","Entire Data"]
+    time_choice= st.radio("Time Range for Type 2:", time_options, index=1)
+
+    max_date= df_source["Date"].max()
+    df_filtered= df_source.copy()
+    import pandas as pd
+    if time_choice == "Last Quarter (3 mo)":
+        cutoff_date= max_date - pd.DateOffset(months=3)
+        df_filtered= df_filtered[df_filtered["Date"]>=cutoff_date]
+    elif time_choice == "Last 12 Months":
+        cutoff_date= max_date - pd.DateOffset(months=12)
+        df_filtered= df_filtered[df_filtered["Date"]>=cutoff_date]
+
+    if df_filtered.empty:
+        st.warning("No data left after the selected time range.")
+        st.stop()
+
+    with stage("aggregation"):
+        # Summaries for Type 2 aggregator approach
+        df_price = (
+            df_filtered
+            .groupby(["Channel","Brand","PPG"], as_index=False, observed=True)
+            .agg({"SalesValue":"sum","Volume":"sum"})
+        )
+        df_price["Price"] = df_price["SalesValue"] / df_price["Volume"].replace(0, np.inf)
+        df_price.rename(columns={"Volume":"SumVolume"}, inplace=True)
+
+        calendar = calendar_for(st.session_state[chosen_data_source])
+        df_filtered["YearMonth"] = lookup(df_filtered, ["YearMonth"], calendar=calendar)["YearMonth"]
+        group_ym = (
+            df_filtered
+            .groupby(["Channel","Brand","PPG"], observed=True)["YearMonth"]
+            .nunique()
+            .reset_index(name="MonthsCount")
+        )
+        df_price = pd.merge(df_price, group_ym, on=["Channel","Brand","PPG"], how="left")
+        df_price["AvgVolume"] = df_price["SumVolume"] / df_price["MonthsCount"].replace(0,1)
+
+    # Retrieve your stored model picks
+    df_brand_models= pd.DataFrame(st.session_state["saved_models_type2"]["Brand"])
+    df_ppg_models  = pd.DataFrame(st.session_state["saved_models_type2"]["PPG"])
+    df_brand_models.rename(columns={"MCV":"brand_MCV"}, inplace=True)
+    df_ppg_models.rename(columns={"MCV":"ppg_MCV"}, inplace=True)
+
+    df_merged= pd.merge(
+        df_price,
+        df_brand_models[["Channel","Brand","brand_MCV"]],
+        on=["Channel","Brand"],
+        how="inner"
+    )
+    df_merged= pd.merge(
+        df_merged,
+        df_ppg_models[["Channel","PPG","ppg_MCV"]],
+        on=["Channel","PPG"],
+        how="inner"
+    )
+
+    brand_vol= (
+        df_merged.groupby(["Channel","Brand"], as_index=False, observed=True)["SumVolume"]
+        .sum()
+        .rename(columns={"SumVolume":"brandVol"})
+    )
+    df_merged= pd.merge(df_merged, brand_vol, on=["Channel","Brand"], how="left")
+    df_merged["ppg_share"]= df_merged["SumVolume"]/ df_merged["brandVol"].replace(0, np.inf)
+    df_merged["ppg_partial"]= df_merged["ppg_share"]* df_merged["ppg_MCV"]
+    brand_index= (
+        df_merged.groupby(["Channel","Brand"], as_index=False, observed=True)["ppg_partial"]
+        .sum()
+        .rename(columns={"ppg_partial":"brand_index"})
+    )
+    df_merged= pd.merge(df_merged, brand_index, on=["Channel","Brand"], how="left")
+    df_merged["final_mcv"] = (df_merged["brand_MCV"]* df_merged["ppg_MCV"])/ df_merged["brand_index"].replace(0,np.inf)
+    df_merged["c"]= df_merged["final_mcv"]
+    df_merged["m"]= (df_merged["Price"]- df_merged["c"])/ df_merged["AvgVolume"].replace(0, np.inf)
+
+    def compute_elasticity(row):
+        m_= row["m"]
+        p_= row["Price"]
+        q_= row["AvgVolume"]
+        if (m_==0) or (q_==0):
+            return np.nan
+        return (1.0/ m_)*(p_/ q_)
+
+    df_merged["Elasticity"]= df_merged.apply(compute_elasticity, axis=1)
+
+    with st.expander("Final Merged Table (Type 2)", expanded=False):
+        st.dataframe(df_merged, use_container_width=True)
+
+    st.markdown("<b>Demand Curves (Volume vs. Price) + Elasticity (Type 2)</b>", unsafe_allow_html=True)
+
+    # Demand curves for Type 2
+    for idx, row in df_merged.iterrows():
+        channel_   = row["Channel"]
+        brand_     = row["Brand"]
+        ppg_       = row["PPG"]
+        intercept  = row["c"]
+        slope_     = row["m"]
+        avg_vol    = row["AvgVolume"]
+        avg_price  = row["Price"]
+        elasticity = row["Elasticity"]
+
+        if avg_vol<=0:
+            st.write(f"Skipping {channel_}-{brand_}-{ppg_}, no positive volume.")
+            continue
+
+        max_domain_vol= 1.5* avg_vol
+        if slope_<0:
+            zero_cross= -intercept/ slope_
+            if 0< zero_cross< max_domain_vol:
+                max_domain_vol= zero_cross
+        if max_domain_vol<=0:
+            st.write(f"Skipping {channel_}-{brand_}-{ppg_} (domain negative).")
+            continue
+
+        volumes= np.linspace(0, max_domain_vol, 100)
+        prices= intercept+ slope_* volumes
+        prices[prices<0]= 0
+        revenues= volumes* prices
+        idx_max_= np.argmax(revenues)
+        vol_max= volumes[idx_max_]
+        rev_max= revenues[idx_max_]
+        price_max= prices[idx_max_]
+
+        fig= go.Figure()
+        fig.update_layout(
+            colorway=["#17BECF","#BCBD22","#9467BD"],
+            plot_bgcolor="rgba(245,245,250,0.9)",
+            paper_bgcolor="rgba(245,245,250,0.9)"
+        )
+        fig.add_trace(go.Scatter(
+            x=volumes, y=prices,
+            mode="lines", name="Demand Curve",
+            line=dict(color="blue",width=2),
+        ))
+        fig.update_layout(
+            shapes=[
+                dict(
+                    type="rect", xref="x", yref="y",
+                    x0=0, y0=0,
+                    x1= avg_vol, y1= avg_price,
+                    fillcolor="limegreen",
+                    opacity=0.3,
+                    line=dict(color="red",width=2,dash="dash")
+                )
+            ]
+        )
+        fig.add_trace(go.Scatter(
+            x=[avg_vol], y=[avg_price],
+            mode="markers",
+            name="Avg Price & Volume",
+            marker=dict(color="orange", size=10),
+        ))
+        if vol_max>0 and price_max>0:
+            fig.add_shape(
+                type="rect",
+                xref="x", yref="y",
+                x0=0, y0=0,
+                x1=vol_max, y1= price_max,
+                fillcolor="red", opacity=0.15,
+                line=dict(color="red",width=1,dash="dot")
+            )
+            fig.add_trace(go.Scatter(
+                x=[vol_max], y=[price_max],
+                mode="markers",
+                name="Max Revenue",
+                marker=dict(color="red", size=10),
+            ))
+        elas_str= f"{elasticity:.2f}" if not np.isnan(elasticity) else "N/A"
+        fig.add_annotation(
+            x=0.5, y=1.06, xref="paper", yref="paper",
+            text=f"<b>Elasticity: {elas_str}</b>",
+            showarrow=False,
+            font=dict(size=14, color="black"),
+        )
+        fig.update_layout(
+            title=f"Demand Curve – (Channel={channel_}, Brand={brand_}, PPG={ppg_})",
+            xaxis_title="Volume (Q)",
+            yaxis_title="Price",
+            template="plotly_white",
+            legend=dict(x=0.02, y=0.98, bgcolor="rgba(255,255,255,0.5)"),
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+
+
+    # ------------------------------------------------------------------------
+    # NAVIGATION BUTTONS
+    # ------------------------------------------------------------------------
+    st.markdown("---")
+    cBack, cHome = st.columns(2)
+    with cBack:
+        if st.button("Back", key="section2_module1_back"):
+            go_back()
+    with cHome:
+        if st.button("Home", key="section2_module1_home"):
+            go_home()
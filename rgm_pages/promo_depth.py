@@ -0,0 +1,702 @@
+"""Promo Depth page (section 1)."""
+import streamlit as st
+
+from rgm.artifacts import ArtifactStore, dataset_fingerprint
+from rgm.calendar import calendar_for, lookup, parse_dates, week_start
+from rgm.hierarchy import hierarchy_index
+from rgm.profiling import stage
+from rgm.promo_depth import MAX_CLUSTERS, auto_bins, elbow_inertias, find_elbow_k, fit_clusters, promo_depth, scale_depths
+from rgm_pages.navigation import go_back, go_home
+from rgm_pages.results_browser import store_session_value
+
+
+def promo_depth_page():
+    # This heading replaces any existing placeholder heading you had before.
+    st.subheader("📉 Automatic Promo Depth Estimator")
+
+    # Retrieve the main DataFrame from session state (saved by the File Management section)
+    dataframe = st.session_state.get("D0", None)
+
+    # -----------
+    #  MAIN LOGIC
+    # -----------
+    import numpy as np
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    # Check for mandatory columns in your data: BasePrice and Price
+    def has_required_columns(df_check):
+        return ("BasePrice" in df_check.columns) and ("Price" in df_check.columns)
+
+    # ---------------------------------------------------------------------
+    # If 'dataframe' has the needed columns, use that; else try 'dataframe1'
+    # ---------------------------------------------------------------------
+    if dataframe is not None and has_required_columns(dataframe):
+        df = dataframe
+        st.write("Using `dataframe` for promo_depth because it has BasePrice & Price.")
+    elif (
+        "dataframe1" in st.session_state
+        and st.session_state["dataframe1"] is not None
+        and has_required_columns(st.session_state["dataframe1"])
+    ):
+        df = st.session_state["dataframe1"]
+        st.write("Using `st.session_state['dataframe1']` for promo_depth because it has BasePrice & Price.")
+    else:
+        st.error(
+            "Neither the selected file nor `dataframe1` in session state contains both "
+            "'BasePrice' and 'Price' columns. Please upload a valid file (or compute them in the Base Price step)."
+        )
+        st.stop()
+
+    # ------------------------------------------------
+    # SECTION A: Channel, Brand, Aggregator, PPG, etc.
+    # ------------------------------------------------
+    hier = hierarchy_index(df)
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        channel_selected = st.selectbox(
+            "Select Channel",
+            sorted(hier.children()),
+            key="depth_channel"
+        )
+
+    with col2:
+        brand_list = sorted(hier.children(channel_selected))
+        brand_selected = st.radio(
+            "Select Brand",
+            options=brand_list,
+            horizontal=True,
+            key="depth_brand"
+        )
+
+    aggregator_options = ["Variant", "PackType", "PackSize"]
+    aggregator_col = st.selectbox(
+        "Select Aggregator Dimension",
+        aggregator_options,
+        key="depth_aggregator"
+    )
+    if aggregator_col not in df.columns:
+        st.warning(f"Column '{aggregator_col}' not found in the data.")
+        st.stop()
+
+    # If you saved an aggregator value from the Base Price page, you could re-use it:
+    if "aggregator_selected" in st.session_state:
+        aggregator_selected = st.session_state["aggregator_selected"]
+        st.write(f"Using aggregator: **{aggregator_selected}** from session state.")
+    else:
+        aggregator_selected = st.selectbox(
+            "Select Aggregator Value",
+            sorted(hier.children(channel_selected, brand_selected, aggregator=aggregator_col)),
+            key="depth_aggregator_value"
+        )
+    aggregator_path = (channel_selected, brand_selected, aggregator_selected)
+
+    # PPG selection
+    ppg_choices = sorted(hier.children(*aggregator_path, aggregator=aggregator_col))
+    ppg_selected = st.selectbox("Select PPG", ppg_choices, key="depth_ppg")
+    subset = hier.take(df, *aggregator_path, ppg_selected, aggregator=aggregator_col)
+    if subset.empty:
+        st.warning("No data found for this combination.")
+        st.stop()
+
+    # Frequency (Daily vs. Weekly)
+    agg_freq = st.radio(
+        "Select Aggregation Frequency for Promo Depth",
+        options=["Daily", "Weekly"],
+        index=1,
+        key="promo_agg_freq"
+    )
+
+    # Define grouping columns based on frequency
+    if agg_freq == "Daily":
+        if "Day" not in subset.columns:
+            # If there's a Date column, use that
+            if "Date" in subset.columns:
+                subset["Day"] = lookup(subset, ["Day"], calendar=calendar_for(df))["Day"]
+            else:
+                # Fallback: parse from index or show error
+                st.warning("No 'Date' column found. Cannot aggregate daily.")
+                st.stop()
+        grouping_cols = ["Day"]
+    else:
+        # Weekly => group by Year, Week (and Month if present)
+        grouping_cols = ["Year", "Week"]
+        if "Month" in subset.columns:
+            grouping_cols = ["Year", "Month", "Week"]
+
+    # -------------------------------------
+    # 2) Aggregate WITHOUT recomputing Price
+    # -------------------------------------
+    with stage("aggregation"):
+        agg_data = subset.groupby(grouping_cols, as_index=False).agg(
+            {
+                "SalesValue": "sum",
+                "Volume": "sum",
+                "Price": "mean",       # Price must already be in your DF
+                "BasePrice": "mean"    # BasePrice must already be in your DF
+            }
+        )
+
+    # Compute PromoDepth
+    agg_data["PromoDepth"] = promo_depth(agg_data["Price"], agg_data["BasePrice"])
+
+    # Create a time axis label
+    if agg_freq == "Weekly":
+        agg_data["WeekStartDate"] = week_start(agg_data["Year"], agg_data["Week"], calendar_for(df))
+        agg_data.dropna(subset=["WeekStartDate"], inplace=True)
+        agg_data.sort_values("WeekStartDate", inplace=True)
+        agg_data["TimeLabel"] = agg_data["WeekStartDate"].dt.strftime("%Y-W%V")
+    else:
+        agg_data["Day"] = parse_dates(agg_data["Day"])
+        agg_data.dropna(subset=["Day"], inplace=True)
+        agg_data.sort_values("Day", inplace=True)
+        agg_data["TimeLabel"] = agg_data["Day"].dt.strftime("%Y-%m-%d")
+
+    st.write(f"**{len(agg_data)}** rows after aggregation using {agg_freq} frequency.")
+    st.markdown("<hr style='border:2px solid black'/>", unsafe_allow_html=True)
+
+    # ------------------------------------------------
+    # SECTION B: K-Means & Bin Range Definition
+    # ------------------------------------------------
+    st.subheader("B) K-Means on Discounted Rows & Bin Range Definition")
+    df_discounts = agg_data[agg_data["PromoDepth"] > 0].copy()
+    if df_discounts.empty:
+        st.info("No discount found (Price >= BasePrice). Nothing to cluster.")
+        st.stop()
+
+    # Prepare data for elbow method
+    scaler, X_scaled = scale_depths(df_discounts["PromoDepth"].values)
+    with stage("elbow (K-Means)"):
+        k_candidates, inertias = elbow_inertias(X_scaled)
+
+    rec_k = find_elbow_k(k_candidates, inertias)
+
+    col_left, col_right = st.columns(2)
+    with col_left:
+        fig_elbow = go.Figure()
+        fig_elbow.add_trace(go.Scatter(x=k_candidates, y=inertias, mode="lines+markers"))
+        fig_elbow.update_layout(title="Elbow Plot", xaxis_title="k", yaxis_title="Inertia")
+        st.plotly_chart(fig_elbow, use_container_width=True)
+
+    with col_right:
+        st.info(f"Recommended k = {rec_k}")
+        chosen_k = st.number_input(
+            "Final # Clusters (k):",
+            min_value=1,
+            max_value=MAX_CLUSTERS,
+            value=int(rec_k),
+            step=1
+        )
+
+        # Run K-Means
+        with stage("clustering (K-Means)"):
+            km = fit_clusters(X_scaled, chosen_k)
+            df_discounts["ClusterID"] = km.labels_
+
+        # Summaries
+        count_label = "NumDays" if agg_freq == "Daily" else "NumWeeks"
+        summary = df_discounts.groupby("ClusterID", as_index=False).agg(
+            **{
+                count_label: ("PromoDepth", "count"),
+                "AvgDepth": ("PromoDepth", "mean"),
+                "MinDepth": ("PromoDepth", "min"),
+                "MaxDepth": ("PromoDepth", "max")
+            }
+        )
+        summary[["AvgDepth", "MinDepth", "MaxDepth"]] *= 100
+        st.dataframe(summary)
+
+        # Generate auto-bins from cluster centers
+        cluster_bins = auto_bins(km, scaler)
+
+        # Key for storing bin definitions
+        current_config_key = (channel_selected, brand_selected, aggregator_selected, ppg_selected)
+
+        if "saved_bins_current" not in st.session_state:
+            st.session_state["saved_bins_current"] = {}
+        if "old_chosen_k" not in st.session_state:
+            st.session_state["old_chosen_k"] = {}
+
+        # Retrieve or initialize the bins for this combo
+        existing = st.session_state["saved_bins_current"].get(current_config_key, None)
+        if existing is None:
+            st.session_state["saved_bins_current"][current_config_key] = {"bins": cluster_bins}
+            existing = st.session_state["saved_bins_current"][current_config_key]
+        else:
+            # If we have bins already and the user changed k, overwrite with new auto-bins
+            old_k = st.session_state["old_chosen_k"].get(current_config_key, None)
+            if old_k != chosen_k:
+                existing["bins"] = cluster_bins
+
+        st.session_state["old_chosen_k"][current_config_key] = chosen_k
+
+        # Let user edit bins
+        current_data = existing
+        new_defs = []
+        with st.expander("Define & Edit Bin Ranges (Min% .. Max%)", expanded=True):
+            for cdef in current_data["bins"]:
+                cid = cdef["ClusterID"]
+                colA, colB, colC, colD = st.columns([1.5, 1, 1, 1])
+                name_in = colA.text_input(
+                    f"Name (Cluster {cid})",
+                    cdef["name"],
+                    key=f"cname_{current_config_key}_{cid}"
+                )
+                min_in = colB.text_input(
+                    "Min%",
+                    str(cdef["min"]),
+                    key=f"cmin_{current_config_key}_{cid}"
+                )
+                max_in = colC.text_input(
+                    "Max%",
+                    str(cdef["max"]),
+                    key=f"cmax_{current_config_key}_{cid}"
+                )
+                try:
+                    cent_val = round((float(min_in) + float(max_in)) / 2, 2)
+                except ValueError:
+                    cent_val = cdef["centroid"]
+                colD.write(f"Centroid: {cent_val}")
+
+                new_defs.append({
+                    "ClusterID": cid,
+                    "name": name_in,
+                    "min": min_in,
+                    "max": max_in,
+                    "centroid": cent_val
+                })
+
+        def build_final_bins(ch, br, agg_val, pp, bin_list):
+            out = []
+            for item in bin_list:
+                out.append({
+                    "ClusterID": item["ClusterID"],
+                    "Channel": ch,
+                    "Brand": br,
+                    "Aggregator": agg_val,  
+                    "PPG": pp,
+                    "Min": item["min"],
+                    "Max": item["max"],
+                    "Centroid": item["centroid"],
+                    "ClusterName": f"{br}_{agg_val}_{pp}_Promo{item['ClusterID']+1}"
+                })
+            return out
+
+        if "final_clusters_depth" not in st.session_state:
+            st.session_state["final_clusters_depth"] = {}
+
+        if st.button("Save & Update Bin Ranges"):
+            try:
+                for nd in new_defs:
+                    mn = float(nd["min"])
+                    mx = float(nd["max"])
+                    nd["min"] = round(mn, 2)
+                    nd["max"] = round(mx, 2)
+                    nd["centroid"] = round((mn + mx) / 2, 2)
+                current_data["bins"] = new_defs
+                st.success("Manual bins updated.")
+
+                final_bin_defs = build_final_bins(
+                    channel_selected,
+                    brand_selected,
+                    aggregator_selected,
+                    ppg_selected,
+                    new_defs
+                )
+                st.session_state["final_clusters_depth"][current_config_key] = final_bin_defs
+            except Exception as e:
+                st.error(f"Error updating bins: {e}")
+
+        # Assign each discounted row to a bin
+        def assign_bin(row):
+            discount_pct = row["PromoDepth"] * 100
+            for b in current_data["bins"]:
+                if b["min"] <= discount_pct <= b["max"]:
+                    return b["name"]
+            return None
+
+        df_discounts["PromoBin"] = df_discounts.apply(assign_bin, axis=1)
+        df_discounts = df_discounts[df_discounts["PromoBin"].notnull()]
+
+        bin_names = [b["name"] for b in current_data["bins"]]
+        color_cycle = px.colors.qualitative.Set2
+        bin_color_map = {n: color_cycle[i % len(color_cycle)] for i, n in enumerate(bin_names)}
+
+    # ------------------------------------------------
+    # SECTION B.2: Raw Cluster Plot (Discount% vs. Time)
+    # ------------------------------------------------
+    st.subheader("B.2) Raw Cluster Plot (Discount% vs. Time)")
+
+    if "rawcluster_toggle" not in st.session_state:
+        st.session_state["rawcluster_toggle"] = False
+
+    if st.button("Toggle Sort (Time vs. Asc. Discount)", key="raw_cluster_button"):
+        st.session_state["rawcluster_toggle"] = not st.session_state["rawcluster_toggle"]
+
+    cluster_data = df_discounts.copy()
+    if st.session_state["rawcluster_toggle"]:
+        cluster_data = cluster_data.sort_values("PromoDepth").reset_index(drop=True)
+        cluster_data["Xaxis"] = cluster_data.index + 1
+        x_label = "Sorted by Discount"
+        tickvals, ticktext = None, None
+    else:
+        agg_sorted = agg_data.sort_values("TimeLabel").reset_index(drop=True)
+        agg_sorted["Xaxis"] = agg_sorted.index + 1
+        lab_map = {row["TimeLabel"]: row["Xaxis"] for _, row in agg_sorted.iterrows()}
+
+        cluster_data = cluster_data.sort_values("TimeLabel").reset_index(drop=True)
+        cluster_data["Xaxis"] = cluster_data["TimeLabel"].map(lab_map)
+        x_label = "Time"
+        tickvals = list(lab_map.values())
+        ticktext = list(lab_map.keys())
+
+    cluster_data["Discount%"] = cluster_data["PromoDepth"] * 100
+    fig_raw = px.scatter(
+        cluster_data,
+        x="Xaxis",
+        y="Discount%",
+        color="PromoBin",
+        title="Raw Cluster Plot: Discount% vs. Time",
+        labels={"Xaxis": x_label, "Discount%": "Discount(%)", "PromoBin": "Bin"},
+        hover_data=["Price", "BasePrice"]
+    )
+    if tickvals and ticktext:
+        fig_raw.update_layout(xaxis=dict(tickmode="array", tickvals=tickvals, ticktext=ticktext))
+
+    for b in current_data["bins"]:
+        bname = b["name"]
+        cent = b["centroid"]
+        sub = cluster_data[cluster_data["PromoBin"] == bname]
+        if not sub.empty:
+            median_x = sub["Xaxis"].median()
+            fig_raw.add_trace(go.Scatter(
+                x=[median_x],
+                y=[cent],
+                mode="markers",
+                marker=dict(color=bin_color_map.get(bname, "gray"), symbol="diamond", size=12),
+                name=f"Centroid {bname} ({cent}%)"
+            ))
+
+    st.plotly_chart(fig_raw, use_container_width=True)
+    st.markdown("<hr style='border:2px solid black'/>", unsafe_allow_html=True)
+
+    # ------------------------------------------------
+    # SECTION C: Final Table, Bar Chart & Final Promo Plot
+    # ------------------------------------------------
+    st.subheader("C) Final Table, Bar Chart & Final Promo Plot")
+    if agg_freq == "Daily":
+        count_label = "NumDays"
+        vol_label = "VolPerDay"
+    else:
+        count_label = "NumWeeks"
+        vol_label = "VolPerWeek"
+
+    vol_summary = df_discounts.groupby("PromoBin", as_index=False).agg(
+        **{
+            count_label: ("PromoBin", "count"),
+            "TotalVol": ("Volume", "sum")
+        }
+    )
+    vol_summary[vol_label] = vol_summary["TotalVol"] / vol_summary[count_label].replace(0, np.nan)
+    totalV = vol_summary["TotalVol"].sum()
+    vol_summary["VolShare%"] = (vol_summary["TotalVol"] / totalV * 100) if totalV > 0 else 0
+    vol_summary.sort_values(vol_label, ascending=False, inplace=True)
+    vol_summary.reset_index(drop=True, inplace=True)
+
+    bins_df = pd.DataFrame(current_data["bins"])
+    merged_table = pd.merge(vol_summary, bins_df, left_on="PromoBin", right_on="name", how="left")
+    merged_table = merged_table[["PromoBin", count_label, "max", "TotalVol", vol_label, "VolShare%"]]
+
+    def color_promo(val):
+        return f"background-color: {bin_color_map.get(val, '#ffffff')}; color: white; font-weight: bold;"
+
+    st.markdown(f"#### Combined Table (Sorted by {vol_label} DESC)")
+    st.table(merged_table.style.map(color_promo, subset=["PromoBin"]))
+
+    fig_bar = px.bar(
+        vol_summary,
+        x="PromoBin",
+        y=vol_label,
+        title=f"Volume per {'Day' if agg_freq == 'Daily' else 'Week'} by Bin (Descending)",
+        labels={
+            "PromoBin": "Bin",
+            vol_label: f"Volume per {'Day' if agg_freq=='Daily' else 'Week'}"
+        },
+        color="PromoBin",
+        color_discrete_map=bin_color_map
+    )
+    st.plotly_chart(fig_bar, use_container_width=True)
+
+    chosen_bins = st.multiselect(
+        "Choose bins to highlight in final chart:",
+        sorted(df_discounts["PromoBin"].unique()),
+        default=sorted(df_discounts["PromoBin"].unique())
+    )
+    if "promo_plot_toggle" not in st.session_state:
+        st.session_state["promo_plot_toggle"] = False
+    if st.button("Toggle X-axis (Time vs. Asc. Discount)", key="promo_plot_button"):
+        st.session_state["promo_plot_toggle"] = not st.session_state["promo_plot_toggle"]
+
+    if st.session_state["promo_plot_toggle"]:
+        chart_data = agg_data.sort_values("PromoDepth").reset_index(drop=True)
+        chart_data["Xaxis"] = chart_data.index + 1
+        x_label = "Sorted by Discount"
+        tickvals, ticktext = None, None
+    else:
+        if agg_freq == "Weekly":
+            chart_data = agg_data.sort_values("WeekStartDate").reset_index(drop=True)
+        else:
+            chart_data = agg_data.sort_values("Day").reset_index(drop=True)
+        chart_data["Xaxis"] = chart_data.index + 1
+        x_label = "Time"
+        tickvals = chart_data["Xaxis"].tolist()
+        ticktext = chart_data["TimeLabel"].tolist()
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=chart_data["Xaxis"],
+        y=chart_data["Price"],
+        mode="lines+markers",
+        name="Price",
+        line=dict(color="blue"),
+        marker=dict(color="blue", size=4),
+        customdata=np.stack([chart_data["BasePrice"], chart_data["PromoDepth"]], axis=-1),
+        hovertemplate=(
+            "<b>Price:</b> %{y:.2f}<br>"
+            "<b>BasePrice:</b> %{customdata[0]:.2f}<br>"
+            "<b>Depth:</b> %{customdata[1]:.1%}"
+        )
+    ))
+    fig.add_trace(go.Scatter(
+        x=chart_data["Xaxis"],
+        y=chart_data["BasePrice"],
+        mode="lines",
+        name="BasePrice",
+        line=dict(color="red", dash="dot"),
+        hoverinfo="skip"
+    ))
+
+    if tickvals and ticktext:
+        fig.update_layout(xaxis=dict(tickmode="array", tickvals=tickvals, ticktext=ticktext))
+
+    disc_plot = df_discounts[df_discounts["PromoBin"].isin(chosen_bins)].copy()
+    if st.session_state["promo_plot_toggle"]:
+        disc_plot = disc_plot.sort_values("PromoDepth").reset_index(drop=True)
+        disc_plot["Xaxis"] = disc_plot.index + 1
+    else:
+        if agg_freq == "Weekly":
+            disc_plot = disc_plot.sort_values("WeekStartDate").reset_index(drop=True)
+        else:
+            disc_plot = disc_plot.sort_values("Day").reset_index(drop=True)
+        disc_plot["Xaxis"] = disc_plot["TimeLabel"].map({row["TimeLabel"]: row["Xaxis"] for _, row in chart_data.iterrows()})
+
+    for bname in chosen_bins:
+        sub = disc_plot[disc_plot["PromoBin"] == bname]
+        fig.add_trace(go.Scatter(
+            x=sub["Xaxis"],
+            y=sub["Price"],
+            mode="markers",
+            name=bname,
+            marker=dict(color=bin_color_map.get(bname, "gray"), size=8),
+            customdata=np.stack([sub["BasePrice"], sub["PromoDepth"]], axis=-1),
+            hovertemplate=(
+                f"<b>Bin:</b> {bname}<br><b>Price:</b> %{{y:.2f}}<br>"
+                f"<b>BasePrice:</b> %{{customdata[0]:.2f}}<br>"
+                f"<b>Depth:</b> %{{customdata[1]:.1%}}"
+            )
+        ))
+
+    fig.update_layout(
+        title="Final Promo Plot: Price vs BasePrice (Markers by Bin)",
+        xaxis_title=x_label,
+        yaxis_title="Price",
+        hovermode="x unified"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # ------------------------------------------------
+    # SECTION D: FINAL SAVE (Auto-Generate Only for Unedited Combos)
+    # ------------------------------------------------
+    st.markdown("<hr style='border:2px solid black'/>", unsafe_allow_html=True)
+    st.subheader("Final Save (Auto-Generate Only for Unedited Combos)")
+
+    if st.button("FINAL SAVE (All Configurations)"):
+        final_clusters = st.session_state.get("final_clusters_depth", {})
+        # The saved bins are keyed on the data, the settings and the manual bins they start from
+        promo_artifact = (
+            "promo_bins",
+            dataset_fingerprint(df),
+            {"frequency": agg_freq, "aggregators": aggregator_options, "manual": dict(final_clusters)},
+        )
+        stored = ArtifactStore().load(*promo_artifact)
+        if stored is not None:
+            final_clusters = stored[0]
+            st.info(f"⚡ Bins loaded from the artifact store (computed {stored[1]['created_at']}).")
+        else:
+            for ch in hier.children():
+                for br in hier.children(ch):
+                    for agg_col2 in aggregator_options:
+                        if agg_col2 not in df.columns:
+                            continue
+                        for agg_val2 in hier.children(ch, br, aggregator=agg_col2):
+                            for pp in hier.children(ch, br, agg_val2, aggregator=agg_col2):
+                                key = (ch, br, agg_val2, pp)
+                                if key in final_clusters:
+                                    st.info(f"Skipping {key} (already in final clusters).")
+                                    continue
+                                sub_df = hier.take(df, ch, br, agg_val2, pp, aggregator=agg_col2)
+                                if sub_df.empty:
+                                    continue
+
+                                # Adjust grouping for daily vs. weekly
+                                if agg_freq == "Daily":
+                                    if "Day" not in sub_df.columns:
+                                        if "Date" in sub_df.columns:
+                                            sub_df["Day"] = lookup(sub_df, ["Day"], calendar=calendar_for(df))["Day"]
+                                        else:
+                                            st.warning("Daily grouping requires a 'Date' column. Skipping this subset.")
+                                            continue
+                                    grouping_cols2 = ["Day"]
+                                else:
+                                    if "Month" in sub_df.columns:
+                                        grouping_cols2 = ["Year", "Month", "Week"]
+                                    else:
+                                        grouping_cols2 = ["Year", "Week"]
+
+                                # Group the same way, but do NOT recompute Price
+                                w_agg = sub_df.groupby(grouping_cols2, as_index=False).agg(
+                                    {
+                                        "SalesValue": "sum",
+                                        "Volume": "sum",
+                                        "Price": "mean",
+                                        "BasePrice": "mean"
+                                    }
+                                )
+                                w_agg["PromoDepth"] = promo_depth(w_agg["Price"], w_agg["BasePrice"])
+
+                                disc = w_agg[w_agg["PromoDepth"] > 0].copy()
+                                if disc.empty:
+                                    continue
+
+                                sc_c, X_sc = scale_depths(disc["PromoDepth"].values)
+                                cands, inert_list = elbow_inertias(X_sc)
+                                best_k2 = find_elbow_k(cands, inert_list)
+
+                                auto_km = fit_clusters(X_sc, best_k2)
+                                disc["ClusterID"] = auto_km.labels_
+
+                                auto_binlist = [
+                                    {
+                                        "ClusterID": b["ClusterID"],
+                                        "Channel": ch,
+                                        "Brand": br,
+                                        "PPG": pp,
+                                        "Aggregator": agg_val2,
+                                        "Min": b["min"],
+                                        "Max": b["max"],
+                                        "Centroid": b["centroid"],
+                                        "ClusterName": f"{br}_{agg_val2}_{pp}_{b['name']}"
+                                    }
+                                    for b in auto_bins(auto_km, sc_c)
+                                ]
+
+                                def build_final_bins(ch2, br2, agg_vv, pp2, bin_list):
+                                    out2 = []
+                                    for item in bin_list:
+                                        out2.append({
+                                            "ClusterID": item["ClusterID"],
+                                            "Channel": ch2,
+                                            "Brand": br2,
+                                            "Aggregator": agg_vv,
+                                            "PPG": pp2,
+                                            "Min": item["Min"],
+                                            "Max": item["Max"],
+                                            "Centroid": item["Centroid"],
+                                            "ClusterName": item["ClusterName"]
+                                        })
+                                    return out2
+
+                                final_bin_defs = build_final_bins(ch, br, agg_val2, pp, auto_binlist)
+                                final_clusters[key] = final_bin_defs
+
+        st.session_state["final_clusters_depth"] = final_clusters
+        if stored is None:
+            store_session_value("final_clusters_depth", *promo_artifact, label="Promo bins")
+        st.success("✅ Final Save done for all unedited combos. Manual combos remain intact.")
+
+    st.subheader("Download Saved Clusters (All Combos)")
+    final_data = st.session_state.get("final_clusters_depth", {})
+    if final_data and isinstance(final_data, dict):
+        all_c = []
+        for combo, bins_list in final_data.items():
+            all_c.extend(bins_list)
+        if all_c:
+            df_clusters = pd.DataFrame(all_c)
+            desired_order = [
+                "Channel", "Brand", "Aggregator", "PPG",
+                "ClusterID", "Min", "Max", "Centroid", "ClusterName"
+            ]
+            df_clusters = df_clusters.reindex(columns=desired_order)
+            st.dataframe(df_clusters)
+            csv_data = df_clusters.to_csv(index=False).encode("utf-8")
+            st.download_button(
+                label="📥 Download Clusters as CSV",
+                data=csv_data,
+                file_name="promo_clusters.csv",
+                mime="text/csv"
+            )
+        else:
+            st.info("No combos have final clusters. Manually edit or do final save.")
+    else:
+        st.info("No final clusters so far. Manually edit or do final save first.")
+
+    # ------------------------------------------------
+    # SECTION E: Download Updated Aggregated Dataset (Current Combo)
+    # ------------------------------------------------
+    st.markdown("<hr style='border:2px solid black'/>", unsafe_allow_html=True)
+    st.subheader("Download Updated Aggregated Dataset (Current Combo)")
+
+    agg_final = agg_data.copy()
+    agg_final["PromoName"] = "No Promo"
+    agg_final["PromoMin"] = 0.0
+    agg_final["PromoMax"] = 0.0
+
+    current_data = st.session_state["saved_bins_current"].get(
+        (channel_selected, brand_selected, aggregator_selected, ppg_selected), {}
+    )
+    if not df_discounts.empty and current_data.get("bins"):
+        bin_map = {b["name"]: (b["min"], b["max"]) for b in current_data["bins"]}
+        agg_final.loc[df_discounts.index, "PromoName"] = df_discounts["PromoBin"]
+        for idx in df_discounts.index:
+            bin_name = df_discounts.loc[idx, "PromoBin"]
+            if bin_name in bin_map:
+                agg_final.loc[idx, "PromoMin"] = bin_map[bin_name][0]
+                agg_final.loc[idx, "PromoMax"] = bin_map[bin_name][1]
+
+    csv_final = agg_final.to_csv(index=False).encode("utf-8")
+    st.download_button(
+        label="📥 Download Updated Aggregated Dataset (Current Combo)",
+        data=csv_final,
+        file_name="updated_aggregated_dataset.csv",
+        mime="text/csv"
+    )
+
+    if st.button("Clear All Saved Clusters"):
+        if "final_clusters_depth" in st.session_state:
+            st.session_state["final_clusters_depth"] = {}
+            st.success("All saved clusters have been cleared.")
+        else:
+            st.info("No saved clusters found.")
+
+    # ---------------------------------
+    # NAVIGATION BUTTONS (Back / Home)
+    # ---------------------------------
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Back"):
+            go_back()
+    with col2:
+        if st.button("Home"):
+            go_home()
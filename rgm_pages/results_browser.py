@@ -0,0 +1,67 @@
+"""Results browser: the pipeline outputs kept in the artifact store (see rgm.artifacts)."""
+import streamlit as st
+
+from rgm.artifacts import ArtifactStore
+from rgm_pages.jobs import store_result
+from rgm_pages.navigation import go_back, go_home
+
+
+def store_session_value(key, stage, dataset, params, label=None):
+    """Keep st.session_state[key] in the artifact store (e.g. after the user saves it)."""
+    ArtifactStore().save(stage, dataset, params, st.session_state[key], targets=key, label=label)
+
+
+def results_browser_page():
+    import pandas as pd
+
+    st.subheader("🗄️ Results Browser")
+    st.caption(
+        "Base prices, promo bins, model results and saved models from earlier runs, "
+        "on any dataset. Loading a run puts its tables back into this session as if they had just been computed."
+    )
+
+    store = ArtifactStore()
+    runs = store.runs()
+    if runs.empty:
+        st.info("No stored results yet. They are kept as the pipeline pages compute them.")
+    else:
+        stages = sorted(runs["Stage"].unique())
+        shown_stages = st.multiselect("Stages:", stages, default=stages, key="browser_stages")
+        shown = runs[runs["Stage"].isin(shown_stages)].reset_index(drop=True)
+        st.dataframe(shown.drop(columns="Path"), hide_index=True, use_container_width=True)
+
+        if not shown.empty:
+            choice = st.selectbox(
+                "Run:",
+                shown.index,
+                format_func=lambda i: f"{shown.at[i, 'Created']} · {shown.at[i, 'Label']} · {shown.at[i, 'Dataset']}",
+                key="browser_run",
+            )
+            path = shown.at[choice, "Path"]
+            result, meta = store.load_run(path)
+            with st.expander("Parameters"):
+                st.json(meta["params"])
+
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("Load into session", key="browser_load"):
+                    store_result(meta["targets"], result)
+                    st.success(f"✅ Loaded {meta['label']} ({meta['created_at']}).")
+            with col2:
+                if st.button("Delete", key="browser_delete"):
+                    store.delete(path)
+                    st.rerun()
+
+            tables = [t for t in (result if isinstance(result, tuple) else (result,)) if isinstance(t, pd.DataFrame)]
+            for table in tables:
+                st.dataframe(table.head(100), use_container_width=True)
+
+    # Navigation buttons
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Back"):
+            go_back()
+    with col2:
+        if st.button("Home"):
+            go_home()
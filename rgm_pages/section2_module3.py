@@ -0,0 +1,21 @@
+"""Section 2, module 3 page."""
+import streamlit as st
+
+from rgm_pages.navigation import go_back, go_home
+
+
+def section2_module3_page():
+    
+
+
+    # ------------------------------------------------------------------------
+    # NAVIGATION BUTTONS
+    # ------------------------------------------------------------------------
+    st.markdown("---")
+    cBack, cHome = st.columns(2)
+    with cBack:
+        if st.button("Back", key="section2_module3_back"):
+            go_back()
+    with cHome:
+        if st.button("Home", key="section2_module3_home"):
+            go_home()
@@ -0,0 +1,855 @@
+"""Section 3, module 2 page."""
+from rgm.hierarchy import hierarchy_index
+from rgm_pages.navigation import go_back, go_home
+
+
+##############################section 3 
+# def section3_module2_page():
+#     import streamlit as st
+#     import plotly.graph_objects as go
+
+#     # -----------------------------------------------------------------------
+#     # CUSTOM CSS FOR VISUAL ENHANCEMENTS
+#     # -----------------------------------------------------------------------
+#     st.markdown("""
+#     <style>
+#     /* Overall app background */
+#     .stApp {
+#         background-color: #F5F5F5;
+#     }
+
+#     /* Primary headers */
+#     .custom-header {
+#         font-family: 'Inter', sans-serif;
+#         font-size: 36px; 
+#         font-weight: 600;
+#         color: #333333;
+#         margin-bottom: 0.2rem;
+#     }
+
+#     .subheader {
+#         font-family: 'Inter', sans-serif;
+#         font-size: 18px;
+#         color: #666666;
+#         margin-top: 0;
+#         margin-bottom: 1rem;
+#     }
+
+#     /* Accent horizontal rule */
+#     .accent-hr {
+#         border: 0;
+#         height: 2px;
+#         background: linear-gradient(to right, #FFBD59, #FFC87A);
+#         margin: 0.5rem 0 1.5rem 0;
+#     }
+
+#     /* Card container styling */
+#     .card {
+#         background-color: #FFFFFF; 
+#         padding: 1.2rem 1.2rem;
+#         margin-bottom: 1rem;
+#         border-radius: 8px;
+#         box-shadow: 2px 2px 10px rgba(0,0,0,0.05);
+#     }
+
+#     /* Card headings */
+#     .card h2 {
+#         font-family: 'Inter', sans-serif;
+#         font-size: 24px;
+#         margin: 0.2rem 0 1rem 0;
+#         color: #333333;
+#     }
+
+#     /* Buttons in horizontal block (Back, Home) */
+#     div[data-testid="stHorizontalBlock"] button {
+#         background-color: #FFBD59 !important; 
+#         color: #333333 !important;
+#         font-weight: 600 !important;
+#         border-radius: 4px !important;
+#         border: none !important;
+#         margin-bottom: 0.5rem;
+#     }
+#     div[data-testid="stHorizontalBlock"] button:hover {
+#         background-color: #FFC87A !important;
+#     }
+
+#     /* Dataframe styling */
+#     .dataframe-table {
+#         font-family: 'Inter', sans-serif;
+#         font-size: 14px;
+#         color: #333333;
+#     }
+#     </style>
+#     """, unsafe_allow_html=True)
+
+#     # -----------------------------------------------------------------------
+#     # MAIN HEADER & NAVIGATION
+#     # -----------------------------------------------------------------------
+#     st.markdown('<h1 class="custom-header">📶 Brand Ladder Analysis with Custom Product Aggregation</h1>', unsafe_allow_html=True)
+#     st.markdown('<p class="subheader">Compare pricing across custom-defined products, using a subtle yet cohesive design.</p>', unsafe_allow_html=True)
+#     st.markdown('<hr class="accent-hr">', unsafe_allow_html=True)
+
+
+
+#     cBack, cHome = st.columns(2)
+#     with cBack:
+#         if st.button("Back", key="section3_module2_back"):
+#             go_back()
+#     with cHome:
+#         if st.button("Home", key="section3_module2_home"):
+#             go_home()
+
+#     # -----------------------------------------------------------------------
+#     # RETRIEVE DATA
+#     # -----------------------------------------------------------------------
+#     dataframe = st.session_state.get("D0", None)
+
+#     # -----------------------------------------------------------------------
+#     # VALIDATE DATA
+#     # -----------------------------------------------------------------------
+#     if dataframe is None or dataframe.empty:
+#         st.warning("No data uploaded yet. Please upload a file in the sidebar.")
+#         st.stop()
+
+#     # =============================================================================
+#     # CARD 1: FILTERS & SELECTION
+#     # =============================================================================
+#     st.markdown('<div class="card">', unsafe_allow_html=True)
+#     st.write("## Step 1: Configure Filters and Aggregations")
+
+#     # 1) (Optional) CHANNEL SELECTION
+#     channel_data = dataframe
+#     if "Channel" in dataframe.columns:
+#         colA, colB = st.columns(2)
+#         with colA:
+#             selected_channel = st.selectbox("Select Channel:", dataframe["Channel"].unique())
+#         channel_data = dataframe[dataframe["Channel"] == selected_channel]
+#         if channel_data.empty:
+#             st.warning("No data available for the selected channel.")
+#             st.markdown('</div>', unsafe_allow_html=True)
+#             st.stop()
+#     else:
+#         st.info("No 'Channel' column found; proceeding without channel filtering.")
+
+#     # 2) POSSIBLE AGGREGATOR COLUMNS
+#     possible_aggregator_cols = ["Brand", "Variant", "PackType", "PPG", "PackSize"]
+#     cols_found = [c for c in possible_aggregator_cols if c in channel_data.columns]
+
+#     if not cols_found:
+#         st.error("None of the expected columns (Brand, Variant, PackType, PPG, PackSize) exist in the data.")
+#         st.markdown('</div>', unsafe_allow_html=True)
+#         st.stop()
+
+#     # Let the user pick how they want to measure volume if both columns exist
+#     volume_options = []
+#     if "VolumeUnits" in channel_data.columns:
+#         volume_options.append("By Unit")
+#     if "Volume" in channel_data.columns:
+#         volume_options.append("By Litre")
+
+#     volume_col = None
+#     if volume_options:
+#         # e.g., default to "By Unit" if both exist
+#         user_volume_choice = st.selectbox("Choose how to compute Price:", volume_options)
+#         if user_volume_choice == "By Unit":
+#             volume_col = "VolumeUnits"
+#         elif user_volume_choice == "By Litre":
+#             volume_col = "Volume"
+
+#     # 3-COLUMN LAYOUT: aggregator cols, base aggregator + volume checkbox, competitor aggregator
+#     c1, c2, c3 = st.columns([1.2, 1.2, 1.2])
+
+#     with c1:
+#         st.markdown("**Select aggregator columns**")
+#         selected_agg_cols = st.multiselect(
+#             "Aggregator definition:",
+#             options=cols_found,
+#             default=["Brand"]
+#         )
+#         st.caption("Combined into a single product identifier.")
+
+#     with c2:
+#         st.markdown("**Base Aggregator & Volume**")
+#         show_volume = st.checkbox("Display Volume on Secondary Y-Axis", value=False)
+
+#     with c3:
+#         st.markdown("**Competitors**")
+#         # We'll define competitor aggregator after aggregator column is set.
+
+#     if not selected_agg_cols:
+#         st.warning("No aggregator columns selected. Please pick at least one column.")
+#         st.markdown('</div>', unsafe_allow_html=True)
+#         st.stop()
+
+#     # Build aggregator column
+#     channel_data = channel_data.copy()
+#     def combine_cols(row):
+#         return " - ".join(str(row[c]) for c in selected_agg_cols)
+
+#     channel_data["Aggregator"] = channel_data.apply(combine_cols, axis=1)
+
+#     all_aggregators = sorted(channel_data["Aggregator"].unique())
+#     with c2:
+#         base_agg = st.selectbox(
+#             "Base Aggregator:",
+#             options=all_aggregators
+#         )
+#     with c3:
+#         comp_aggs = st.multiselect(
+#             "Competitor(s):",
+#             options=[a for a in all_aggregators if a != base_agg]
+#         )
+
+#     st.markdown('</div>', unsafe_allow_html=True)
+
+#     # =============================================================================
+#     # CARD 2: BRAND LADDER + MARKET SHARE (SIDE-BY-SIDE)
+#     # =============================================================================
+#     st.markdown('<div class="card">', unsafe_allow_html=True)
+#     st.write("## Step 2: Brand Ladder & Market Share")
+
+#     selected_data = channel_data[channel_data["Aggregator"].isin([base_agg] + comp_aggs)]
+#     if selected_data.empty:
+#         st.warning("No data found for the selected aggregators.")
+#         st.markdown('</div>', unsafe_allow_html=True)
+#         st.stop()
+
+#     colLeft, colRight = st.columns([2, 1])  # Left chart is bigger, right chart narrower
+
+#     # --------------------------
+#     # BRAND LADDER (Left Column)
+#     # --------------------------
+#     with colLeft:
+#         st.write("### Brand Ladder Chart")
+        
+#         # Helper function: create custom marker colors & sizes 
+#         # so our brand aggregator stands out a bit, without being too bold
+#         def get_marker_properties(df, base_aggregator):
+#             marker_colors = []
+#             marker_sizes = []
+#             for _, row in df.iterrows():
+#                 if row["Aggregator"] == base_agg:
+#                     marker_colors.append("#FF7F7F")  # Soft red highlight
+#                     marker_sizes.append(10)
+#                 else:
+#                     marker_colors.append("#458EE2")  # Subtle blue
+#                     marker_sizes.append(7)
+#             return marker_colors, marker_sizes
+
+#         # SCENARIO A: Price & BasePrice
+#         if "Price" in channel_data.columns and "BasePrice" in channel_data.columns:
+#             grouped_data = (
+#                 selected_data.groupby("Aggregator", as_index=False)
+#                 .agg(MeanBasePrice=("BasePrice", "mean"), MeanPrice=("Price", "mean"))
+#             )
+
+#             # If either "VolumeUnits" or "Volume" is present, merge it in as "VolumeUnits" col
+#             # if user wants to display volume. But this usage is optional for scenario A.
+#             if volume_col and volume_col in selected_data.columns:
+#                 vol_data = selected_data.groupby("Aggregator", as_index=False)[volume_col].sum()
+#                 vol_data.rename(columns={volume_col: "VolumeUnits"}, inplace=True) 
+#                 grouped_data = grouped_data.merge(vol_data, on="Aggregator", how="left")
+#             else:
+#                 grouped_data["VolumeUnits"] = 0
+
+#             base_price_val = grouped_data.loc[grouped_data["Aggregator"] == base_agg, "MeanPrice"].values[0]
+#             grouped_data["Price Difference (%)"] = (
+#                 (grouped_data["MeanPrice"] - base_price_val) / base_price_val * 100
+#             )
+#             grouped_data.sort_values(by="MeanPrice", inplace=True)
+
+#             marker_colors, marker_sizes = get_marker_properties(grouped_data, base_agg)
+
+#             fig_ladder = go.Figure()
+#             fig_ladder.add_trace(go.Scatter(
+#                 x=grouped_data["Aggregator"],
+#                 y=grouped_data["MeanPrice"],
+#                 mode="lines+markers",
+#                 line=dict(shape="hv", width=2, color="#666666"),
+#                 marker=dict(color=marker_colors, size=marker_sizes, line=dict(width=1, color="#666")),
+#                 name="Mean Price"
+#             ))
+
+#             # If show_volume is checked, display volume on secondary axis
+#             if show_volume and grouped_data["VolumeUnits"].any():
+#                 fig_ladder.add_trace(go.Scatter(
+#                     x=grouped_data["Aggregator"],
+#                     y=grouped_data["VolumeUnits"],
+#                     mode="lines+markers",
+#                     line=dict(shape="hv", width=2, color="#41C185"),
+#                     name="Volume",
+#                     yaxis="y2"
+#                 ))
+
+#             for _, row in grouped_data.iterrows():
+#                 if row["Aggregator"] == base_agg:
+#                     note_text = f"${row['MeanPrice']:.2f}"
+#                 else:
+#                     note_text = f"${row['MeanPrice']:.2f} ({row['Price Difference (%)']:+.1f}%)"
+#                 fig_ladder.add_annotation(
+#                     x=row["Aggregator"],
+#                     y=row["MeanPrice"],
+#                     text=note_text,
+#                     showarrow=False,
+#                     yshift=8,
+#                     font=dict(family="Inter", size=12, color="#333")
+#                 )
+
+#             fig_ladder.update_layout(
+#                 title="Brand Ladder (Base vs. Mean Price)",
+#                 xaxis_title="Aggregators",
+#                 yaxis_title="Mean Price",
+#                 yaxis2=dict(title="Volume", overlaying="y", side="right"),
+#                 template="plotly_white",
+#                 margin=dict(l=40, r=40, t=60, b=40),
+#                 font=dict(family="Inter", size=13, color="#333")
+#             )
+
+#             st.plotly_chart(fig_ladder, use_container_width=True)
+#             st.dataframe(grouped_data.style.set_table_styles(
+#                 [{'selector': 'th', 'props': [('font-family', 'Inter'), ('font-weight', 'normal')]}]
+#             ), use_container_width=True)
+
+#         # SCENARIO B: SalesValue & Volume
+#         elif "SalesValue" in channel_data.columns and volume_col and volume_col in channel_data.columns:
+#             # e.g., computing Avg Price = SalesValue / Volume
+#             grouped_data = (
+#                 selected_data.groupby("Aggregator", as_index=False)
+#                 .agg(TotalSalesValue=("SalesValue", "sum"), TotalVolume=(volume_col, "sum"))
+#             )
+#             grouped_data["Avg Price"] = grouped_data["TotalSalesValue"] / grouped_data["TotalVolume"]
+
+#             base_avg_price = grouped_data.loc[grouped_data["Aggregator"] == base_agg, "Avg Price"].values[0]
+#             grouped_data["Price Difference (%)"] = (
+#                 (grouped_data["Avg Price"] - base_avg_price) / base_avg_price * 100
+#             )
+#             grouped_data.sort_values(by="Avg Price", inplace=True)
+
+#             marker_colors, marker_sizes = get_marker_properties(grouped_data, base_agg)
+
+#             fig_ladder = go.Figure()
+#             fig_ladder.add_trace(go.Scatter(
+#                 x=grouped_data["Aggregator"],
+#                 y=grouped_data["Avg Price"],
+#                 mode="lines+markers",
+#                 line=dict(shape="hv", width=2, color="#666666"),
+#                 marker=dict(color=marker_colors, size=marker_sizes, line=dict(width=1, color="#666")),
+#                 name="Avg Price"
+#             ))
+
+#             if show_volume:
+#                 fig_ladder.add_trace(go.Scatter(
+#                     x=grouped_data["Aggregator"],
+#                     y=grouped_data["TotalVolume"],
+#                     mode="lines+markers",
+#                     line=dict(shape="hv", width=2, color="#41C185"),
+#                     name="Total Volume",
+#                     yaxis="y2"
+#                 ))
+
+#             for _, row in grouped_data.iterrows():
+#                 if row["Aggregator"] == base_agg:
+#                     note_text = f"${row['Avg Price']:.2f}"
+#                 else:
+#                     note_text = f"${row['Avg Price']:.2f} ({row['Price Difference (%)']:+.1f}%)"
+#                 fig_ladder.add_annotation(
+#                     x=row["Aggregator"],
+#                     y=row["Avg Price"],
+#                     text=note_text,
+#                     showarrow=False,
+#                     yshift=8,
+#                     font=dict(family="Inter", size=12, color="#333")
+#                 )
+
+#             fig_ladder.update_layout(
+#                 title="Brand Ladder: Price & Volume",
+#                 xaxis_title="Aggregators",
+#                 yaxis_title="Avg Price",
+#                 yaxis2=dict(title="Total Volume", overlaying="y", side="right"),
+#                 template="plotly_white",
+#                 margin=dict(l=40, r=40, t=60, b=40),
+#                 font=dict(family="Inter", size=13, color="#333")
+#             )
+
+#             st.plotly_chart(fig_ladder, use_container_width=True)
+#             st.dataframe(grouped_data.style.set_table_styles(
+#                 [{'selector': 'th', 'props': [('font-family', 'Inter'), ('font-weight', 'normal')]}]
+#             ), use_container_width=True)
+
+#         else:
+#             st.error("Required columns for analysis are missing. Need either: "
+#                     "('Price' & 'BasePrice') or ('SalesValue' & a chosen volume column).")
+
+#     # --------------------------
+#     # MARKET SHARE PIE (Right Column)
+#     # --------------------------
+#     with colRight:
+#         st.write("### Market Share")
+#         # We'll show aggregator-level share for the entire channel
+#         pie_colors = ["#FFBD59", "#FFC87A", "#41C185", "#458EE2", "#999999"]
+
+#         # If the user picked "VolumeUnits" or "Volume", we can do volume-based share;
+#         # else if we have "SalesValue", we do sales-based share
+#         # or else we warn the user
+#         if volume_col and volume_col in channel_data.columns:
+#             share_data = (
+#                 channel_data.groupby("Aggregator", as_index=False)
+#                 .agg(TotalVolume=(volume_col, "sum"))
+#             )
+#             total_volume = share_data["TotalVolume"].sum()
+#             if total_volume == 0:
+#                 st.warning("Total volume is zero, cannot compute market share.")
+#             else:
+#                 share_data["Share (%)"] = share_data["TotalVolume"] / total_volume * 100
+
+#                 fig_pie = go.Figure(data=[go.Pie(
+#                     labels=share_data["Aggregator"],
+#                     values=share_data["TotalVolume"],
+#                     hole=0.4
+#                 )])
+#                 fig_pie.update_layout(
+#                     colorway=pie_colors,
+#                     title="Market Share (Volume)",
+#                     margin=dict(l=10, r=10, t=60, b=10),
+#                     height=400
+#                 )
+#                 st.plotly_chart(fig_pie, use_container_width=True)
+
+#                 st.dataframe(share_data.style.set_table_styles(
+#                     [{'selector': 'th', 'props': [('font-family', 'Inter'), ('font-weight', 'normal')]}]
+#                 ), use_container_width=True)
+
+#         elif "SalesValue" in channel_data.columns:
+#             # fallback to sales-based share
+#             share_data = (
+#                 channel_data.groupby("Aggregator", as_index=False)
+#                 .agg(TotalSales=("SalesValue", "sum"))
+#             )
+#             total_sales = share_data["TotalSales"].sum()
+#             if total_sales == 0:
+#                 st.warning("Total sales is zero, cannot compute market share.")
+#             else:
+#                 share_data["Share (%)"] = share_data["TotalSales"] / total_sales * 100
+
+#                 fig_pie = go.Figure(data=[go.Pie(
+#                     labels=share_data["Aggregator"],
+#                     values=share_data["TotalSales"],
+#                     hole=0.4
+#                 )])
+#                 fig_pie.update_layout(
+#                     colorway=pie_colors,
+#                     title="Market Share (Sales)",
+#                     margin=dict(l=10, r=10, t=60, b=10),
+#                     height=400
+#                 )
+#                 st.plotly_chart(fig_pie, use_container_width=True)
+
+#                 st.dataframe(share_data.style.set_table_styles(
+#                     [{'selector': 'th', 'props': [('font-family', 'Inter'), ('font-weight', 'normal')]}]
+#                 ), use_container_width=True)
+
+#         else:
+#             st.warning("No 'Volume'/'VolumeUnits' or 'SalesValue' columns found, so market share cannot be computed.")
+
+#     st.markdown('</div>', unsafe_allow_html=True)
+
+def section3_module2_page():
+    import streamlit as st
+    import pandas as pd
+    import numpy as np
+    import plotly.graph_objects as go
+
+    # -----------------------------------------------------------------------
+    # CUSTOM CSS
+    # -----------------------------------------------------------------------
+    st.markdown("""
+    <style>
+    .stApp {
+        background-color: #F5F5F5;
+    }
+    .custom-header {
+        font-family: 'Inter', sans-serif;
+        font-size: 36px; 
+        font-weight: 600;
+        color: #333333;
+        margin-bottom: 0.2rem;
+    }
+    .subheader {
+        font-family: 'Inter', sans-serif;
+        font-size: 18px;
+        color: #666666;
+        margin-top: 0;
+        margin-bottom: 1rem;
+    }
+    .accent-hr {
+        border: 0;
+        height: 2px;
+        background: linear-gradient(to right, #FFBD59, #FFC87A);
+        margin: 0.5rem 0 1.5rem 0;
+    }
+    .card {
+        background-color: #FFFFFF; 
+        padding: 1.2rem 1.2rem;
+        margin-bottom: 1rem;
+        border-radius: 8px;
+        box-shadow: 2px 2px 10px rgba(0,0,0,0.05);
+    }
+    .card h2 {
+        font-family: 'Inter', sans-serif;
+        font-size: 24px;
+        margin: 0.2rem 0 1rem 0;
+        color: #333333;
+    }
+    div[data-testid="stHorizontalBlock"] button {
+        background-color: #FFBD59 !important; 
+        color: #333333 !important;
+        font-weight: 600 !important;
+        border-radius: 4px !important;
+        border: none !important;
+        margin-bottom: 0.5rem;
+    }
+    div[data-testid="stHorizontalBlock"] button:hover {
+        background-color: #FFC87A !important;
+    }
+    .dataframe-table {
+        font-family: 'Inter', sans-serif;
+        font-size: 14px;
+        color: #333333;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # MAIN HEADER & NAVIGATION
+    # -----------------------------------------------------------------------
+    st.markdown('<h1 class="custom-header">Brand Ladder with Monthly Selection</h1>', unsafe_allow_html=True)
+    st.markdown('<p class="subheader">Pick one or two months in your dataset to see each aggregator\'s last BasePrice (and optional Vol/Week). Multiple own aggregators, no % difference.</p>', unsafe_allow_html=True)
+    st.markdown('<hr class="accent-hr">', unsafe_allow_html=True)
+
+
+
+    cBack, cHome = st.columns(2)
+    with cBack:
+        if st.button("Back"):
+            go_back()
+    with cHome:
+        if st.button("Home"):
+            go_home()
+
+    # -----------------------------------------------------------------------
+    # RETRIEVE DATA (assuming final BasePrice is in st.session_state["dataframe1"])
+    # -----------------------------------------------------------------------
+    df_bp = st.session_state.get("dataframe1", None)
+    if df_bp is None or df_bp.empty:
+        st.warning("No data with final BasePrice found. Please ensure 'dataframe1' is loaded.")
+        st.stop()
+
+    # We must have columns: 'Year','Month', or something to define "one-month" subsets
+    if not ({"Year","Month"} <= set(df_bp.columns)):
+        st.warning("No 'Year'/'Month' columns found; cannot do monthly selection. Please ensure these exist.")
+        st.stop()
+
+    # =============================================================================
+    # CARD 1: FILTERS & MONTH PICK
+    # =============================================================================
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## Step 1: Filters & Month Selection")
+
+    # (Optional) Channel filter, taken from the hierarchy index before any per-row work
+    if "Channel" in df_bp.columns:
+        hier = hierarchy_index(df_bp)
+        colA, colB = st.columns(2)
+        with colA:
+            selected_channel = st.selectbox("Select Channel:", hier.children())
+        channel_data = hier.take(df_bp, selected_channel)
+        if channel_data.empty:
+            st.warning("No data for that channel.")
+            st.markdown('</div>', unsafe_allow_html=True)
+            st.stop()
+    else:
+        st.info("No 'Channel' column – skipping channel filter.")
+        channel_data = df_bp.copy()
+
+    # Ensure numeric or integer Year/Month
+    channel_data["Year"] = pd.to_numeric(channel_data["Year"], errors="coerce")
+    channel_data["Month"] = pd.to_numeric(channel_data["Month"], errors="coerce")
+    channel_data = channel_data.dropna(subset=["Year","Month"])
+    channel_data = channel_data.astype({"Year":"int","Month":"int"})
+
+    if channel_data.empty:
+        st.warning("After forcing numeric Year/Month, no data remain.")
+        st.markdown('</div>', unsafe_allow_html=True)
+        st.stop()
+
+    # We'll define a helper "YYYY-MM" aggregator for user picks
+    channel_data["YearMonth"] = channel_data["Year"].astype(str).str.zfill(4) + "-" + channel_data["Month"].astype(str).str.zfill(2)
+
+    # Figure out all distinct months, sorted ascending
+    all_months = sorted(channel_data["YearMonth"].unique())
+
+    # aggregator columns
+    possible_agg_cols = ["Brand","Variant","PackType","PPG","PackSize"]
+    found_agg_cols = [c for c in possible_agg_cols if c in channel_data.columns]
+    if not found_agg_cols:
+        st.error("No aggregator columns found.")
+        st.stop()
+
+    c1, c2, c3 = st.columns([1.2,1.2,1.2])
+    with c1:
+        st.markdown("**Select aggregator columns**")
+        selected_agg_cols = st.multiselect(
+            "Aggregator definition:",
+            options=found_agg_cols,
+            default=["Brand"]
+        )
+
+    if not selected_agg_cols:
+        st.warning("No aggregator columns selected.")
+        st.stop()
+
+    def combine_cols(row):
+        return " - ".join(str(row[c]) for c in selected_agg_cols)
+
+    channel_data["Aggregator"] = channel_data.apply(combine_cols, axis=1)
+    all_aggs = sorted(channel_data["Aggregator"].unique())
+
+    # Instead of "Base Aggregator" single pick, let user pick multiple "own brand" aggregator(s).
+    with c2:
+        st.markdown("**Own Aggregator(s)**")
+        own_aggs = st.multiselect("Pick your aggregator(s):", all_aggs)
+
+    with c3:
+        st.markdown("**Competitors**")
+        comp_aggs = st.multiselect(
+            "Competitor(s):",
+            [a for a in all_aggs if a not in own_aggs]
+        )
+
+    # Merge final aggregator list
+    final_aggs = own_aggs + comp_aggs
+    if not final_aggs:
+        st.warning("No aggregator chosen.")
+        st.stop()
+
+    # Compare Mode?
+    compare_mode = st.checkbox("Compare Two Different Months?", value=False)
+
+    if compare_mode:
+        colM1, colM2 = st.columns(2)
+        with colM1:
+            month_1 = st.selectbox("Pick Month #1", all_months)
+        with colM2:
+            month_2 = st.selectbox("Pick Month #2", all_months)
+    else:
+        month_1 = st.selectbox("Pick Month", all_months)
+        month_2 = None
+
+    show_vol_week = st.checkbox("Show Vol/Week on the brand ladder?", value=True)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # =============================================================================
+    # CARD 2: BRAND LADDER (and Market Share if not compare)
+    # =============================================================================
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## Step 2: Brand Ladder")
+
+    data_sub = channel_data[channel_data["Aggregator"].isin(final_aggs)]
+    if data_sub.empty:
+        st.warning("No data after aggregator picks.")
+        st.markdown('</div>', unsafe_allow_html=True)
+        st.stop()
+
+    # filter by months
+    def data_for_month(df_, yearmonth):
+        return df_[df_["YearMonth"] == yearmonth]
+
+    data1 = data_for_month(data_sub, month_1)
+    data2 = None
+    if compare_mode and month_2:
+        data2 = data_for_month(data_sub, month_2)
+
+    if data1.empty and not compare_mode:
+        st.warning("No data for selected month.")
+        st.stop()
+
+    # define build_ladder_data
+    def build_ladder_data(df_, aggregator_list):
+        # We'll find "last base price"
+        # If multiple rows, we sort by (Year,Week) or by index
+        df_ = df_.copy()
+        if "Year" in df_.columns and "Week" in df_.columns:
+            df_.sort_values(["Year","Week"], inplace=True)
+        elif "Date" in df_.columns:
+            df_.sort_values("Date", inplace=True)
+        else:
+            df_.reset_index(drop=True, inplace=True)
+
+        # pick a volume col
+        used_vol = None
+        if show_vol_week:
+            if "VolumeUnits" in df_.columns:
+                used_vol = "VolumeUnits"
+            elif "Volume" in df_.columns:
+                used_vol = "Volume"
+
+        rows = []
+        for agg in aggregator_list:
+            sub = df_[(df_["Aggregator"]==agg) & df_["BasePrice"].notna()]
+            if sub.empty:
+                rows.append({"Aggregator": agg, "LastBasePrice": 0, "VolumePerWeek": 0})
+                continue
+            last_bp = sub.iloc[-1]["BasePrice"]
+            same_bp = sub[sub["BasePrice"]==last_bp]
+            volpw = 0
+            if used_vol and not same_bp.empty:
+                total_vol = same_bp[used_vol].sum()
+                if {"Year","Week"} <= set(same_bp.columns):
+                    wcount = same_bp[["Year","Week"]].drop_duplicates().shape[0]
+                else:
+                    wcount = len(same_bp)
+                volpw = total_vol/wcount if wcount else 0
+
+            rows.append({
+                "Aggregator": agg,
+                "LastBasePrice": last_bp,
+                "VolumePerWeek": volpw
+            })
+        return pd.DataFrame(rows)
+
+    def plot_ladder(ladder_df, own_list, chart_title):
+        if ladder_df.empty:
+            return None
+        # sort by LastBasePrice
+        ladder_df.sort_values("LastBasePrice", inplace=True)
+        # define color / size
+        def color_n_size(agg):
+            if agg in own_list:
+                return "#FF7F7F",10
+            else:
+                return "#458EE2",7
+        cvals, svals = [], []
+        for _, row in ladder_df.iterrows():
+            c,s = color_n_size(row["Aggregator"])
+            cvals.append(c)
+            svals.append(s)
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=ladder_df["Aggregator"],
+            y=ladder_df["LastBasePrice"],
+            mode="lines+markers",
+            line=dict(shape="hv", width=2, color="#666666"),
+            marker=dict(color=cvals, size=svals, line=dict(width=1, color="#666")),
+            name="Last BasePrice"
+        ))
+        # if show_vol_week
+        if show_vol_week and "VolumePerWeek" in ladder_df.columns:
+            if ladder_df["VolumePerWeek"].any():
+                fig.add_trace(go.Scatter(
+                    x=ladder_df["Aggregator"],
+                    y=ladder_df["VolumePerWeek"],
+                    mode="lines+markers",
+                    line=dict(shape="hv", width=2, color="#41C185"),
+                    name="Volume/Week",
+                    yaxis="y2"
+                ))
+        # annotation => only price
+        for i, row in ladder_df.iterrows():
+            note_text = f"${row['LastBasePrice']:.2f}"
+            fig.add_annotation(
+                x=row["Aggregator"],
+                y=row["LastBasePrice"],
+                text=note_text,
+                showarrow=False,
+                yshift=8
+            )
+        fig.update_layout(
+            title=chart_title,
+            xaxis_title="Aggregators",
+            yaxis_title="Last BasePrice",
+            yaxis2=dict(title="Volume/Week", overlaying="y", side="right"),
+            template="plotly_white",
+            margin=dict(l=40,r=40,t=60,b=40)
+        )
+        return fig
+
+    # single or compare
+    cLeft, cRight = st.columns(2)
+    ladder1 = build_ladder_data(data1, final_aggs)
+    fig1 = plot_ladder(ladder1, own_aggs, f"Brand Ladder (Month: {month_1})")
+
+    if fig1:
+        cLeft.plotly_chart(fig1, use_container_width=True)
+        cLeft.dataframe(ladder1, use_container_width=True)
+    else:
+        cLeft.warning(f"No data in first month: {month_1}")
+
+    if compare_mode and month_2:
+        # second chart, no market share
+        ladder2 = build_ladder_data(data2, final_aggs)
+        fig2 = plot_ladder(ladder2, own_aggs, f"Brand Ladder (Month: {month_2})")
+        if fig2:
+            cRight.plotly_chart(fig2, use_container_width=True)
+            cRight.dataframe(ladder2, use_container_width=True)
+        else:
+            cRight.warning(f"No data in second month: {month_2}")
+    else:
+        # market share
+        cRight.write("### Market Share")
+        share_colors = ["#FFBD59","#FFC87A","#41C185","#458EE2","#999999"]
+
+        # pick volume or fallback to sales
+        def compute_market_share(df_):
+            vol_col = None
+            if "VolumeUnits" in df_.columns:
+                vol_col = "VolumeUnits"
+            elif "Volume" in df_.columns:
+                vol_col = "Volume"
+            if vol_col:
+                share_df = df_.groupby("Aggregator", as_index=False, observed=True).agg(TotalVol=(vol_col,"sum"))
+                tv = share_df["TotalVol"].sum()
+                if tv>0:
+                    share_df["Share(%)"] = share_df["TotalVol"]/tv*100
+                    fig_pie = go.Figure(data=[go.Pie(
+                        labels=share_df["Aggregator"],
+                        values=share_df["TotalVol"],
+                        hole=0.4
+                    )])
+                    fig_pie.update_layout(
+                        colorway=share_colors,
+                        title="Market Share (Volume)",
+                        margin=dict(l=10,r=10,t=60,b=10),
+                        height=400
+                    )
+                    return fig_pie, share_df
+                else:
+                    return None,None
+            elif "SalesValue" in df_.columns:
+                share_df = df_.groupby("Aggregator", as_index=False, observed=True).agg(TotalSales=("SalesValue","sum"))
+                ts = share_df["TotalSales"].sum()
+                if ts>0:
+                    share_df["Share(%)"] = share_df["TotalSales"]/ts*100
+                    fig_pie = go.Figure(data=[go.Pie(
+                        labels=share_df["Aggregator"],
+                        values=share_df["TotalSales"],
+                        hole=0.4
+                    )])
+                    fig_pie.update_layout(
+                        colorway=share_colors,
+                        title="Market Share (Sales)",
+                        margin=dict(l=10,r=10,t=60,b=10),
+                        height=400
+                    )
+                    return fig_pie, share_df
+                else:
+                    return None,None
+            return None,None
+
+        fig_share, df_share = compute_market_share(data1)
+        if fig_share:
+            cRight.plotly_chart(fig_share, use_container_width=True)
+            cRight.dataframe(df_share, use_container_width=True)
+        else:
+            cRight.warning("No volume or sales for share calculation or total is 0.")
+
+    st.markdown('</div>', unsafe_allow_html=True)
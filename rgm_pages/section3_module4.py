@@ -0,0 +1,182 @@
+"""Section 3, module 4 page."""
+import streamlit as st
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from rgm_pages.navigation import go_back, go_home
+
+
+def section3_module4_page():
+
+
+
+    cBack, cHome = st.columns(2)
+    with cBack:
+        if st.button("Back"):
+            go_back()
+    with cHome:
+        if st.button("Home"):
+            go_home()
+
+    # -----------------------------------------------------------------------
+    # RETRIEVE DATA
+    # -----------------------------------------------------------------------
+    df = st.session_state.get("D0", None)  # or "dataframe1" if your data is there
+    if df is None or df.empty:
+        st.warning("No data uploaded yet. Please upload a file in the sidebar or store in st.session_state['D0'].")
+        st.stop()
+
+    # For this example, we assume:
+    # 1) There's an "Aggregator" column or an easy way to build it
+    # 2) "SalesValue" is RSV
+    # 3) We'll compute "Market Share" = aggregator's SalesValue / sum(all)
+    # 4) We'll compute "Brand Share" = aggregator's SalesValue / sum(all aggregator that share the aggregator's brand)
+    #    * This logic is flexible. You might define brand share differently.
+
+    # If you need to build aggregator from columns like [Brand, PackSize], do it here:
+    # e.g.:
+    # df["Aggregator"] = df["Brand"] + " (" + df["PackSize"] + ")"
+
+    # Check we have "Aggregator", "SalesValue", maybe "Brand"
+    needed_cols = {"Aggregator","SalesValue","Brand"}
+    missing = needed_cols - set(df.columns)
+    if missing:
+        st.error(f"Missing columns for aggregator analysis: {missing}")
+        st.stop()
+
+    # -----------------------------------------------------------------------
+    # CARD 1: FILTERS
+    # -----------------------------------------------------------------------
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## Step 1: Configure Filters")
+
+    # Optional channel, brand, etc. 
+    if "Channel" in df.columns:
+        channel_list = ["All"] + sorted(df["Channel"].dropna().unique())
+        chosen_channel = st.selectbox("Select Channel:", channel_list)
+        if chosen_channel!="All":
+            df = df[df["Channel"]==chosen_channel]
+            if df.empty:
+                st.warning(f"No data after channel filter: {chosen_channel}")
+                st.markdown('</div>', unsafe_allow_html=True)
+                st.stop()
+
+    # Possibly more filters
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # -----------------------------------------------------------------------
+    # CARD 2: TRIPLE SUBPLOT
+    # -----------------------------------------------------------------------
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.write("## Step 2: Triple Subplot: RSV, Market Share, Brand Share")
+
+    # For each aggregator, sum SalesValue => aggregator_rsv
+    aggregator_df = (
+        df.groupby(["Aggregator","Brand"], as_index=False, observed=True)
+          .agg(SumSalesValue=("SalesValue","sum"))
+    )
+    if aggregator_df.empty:
+        st.warning("No aggregator data after filters.")
+        st.stop()
+
+    # Market share = aggregator_rsv / total_rsv
+    total_rsv = aggregator_df["SumSalesValue"].sum()
+    aggregator_df["MarketShare"] = np.where(
+        total_rsv!=0,
+        aggregator_df["SumSalesValue"]/total_rsv,
+        0
+    )
+
+    # Brand share = aggregator's sumSalesValue / sumSalesValue of brand
+    # first find brand total
+    brand_totals = (
+        aggregator_df.groupby("Brand", as_index=False, observed=True)["SumSalesValue"].sum()
+        .rename(columns={"SumSalesValue":"BrandTotal"})
+    )
+    aggregator_df = aggregator_df.merge(brand_totals, on="Brand", how="left")
+    aggregator_df["BrandShare"] = np.where(
+        aggregator_df["BrandTotal"]!=0,
+        aggregator_df["SumSalesValue"]/aggregator_df["BrandTotal"],
+        0
+    )
+
+    # We'll store aggregator, RSV, MarketShare, BrandShare
+    aggregator_df.sort_values("SumSalesValue", ascending=False, inplace=True)
+    xvals = aggregator_df["Aggregator"].tolist()
+    rsv = aggregator_df["SumSalesValue"].tolist()
+    mk_share = aggregator_df["MarketShare"].tolist()
+    br_share = aggregator_df["BrandShare"].tolist()
+
+    # Build 3-subplot figure with shared X?
+    # Actually we can do subplots with shared x, but each trace might want separate x
+    # We'll do subplots w/ row=1, col=3
+    fig = make_subplots(
+        rows=1, cols=3,
+        shared_xaxes=False,
+        subplot_titles=["RSV (Sales Value)", "Market Share (%)", "Brand Share (%)"]
+    )
+
+    # Subplot 1: RSV as bar
+    fig.add_trace(
+        go.Bar(
+            x=xvals,
+            y=rsv,
+            marker_color="blue",
+            name="RSV (SalesValue)"
+        ),
+        row=1, col=1
+    )
+
+    # Subplot 2: Market Share as line
+    fig.add_trace(
+        go.Scatter(
+            x=xvals,
+            y=mk_share,
+            mode="lines+markers",
+            line=dict(color="orange"),
+            name="Market Share (%)"
+        ),
+        row=1, col=2
+    )
+
+    # Subplot 3: Brand Share as line
+    fig.add_trace(
+        go.Scatter(
+            x=xvals,
+            y=br_share,
+            mode="lines+markers",
+            line=dict(color="green", dash="dot"),
+            name="Brand Share (%)"
+        ),
+        row=1, col=3
+    )
+
+    # Update layout for each subplot
+    fig.update_xaxes(tickangle=45, row=1, col=1)
+    fig.update_xaxes(tickangle=45, row=1, col=2)
+    fig.update_xaxes(tickangle=45, row=1, col=3)
+
+    fig.update_layout(
+        title="Pack/Format Price Curves Analysis",
+        showlegend=False,
+        template="plotly_white",
+        margin=dict(l=40, r=40, t=80, b=100)
+    )
+
+    # Show the figure
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Show aggregator table
+    st.dataframe(aggregator_df, use_container_width=True)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+    cBack, cHome = st.columns(2)
+    with cBack:
+        if st.button("Back"):
+            go_back()
+    with cHome:
+        if st.button("Home"):
+            go_home()
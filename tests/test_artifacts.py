@@ -0,0 +1,63 @@
+import pandas as pd
+
+from rgm.artifacts import ArtifactStore, compute_and_save, dataset_fingerprint
+
+
+def _frame(n=5):
+    return pd.DataFrame({
+        "PPG": pd.Categorical([f"P{i % 2}" for i in range(n)]),
+        "Price": [1.5 * i for i in range(n)],
+        "Week": list(range(n)),
+    })
+
+
+def test_nested_result_round_trips(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    df = _frame()
+    result = (
+        df,
+        {"a": [df.head(2), 3, None], ("Tesco", "P1"): {"r2": 0.5}},
+        df.iloc[1],
+        "label",
+    )
+    path = store.save("stage", "digest", {"k": (1, 2)}, result, targets=("t1", None, "t2", None), label="Run")
+    loaded, meta = store.load("stage", "digest", {"k": (1, 2)})
+
+    assert meta["label"] == "Run" and meta["targets"] == ["t1", None, "t2", None]
+    pd.testing.assert_frame_equal(loaded[0], df)
+    assert loaded[1]["a"][1:] == [3, None]
+    pd.testing.assert_frame_equal(loaded[1]["a"][0], df.head(2))
+    assert loaded[1][("Tesco", "P1")] == {"r2": 0.5}
+    assert loaded[2]["Price"] == df.iloc[1]["Price"]
+    assert loaded[3] == "label"
+
+    runs = store.runs()
+    assert runs["Path"].tolist() == [path] and runs.at[0, "Tables"] == 3
+    store.delete(path)
+    assert store.load("stage", "digest", {"k": (1, 2)}) is None
+
+
+def test_keys_separate_stage_dataset_and_params(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    store.save("stage", "d1", {"k": 1}, 1)
+    assert store.load("stage", "d1", {"k": 2}) is None
+    assert store.load("stage", "d2", {"k": 1}) is None
+    assert store.load("other", "d1", {"k": 1}) is None
+    assert store.load("stage", "d1", {"k": 1})[0] == 1
+
+
+def test_unstorable_results_are_returned_with_a_warning(tmp_path):
+    warnings = []
+    result = compute_and_save(str(tmp_path), "stage", "d", {}, None, None, lambda: {"model": object()}, (), {},
+                              warn=warnings.append)
+    assert "model" in result and len(warnings) == 1
+    assert ArtifactStore(str(tmp_path)).runs().empty
+
+
+def test_fingerprint_sees_every_row():
+    df = pd.DataFrame({"x": range(10_000)})
+    changed = df.copy()
+    changed.loc[4321, "x"] = -1
+    assert dataset_fingerprint(df) == dataset_fingerprint(df.copy())
+    assert dataset_fingerprint(df) != dataset_fingerprint(changed)
+    assert dataset_fingerprint({"a": df}) != dataset_fingerprint({"a": changed})
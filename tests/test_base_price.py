@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rgm.base_price import (
+    PREVIEW_CACHE_KEYS,
+    _estimates,
+    _weekly,
+    base_prices,
+    estimate_base_price,
+    extend_base_price,
+    ppg_base_price,
+    ppg_weekly,
+)
+from rgm.hierarchy import hierarchy_index
+from rgm.synthetic import generate
+
+
+def _frame(n_rows=2000, weeks=52, seed=5):
+    df = generate(n_rows, weeks=weeks, seed=seed).drop(columns=["BasePrice"])
+    return df
+
+
+def test_save_all_writes_fractional_prices_whatever_the_price_dtype():
+    df = _frame()
+    expected = df["SalesValue"] / df["Volume"]
+    df["Price"] = np.round(df["Price"]).astype("int16")
+    out, weekly = base_prices(df)
+    assert out["Price"].dtype == np.float64
+    assert out["BasePrice"].notna().all()
+    # Single-row group-weeks: the weekly price is the row's own SalesValue / Volume
+    single = ~df.duplicated(["Channel", "Brand", "Variant", "PPG", "Year", "Month", "Week"], keep=False)
+    np.testing.assert_allclose(out.loc[single, "Price"], expected[single])
+    assert (out["Price"] % 1 != 0).any()
+
+
+def _series(rng, weeks):
+    base = 2.0 * np.cumprod(1 + rng.choice([0, 0, 0, 0.08, -0.06], weeks) * (rng.random(weeks) < 0.05))
+    promo = np.where(rng.random(weeks) < 0.2, 1 - rng.uniform(0.1, 0.3, weeks), 1.0)
+    return np.round(base * promo * (1 + rng.normal(0, 0.005, weeks)), 2)
+
+
+@pytest.mark.parametrize("settings", [{}, {"rolling_period": 8, "promo_weeks": 6, "percentile": 90.0}])
+def test_extend_matches_full_recompute(settings):
+    rng = np.random.default_rng(11)
+    for _ in range(200):
+        prices = _series(rng, int(rng.integers(20, 160)))
+        cut = int(rng.integers(1, len(prices)))
+        previous = estimate_base_price(prices[:cut], **settings)
+        base, transitions = extend_base_price(prices, previous, **settings)
+        expected_base, expected_transitions = estimate_base_price(prices, **settings)
+        np.testing.assert_array_equal(base, expected_base)
+        assert list(transitions) == list(expected_transitions)
+
+
+def test_save_all_with_previous_table_matches_full_run():
+    df = _frame(weeks=60)
+    last_date = pd.to_datetime(df["Date"]).max() - pd.Timedelta(weeks=4)
+    first_weeks = df[pd.to_datetime(df["Date"]) <= last_date]
+    _, previous = base_prices(first_weeks)
+    out, weekly = base_prices(df, previous=previous)
+    expected_out, expected_weekly = base_prices(df)
+    pd.testing.assert_frame_equal(out, expected_out)
+    pd.testing.assert_frame_equal(weekly, expected_weekly)
+
+
+def test_ppg_previews_are_cached_for_the_current_version_only():
+    df = _frame(weeks=30)
+    df["BasePrice"] = np.nan
+    path = next(hierarchy_index(df).leaves("Variant"))
+
+    weekly, transitions = ppg_base_price(df, "Variant", path, rolling_period=8)
+    assert ppg_base_price(df, "Variant", path, rolling_period=8)[0] is weekly
+    prices = ppg_weekly(df, "Variant", path)[0]["Price"].to_numpy()
+    expected_base, expected_transitions = estimate_base_price(prices, rolling_period=8)
+    np.testing.assert_array_equal(weekly["BasePrice"].to_numpy(), expected_base)
+    assert list(transitions) == list(expected_transitions)
+
+    for rolling_period in range(4, 4 + PREVIEW_CACHE_KEYS + 10):
+        ppg_base_price(df, "Variant", path, rolling_period=rolling_period)
+    assert len(_estimates._entries[id(df)][3]) == PREVIEW_CACHE_KEYS
+
+    df["BasePrice"] = 1.0
+    assert ppg_weekly(df, "Variant", path)[1]
+    assert len(_estimates._entries[id(df)][3]) == PREVIEW_CACHE_KEYS  # dropped on the next estimate
+    ppg_base_price(df, "Variant", path, rolling_period=8)
+    assert len(_estimates._entries[id(df)][3]) == 1
+    assert len(_weekly._entries[id(df)][3]) == 1
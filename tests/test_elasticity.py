@@ -0,0 +1,22 @@
+import pandas as pd
+
+from rgm.calendar import attach_calendar, calendar_for
+from rgm.elasticity import run_full_pipeline
+from rgm.synthetic import generate
+
+
+def _raw(hours=0):
+    df = generate(600, weeks=52, seed=3)
+    df["Date"] = pd.to_datetime(df["Date"]) + pd.Timedelta(hours=hours)
+    df["Promo"] = (df["Price"] < df["BasePrice"]).astype(float)
+    attach_calendar(df, calendar_for(df))
+    return df
+
+
+def test_dates_with_a_time_of_day_keep_their_rows():
+    raw = _raw(hours=9)
+    final_df = run_full_pipeline(raw, ["Date", "Channel", "PPG"], ["PPG"], use_kalman=False)
+    assert not (final_df["Date"] == 0).any()
+    assert set(final_df["Date"]) == set(raw["Date"].dt.date)
+    # Columns merged back from the raw rows line up with the aggregated weeks
+    assert final_df["Promo"].sum() > 0
@@ -0,0 +1,42 @@
+import gc
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from rgm.framecache import FrameCache
+from rgm.schema import projection
+
+
+def test_unversioned_entries_live_with_the_frame():
+    calls = []
+    cache = FrameCache(lambda df, n: calls.append(n) or len(df) * n)
+    df = pd.DataFrame({"a": range(4)})
+    assert cache.get(df, 2) == 8 and cache.get(df, 2) == 8 and cache.get(df, 3) == 12
+    assert calls == [2, 3]
+    del df
+    gc.collect()
+    assert not cache._entries
+
+
+def test_versioned_cache_keeps_only_the_latest_version():
+    cache = FrameCache(lambda df, version, key: (version, key), versioned=True, max_keys=2)
+    df = pd.DataFrame({"a": range(4)})
+    for key in "abc":
+        cache.get(df, 1, key)
+    assert list(cache._entries[id(df)][3]) == [(1, "b"), (1, "c")]
+    cache.get(df, 2, "a")
+    assert list(cache._entries[id(df)][3]) == [(2, "a")]
+
+
+def test_projection_releases_superseded_columns():
+    df = pd.DataFrame({"BasePrice": np.zeros(1000), "Volume": np.ones(1000)})
+    first = projection(df, ["BasePrice", "Volume"])
+    assert projection(df, ["BasePrice", "Volume"]) is first
+    old_values = weakref.ref(first)
+    del first
+    df["BasePrice"] = np.arange(1000.0)
+    second = projection(df, ["BasePrice", "Volume"])
+    gc.collect()
+    assert old_values() is None
+    assert second["BasePrice"].iloc[-1] == 999.0
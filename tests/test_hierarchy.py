@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from rgm.hierarchy import HierarchyIndex
+
+
+def _frame(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Channel": rng.choice(["Tesco", "Asda", "Lidl"], n),
+        "Brand": rng.choice(["B3", "B1", "B2", "B4"], n),
+        "Variant": rng.choice(["Zest", "Classic", "Lite"], n),
+        "PPG": rng.choice([f"PPG{i}" for i in range(12, 0, -1)], n),
+    })
+    df.loc[rng.random(n) < 0.05, "Variant"] = None
+    return df
+
+
+def _unique(s):
+    return s.dropna().unique().tolist()
+
+
+def test_children_match_unique_cascade():
+    df = _frame()
+    index = HierarchyIndex(df)
+    assert index.children() == _unique(df["Channel"])
+    for channel in _unique(df["Channel"]):
+        c = df[df["Channel"] == channel]
+        assert index.children(channel) == _unique(c["Brand"])
+        for brand in _unique(c["Brand"]):
+            b = c[c["Brand"] == brand]
+            assert index.children(channel, brand, aggregator="Variant") == _unique(b["Variant"])
+            assert index.children(channel, brand) == _unique(b["PPG"])
+            for variant in _unique(b["Variant"]):
+                v = b[b["Variant"] == variant]
+                path = (channel, brand, variant)
+                assert index.children(*path, aggregator="Variant") == _unique(v["PPG"])
+                for ppg in _unique(v["PPG"]):
+                    pd.testing.assert_frame_equal(
+                        index.take(df, *path, ppg, aggregator="Variant"), v[v["PPG"] == ppg]
+                    )
+
+
+def test_values_within_rows_in_first_appearance_order():
+    df = _frame(seed=1)
+    index = HierarchyIndex(df)
+    rows = index.filter_rows({"Channel": "Lidl"}, exclude={"Brand": "B2"})
+    expected = df[(df["Channel"] == "Lidl") & (df["Brand"] != "B2")]
+    np.testing.assert_array_equal(rows, np.flatnonzero(df.index.isin(expected.index)))
+    assert index.values("PPG", rows) == _unique(expected["PPG"])
+
+
+def test_missing_path_is_empty():
+    index = HierarchyIndex(_frame())
+    assert index.children("Nowhere") == []
+    assert len(index.rows("Tesco", "Nope")) == 0
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from rgm.ingest import append_rows
+
+
+def _rows(dates, ppgs, volume, market="UK"):
+    return pd.DataFrame({
+        "Date": pd.to_datetime(dates),
+        "Market": market,
+        "Channel": pd.Categorical(["Tesco"] * len(dates)),
+        "Brand": "B1",
+        "PPG": pd.Categorical(ppgs),
+        "SalesValue": [v * 2.0 for v in volume],
+        "Volume": [float(v) for v in volume],
+    })
+
+
+def test_append_adds_only_new_keys():
+    base = _rows(["2024-01-01", "2024-01-08", "2024-01-08"], ["P1", "P1", "P2"], [1, 2, 3])
+    new = pd.concat([
+        _rows(["2024-01-08", "2024-01-08"], ["P1", "P2"], [2, 9]),      # duplicate, conflict
+        _rows(["2024-01-15", "2024-01-15"], ["P1", "P1"], [4, 5]),      # new, then repeated in the drop
+        _rows(["2024-01-08"], ["P1"], [2], market="IE"),               # same PPG and date, other market
+    ], ignore_index=True)
+
+    df, report = append_rows(base, new)
+
+    assert len(df) == 5
+    assert (report["added_rows"], report["duplicate_rows"], report["conflict_rows"], report["repeated_rows"]) == (
+        2, 1, 1, 1
+    )
+    assert df.iloc[:3].equals(base)
+    added = df.iloc[3:].reset_index(drop=True)
+    assert added["Market"].tolist() == ["UK", "IE"]
+    assert added["Volume"].tolist() == [4.0, 2.0]
+    assert list(report["conflicts"]["Volume_base"]) == [3.0]
+
+    groups = report["changed_groups"].set_index("PPG")
+    assert groups.loc["P1", "Rows"] == 2
+    assert groups.loc["P1", "FirstNewDate"] == pd.Timestamp("2024-01-08")
+
+
+def test_appending_the_same_drop_twice_adds_nothing():
+    base = _rows(["2024-01-01"], ["P1"], [1])
+    new = _rows(["2024-01-08"], ["P1"], [2])
+    once, _ = append_rows(base, new)
+    twice, report = append_rows(once, new)
+    assert report["added_rows"] == 0 and report["duplicate_rows"] == 1
+    assert len(twice) == 2
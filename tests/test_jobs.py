@@ -0,0 +1,16 @@
+import os
+
+import rgm.jobs as jobs
+from rgm.base_price import worker_pool
+
+
+def test_jobs_get_their_share_of_the_cpus(monkeypatch):
+    cpus = os.cpu_count() or 1
+    assert jobs.available_workers() == cpus
+    monkeypatch.setattr(jobs, "_current", (1, {}, {}, []))
+    monkeypatch.setattr(jobs, "JOB_MAX_WORKERS", cpus)
+    assert jobs.available_workers() == 1
+    with worker_pool() as pool:
+        assert pool is None
+    monkeypatch.setattr(jobs, "JOB_MAX_WORKERS", 1)
+    assert jobs.available_workers() == cpus
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rgm.schema import SchemaError, apply_dtype_plan, plan_dtypes, validate_columns
+
+
+def test_whole_number_prices_stay_float():
+    df = pd.DataFrame({"Price": [10, 12] * 20, "BasePrice": [12, 12] * 20, "Volume": [1, 2] * 20})
+    plan = plan_dtypes(df)
+    assert plan["Price"] == "float32"
+    assert plan["BasePrice"] == "float32"
+    assert plan["Volume"] == "int8"
+
+
+def test_integer_prices_too_wide_for_float32_stay_float64():
+    df = pd.DataFrame({"Price": [2 ** 24 + 1, 3]})
+    assert plan_dtypes(df)["Price"] == "float64"
+
+
+def test_plan_round_trips_values():
+    df = pd.DataFrame({
+        "Channel": ["A", "B"] * 10,
+        "SalesValue": np.arange(20, dtype=float) / 4,
+        "Price": [10, 12] * 10,
+        "Week": np.arange(20),
+    })
+    out = apply_dtype_plan(df.copy(), plan_dtypes(df))
+    assert isinstance(out["Channel"].dtype, pd.CategoricalDtype)
+    for col in ["SalesValue", "Price", "Week"]:
+        np.testing.assert_array_equal(out[col].to_numpy(dtype=float), df[col].to_numpy(dtype=float))
+
+
+def test_validate_columns_is_case_sensitive():
+    ok = ["Date", "Channel", "Brand", "PPG", "SalesValue", "Volume", "Extra"]
+    validate_columns(ok)
+    with pytest.raises(SchemaError, match="'date' should be 'Date'"):
+        validate_columns(["date", "Channel", "Brand", "ppg", "SalesValue", "Volume"])
+    with pytest.raises(SchemaError, match="Volume"):
+        validate_columns(ok[:5])
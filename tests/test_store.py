@@ -0,0 +1,34 @@
+import gc
+
+import pandas as pd
+
+from rgm.store import DatasetRegistry
+
+
+def test_handles_share_one_load_and_writes_stay_per_handle():
+    registry = DatasetRegistry()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return pd.DataFrame({"BasePrice": [1.0, 2.0]}), {"source_name": "x.csv"}
+
+    a, _ = registry.open("digest", loader)
+    b, _ = registry.open("digest", loader)
+    assert len(calls) == 1
+    a.loc[0, "BasePrice"] = 9.0
+    assert b.loc[0, "BasePrice"] == 1.0
+    assert registry.stats()["Handles"].tolist() == [2]
+
+    del a, b
+    gc.collect()
+    assert "digest" not in registry
+
+
+def test_frame_is_the_dataset_without_session_edits():
+    registry = DatasetRegistry()
+    handle, _ = registry.open("digest", lambda: (pd.DataFrame({"BasePrice": [1.0, 2.0]}), {}))
+    handle["BasePrice"] = [5.0, 6.0]
+    handle.drop(columns="BasePrice", inplace=True)
+    assert registry.frame("digest")["BasePrice"].tolist() == [1.0, 2.0]
+    assert registry.frame("other") is None